@@ -0,0 +1,7 @@
+"""
+Benchmarks für das Backend
+
+Aufruf aus dem ``backend``-Verzeichnis, z.B.:
+
+    python -m benchmarks.bench_pap_compiler
+"""
@@ -0,0 +1,49 @@
+"""
+Reproduzierbare Eingabedaten für die Benchmarks
+"""
+
+import random
+from decimal import Decimal
+from typing import Dict, List
+
+
+def sample_inputs(count: int, seed: int = 2025) -> List[Dict]:
+    """Erzeugt gemischte, aber plausible Eingaben über alle Steuerklassen und Zeiträume"""
+    rnd = random.Random(seed)
+    samples = []
+    for _ in range(count):
+        lzz = rnd.choice([1, 2, 2, 2, 3, 4])
+        monthly = rnd.randint(50000, 1500000)
+        re4 = {1: monthly * 12, 2: monthly, 3: monthly * 7 // 30, 4: monthly // 30}[lzz]
+        with_sonstb = rnd.random() < 0.2
+        samples.append(
+            {
+                "RE4": Decimal(max(re4, 1)),
+                "STKL": rnd.randint(1, 6),
+                "LZZ": lzz,
+                "ZKF": Decimal(rnd.randint(0, 6)) / 2,
+                "R": rnd.randint(0, 2),
+                "KVZ": Decimal(rnd.randint(0, 350)) / 100,
+                "PKV": rnd.choice([0, 0, 0, 1, 2]),
+                "PKPV": Decimal(rnd.randint(0, 90000)),
+                "PVS": rnd.randint(0, 1),
+                "PVZ": rnd.randint(0, 1),
+                "PVA": Decimal(rnd.randint(0, 4)),
+                "KRV": rnd.choice([0, 0, 0, 1]),
+                "af": rnd.randint(0, 1),
+                "f": rnd.choice([1.0, 1.0, 0.9, 0.75]),
+                "ALTER1": rnd.choice([0, 0, 0, 1]),
+                "AJAHR": rnd.randint(2005, 2060),
+                "VBEZ": Decimal(rnd.choice([0, 0, 0, rnd.randint(0, 300000)])),
+                "VBEZM": Decimal(rnd.choice([0, rnd.randint(0, 300000)])),
+                "VBEZS": Decimal(rnd.choice([0, rnd.randint(0, 300000)])),
+                "VJAHR": rnd.randint(2000, 2060),
+                "ZMVB": rnd.randint(0, 12),
+                "JRE4": Decimal(monthly * 12 if with_sonstb else 0),
+                "SONSTB": Decimal(rnd.randint(0, 2000000) if with_sonstb else 0),
+                "MBV": Decimal(rnd.choice([0, 0, 0, rnd.randint(0, 500000)]) if with_sonstb else 0),
+                "LZZFREIB": Decimal(rnd.choice([0, 0, rnd.randint(0, 100000)])),
+                "LZZHINZU": Decimal(rnd.choice([0, 0, rnd.randint(0, 100000)])),
+            }
+        )
+    return samples
@@ -0,0 +1,55 @@
+"""
+Benchmark: vektorisierter Rechenkern gegen den int-Rechenkern je Zeile
+
+Rechnet eine Lohnliste spaltenweise mit ``calculate_batch``, prüft die Ergebnisse auf
+einer Teilmenge gegen den Decimal-PAP und vergleicht die Zeit mit dem int-Rechenkern.
+"""
+
+import time
+
+import numpy as np
+
+import tax_calculator_batch
+import tax_calculator_int
+from benchmarks._inputs import sample_inputs
+from pap_compiler import load_pap_module
+
+
+def main(count: int = 100000, repeat: int = 3):
+    samples = sample_inputs(count)
+    columns = {}
+    for name in samples[0]:
+        values = [data[name] for data in samples]
+        if all(value == int(value) for value in values):
+            # Ganzzahlige Spalten als int64, Nachkommawerte (ZKF, KVZ, f) als float64
+            columns[name] = np.array([int(value) for value in values], dtype=np.int64)
+        else:
+            columns[name] = np.array([float(value) for value in values])
+    pap = load_pap_module()
+
+    result = tax_calculator_batch.calculate_batch(columns)
+    for index in range(0, count, max(count // 2000, 1)):
+        expected = pap.calculate(**samples[index])
+        actual = {name: int(column[index]) for name, column in result.items()}
+        if actual != {name: int(value) for name, value in expected.items()}:
+            raise SystemExit(f"Abweichung für {samples[index]}: {expected} != {actual}")
+    print(f"{count} Eingaben: Stichprobe identisch")
+
+    batch_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tax_calculator_batch.calculate_batch(columns)
+        batch_time = min(batch_time, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for data in samples:
+        tax_calculator_int.calculate(**data)
+    int_time = time.perf_counter() - start
+
+    print(f"int je Zeile:      {int_time:8.3f} s ({int_time / count * 1e6:.1f} µs/Berechnung)")
+    print(f"calculate_batch:   {batch_time:8.3f} s ({batch_time / count * 1e6:.2f} µs/Berechnung)")
+    print(f"Faktor:            {int_time / batch_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark: Kosten für das Erzeugen eines TaxCalculator2025 und für MPARA
+
+Misst die Zeit pro Konstruktion, die dabei neu belegten Bytes (tracemalloc) sowie
+die Zeit eines MPARA-Aufrufs mit gleichbleibenden Sozialversicherungs-Eingaben.
+"""
+
+import logging
+import time
+import tracemalloc
+
+from benchmarks._inputs import sample_inputs
+from tax_calculator import TaxCalculator2025
+
+
+def main(count: int = 20000, repeat: int = 3):
+    logging.disable(logging.INFO)
+    samples = sample_inputs(count)
+
+    construct_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for data in samples:
+            TaxCalculator2025(**data)
+        construct_time = min(construct_time, time.perf_counter() - start)
+
+    tracemalloc.start()
+    calculators = [TaxCalculator2025(**data) for data in samples[:1000]]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mpara_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for calculator in calculators:
+            calculator.MPARA()
+        mpara_time = min(mpara_time, time.perf_counter() - start)
+
+    print(f"Konstruktion:  {construct_time / count * 1e6:8.2f} µs")
+    print(f"Belegt:        {allocated / len(calculators):8.0f} Bytes je Instanz")
+    print(f"MPARA:         {mpara_time / len(calculators) * 1e6:8.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
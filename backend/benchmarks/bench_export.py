@@ -0,0 +1,98 @@
+"""
+Benchmark: PDF-/Excel-Exporte je Report und im Prozess-Pool
+
+Misst die Zeit je Report mit frisch angelegtem Service (Stile bei jedem Aufruf gebaut)
+gegen einen wiederverwendeten Service, für Excel zusätzlich die temporären Dateien in
+``/tmp`` gegen ``EXPORT_TMPDIR``. Danach den Durchsatz eines Prozess-Pools mit
+``init_export_worker`` für 1 bis ``os.cpu_count()`` Worker.
+"""
+
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import export_service
+from benchmarks._inputs import sample_inputs
+from engines import calculate_pap
+from executor import _init_worker
+
+SERVICES = {
+    "pdf": export_service.PDFExportService,
+    "excel": export_service.ExcelExportService,
+}
+
+
+def _percentiles(times):
+    times = sorted(times)
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    return f"p50 {statistics.median(times) * 1e3:6.2f} ms  p95 {p95 * 1e3:6.2f} ms"
+
+
+def _measure(render, cases):
+    times = []
+    for input_data, result in cases:
+        start = time.perf_counter()
+        render(input_data, result)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _render_job(args):
+    format_type, input_data, result = args
+    return len(export_service.render_calculation_report(format_type, input_data, result))
+
+
+def main(count: int = 50, jobs: int = 200):
+    cases = [(data, calculate_pap(data)) for data in sample_inputs(count)]
+
+    for format_type, service_class in SERVICES.items():
+        cold = _measure(lambda d, r: service_class().generate_calculation_report(d, r), cases)
+        service = service_class()
+        service.generate_calculation_report(*cases[0])
+        warm = _measure(service.generate_calculation_report, cases)
+        print(f"{format_type:6} neuer Service:  {_percentiles(cold)}")
+        print(f"{format_type:6} Service wieder: {_percentiles(warm)}")
+
+    service = export_service.ExcelExportService()
+    standard = tempfile.gettempdir()
+    for tmpdir in dict.fromkeys((standard, export_service.EXPORT_TMPDIR)):
+        if not os.path.isdir(tmpdir):
+            continue
+        tempfile.tempdir = tmpdir
+        times = _measure(service.generate_calculation_report, cases)
+        print(f"excel  Temp {tmpdir:10} {_percentiles(times)}")
+    tempfile.tempdir = None
+
+    comparison = export_service.ComparisonExportService()
+    scenarios = [{"input": d, "result": r, "name": f"S{i}"} for i, (d, r) in enumerate(cases[:4])]
+    times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        comparison.generate_comparison_report(scenarios, "pdf")
+        times.append(time.perf_counter() - start)
+    print(f"Vergleich (4 Szenarien, pdf): {_percentiles(times)}")
+
+    auftraege = [
+        ("pdf" if index % 2 else "excel", *cases[index % count]) for index in range(jobs)
+    ]
+    context = multiprocessing.get_context("spawn")
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        with ProcessPoolExecutor(
+            workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(export_service.init_export_worker,),
+        ) as pool:
+            # Worker starten und aufwärmen, bevor gemessen wird
+            list(pool.map(_render_job, auftraege[:workers]))
+            start = time.perf_counter()
+            list(pool.map(_render_job, auftraege, chunksize=4))
+            elapsed = time.perf_counter() - start
+        print(f"Pool mit {workers} Worker(n): {jobs / elapsed:7.1f} Reports/s")
+
+
+if __name__ == "__main__":
+    main()
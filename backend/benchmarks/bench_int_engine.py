@@ -0,0 +1,54 @@
+"""
+Benchmark: ganzzahliger Rechenkern gegen den übersetzten Decimal-PAP
+
+Prüft zunächst, dass beide Rechenkerne für alle Eingaben identische Ergebnisse
+(auch als Zeichenkette) liefern, und misst dann die Zeit pro Berechnung. Die Klasse
+TaxCalculator2025 wird zum Vergleich auf einer Teilmenge gemessen.
+"""
+
+import logging
+import time
+
+import tax_calculator_int
+from benchmarks._inputs import sample_inputs
+from pap_compiler import load_pap_module
+from tax_calculator import TaxCalculator2025
+
+
+def _measure(func, samples, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for data in samples:
+            func(**data)
+        best = min(best, time.perf_counter() - start)
+    return best / len(samples)
+
+
+def main(count: int = 20000, repeat: int = 3):
+    logging.disable(logging.INFO)
+    samples = sample_inputs(count)
+    pap = load_pap_module()
+
+    for data in samples:
+        expected = pap.calculate(**data)
+        actual = tax_calculator_int.calculate(**data)
+        if {k: str(v) for k, v in expected.items()} != {k: str(v) for k, v in actual.items()}:
+            raise SystemExit(f"Abweichung für {data}: {expected} != {actual}")
+    print(f"{count} Eingaben: Ergebnisse identisch")
+
+    class_time = _measure(
+        lambda **d: TaxCalculator2025(**d).calculate(), samples[: count // 10], repeat
+    )
+    decimal_time = _measure(pap.calculate, samples, repeat)
+    int_time = _measure(tax_calculator_int.calculate, samples, repeat)
+
+    print(f"TaxCalculator2025:          {class_time * 1e6:8.1f} µs/Berechnung")
+    print(f"Decimal (übersetzter PAP):  {decimal_time * 1e6:8.1f} µs/Berechnung")
+    print(f"int (Cent-Festkomma):       {int_time * 1e6:8.1f} µs/Berechnung")
+    print(f"Faktor gegenüber Decimal:   {decimal_time / int_time:8.1f}x")
+    print(f"Faktor gegenüber Klasse:    {class_time / int_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
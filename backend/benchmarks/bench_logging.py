@@ -0,0 +1,114 @@
+"""
+Benchmark: Log-Ereignisse synchron über ``logging`` gegen die Warteschlange der LogPipeline
+
+Gemessen wird die Zeit je Ereignis auf dem Anfragepfad (``log_request`` und ``log_error`` mit
+``input_data``) für einen schnellen Ausgabestrom (Datei) und einen langsamen, der je Schreiben
+1 ms braucht, etwa eine blockierende Pipe. Die Pipeline schreibt in einem Hintergrund-Thread.
+"""
+
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks._inputs import sample_inputs
+from log_pipeline import LogPipeline
+from monitoring import StructuredLogger
+
+
+class _JsonFormatter(logging.Formatter):
+    FELDER = ("event_type", "method", "path", "client_ip", "user_agent", "input_data")
+
+    def format(self, record):
+        daten = {name: getattr(record, name, None) for name in self.FELDER}
+        daten["message"] = record.getMessage()
+        return json.dumps(daten, default=str)
+
+
+class _SlowStream(io.TextIOBase):
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        time.sleep(0.001)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def _sync_logger(stream) -> logging.Logger:
+    """Bisheriger Weg: logger.info mit ``extra`` und Handler, der sofort schreibt"""
+    logger = logging.getLogger(f"bench_sync_{id(stream)}")
+    logger.handlers = []
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(_JsonFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def _sync_events(logger: logging.Logger, inputs, requests: int):
+    for i in range(requests):
+        logger.info(
+            "Request received",
+            extra={
+                "event_type": "request",
+                "method": "POST",
+                "path": "/api/v1/calculate_payroll_tax",
+                "client_ip": "10.0.0.1",
+                "user_agent": "bench",
+                "timestamp": datetime.utcnow().isoformat(),
+            },
+        )
+        if i % 10 == 0:
+            logger.error(
+                "Error occurred: ValueError",
+                extra={
+                    "event_type": "error",
+                    "input_data": inputs[i % len(inputs)],
+                    "timestamp": datetime.utcnow().isoformat(),
+                },
+            )
+
+
+def _pipeline_events(logger: StructuredLogger, inputs, requests: int):
+    for i in range(requests):
+        logger.log_request("POST", "/api/v1/calculate_payroll_tax", "10.0.0.1", "bench")
+        if i % 10 == 0:
+            logger.log_error("ValueError", "bench", inputs[i % len(inputs)], "10.0.0.1")
+
+
+def main(requests: int = 20000):
+    inputs = sample_inputs(100)
+    with tempfile.TemporaryDirectory() as tmp, open(os.path.join(tmp, "log.jsonl"), "w") as fh:
+        for name, stream in (("Datei", fh), ("langsam (1 ms je write)", _SlowStream(fh))):
+            anzahl = requests if name == "Datei" else requests // 20
+            logger = _sync_logger(stream)
+            start = time.perf_counter()
+            _sync_events(logger, inputs, anzahl)
+            sync_us = (time.perf_counter() - start) / anzahl * 1e6
+
+            pipeline = LogPipeline(stream, queue_size=anzahl * 2)
+            structured = StructuredLogger("bench_pipeline", pipeline)
+            structured.logger.setLevel(logging.INFO)
+            start = time.perf_counter()
+            _pipeline_events(structured, inputs, anzahl)
+            pipeline_us = (time.perf_counter() - start) / anzahl * 1e6
+            start = time.perf_counter()
+            pipeline.flush()
+            flush_ms = (time.perf_counter() - start) * 1000
+            stats = pipeline.get_stats()
+            print(
+                f"{name:<24} synchron {sync_us:8.2f} µs/Anfrage | Pipeline {pipeline_us:5.2f} "
+                f"µs/Anfrage, danach flush {flush_ms:7.1f} ms, {stats['written']} Zeilen "
+                f"geschrieben, {stats['dropped']} verworfen"
+            )
+
+
+if __name__ == "__main__":
+    main()
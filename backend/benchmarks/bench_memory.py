@@ -0,0 +1,55 @@
+"""
+Benchmark: Speicherbedarf und Attributzugriff von TaxCalculator2025
+
+Misst die belegten Bytes je Instanz (tracemalloc), den Zuwachs des maximalen RSS für
+100.000 gleichzeitig lebende Instanzen sowie die Zeit eines vollständigen calculate().
+"""
+
+import gc
+import logging
+import resource
+import sys
+import time
+import tracemalloc
+
+from benchmarks._inputs import sample_inputs
+from tax_calculator import TaxCalculator2025
+
+
+def _max_rss() -> int:
+    """Maximaler RSS des Prozesses in Bytes (ru_maxrss ist unter Linux in KiB)"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def main(count: int = 100000, calculate_count: int = 5000, repeat: int = 3):
+    logging.disable(logging.INFO)
+    samples = sample_inputs(1000)
+
+    tracemalloc.start()
+    probe = [TaxCalculator2025(**data) for data in samples]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del probe
+    gc.collect()
+
+    rss_before = _max_rss()
+    calculators = [TaxCalculator2025(**samples[i % len(samples)]) for i in range(count)]
+    rss_after = _max_rss()
+    del calculators
+    gc.collect()
+
+    calculate_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(calculate_count):
+            TaxCalculator2025(**samples[i % len(samples)]).calculate()
+        calculate_time = min(calculate_time, time.perf_counter() - start)
+
+    print(f"Belegt:          {allocated / len(samples):8.0f} Bytes je Instanz")
+    print(f"Max. RSS +{count}: {(rss_after - rss_before) / 2**20:8.1f} MiB")
+    print(f"calculate():     {calculate_time / calculate_count * 1e6:8.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
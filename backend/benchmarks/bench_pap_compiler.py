@@ -0,0 +1,52 @@
+"""
+Benchmark: übersetzter PAP (pap_compiler) gegen die Klasse TaxCalculator2025
+
+Prüft zunächst, dass beide Varianten für alle Eingaben identische Ergebnisse liefern,
+und misst dann die Zeit pro Berechnung.
+"""
+
+import logging
+import time
+
+from benchmarks._inputs import sample_inputs
+from pap_compiler import load_pap_module
+from tax_calculator import TaxCalculator2025
+
+
+def _measure(func, samples, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for data in samples:
+            func(data)
+        best = min(best, time.perf_counter() - start)
+    return best / len(samples)
+
+
+def main(count: int = 5000, repeat: int = 3):
+    # Das Logging der Klasse würde sonst die Messung dominieren und die Ausgabe fluten
+    logging.disable(logging.INFO)
+    samples = sample_inputs(count)
+
+    start = time.perf_counter()
+    pap = load_pap_module()
+    load_time = time.perf_counter() - start
+
+    for data in samples:
+        expected = TaxCalculator2025(**data).calculate()
+        actual = pap.calculate(**data)
+        if {k: str(v) for k, v in expected.items()} != {k: str(v) for k, v in actual.items()}:
+            raise SystemExit(f"Abweichung für {data}: {expected} != {actual}")
+    print(f"{count} Eingaben: Ergebnisse identisch")
+
+    class_time = _measure(lambda d: TaxCalculator2025(**d).calculate(), samples, repeat)
+    pap_time = _measure(lambda d: pap.calculate(**d), samples, repeat)
+
+    print(f"Laden/Übersetzen des PAP:   {load_time * 1000:8.1f} ms")
+    print(f"TaxCalculator2025:          {class_time * 1e6:8.1f} µs/Berechnung")
+    print(f"Übersetzter PAP:            {pap_time * 1e6:8.1f} µs/Berechnung")
+    print(f"Faktor:                     {class_time / pap_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
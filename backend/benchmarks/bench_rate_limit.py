@@ -0,0 +1,113 @@
+"""
+Benchmark: GCRA-Rate-Limiter gegen Zeitstempel-Listen je Client
+
+Die bisherige Prüfung hielt je Client eine Liste der Anfragezeiten im Fenster und baute sie bei
+jeder Anfrage neu auf; Clients wurden nie entfernt. Gemessen wird die Zeit je Anfrage und der
+Speicher bei vielen verschiedenen Clients, danach der Durchsatz mehrerer Prozesse auf einer
+gemeinsamen Datei.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+from rate_limiter import RateLimiter
+
+LIMIT = 100
+WINDOW = 60
+
+
+def _list_limiter():
+    request_counts = defaultdict(list)
+
+    def check(client_ip: str) -> bool:
+        current_time = time.time()
+        request_counts[client_ip] = [
+            t for t in request_counts[client_ip] if current_time - t < WINDOW
+        ]
+        if len(request_counts[client_ip]) >= LIMIT:
+            return False
+        request_counts[client_ip].append(current_time)
+        return True
+
+    return check
+
+
+def _clients(count: int, requests: int):
+    # Wenige aktive Clients mit vielen Anfragen, dazu viele mit einzelnen
+    return [
+        f"10.0.{i % 256}.{i % 97}" if i % 2 else f"192.168.{(i // 2) % count}"
+        for i in range(requests)
+    ]
+
+
+def _measure(check, clients) -> float:
+    start = time.perf_counter()
+    for client in clients:
+        check(client)
+    return (time.perf_counter() - start) / len(clients) * 1e6
+
+
+def _peak_memory(check, clients) -> int:
+    tracemalloc.start()
+    for client in clients:
+        check(client)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def _worker(path: str, requests: int, queue):
+    limiter = RateLimiter(LIMIT, WINDOW, path)
+    clients = [f"172.16.{os.getpid() % 256}.{i % 5000}" for i in range(requests)]
+    start = time.perf_counter()
+    for client in clients:
+        limiter.hit(client)
+    queue.put(time.perf_counter() - start)
+
+
+def main(requests: int = 200000, processes: int = 4):
+    for count in (1000, 100000, 500000):
+        clients = _clients(count, max(requests, 2 * count))
+        liste_us = _measure(_list_limiter(), clients)
+        liste_mem = _peak_memory(_list_limiter(), clients)
+        limiter = RateLimiter(LIMIT, WINDOW)
+        gcra_us = _measure(limiter.hit, clients)
+        print(
+            f"{count:>8} Clients: Listen {liste_us:6.2f} µs/Anfrage, {liste_mem / 2**20:7.1f} MB"
+            f" | GCRA {gcra_us:5.2f} µs/Anfrage, Datei fest "
+            f"{limiter.slots * 16 / 2**20:.1f} MB, {limiter.evictions} verdrängt"
+        )
+        limiter.close()
+
+    # Ein voller Client: Listen wachsen bis LIMIT Einträge, die GCRA bleibt bei einem Slot
+    clients = ["10.0.0.1"] * requests
+    liste_us = _measure(_list_limiter(), clients)
+    gcra_us = _measure(RateLimiter(LIMIT, WINDOW).hit, clients)
+    print(f"ein Client im Limit:  Listen {liste_us:6.2f} µs/Anfrage | GCRA {gcra_us:5.2f} µs")
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rate_limit.bin")
+        RateLimiter(LIMIT, WINDOW, path).close()
+        queue = context.Queue()
+        workers = [
+            context.Process(target=_worker, args=(path, requests, queue))
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        zeiten = [queue.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+    print(
+        f"{processes} Prozesse, gemeinsame Datei: "
+        f"{processes * requests / max(zeiten):,.0f} Anfragen/s gesamt"
+    )
+
+
+if __name__ == "__main__":
+    main()
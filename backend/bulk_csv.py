@@ -0,0 +1,267 @@
+"""
+Lohnlisten als CSV: zeilenweise einlesen, blockweise rechnen, als CSV zurückgeben
+
+Eine Zeile je Beschäftigtem, die Spalten heißen wie die Felder von ``LohnsteuerRequest``
+(``RE4``, ``STKL``, ``LZZ``, ...); leere Zellen gelten als nicht angegeben. Die Eingabe wird
+nie vollständig gehalten: ``RecordSplitter`` zerlegt beliebige Textstücke in vollständige
+Datensätze (Zeilenumbrüche in Anführungszeichen bleiben erhalten), je ``CHUNK_ROWS``
+Datensätze rechnet ``process_chunk`` mit einem Aufruf des Rechenkerns (Standard ``numpy``)
+und liefert die Zeilen mit angehängten Ergebnisspalten und ``error``.
+
+Aufruf als Skript (``-`` für stdin/stdout):
+
+    python bulk_csv.py lohnliste.csv ergebnis.csv [--engine numpy] [--chunk-rows 5000]
+"""
+
+import argparse
+import codecs
+import csv
+import io
+import os
+import sys
+from decimal import Decimal, InvalidOperation
+from typing import (
+    AsyncIterator, Callable, Collection, Dict, Iterator, List, Optional, TextIO, Tuple, Union
+)
+
+from engines import BATCH_ENGINES, calculate_pap_batch, pap2025
+from payroll_input import BULK_FIELDS, BULK_REQUIRED, validate_payroll_row
+
+# Datensätze je Aufruf des Rechenkerns
+CHUNK_ROWS = int(os.environ.get("BULK_CHUNK_ROWS", "5000"))
+
+# Gelesene Bytes je Block beim Lesen aus Dateien
+READ_BYTES = 1 << 20
+
+RESULT_COLUMNS = tuple(pap2025.OUTPUTS)
+
+
+class BulkFormatError(ValueError):
+    """Die Kopfzeile der CSV-Datei passt nicht zu den Eingabefeldern"""
+
+
+class RecordSplitter:
+    """Zerlegt fortlaufenden Text in vollständige CSV-Datensätze"""
+
+    def __init__(self):
+        self._rest = ""
+        self._offen = ""
+
+    def feed(self, text: str) -> List[str]:
+        zeilen = (self._rest + text).split("\n")
+        self._rest = zeilen.pop()
+        return self._datensaetze(zeilen)
+
+    def close(self) -> List[str]:
+        """Restliche Datensätze am Ende der Eingabe"""
+        zeilen, self._rest = [self._rest], ""
+        datensaetze = self._datensaetze(zeilen)
+        if self._offen:
+            raise BulkFormatError("Die CSV-Datei endet in einem Feld mit Anführungszeichen")
+        return datensaetze
+
+    def _datensaetze(self, zeilen: List[str]) -> List[str]:
+        datensaetze = []
+        for zeile in zeilen:
+            if self._offen:
+                zeile = self._offen + "\n" + zeile
+            # Ungerade Zahl von Anführungszeichen: der Datensatz geht in der nächsten Zeile weiter
+            if zeile.count('"') % 2:
+                self._offen = zeile
+                continue
+            self._offen = ""
+            zeile = zeile.rstrip("\r")
+            if zeile:
+                datensaetze.append(zeile)
+        return datensaetze
+
+
+def parse_header(record: str, fields: Collection[str], required: Collection[str]) -> List[str]:
+    """Spaltennamen aus der Kopfzeile; unbekannte oder fehlende Pflichtfelder sind Fehler"""
+    columns = [name.strip() for name in next(csv.reader([record]))]
+    unbekannt = [name for name in columns if name not in fields]
+    if unbekannt:
+        raise BulkFormatError(f"Unbekannte Spalten: {', '.join(unbekannt)}")
+    doppelt = sorted({name for name in columns if columns.count(name) > 1})
+    if doppelt:
+        raise BulkFormatError(f"Doppelte Spalten: {', '.join(doppelt)}")
+    fehlend = [name for name in required if name not in columns]
+    if fehlend:
+        raise BulkFormatError(f"Fehlende Pflichtspalten: {', '.join(fehlend)}")
+    return columns
+
+
+def output_columns(columns: List[str]) -> List[str]:
+    """Spalten der Ausgabe: Eingabespalten, Ergebnisspalten und ``error``"""
+    return list(columns) + list(RESULT_COLUMNS) + ["error"]
+
+
+def header_line(columns: List[str]) -> str:
+    """Kopfzeile der CSV-Ausgabe"""
+    return _csv_text([output_columns(columns)])
+
+
+def xlsx_formats(columns: List[str]) -> List[Optional[str]]:
+    """Zahlenformate für ``xlsx_stream``: Ergebnisse als ganze Cent mit Tausenderpunkten"""
+    return [None] * len(columns) + ["integer"] * len(RESULT_COLUMNS) + [None]
+
+
+def _zelle(text: str):
+    """Zahl für Excel, sofern die Zelle eine ist, sonst der Text"""
+    try:
+        zahl = Decimal(text)
+    except InvalidOperation:
+        return text
+    if not zahl.is_finite():
+        return text
+    return int(zahl) if zahl == zahl.to_integral_value() else zahl
+
+
+def _csv_text(rows) -> str:
+    out = io.StringIO()
+    csv.writer(out, lineterminator="\n").writerows(rows)
+    return out.getvalue()
+
+
+def process_chunk(
+    columns: List[str],
+    records: List[str],
+    validate: Callable[[Dict[str, str]], Dict],
+    engine: Optional[str] = None,
+    as_rows: bool = False,
+) -> Tuple[Union[str, List[List]], int]:
+    """Rechnet einen Block von Datensätzen; liefert (CSV mit Ergebnisspalten, Zahl der Fehler)
+
+    ``validate`` wandelt die Zellen einer Zeile in Eingaben des PAP und löst bei ungültigen
+    Werten ``ValueError`` aus; solche Zeilen erhalten leere Ergebnisse und ``error``.
+    Mit ``as_rows`` statt CSV die Zeilen als Listen mit Zahlen, z.B. für ``xlsx_stream``.
+    """
+    zeilen = []
+    fehler: Dict[int, str] = {}
+    eingaben = []
+    for index, values in enumerate(csv.reader(records)):
+        zeilen.append(values)
+        if len(values) != len(columns):
+            fehler[index] = f"{len(values)} statt {len(columns)} Spalten"
+            continue
+        try:
+            eingaben.append(validate({k: v for k, v in zip(columns, values) if v.strip()}))
+        except ValueError as e:
+            fehler[index] = str(e)
+    ergebnisse = iter(calculate_pap_batch(eingaben, engine))
+
+    leer = [""] * len(RESULT_COLUMNS)
+    ausgabe = []
+    for index, values in enumerate(zeilen):
+        if as_rows:
+            values = [_zelle(value) for value in values]
+        if index in fehler:
+            ausgabe.append(values + leer + [fehler[index]])
+        elif as_rows:
+            result = next(ergebnisse)
+            ausgabe.append(values + [_zelle(str(result[name])) for name in RESULT_COLUMNS] + [""])
+        else:
+            result = next(ergebnisse)
+            ausgabe.append(values + [str(result[name]) for name in RESULT_COLUMNS] + [""])
+    return (ausgabe if as_rows else _csv_text(ausgabe)), len(fehler)
+
+
+def iter_chunks(source: TextIO, chunk_rows: int = CHUNK_ROWS) -> Iterator[List[str]]:
+    """Datensätze einer Textdatei in Blöcken von höchstens ``chunk_rows``"""
+    splitter = RecordSplitter()
+    records: List[str] = []
+    while True:
+        text = source.read(READ_BYTES)
+        records += splitter.feed(text) if text else splitter.close()
+        while len(records) >= chunk_rows or (records and not text):
+            yield records[:chunk_rows]
+            records = records[chunk_rows:]
+        if not text:
+            return
+
+
+async def aiter_chunks(
+    stream: AsyncIterator[bytes], chunk_rows: int = CHUNK_ROWS
+) -> AsyncIterator[List[str]]:
+    """Wie ``iter_chunks`` für einen Bytestrom in UTF-8, z.B. den Body einer Anfrage"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    splitter = RecordSplitter()
+    records: List[str] = []
+    async for data in stream:
+        records += splitter.feed(decoder.decode(data))
+        while len(records) >= chunk_rows:
+            yield records[:chunk_rows]
+            records = records[chunk_rows:]
+    records += splitter.feed(decoder.decode(b"", True)) + splitter.close()
+    while records:
+        yield records[:chunk_rows]
+        records = records[chunk_rows:]
+
+
+def process_file(
+    source: TextIO,
+    target: TextIO,
+    validate: Callable[[Dict[str, str]], Dict],
+    fields: Collection[str],
+    required: Collection[str],
+    engine: Optional[str] = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Dict[str, int]:
+    """Rechnet eine ganze CSV-Datei blockweise; liefert die Zahl der Zeilen und Fehler"""
+    chunks = iter_chunks(source, chunk_rows)
+    records = next(chunks, [])
+    if not records:
+        raise BulkFormatError("Die CSV-Datei ist leer")
+    columns = parse_header(records.pop(0), fields, required)
+    target.write(header_line(columns))
+    stats = {"rows": 0, "failed": 0}
+    while records is not None:
+        if records:
+            text, failed = process_chunk(columns, records, validate, engine)
+            target.write(text)
+            stats["rows"] += len(records)
+            stats["failed"] += failed
+        records = next(chunks, None)
+    return stats
+
+
+def cli(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Lohnsteuer für eine CSV-Lohnliste berechnen")
+    parser.add_argument("eingabe", help="CSV-Datei mit einer Zeile je Beschäftigtem, - für stdin")
+    parser.add_argument("ausgabe", help="CSV-Datei für das Ergebnis, - für stdout")
+    parser.add_argument("--engine", choices=BATCH_ENGINES, default="numpy")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--encoding", default="utf-8-sig", help="Zeichensatz der Eingabe")
+    args = parser.parse_args(argv)
+
+    source = (
+        io.TextIOWrapper(sys.stdin.buffer, encoding=args.encoding, newline="")
+        if args.eingabe == "-"
+        else open(args.eingabe, encoding=args.encoding, newline="")
+    )
+    target = (
+        sys.stdout
+        if args.ausgabe == "-"
+        else open(args.ausgabe, "w", encoding="utf-8", newline="")
+    )
+    try:
+        stats = process_file(
+            source,
+            target,
+            validate_payroll_row,
+            BULK_FIELDS,
+            BULK_REQUIRED,
+            args.engine,
+            args.chunk_rows,
+        )
+    except BulkFormatError as e:
+        raise SystemExit(f"Fehler: {e}")
+    finally:
+        source.close()
+        if target is not sys.stdout:
+            target.close()
+    print(f"{stats['rows']} Zeilen berechnet, davon {stats['failed']} mit Fehler", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    cli()
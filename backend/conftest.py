@@ -0,0 +1,10 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# Die Tests laden ``main`` mit einem eigenen Ergebnis-Cache statt der Datei unter
+# pap/generated; das Verzeichnis wird am Ende des Laufs entfernt
+_TMP = tempfile.mkdtemp(prefix="lohnsteuer_tests_")
+os.environ["RESULT_CACHE_PATH"] = os.path.join(_TMP, "result_cache.bin")
+atexit.register(shutil.rmtree, _TMP, ignore_errors=True)
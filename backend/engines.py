@@ -0,0 +1,112 @@
+"""
+Auswahl des Rechenkerns und des PAP-Jahres
+
+- ``int``: der ganzzahlige Rechenkern aus tax_calculator_int.py mit den vorberechneten
+  Tariftabellen (tarif_tabellen.py), Standard
+- ``decimal``: der aus pap/Lohnsteuer2025.xml übersetzte PAP
+
+Beide liefern identische Ergebnisse. Der Standard kann über die Umgebungsvariable
+``PAP_ENGINE`` gesetzt und pro Aufruf überschrieben werden.
+
+Für viele Eingaben auf einmal rechnet ``calculate_pap_batch`` standardmäßig mit dem
+vektorisierten Rechenkern ``numpy`` (tax_calculator_batch.py) in einem Aufruf.
+
+Das Jahr steht als ``year`` in den Eingaben (ohne Angabe ``PAP_YEAR``, Standard 2025) und
+wählt den PAP aus ``pap_registry``. ``int`` und ``numpy`` gibt es nur für den PAP 2025;
+für andere Jahre rechnet immer der übersetzte PAP, der beim ersten Aufruf geladen wird.
+"""
+
+import os
+from decimal import Decimal
+from operator import itemgetter
+from typing import Dict, List, Optional
+
+import tarif_tabellen
+import tax_calculator_batch
+import tax_calculator_int
+from pap_compiler import load_pap_module
+from pap_registry import PAPEntry, registry
+
+ENGINES = ("decimal", "int")
+BATCH_ENGINES = ("numpy",) + ENGINES
+DEFAULT_ENGINE = os.environ.get("PAP_ENGINE", "int")
+
+if DEFAULT_ENGINE not in ENGINES:
+    raise ValueError(f"Unbekannter Rechenkern in PAP_ENGINE: {DEFAULT_ENGINE}")
+
+# Aus pap/Lohnsteuer2025.xml übersetzter PAP, Referenz der ganzzahligen Rechenkerne
+pap2025 = load_pap_module()
+
+# PAP des Standardjahres wird beim Start geladen, alle anderen Jahre erst bei Bedarf
+default_pap = registry.get()
+default_pap.module
+
+# Ändert sich mit PAP-XML, Übersetzer oder int-Rechenkern, z.B. für Cache-Schlüssel
+PAP_VERSION = f"{pap2025.__name__}:{tarif_tabellen.tabellen_schluessel(tax_calculator_int.calculate)[:16]}"
+
+
+def pap_entry(data: Dict) -> PAPEntry:
+    """PAP-Version zum Feld ``year`` der Eingaben"""
+    year = data.get("year")
+    return default_pap if year is None else registry.get(year)
+
+
+def fixed_point(data: Dict) -> bool:
+    """True, wenn die Eingaben mit den ganzzahligen Rechenkernen gerechnet werden können"""
+    return pap_entry(data).fixed_point
+
+
+def pap_version(data: Dict) -> str:
+    """Versionskennung des PAP zu den Eingaben, z.B. für Cache-Schlüssel"""
+    entry = pap_entry(data)
+    return PAP_VERSION if entry.fixed_point else entry.module.__name__
+
+
+def calculate_pap(data: Dict, engine: Optional[str] = None) -> Dict:
+    """Berechnet den PAP des Jahres ``data["year"]`` mit dem gewählten Rechenkern"""
+    engine = engine or DEFAULT_ENGINE
+    entry = pap_entry(data)
+    if engine == "int" and entry.fixed_point:
+        try:
+            return tax_calculator_int.calculate(**data)
+        except tax_calculator_int.NotRepresentableError:
+            # z.B. Cent-Beträge mit Nachkommastellen: exakt nur mit Decimal
+            return entry.module.calculate(**data)
+    if engine in ENGINES:
+        return entry.module.calculate(**data)
+    raise ValueError(f"Unbekannter Rechenkern: {engine}")
+
+
+def calculate_pap_batch(rows: List[Dict], engine: Optional[str] = None) -> List[Dict]:
+    """Berechnet den PAP für viele Eingaben, Ergebnisse in derselben Reihenfolge"""
+    engine = engine or "numpy"
+    if engine != "numpy":
+        return [calculate_pap(row, engine) for row in rows]
+    if not rows:
+        return []
+    if not all(map(fixed_point, rows)):
+        # Andere Jahre zeilenweise mit dem übersetzten PAP, das Jahr 2025 weiter spaltenweise
+        vektoriell = [index for index, row in enumerate(rows) if fixed_point(row)]
+        results = [None] * len(rows)
+        for index, result in zip(vektoriell, calculate_pap_batch([rows[i] for i in vektoriell])):
+            results[index] = result
+        return [result or calculate_pap(row, "decimal") for row, result in zip(rows, results)]
+    columns = {}
+    for name in tax_calculator_batch.INPUTS:
+        try:
+            columns[name] = list(map(itemgetter(name), rows))
+        except KeyError:
+            standard = tax_calculator_batch.STANDARDWERTE.get(name, 0)
+            columns[name] = [row.get(name, standard) for row in rows]
+    try:
+        spalten = tax_calculator_batch.calculate_batch(columns)
+    except tax_calculator_int.NotRepresentableError:
+        # z.B. Cent-Beträge mit Nachkommastellen: zeilenweise, exakt mit Decimal-Fallback
+        return [calculate_pap(row, "int") for row in rows]
+    werte = []
+    for spalte in spalten.values():
+        spalte = spalte.tolist()
+        # Viele Spalten sind überwiegend 0: jeden Wert nur einmal in Decimal wandeln
+        dezimal = {wert: Decimal(wert) for wert in set(spalte)}
+        werte.append(list(map(dezimal.__getitem__, spalte)))
+    return [dict(zip(spalten, zeile)) for zeile in zip(*werte)]
@@ -0,0 +1,161 @@
+"""
+Worker-Pools für rechenintensive Aufträge der API
+
+Die Endpunkte sind ``async def``; Berechnungen und Exporte laufen deshalb nicht in der
+Ereignisschleife, sondern in einem ``WorkerPool``:
+
+- ``thread``: kurze Berechnungen (der PAP gibt den GIL zwischen Anfragen schnell frei)
+- ``process``: PDF/Excel-Exporte und große Batches, die sonst den Worker blockieren
+
+Jeder Pool nimmt höchstens ``max_workers + max_queue`` Aufträge an (sonst ``PoolBusyError``)
+und wartet höchstens ``timeout`` Sekunden auf ein Ergebnis (sonst ``PoolTimeoutError``).
+Ein bereits laufender Auftrag wird dabei nicht abgebrochen, belegt seinen Platz aber bis
+zum Ende. Mit ``max_workers = 0`` wird direkt im aufrufenden Thread gerechnet.
+
+``initializer`` läuft einmal je Worker-Thread bzw. -Prozess, z.B. um teure Vorlagen
+vorab zu erzeugen; bei Prozessen muss es eine modulweite Funktion sein.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from decimal import getcontext
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Genauigkeit wie in main.py; der Decimal-Kontext gilt je Thread bzw. Prozess
+DECIMAL_PRECISION = 50
+
+POOL_KINDS = ("thread", "process")
+
+
+class PoolBusyError(RuntimeError):
+    """Warteschlange des Pools ist voll"""
+
+
+class PoolTimeoutError(TimeoutError):
+    """Auftrag wurde nicht innerhalb des Zeitlimits fertig"""
+
+
+def _init_worker(initializer: Optional[Callable] = None):
+    getcontext().prec = DECIMAL_PRECISION
+    if initializer is not None:
+        initializer()
+
+
+def _timed(fn: Callable, args: Tuple) -> Tuple[float, Any]:
+    """Führt den Auftrag aus und liefert zusätzlich den Startzeitpunkt"""
+    return time.time(), fn(*args)
+
+
+class WorkerPool:
+    """Begrenzter Thread- oder Prozess-Pool mit Zeitlimit und Wartezeit-Metriken"""
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        max_workers: int,
+        max_queue: int,
+        timeout: float,
+        initializer: Optional[Callable] = None,
+    ):
+        if kind not in POOL_KINDS:
+            raise ValueError(f"Unbekannte Pool-Art: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.initializer = initializer
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._pending = 0
+        self._queue_waits = deque(maxlen=1000)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "thread":
+                    self._executor = ThreadPoolExecutor(
+                        self.max_workers,
+                        thread_name_prefix=self.name,
+                        initializer=_init_worker,
+                        initargs=(self.initializer,),
+                    )
+                else:
+                    # spawn: keine geerbten Threads oder Locks aus dem API-Prozess
+                    self._executor = ProcessPoolExecutor(
+                        self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                        initargs=(self.initializer,),
+                    )
+            return self._executor
+
+    def _done(self, future):
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled():
+                return
+            if future.exception() is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Führt ``fn(*args)`` im Pool aus; bei Prozessen müssen fn und args picklebar sein"""
+        if self.max_workers <= 0:
+            return fn(*args)
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise PoolBusyError(f"Pool {self.name} ausgelastet")
+            self._pending += 1
+        submitted = time.time()
+        try:
+            future = self._get_executor().submit(_timed, fn, args)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._done)
+        try:
+            started, result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise PoolTimeoutError(f"Auftrag in Pool {self.name} nach {self.timeout} s abgebrochen")
+        self._queue_waits.append(max(0.0, started - submitted))
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Auslastung, Zähler und Wartezeiten in der Warteschlange"""
+        with self._lock:
+            waits = list(self._queue_waits)
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "timeout_seconds": self.timeout,
+                "pending": self._pending,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "avg_queue_wait_ms": round(sum(waits) / len(waits) * 1000, 3) if waits else 0,
+                "max_queue_wait_ms": round(max(waits) * 1000, 3) if waits else 0,
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
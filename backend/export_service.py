@@ -3,8 +3,11 @@ Export Service für PDF und Excel Reports
 """
 
 import io
+import os
+import tempfile
 from datetime import datetime
-from typing import Dict, List
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Tuple
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import (
@@ -18,11 +21,105 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
+
+from xlsx_stream import euro, iter_xlsx
+
+
+# Beschriftungen, gemeinsam für PDF und Excel
+STEUERKLASSEN = {
+    1: "I (ledig)",
+    2: "II (alleinerziehend)",
+    3: "III (verheiratet, höheres Einkommen)",
+    4: "IV (verheiratet, ähnliches Einkommen)",
+    5: "V (verheiratet, geringeres Einkommen)",
+    6: "VI (Nebenjob)",
+}
+ZEITRAEUME = {1: "Jahr", 2: "Monat", 3: "Woche", 4: "Tag"}
+RELIGIONEN = {0: "Keine", 1: "Evangelisch/Katholisch (9%)", 2: "Andere (8%)"}
+KRANKENVERSICHERUNGEN = {
+    0: "Gesetzlich",
+    1: "Privat ohne AG-Zuschuss",
+    2: "Privat mit AG-Zuschuss",
+}
+JAHRESFAKTOREN = {1: 1, 2: 12, 3: 52, 4: 365}
+
+HINWEISE = (
+    "• Diese Berechnung erfolgt nach dem Programmablaufplan (PAP) 2025",
+    "• Alle Angaben ohne Gewähr",
+    "• Sozialversicherungsbeiträge sind nicht enthalten",
+    "• Bei Fragen wenden Sie sich an Ihren Steuerberater",
+)
+
+
+def _input_rows(input_data: Dict) -> List[Tuple[str, str]]:
+    """Wichtigste Eingaben als (Bezeichnung, Wert)"""
+    stkl = input_data.get("STKL")
+    lzz = input_data.get("LZZ")
+    r = input_data.get("R", 0)
+    pkv = input_data.get("PKV", 0)
+    return [
+        ("Bruttolohn", f"{float(input_data.get('RE4', 0)) / 100:.2f} €"),
+        ("Steuerklasse", STEUERKLASSEN.get(stkl, str(stkl))),
+        ("Zeitraum", ZEITRAEUME.get(lzz, str(lzz))),
+        ("Kinderfreibeträge", str(input_data.get("ZKF", 0))),
+        ("Kirchensteuer", RELIGIONEN.get(r, str(r))),
+        ("KV-Zusatzbeitrag", f"{float(input_data.get('KVZ', 0)):.1f} %"),
+        ("Krankenversicherung", KRANKENVERSICHERUNGEN.get(pkv, str(pkv))),
+    ]
+
+
+def _result_rows(input_data: Dict, result: Dict) -> List[Tuple[str, str]]:
+    """Abzüge und Nettolohn des Lohnzahlungszeitraums als (Bezeichnung, Betrag)"""
+    lstlzz = float(result.get("LSTLZZ", 0)) / 100
+    solzlzz = float(result.get("SOLZLZZ", 0)) / 100
+    bk = float(result.get("BK", 0)) / 100
+    brutto = float(input_data.get("RE4", 0)) / 100
+
+    total_tax = lstlzz + solzlzz + bk
+    netto = brutto - total_tax
+
+    return [
+        ("Lohnsteuer", f"{lstlzz:.2f} €"),
+        ("Solidaritätszuschlag", f"{solzlzz:.2f} €"),
+        ("Kirchensteuer", f"{bk:.2f} €"),
+        ("Gesamte Steuerbelastung", f"{total_tax:.2f} €"),
+        ("Nettolohn", f"{netto:.2f} €"),
+    ]
+
+
+def _table_style(
+    header: colors.Color, body: colors.Color, align_right: bool = False, highlight_last: bool = False
+) -> TableStyle:
+    """Tabellenstil der Berechnungsreports: farbige Kopfzeile, Beträge wahlweise rechtsbündig"""
+    commands = [
+        ("BACKGROUND", (0, 0), (-1, 0), header),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+    ]
+    if align_right:
+        commands.append(("ALIGN", (1, 0), (1, -1), "RIGHT"))
+    commands += [
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, 0), 12),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+        ("BACKGROUND", (0, 1), (-1, -1), body),
+        ("GRID", (0, 0), (-1, -1), 1, colors.black),
+    ]
+    if highlight_last:
+        commands += [
+            ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),  # Letzte Zeile fett
+            ("BACKGROUND", (0, -1), (-1, -1), colors.yellow),  # Letzte Zeile hervorheben
+        ]
+    return TableStyle(commands)
 
 
 class PDFExportService:
-    """Service für PDF-Export von Lohnsteuerberechnungen"""
+    """Service für PDF-Export von Lohnsteuerberechnungen
+
+    Stile, Tabellenstile und die festen Inhalte (Titel, Überschriften, Hinweise) werden einmal
+    je Instanz erzeugt und von jedem Report wiederverwendet. Eine Instanz ist nicht
+    threadsicher; die Export-Worker halten je Prozess eine eigene (``render_calculation_report``).
+    """
 
     def __init__(self):
         self.styles = getSampleStyleSheet()
@@ -33,6 +130,24 @@ class PDFExportService:
             spaceAfter=30,
             textColor=colors.darkblue,
         )
+        self.input_table_style = _table_style(colors.grey, colors.beige)
+        self.result_table_style = _table_style(
+            colors.darkblue, colors.lightblue, align_right=True, highlight_last=True
+        )
+        self.yearly_table_style = _table_style(
+            colors.darkgreen, colors.lightgreen, align_right=True
+        )
+
+        # Feste Inhalte
+        heading = self.styles["Heading2"]
+        self._title = Paragraph("Lohnsteuerberechnung 2025", self.title_style)
+        self._headings = {
+            name: Paragraph(name, heading)
+            for name in ("Eingabedaten", "Berechnungsergebnis", "Jahreshochrechnung")
+        }
+        self._hinweise = [Paragraph("Wichtige Hinweise", heading)] + [
+            Paragraph(hinweis, self.styles["Normal"]) for hinweis in HINWEISE
+        ]
 
     def generate_calculation_report(
         self, input_data: Dict, result: Dict, calculation_id: str = None
@@ -48,13 +163,8 @@ class PDFExportService:
             bottomMargin=18,
         )
 
-        # Story für PDF-Inhalt
-        story = []
-
         # Titel
-        title = Paragraph("Lohnsteuerberechnung 2025", self.title_style)
-        story.append(title)
-        story.append(Spacer(1, 12))
+        story = [self._title, Spacer(1, 12)]
 
         # Berechnungsdatum und ID
         date_str = datetime.now().strftime("%d.%m.%Y %H:%M")
@@ -64,99 +174,37 @@ class PDFExportService:
             )
         else:
             info_text = f"Berechnung vom: {date_str}"
-
-        info_para = Paragraph(info_text, self.styles["Normal"])
-        story.append(info_para)
+        story.append(Paragraph(info_text, self.styles["Normal"]))
         story.append(Spacer(1, 20))
 
         # Eingabedaten Tabelle
-        story.append(Paragraph("Eingabedaten", self.styles["Heading2"]))
-        input_table_data = self._prepare_input_table_data(input_data)
-        input_table = Table(input_table_data, colWidths=[3 * inch, 2 * inch])
-        input_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, 0), 12),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ]
-            )
+        story.append(self._headings["Eingabedaten"])
+        story.append(
+            self._table(self._prepare_input_table_data(input_data), self.input_table_style)
         )
-        story.append(input_table)
         story.append(Spacer(1, 20))
 
         # Ergebnisse Tabelle
-        story.append(Paragraph("Berechnungsergebnis", self.styles["Heading2"]))
-        result_table_data = self._prepare_result_table_data(input_data, result)
-        result_table = Table(result_table_data, colWidths=[3 * inch, 2 * inch])
-        result_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.darkblue),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                    ("ALIGN", (1, 0), (1, -1), "RIGHT"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, 0), 12),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    ("BACKGROUND", (0, 1), (-1, -1), colors.lightblue),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                    (
-                        "FONTNAME",
-                        (0, -1),
-                        (-1, -1),
-                        "Helvetica-Bold",
-                    ),  # Letzte Zeile fett
-                    (
-                        "BACKGROUND",
-                        (0, -1),
-                        (-1, -1),
-                        colors.yellow,
-                    ),  # Letzte Zeile hervorheben
-                ]
+        story.append(self._headings["Berechnungsergebnis"])
+        story.append(
+            self._table(
+                self._prepare_result_table_data(input_data, result), self.result_table_style
             )
         )
-        story.append(result_table)
         story.append(Spacer(1, 20))
 
         # Jahreshochrechnung
         if input_data.get("LZZ") != 1:  # Nicht bei jährlicher Berechnung
-            story.append(Paragraph("Jahreshochrechnung", self.styles["Heading2"]))
-            yearly_table_data = self._prepare_yearly_projection(input_data, result)
-            yearly_table = Table(yearly_table_data, colWidths=[3 * inch, 2 * inch])
-            yearly_table.setStyle(
-                TableStyle(
-                    [
-                        ("BACKGROUND", (0, 0), (-1, 0), colors.darkgreen),
-                        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                        ("ALIGN", (1, 0), (1, -1), "RIGHT"),
-                        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                        ("FONTSIZE", (0, 0), (-1, 0), 12),
-                        ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                        ("BACKGROUND", (0, 1), (-1, -1), colors.lightgreen),
-                        ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                    ]
+            story.append(self._headings["Jahreshochrechnung"])
+            story.append(
+                self._table(
+                    self._prepare_yearly_projection(input_data, result), self.yearly_table_style
                 )
             )
-            story.append(yearly_table)
             story.append(Spacer(1, 20))
 
         # Hinweise
-        story.append(Paragraph("Wichtige Hinweise", self.styles["Heading2"]))
-        hinweise = [
-            "• Diese Berechnung erfolgt nach dem Programmablaufplan (PAP) 2025",
-            "• Alle Angaben ohne Gewähr",
-            "• Sozialversicherungsbeiträge sind nicht enthalten",
-            "• Bei Fragen wenden Sie sich an Ihren Steuerberater",
-        ]
-        for hinweis in hinweise:
-            story.append(Paragraph(hinweis, self.styles["Normal"]))
+        story.extend(self._hinweise)
 
         # PDF generieren
         doc.build(story)
@@ -165,61 +213,21 @@ class PDFExportService:
 
         return pdf_data
 
+    @staticmethod
+    def _table(data: List[List[str]], style: TableStyle) -> Table:
+        table = Table(data, colWidths=[3 * inch, 2 * inch])
+        table.setStyle(style)
+        return table
+
     def _prepare_input_table_data(self, input_data: Dict) -> List[List[str]]:
         """Bereitet Eingabedaten für Tabelle vor"""
-        data = [["Parameter", "Wert"]]
-
-        # Wichtigste Parameter anzeigen
-        params = {
-            "RE4": f"{float(input_data.get('RE4', 0)) / 100:.2f} €",
-            "STKL": self._get_steuerklasse_text(input_data.get("STKL")),
-            "LZZ": self._get_lzz_text(input_data.get("LZZ")),
-            "ZKF": str(input_data.get("ZKF", 0)),
-            "R": self._get_religion_text(input_data.get("R", 0)),
-            "KVZ": f"{float(input_data.get('KVZ', 0)):.1f} %",
-            "PKV": self._get_pkv_text(input_data.get("PKV", 0)),
-        }
-
-        param_names = {
-            "RE4": "Bruttolohn",
-            "STKL": "Steuerklasse",
-            "LZZ": "Zeitraum",
-            "ZKF": "Kinderfreibeträge",
-            "R": "Kirchensteuer",
-            "KVZ": "KV-Zusatzbeitrag",
-            "PKV": "Krankenversicherung",
-        }
-
-        for key, value in params.items():
-            data.append([param_names[key], value])
-
-        return data
+        return [["Parameter", "Wert"]] + [list(row) for row in _input_rows(input_data)]
 
     def _prepare_result_table_data(
         self, input_data: Dict, result: Dict
     ) -> List[List[str]]:
         """Bereitet Ergebnisdaten für Tabelle vor"""
-        data = [["Abzug", "Betrag"]]
-
-        lstlzz = float(result.get("LSTLZZ", 0)) / 100
-        solzlzz = float(result.get("SOLZLZZ", 0)) / 100
-        bk = float(result.get("BK", 0)) / 100
-        brutto = float(input_data.get("RE4", 0)) / 100
-
-        total_tax = lstlzz + solzlzz + bk
-        netto = brutto - total_tax
-
-        data.extend(
-            [
-                ["Lohnsteuer", f"{lstlzz:.2f} €"],
-                ["Solidaritätszuschlag", f"{solzlzz:.2f} €"],
-                ["Kirchensteuer", f"{bk:.2f} €"],
-                ["Gesamte Steuerbelastung", f"{total_tax:.2f} €"],
-                ["Nettolohn", f"{netto:.2f} €"],
-            ]
-        )
-
-        return data
+        return [["Abzug", "Betrag"]] + [list(row) for row in _result_rows(input_data, result)]
 
     def _prepare_yearly_projection(
         self, input_data: Dict, result: Dict
@@ -227,7 +235,7 @@ class PDFExportService:
         """Bereitet Jahreshochrechnung vor"""
         data = [["Jahreswerte", "Betrag"]]
 
-        multiplier = self._get_yearly_multiplier(input_data.get("LZZ"))
+        multiplier = JAHRESFAKTOREN.get(input_data.get("LZZ"), 12)
 
         lstlzz = float(result.get("LSTLZZ", 0)) / 100 * multiplier
         solzlzz = float(result.get("SOLZLZZ", 0)) / 100 * multiplier
@@ -249,71 +257,37 @@ class PDFExportService:
 
         return data
 
-    def _get_yearly_multiplier(self, lzz: int) -> int:
-        """Gibt Multiplikator für Jahreshochrechnung zurück"""
-        multipliers = {1: 1, 2: 12, 3: 52, 4: 365}
-        return multipliers.get(lzz, 12)
-
-    def _get_steuerklasse_text(self, stkl: int) -> str:
-        """Konvertiert Steuerklasse zu Text"""
-        classes = {
-            1: "I (ledig)",
-            2: "II (alleinerziehend)",
-            3: "III (verheiratet, höheres Einkommen)",
-            4: "IV (verheiratet, ähnliches Einkommen)",
-            5: "V (verheiratet, geringeres Einkommen)",
-            6: "VI (Nebenjob)",
-        }
-        return classes.get(stkl, str(stkl))
-
-    def _get_lzz_text(self, lzz: int) -> str:
-        """Konvertiert LZZ zu Text"""
-        periods = {1: "Jahr", 2: "Monat", 3: "Woche", 4: "Tag"}
-        return periods.get(lzz, str(lzz))
-
-    def _get_religion_text(self, r: int) -> str:
-        """Konvertiert Religionsgemeinschaft zu Text"""
-        religions = {0: "Keine", 1: "Evangelisch/Katholisch (9%)", 2: "Andere (8%)"}
-        return religions.get(r, str(r))
-
-    def _get_pkv_text(self, pkv: int) -> str:
-        """Konvertiert PKV zu Text"""
-        types = {
-            0: "Gesetzlich",
-            1: "Privat ohne AG-Zuschuss",
-            2: "Privat mit AG-Zuschuss",
-        }
-        return types.get(pkv, str(pkv))
-
 
 class ExcelExportService:
     """Service für Excel-Export von Lohnsteuerberechnungen"""
 
-    def generate_calculation_report(
-        self, input_data: Dict, result: Dict, calculation_id: str = None
-    ) -> bytes:
-        """Generiert einen Excel-Report für eine Lohnsteuerberechnung"""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Lohnsteuerberechnung"
-
-        # Styles definieren
-        title_font = Font(size=16, bold=True, color="1F4E79")
-        header_font = Font(size=12, bold=True, color="FFFFFF")
-        header_fill = PatternFill(
+    def __init__(self):
+        # Stile einmal je Instanz; openpyxl übernimmt sie unverändert in jede Arbeitsmappe
+        self.title_font = Font(size=16, bold=True, color="1F4E79")
+        self.header_font = Font(size=12, bold=True, color="FFFFFF")
+        self.header_fill = PatternFill(
             start_color="4472C4", end_color="4472C4", fill_type="solid"
         )
-        data_font = Font(size=10)
-        border = Border(
+        self.data_font = Font(size=10)
+        self.bold_font = Font(size=10, bold=True)
+        self.border = Border(
             left=Side(style="thin"),
             right=Side(style="thin"),
             top=Side(style="thin"),
             bottom=Side(style="thin"),
         )
 
+    def generate_calculation_report(
+        self, input_data: Dict, result: Dict, calculation_id: str = None
+    ) -> bytes:
+        """Generiert einen Excel-Report für eine Lohnsteuerberechnung"""
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Lohnsteuerberechnung"
+
         # Titel
         ws["A1"] = "Lohnsteuerberechnung 2025"
-        ws["A1"].font = title_font
+        ws["A1"].font = self.title_font
         ws.merge_cells("A1:D1")
 
         # Datum und ID
@@ -325,44 +299,17 @@ class ExcelExportService:
 
         # Eingabedaten
         row += 3
-        ws[f"A{row}"] = "Eingabedaten"
-        ws[f"A{row}"].font = header_font
-        ws[f"A{row}"].fill = header_fill
-        ws[f"B{row}"].fill = header_fill
-        ws.merge_cells(f"A{row}:B{row}")
-
-        row += 1
-        input_data_rows = self._prepare_excel_input_data(input_data)
-        for param, value in input_data_rows:
-            ws[f"A{row}"] = param
-            ws[f"B{row}"] = value
-            ws[f"A{row}"].font = data_font
-            ws[f"B{row}"].font = data_font
-            ws[f"A{row}"].border = border
-            ws[f"B{row}"].border = border
-            row += 1
+        row = self._section(ws, row, "Eingabedaten", self._prepare_excel_input_data(input_data))
 
         # Ergebnisse
         row += 2
-        ws[f"A{row}"] = "Berechnungsergebnis"
-        ws[f"A{row}"].font = header_font
-        ws[f"A{row}"].fill = header_fill
-        ws[f"B{row}"].fill = header_fill
-        ws.merge_cells(f"A{row}:B{row}")
-
-        row += 1
-        result_data_rows = self._prepare_excel_result_data(input_data, result)
-        for param, value in result_data_rows:
-            ws[f"A{row}"] = param
-            ws[f"B{row}"] = value
-            ws[f"A{row}"].font = data_font
-            ws[f"B{row}"].font = data_font
-            ws[f"A{row}"].border = border
-            ws[f"B{row}"].border = border
-            if "Nettolohn" in param or "Gesamte" in param:
-                ws[f"A{row}"].font = Font(size=10, bold=True)
-                ws[f"B{row}"].font = Font(size=10, bold=True)
-            row += 1
+        self._section(
+            ws,
+            row,
+            "Berechnungsergebnis",
+            self._prepare_excel_result_data(input_data, result),
+            bold=("Gesamte Steuerbelastung", "Nettolohn"),
+        )
 
         # Spaltenbreite anpassen
         ws.column_dimensions["A"].width = 30
@@ -376,47 +323,69 @@ class ExcelExportService:
 
         return excel_data
 
+    def _section(self, ws, row: int, title: str, rows: List[tuple], bold=()) -> int:
+        """Überschrift und Zeilen ab ``row``; liefert die erste freie Zeile"""
+        ws[f"A{row}"] = title
+        ws[f"A{row}"].font = self.header_font
+        ws[f"A{row}"].fill = self.header_fill
+        ws[f"B{row}"].fill = self.header_fill
+        ws.merge_cells(f"A{row}:B{row}")
+
+        row += 1
+        for param, value in rows:
+            font = self.bold_font if param in bold else self.data_font
+            for column, text in (("A", param), ("B", value)):
+                cell = ws[f"{column}{row}"]
+                cell.value = text
+                cell.font = font
+                cell.border = self.border
+            row += 1
+        return row
+
     def _prepare_excel_input_data(self, input_data: Dict) -> List[tuple]:
         """Bereitet Eingabedaten für Excel vor"""
-        pdf_service = PDFExportService()
-
-        return [
-            ("Bruttolohn", f"{float(input_data.get('RE4', 0)) / 100:.2f} €"),
-            (
-                "Steuerklasse",
-                pdf_service._get_steuerklasse_text(input_data.get("STKL")),
-            ),
-            ("Zeitraum", pdf_service._get_lzz_text(input_data.get("LZZ"))),
-            ("Kinderfreibeträge", str(input_data.get("ZKF", 0))),
-            ("Kirchensteuer", pdf_service._get_religion_text(input_data.get("R", 0))),
-            ("KV-Zusatzbeitrag", f"{float(input_data.get('KVZ', 0)):.1f} %"),
-            (
-                "Krankenversicherung",
-                pdf_service._get_pkv_text(input_data.get("PKV", 0)),
-            ),
-        ]
+        return _input_rows(input_data)
 
     def _prepare_excel_result_data(self, input_data: Dict, result: Dict) -> List[tuple]:
         """Bereitet Ergebnisdaten für Excel vor"""
-        lstlzz = float(result.get("LSTLZZ", 0)) / 100
-        solzlzz = float(result.get("SOLZLZZ", 0)) / 100
-        bk = float(result.get("BK", 0)) / 100
-        brutto = float(input_data.get("RE4", 0)) / 100
+        return _result_rows(input_data, result)
 
-        total_tax = lstlzz + solzlzz + bk
-        netto = brutto - total_tax
 
-        return [
-            ("Lohnsteuer", f"{lstlzz:.2f} €"),
-            ("Solidaritätszuschlag", f"{solzlzz:.2f} €"),
-            ("Kirchensteuer", f"{bk:.2f} €"),
-            ("Gesamte Steuerbelastung", f"{total_tax:.2f} €"),
-            ("Nettolohn", f"{netto:.2f} €"),
-        ]
+COMPARISON_HEADERS = [
+    "Szenario",
+    "Bruttolohn",
+    "Lohnsteuer",
+    "Solidaritätszuschlag",
+    "Kirchensteuer",
+    "Nettolohn",
+]
 
 
 class ComparisonExportService:
-    """Service für Vergleichsberichte"""
+    """Service für Vergleichsberichte; Stile werden wie beim PDF-Report einmal erzeugt"""
+
+    def __init__(self):
+        styles = getSampleStyleSheet()
+        title_style = ParagraphStyle(
+            "CustomTitle",
+            parent=styles["Heading1"],
+            fontSize=18,
+            spaceAfter=30,
+            textColor=colors.darkblue,
+        )
+        self._title = Paragraph("Lohnsteuervergleich 2025", title_style)
+        self.table_style = TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.darkblue),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("FONTSIZE", (0, 0), (-1, 0), 10),
+                ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+                ("BACKGROUND", (0, 1), (-1, -1), colors.lightblue),
+                ("GRID", (0, 0), (-1, -1), 1, colors.black),
+            ]
+        )
 
     def generate_comparison_report(
         self, calculations: List[Dict], format_type: str = "pdf"
@@ -439,33 +408,11 @@ class ComparisonExportService:
             bottomMargin=18,
         )
 
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            "CustomTitle",
-            parent=styles["Heading1"],
-            fontSize=18,
-            spaceAfter=30,
-            textColor=colors.darkblue,
-        )
-
-        story = []
-
         # Titel
-        title = Paragraph("Lohnsteuervergleich 2025", title_style)
-        story.append(title)
-        story.append(Spacer(1, 12))
+        story = [self._title, Spacer(1, 12)]
 
         # Vergleichstabelle erstellen
-        table_data = [
-            [
-                "Szenario",
-                "Bruttolohn",
-                "Lohnsteuer",
-                "Solidaritätszuschlag",
-                "Kirchensteuer",
-                "Nettolohn",
-            ]
-        ]
+        table_data = [list(COMPARISON_HEADERS)]
 
         for i, calc in enumerate(calculations, 1):
             input_data = calc["input"]
@@ -500,20 +447,7 @@ class ComparisonExportService:
                 1.2 * inch,
             ],
         )
-        table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.darkblue),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, 0), 10),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    ("BACKGROUND", (0, 1), (-1, -1), colors.lightblue),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ]
-            )
-        )
+        table.setStyle(self.table_style)
 
         story.append(table)
 
@@ -525,52 +459,76 @@ class ComparisonExportService:
 
     def _generate_excel_comparison(self, calculations: List[Dict]) -> bytes:
         """Generiert Excel-Vergleichsbericht"""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Lohnsteuervergleich"
-
-        # Header
-        headers = [
-            "Szenario",
-            "Bruttolohn",
-            "Lohnsteuer",
-            "Solidaritätszuschlag",
-            "Kirchensteuer",
-            "Nettolohn",
-        ]
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(
-                start_color="4472C4", end_color="4472C4", fill_type="solid"
-            )
-
-        # Daten
-        for row, calc in enumerate(calculations, 2):
-            input_data = calc["input"]
-            result = calc["result"]
-            name = calc.get("name", f"Szenario {row - 1}")
-
-            brutto = float(input_data.get("RE4", 0)) / 100
-            lstlzz = float(result.get("LSTLZZ", 0)) / 100
-            solzlzz = float(result.get("SOLZLZZ", 0)) / 100
-            bk = float(result.get("BK", 0)) / 100
-            netto = brutto - lstlzz - solzlzz - bk
-
-            ws.cell(row=row, column=1, value=name)
-            ws.cell(row=row, column=2, value=f"{brutto:.2f} €")
-            ws.cell(row=row, column=3, value=f"{lstlzz:.2f} €")
-            ws.cell(row=row, column=4, value=f"{solzlzz:.2f} €")
-            ws.cell(row=row, column=5, value=f"{bk:.2f} €")
-            ws.cell(row=row, column=6, value=f"{netto:.2f} €")
-
-        # Spaltenbreite anpassen
-        for col in range(1, 7):
-            ws.column_dimensions[get_column_letter(col)].width = 18
-
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        excel_data = buffer.getvalue()
-        buffer.close()
-
-        return excel_data
+        return b"".join(iter_comparison_xlsx(comparison_rows(calculations)))
+
+
+def _betrag(cents) -> Decimal:
+    """Centbetrag als endlicher Eurobetrag; ValueError bei ungültigen Werten"""
+    try:
+        betrag = euro(cents)
+    except ArithmeticError:
+        raise ValueError(f"Ungültiger Betrag: {cents!r}")
+    if not betrag.is_finite():
+        raise ValueError(f"Ungültiger Betrag: {cents!r}")
+    return betrag
+
+
+def comparison_rows(calculations: Iterable[Dict]) -> Iterator[List]:
+    """Zeilen des Vergleichs mit Beträgen in Euro als Zahlen; ValueError bei ungültigen Eingaben"""
+    for i, calc in enumerate(calculations, 1):
+        input_data = calc.get("input")
+        result = calc.get("result")
+        if not isinstance(input_data, dict) or not isinstance(result, dict):
+            raise ValueError(f"Berechnung {i} braucht input und result")
+        brutto = _betrag(input_data.get("RE4", 0))
+        abzuege = [_betrag(result.get(name, 0)) for name in ("LSTLZZ", "SOLZLZZ", "BK")]
+        yield [calc.get("name", f"Szenario {i}"), brutto, *abzuege, brutto - sum(abzuege)]
+
+
+def iter_comparison_xlsx(rows: Iterable[List]) -> Iterator[bytes]:
+    """Excel-Vergleich aus ``comparison_rows`` für beliebig viele Berechnungen, als Strom"""
+    return iter_xlsx(
+        rows,
+        COMPARISON_HEADERS,
+        [None] + ["euro"] * (len(COMPARISON_HEADERS) - 1),
+        "Lohnsteuervergleich",
+        [18] * len(COMPARISON_HEADERS),
+    )
+
+
+# Services je Prozess, von den Export-Workern beim Start (init_export_worker) angelegt
+_services: Dict[str, object] = {}
+
+# openpyxl schreibt jedes Tabellenblatt über eine temporäre Datei; in den Export-Workern
+# liegen diese in einem tmpfs, sofern vorhanden (auf Festplatte kostet das je Report ~40 ms)
+EXPORT_TMPDIR = os.environ.get("EXPORT_TMPDIR", "/dev/shm")
+
+_WARMUP_INPUT = {"RE4": 400000, "STKL": 1, "LZZ": 2, "R": 1, "KVZ": 1.7}
+_WARMUP_RESULT = {"LSTLZZ": 50000, "SOLZLZZ": 0, "BK": 4500}
+
+
+def init_export_worker():
+    """Start eines Export-Workers: Services mit ihren Stilen anlegen und je Format einmal
+    rendern, damit Schriften und Vorlagen vor dem ersten Auftrag geladen sind"""
+    if os.path.isdir(EXPORT_TMPDIR) and os.access(EXPORT_TMPDIR, os.W_OK):
+        tempfile.tempdir = EXPORT_TMPDIR
+    for format_type in ("pdf", "excel"):
+        render_calculation_report(format_type, _WARMUP_INPUT, _WARMUP_RESULT)
+    scenario = {"input": _WARMUP_INPUT, "result": _WARMUP_RESULT}
+    render_comparison_report([scenario], "pdf")
+
+
+def render_calculation_report(
+    format_type: str, input_data: Dict, result: Dict, calculation_id: str = None
+) -> bytes:
+    """Erzeugt einen PDF- oder Excel-Report; modulweit, damit ein Prozess-Pool ihn aufrufen kann"""
+    if format_type not in _services:
+        _services[format_type] = PDFExportService() if format_type == "pdf" else ExcelExportService()
+    return _services[format_type].generate_calculation_report(input_data, result, calculation_id)
+
+
+def render_comparison_report(calculations: List[Dict], format_type: str = "pdf") -> bytes:
+    """Erzeugt einen Vergleichsbericht; modulweit, damit ein Prozess-Pool ihn aufrufen kann"""
+    if "comparison" not in _services:
+        _services["comparison"] = ComparisonExportService()
+    return _services["comparison"].generate_comparison_report(calculations, format_type)
@@ -0,0 +1,163 @@
+"""
+Strukturierte Log-Ereignisse über eine Warteschlange, geschrieben von einem Hintergrund-Thread
+
+Auf dem Anfragepfad wird ein Ereignis nur als Dict mit Zeitstempel (``time.time()``) in eine
+begrenzte Warteschlange gehängt. Ein Thread je Prozess holt alle ``flush_interval`` Sekunden
+die wartenden Ereignisse, serialisiert sie als JSON-Zeilen und schreibt sie in Blöcken von
+höchstens ``batch_size`` Zeilen mit einem ``write`` je Block. Ist die Warteschlange voll, wird
+das Ereignis verworfen und gezählt; eine Anfrage wartet nie auf das Schreiben.
+
+``sample_rates`` legt je Ereignistyp den Anteil fest, der überhaupt in die Warteschlange kommt
+(z.B. ``{"request": 0.1}``); Typen ohne Eintrag werden vollständig geschrieben.
+"""
+
+import atexit
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, TextIO
+
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+LOG_BATCH_SIZE = int(os.environ.get("LOG_BATCH_SIZE", "500"))
+LOG_FLUSH_INTERVAL = float(os.environ.get("LOG_FLUSH_INTERVAL", "0.2"))
+
+
+def parse_sample_rates(text: Optional[str]) -> Dict[str, float]:
+    """``"request=0.1,calculation=0.5"`` -> ``{"request": 0.1, "calculation": 0.5}``"""
+    rates = {}
+    for eintrag in (text or "").split(","):
+        if not eintrag.strip():
+            continue
+        name, _, wert = eintrag.partition("=")
+        try:
+            rates[name.strip()] = min(1.0, max(0.0, float(wert)))
+        except ValueError:
+            logging.warning(f"Ungültige Sampling-Rate ignoriert: {eintrag!r}")
+    return rates
+
+
+LOG_SAMPLE_RATES = parse_sample_rates(os.environ.get("LOG_SAMPLE_RATES"))
+
+
+def _timestamp(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+class LogPipeline:
+    """Begrenzte Warteschlange für Log-Ereignisse mit Schreib-Thread je Prozess"""
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        queue_size: int = LOG_QUEUE_SIZE,
+        batch_size: int = LOG_BATCH_SIZE,
+        flush_interval: float = LOG_FLUSH_INTERVAL,
+        sample_rates: Optional[Dict[str, float]] = None,
+    ):
+        self.stream = stream
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.sample_rates = dict(LOG_SAMPLE_RATES if sample_rates is None else sample_rates)
+        self.enqueued = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.written = 0
+        self.write_errors = 0
+        self.max_queue_length = 0
+        self._queue: deque = deque()
+        self._flush_lock = threading.Lock()
+        self._pid: Optional[int] = None
+        atexit.register(self.flush)
+
+    def emit(self, event_type: str, level: str, message: str, fields: Dict[str, Any]) -> bool:
+        """Hängt ein Ereignis an; False, wenn es verworfen oder ausgesampelt wurde
+
+        ``fields`` wird erst im Schreib-Thread serialisiert und darf danach nicht mehr
+        verändert werden.
+        """
+        rate = self.sample_rates.get(event_type)
+        if rate is not None and rate < 1.0 and random.random() >= rate:
+            self.sampled_out += 1
+            return False
+        if self._pid != os.getpid():
+            self._start()
+        queue = self._queue
+        laenge = len(queue)
+        if laenge >= self.queue_size:
+            self.dropped += 1
+            return False
+        queue.append((time.time(), event_type, level, message, fields))
+        self.enqueued += 1
+        if laenge >= self.max_queue_length:
+            self.max_queue_length = laenge + 1
+        return True
+
+    def _start(self):
+        """Startet den Schreib-Thread; nach fork verwirft das Kind die Ereignisse der Eltern"""
+        with self._flush_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                self._queue = deque()
+            self._pid = os.getpid()
+            if self.flush_interval > 0:
+                threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def _serialize(self, ts: float, event_type: str, level: str, message: str, fields) -> str:
+        record = {
+            "timestamp": _timestamp(ts),
+            "level": level,
+            "event_type": event_type,
+            "message": message,
+        }
+        record.update(fields)
+        return json.dumps(record, default=str, ensure_ascii=False, separators=(",", ":"))
+
+    def flush(self):
+        """Schreibt alle wartenden Ereignisse; läuft im Schreib-Thread und beim Beenden"""
+        with self._flush_lock:
+            queue = self._queue
+            stream = self.stream or sys.stdout
+            while queue:
+                zeilen = []
+                while queue and len(zeilen) < self.batch_size:
+                    event = queue.popleft()
+                    try:
+                        zeilen.append(self._serialize(*event))
+                    except (TypeError, ValueError, RuntimeError):
+                        self.write_errors += 1
+                if not zeilen:
+                    continue
+                try:
+                    stream.write("\n".join(zeilen) + "\n")
+                    stream.flush()
+                except (OSError, ValueError):
+                    self.write_errors += len(zeilen)
+                    continue
+                self.written += len(zeilen)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "queue_size": self.queue_size,
+            "queue_length": len(self._queue),
+            "max_queue_length": self.max_queue_length,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+            "write_errors": self.write_errors,
+            "sample_rates": self.sample_rates,
+        }
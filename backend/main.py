@@ -1,252 +1,298 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field, field_validator
+from contextlib import asynccontextmanager
 from decimal import Decimal, getcontext
-from typing import Optional
+from typing import Annotated, Optional
 import os
 import logging
+import math
 import time
-from collections import defaultdict
-from tax_calculator import TaxCalculator2025
+from engines import ENGINES, calculate_pap, calculate_pap_batch, default_pap, fixed_point, pap_version
+from pap_registry import registry as pap_registry
 from monitoring import metrics, structured_logger, security_monitor
-from export_service import PDFExportService, ExcelExportService, ComparisonExportService
+from tax_calculator import calculate_traced
+from export_service import (
+    init_export_worker,
+    comparison_rows,
+    iter_comparison_xlsx,
+    render_calculation_report,
+    render_comparison_report,
+)
+from executor import PoolBusyError, PoolTimeoutError, WorkerPool
+from net_to_gross import net_to_gross
+from tax_curve import tax_curve
+from year_simulation import simulate_year
+from payroll_input import (
+    BULK_FIELDS,
+    BULK_REQUIRED,
+    LohnsteuerRequest,
+    sanitize_input,
+    validate_payroll_items,
+    validate_payroll_row,
+)
+from bulk_csv import (
+    BulkFormatError,
+    aiter_chunks,
+    header_line,
+    output_columns,
+    parse_header,
+    process_chunk,
+    xlsx_formats,
+)
+from xlsx_stream import MEDIA_TYPE as XLSX_MEDIA_TYPE, XLSXStreamWriter
+from payslips import PAYSLIP_CHUNK, PayslipArchive, payslip_filename, render_payslips
+from pap_compiler import PAP_CACHE_DIR
+from result_cache import cache_key, open_result_cache
+from rate_limiter import open_rate_limiter
+from singleflight import SingleFlight, request_key
 from fastapi.responses import StreamingResponse
 from typing import List
+import asyncio
 import uuid
 import io
+from collections import deque
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s - %(levelname)s - %(message)s",
 )
 
 # Set precision for Decimal calculations
 getcontext().prec = 50
 
-# Rate limiting storage
-request_counts = defaultdict(list)
 
+class LohnsteuerResponse(BaseModel):
+    BK: Decimal
+    BKS: Decimal
+    LSTLZZ: Decimal
+    SOLZLZZ: Decimal
+    SOLZS: Decimal
+    STS: Decimal
+    VKVLZZ: Decimal
+    VKVSONST: Decimal
+    VFRB: Optional[Decimal] = None
+    VFRBS1: Optional[Decimal] = None
+    VFRBS2: Optional[Decimal] = None
+    WVFRB: Optional[Decimal] = None
+    WVFRBO: Optional[Decimal] = None
+    WVFRBM: Optional[Decimal] = None
 
-class LohnsteuerRequest(BaseModel):
-    af: int = Field(
-        default=1,
-        ge=0,
-        le=1,
-        description="1, wenn die Anwendung des Faktorverfahrens gewählt wurden (nur in Steuerklasse IV)",
-    )
-    AJAHR: Optional[int] = Field(
-        default=0,
-        ge=1900,
-        le=2100,
-        description="Auf die Vollendung des 64. Lebensjahres folgende Kalenderjahr",
-    )
-    ALTER1: Optional[int] = Field(
-        default=0,
-        ge=0,
-        le=1,
-        description="1, wenn das 64. Lebensjahr zu Beginn des Kalenderjahres vollendet wurde",
-    )
-    f: float = Field(
-        default=1.0,
-        ge=0.001,
-        le=10.0,
-        description="Eingetragener Faktor mit drei Nachkommastellen",
-    )
-    JFREIB: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(10000000),
-        description="Jahresfreibetrag in Cent",
-    )
-    JHINZU: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(10000000),
-        description="Jahreshinzurechnungsbetrag in Cent",
-    )
-    JRE4: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(100000000),
-        description="Voraussichtlicher Jahresarbeitslohn in Cent",
-    )
-    JRE4ENT: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(100000000),
-        description="In JRE4 enthaltene Entschädigungen",
-    )
-    JVBEZ: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(100000000),
-        description="In JRE4 enthaltene Versorgungsbezuege in Cents",
-    )
-    KRV: Optional[int] = Field(
-        default=0, ge=0, le=1, description="Merker für die Vorsorgepauschale (0 oder 1)"
-    )
-    KVZ: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(10),
-        description="Kassenindividueller Zusatzbeitragssatz in Prozent",
-    )
-    LZZ: int = Field(
-        ge=1, le=4, description="Lohnzahlungszeitraum: 1=Jahr, 2=Monat, 3=Woche, 4=Tag"
-    )
-    LZZFREIB: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(10000000),
-        description="Freibetrag für den Lohnzahlungszeitraum in Cent",
-    )
-    LZZHINZU: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(10000000),
-        description="Hinzurechnungsbetrag für den Lohnzahlungszeitraum in Cent",
-    )
-    MBV: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(10000000),
-        description="Nicht zu besteuernde Vorteile bei Vermögensbeteiligungen in Cent",
-    )
-    PKPV: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(200000),
-        description="Private Kranken- bzw. Pflegeversicherung Monatsbetrag in Cent",
-    )
-    PKV: int = Field(
-        default=0,
-        ge=0,
-        le=2,
-        description="0=gesetzlich, 1=privat ohne AG-Zuschuss, 2=privat mit AG-Zuschuss",
-    )
-    PVA: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(10),
-        description="Beitragsabschläge in der sozialen Pflegeversicherung",
-    )
-    PVS: Optional[int] = Field(
-        default=0,
-        ge=0,
-        le=1,
-        description="1, wenn Besonderheiten in Sachsen zu berücksichtigen sind",
-    )
-    PVZ: Optional[int] = Field(
-        default=0,
-        ge=0,
-        le=1,
-        description="1, wenn Zuschlag zur sozialen Pflegeversicherung zu zahlen ist",
-    )
-    R: Optional[int] = Field(
-        default=0, ge=0, le=2, description="Religionsgemeinschaft des Arbeitnehmers"
-    )
-    RE4: Decimal = Field(
-        ge=0,
-        le=Decimal(100000000),
-        description="Steuerpflichtiger Arbeitslohn für den Lohnzahlungszeitraum in Cent",
-    )
-    SONSTB: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(100000000),
-        description="Sonstige Bezüge in Cent",
-    )
-    SONSTENT: Optional[Decimal] = Field(
-        default=Decimal(0),
+
+class NetToGrossRequest(LohnsteuerRequest):
+    NETTO: Decimal = Field(
         ge=0,
         le=Decimal(100000000),
-        description="In SONSTB enthaltene Entschädigungen",
+        description="Gewünschter Nettobetrag (RE4 - LSTLZZ - SOLZLZZ - BK) in Cent",
     )
-    STERBE: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(1000000),
-        description="Sterbegeld bei Versorgungsbezuegen",
+    RE4: Optional[Decimal] = Field(
+        default=None, description="Wird berechnet, ein übergebener Wert wird ignoriert"
     )
-    STKL: int = Field(ge=1, le=6, description="Steuerklasse: 1-6")
-    VBEZ: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(100000000),
-        description="In RE4 enthaltene Versorgungsbezuege in Cents",
-    )
-    VBEZM: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(10000000),
-        description="Vorsorgungsbezug im Januar 2005 oder ersten vollen Monat in Cents",
+
+    @field_validator("NETTO")
+    @classmethod
+    def validate_netto_cents(cls, v):
+        if v % 1 != 0:
+            raise ValueError("NETTO muss in ganzen Cent angegeben werden")
+        return v
+
+
+class NetToGrossResponse(BaseModel):
+    RE4: Decimal
+    NETTO: Decimal
+    probes: int
+    result: LohnsteuerResponse
+
+
+# Maximale Anzahl berechneter Punkte einer Steuerkurve
+CURVE_MAX_POINTS = int(os.environ.get("CURVE_MAX_POINTS", "100000"))
+
+
+class CurveRequest(LohnsteuerRequest):
+    RE4: Optional[Decimal] = Field(
+        default=None, description="Wird durch re4_from/re4_to/re4_step ersetzt"
     )
-    VBEZS: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(10000000),
-        description="Voraussichtliche Sonderzahlungen im Kalenderjahr des Versorgungsbeginns",
+    re4_from: int = Field(default=0, ge=0, le=100000000, description="Erster RE4-Wert in Cent")
+    re4_to: int = Field(ge=0, le=100000000, description="Letzter RE4-Wert in Cent (höchstens)")
+    re4_step: int = Field(default=100, ge=1, description="Abstand der RE4-Werte in Cent")
+    max_points: Optional[int] = Field(
+        default=None, ge=3, description="Punktebudget für Diagramme (Ausdünnen per LTTB)"
     )
-    VBS: Optional[Decimal] = Field(
+
+
+class CurveResponse(BaseModel):
+    RE4: List[int]
+    LSTLZZ: List[int]
+    SOLZLZZ: List[int]
+    BK: List[int]
+    average_rate: List[float]
+    marginal_rate: List[float]
+    computed_points: int
+
+
+class OneOffPayment(BaseModel):
+    month: int = Field(ge=1, le=12, description="Monat der Zahlung")
+    SONSTB: Decimal = Field(gt=0, le=Decimal(100000000), description="Sonstiger Bezug in Cent")
+    SONSTENT: Decimal = Field(
         default=Decimal(0),
         ge=0,
         le=Decimal(100000000),
-        description="In SONSTB enthaltene Versorgungsbezuege",
-    )
-    VJAHR: Optional[int] = Field(
-        default=0,
-        ge=0,
-        le=2100,
-        description="Jahr, in dem der Versorgungsbezug erstmalig gewährt wurde",
-    )
-    ZKF: Optional[Decimal] = Field(
-        default=Decimal(0),
-        ge=0,
-        le=Decimal(20),
-        description="Zahl der Freibetraege fuer Kinder",
-    )
-    ZMVB: Optional[int] = Field(
-        default=0,
-        ge=0,
-        le=12,
-        description="Zahl der Monate, fuer die Versorgungsbezuege gezahlt werden",
+        description="Darin enthaltene Entschädigungen in Cent",
     )
 
-    @field_validator("RE4")
-    @classmethod
-    def validate_re4_not_zero(cls, v):
-        if v <= 0:
-            raise ValueError("RE4 (Arbeitslohn) muss größer als 0 sein")
-        return v
 
-    @field_validator("ZKF")
-    @classmethod
-    def validate_zkf_increment(cls, v):
-        # ZKF muss in 0.5er Schritten sein
-        if v % Decimal("0.5") != 0:
-            raise ValueError(
-                "Kinderfreibeträge müssen in 0.5er Schritten angegeben werden"
-            )
-        return v
+class YearSimulationRequest(LohnsteuerRequest):
+    RE4: Optional[Decimal] = Field(default=None, description="Wird durch wages ersetzt")
+    LZZ: int = Field(default=2, ge=2, le=2, description="Immer 2: monatlicher Lohnzahlungszeitraum")
+    wages: List[Annotated[Decimal, Field(ge=0, le=Decimal(100000000))]] = Field(
+        min_length=1,
+        max_length=12,
+        description="Monatslöhne RE4 in Cent: einer für alle Monate oder zwölf",
+    )
+    one_offs: List[OneOffPayment] = Field(
+        default_factory=list, max_length=120, description="Sonstige Bezüge mit Monat"
+    )
 
 
-class LohnsteuerResponse(BaseModel):
+class YearMonthResult(BaseModel):
+    month: int
+    RE4: Decimal
+    SONSTB: Decimal
+    LSTLZZ: Decimal
+    SOLZLZZ: Decimal
     BK: Decimal
+    STS: Decimal
+    SOLZS: Decimal
     BKS: Decimal
+    tax: Decimal
+    net: Decimal
+    ytd_gross: Decimal
+    ytd_tax: Decimal
+
+
+class YearTotals(BaseModel):
+    RE4: Decimal
+    SONSTB: Decimal
     LSTLZZ: Decimal
     SOLZLZZ: Decimal
-    SOLZS: Decimal
+    BK: Decimal
     STS: Decimal
-    VKVLZZ: Decimal
-    VKVSONST: Decimal
-    VFRB: Optional[Decimal] = None
-    VFRBS1: Optional[Decimal] = None
-    VFRBS2: Optional[Decimal] = None
-    WVFRB: Optional[Decimal] = None
-    WVFRBO: Optional[Decimal] = None
-    WVFRBM: Optional[Decimal] = None
+    SOLZS: Decimal
+    BKS: Decimal
+    tax: Decimal
+    net: Decimal
+
+
+class YearSimulationResponse(BaseModel):
+    months: List[YearMonthResult]
+    totals: YearTotals
+    calculations: int
+
+
+# Von allen Workern geteilter Ergebnis-Cache für Einzelberechnungen (0 Slots: aus)
+result_cache = open_result_cache(
+    os.environ.get("RESULT_CACHE_PATH", os.path.join(PAP_CACHE_DIR, "result_cache.bin")),
+    LohnsteuerResponse.model_fields,
+    slots=int(os.environ.get("RESULT_CACHE_SLOTS", "65536")),
+)
+
+# Maximale Anzahl Einträge der Ablaufverfolgung je Berechnung
+TRACE_LIMIT = int(os.environ.get("TRACE_LIMIT", "1000"))
+
+
+class PAPTraceResponse(BaseModel):
+    limit: int
+    dropped: int
+    events: List[dict]
+
+
+class LohnsteuerTraceResponse(LohnsteuerResponse):
+    trace: Optional[PAPTraceResponse] = None
+
+
+# Maximale Anzahl Berechnungen je Batch-Anfrage
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "10000"))
+
+
+class LohnsteuerBatchRequest(BaseModel):
+    items: List[dict] = Field(
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        description="Eingaben wie bei /api/v1/calculate_payroll_tax, jede wird einzeln validiert",
+    )
+
+
+class LohnsteuerBatchItem(BaseModel):
+    index: int
+    result: Optional[LohnsteuerResponse] = None
+    error: Optional[str] = None
+
+
+class LohnsteuerBatchResponse(BaseModel):
+    results: List[LohnsteuerBatchItem]
+    succeeded: int
+    failed: int
+
+
+# Worker-Pools: Berechnungen in Threads, Exporte und große Batches in eigenen Prozessen
+calculation_pool = WorkerPool(
+    "calculation",
+    "thread",
+    max_workers=int(os.environ.get("CALC_WORKERS", "4")),
+    max_queue=int(os.environ.get("CALC_QUEUE", "256")),
+    timeout=float(os.environ.get("CALC_TIMEOUT", "10")),
+)
+export_pool = WorkerPool(
+    "export",
+    "process",
+    max_workers=int(os.environ.get("EXPORT_WORKERS", "2")),
+    max_queue=int(os.environ.get("EXPORT_QUEUE", "32")),
+    timeout=float(os.environ.get("EXPORT_TIMEOUT", "60")),
+    initializer=init_export_worker,
+)
+# Große Batches: eigener Pool, damit sie Exporte nicht aus der Warteschlange drängen
+batch_pool = WorkerPool(
+    "batch",
+    "process",
+    max_workers=int(os.environ.get("BATCH_WORKERS", "2")),
+    max_queue=int(os.environ.get("BATCH_QUEUE", "8")),
+    timeout=float(os.environ.get("BATCH_TIMEOUT", "60")),
+)
+# CSV-Lohnlisten: Blöcke werden in eigenen Prozessen gerechnet, höchstens BULK_WORKERS
+# Blöcke je Anfrage gleichzeitig, damit der Speicherbedarf begrenzt bleibt
+bulk_pool = WorkerPool(
+    "bulk",
+    "process",
+    max_workers=int(os.environ.get("BULK_WORKERS", "2")),
+    max_queue=int(os.environ.get("BULK_QUEUE", "16")),
+    timeout=float(os.environ.get("BULK_TIMEOUT", "120")),
+)
+# Gleichzeitige identische Berechnungen bzw. Exporte laufen nur einmal
+calculation_flight = SingleFlight()
+export_flight = SingleFlight()
+
+# Ab dieser Anzahl gültiger Eingaben rechnet ein Batch im Prozess-Pool
+BATCH_PROCESS_MIN = int(os.environ.get("BATCH_PROCESS_MIN", "2000"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    calculation_pool.shutdown()
+    export_pool.shutdown()
+    batch_pool.shutdown()
+    bulk_pool.shutdown()
+    if result_cache is not None:
+        result_cache.close()
+    if metrics.snapshot:
+        try:
+            metrics.save_snapshot()
+        except OSError as e:
+            logging.warning(f"Metrik-Snapshot nicht geschrieben: {e}")
+    structured_logger.close()
 
 
 app = FastAPI(
@@ -264,6 +310,7 @@ app = FastAPI(
     },
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Read allowed origins from environment variable, default to "*"
@@ -284,24 +331,13 @@ RATE_LIMIT_REQUESTS = int(
 RATE_LIMIT_WINDOW = int(os.environ.get("RATE_LIMIT_WINDOW", "60"))  # seconds
 
 
-def check_rate_limit(client_ip: str) -> bool:
-    """Check if client has exceeded rate limit"""
-    current_time = time.time()
-
-    # Clean old requests
-    request_counts[client_ip] = [
-        req_time
-        for req_time in request_counts[client_ip]
-        if current_time - req_time < RATE_LIMIT_WINDOW
-    ]
-
-    # Check if limit exceeded
-    if len(request_counts[client_ip]) >= RATE_LIMIT_REQUESTS:
-        return False
-
-    # Add current request
-    request_counts[client_ip].append(current_time)
-    return True
+# Zustand je Client, unter gunicorn über RATE_LIMIT_PATH von allen Workern geteilt
+rate_limiter = open_rate_limiter(
+    RATE_LIMIT_REQUESTS,
+    RATE_LIMIT_WINDOW,
+    os.environ.get("RATE_LIMIT_PATH"),
+    slots=int(os.environ.get("RATE_LIMIT_SLOTS", "65536")),
+)
 
 
 @app.middleware("http")
@@ -314,14 +350,16 @@ async def rate_limit_middleware(request: Request, call_next):
         response = await call_next(request)
         return response
 
-    if not check_rate_limit(client_ip):
+    retry_after = rate_limiter.hit(client_ip)
+    if retry_after:
         logging.warning(f"Rate limit exceeded for IP: {client_ip}")
         return JSONResponse(
             status_code=429,
             content={
                 "detail": "Rate limit exceeded. Zu viele Anfragen in kurzer Zeit.",
-                "retry_after": RATE_LIMIT_WINDOW,
+                "retry_after": math.ceil(retry_after),
             },
+            headers={"Retry-After": str(math.ceil(retry_after))},
         )
 
     response = await call_next(request)
@@ -353,13 +391,29 @@ async def general_exception_handler(request: Request, exc: Exception):
     )
 
 
-@app.post("/api/v1/calculate_payroll_tax", response_model=LohnsteuerResponse, tags=["Berechnung"], summary="Berechnet die Lohnsteuer für 2025")
-async def calculate_payroll_tax(request: LohnsteuerRequest, http_request: Request):
+@app.post("/api/v1/calculate_payroll_tax", response_model=LohnsteuerTraceResponse, response_model_exclude_unset=True, tags=["Berechnung"], summary="Berechnet die Lohnsteuer für 2025")
+async def calculate_payroll_tax(
+    request: LohnsteuerRequest,
+    http_request: Request,
+    engine: Optional[str] = Query(
+        default=None,
+        pattern="^(decimal|int)$",
+        description="Rechenkern: int (Standard, ganzzahlig mit Tariftabellen) oder decimal (identische Ergebnisse)",
+    ),
+    trace: bool = Query(
+        default=False,
+        description="Ablaufverfolgung des PAP (Methoden und Zwischenwerte) in `trace` zurückgeben",
+    ),
+    x_pap_trace: Optional[str] = Header(default=None),
+):
     """
     Dieser Endpunkt ist das Herzstück der API und berechnet die deutsche Lohnsteuer, den Solidaritätszuschlag und die Kirchensteuer für das Jahr 2025.
 
     - **Eingabewerte**: Alle monetären Werte müssen in Cent angegeben werden.
     - **Genauigkeit**: Die Berechnung erfolgt mit hoher Präzision unter Verwendung von Dezimalzahlen.
+    - **Rechenkern**: Standard ist `int` (ganzzahlig in Cent mit vorberechneten Tariftabellen); mit `?engine=decimal` rechnet der übersetzte PAP, die Ergebnisse sind identisch.
+    - **Ablaufverfolgung**: Mit `?trace=true` oder dem Header `X-PAP-Trace: 1` rechnet `TaxCalculator2025` und `trace` enthält die PAP-Methoden mit ihren Zwischenwerten (höchstens `TRACE_LIMIT` Einträge).
+    - **Jahr**: `year` wählt den PAP (z.B. Korrekturen für Vorjahre); ohne Angabe gilt `PAP_YEAR`.
     - **Validierung**: Die Eingabedaten werden serverseitig validiert.
     """
     start_time = time.time()
@@ -388,13 +442,29 @@ async def calculate_payroll_tax(request: LohnsteuerRequest, http_request: Reques
             client_ip,
         )
 
+    trace = trace or x_pap_trace in ("1", "true", "yes")
+    if trace and not fixed_point(request_data):
+        raise HTTPException(
+            status_code=400, detail="Die Ablaufverfolgung gibt es nur für den PAP 2025"
+        )
+
     try:
         # Input sanitization and validation
-        sanitized_data = _sanitize_input(request_data)
+        sanitized_data = sanitize_input(request_data)
 
         # Perform calculation
-        calculator = TaxCalculator2025(**sanitized_data)
-        result = calculator.calculate()
+        if trace:
+            result, verlauf = await calculation_pool.run(
+                calculate_traced, sanitized_data, TRACE_LIMIT
+            )
+            result = dict(result, trace=verlauf.as_dict())
+        else:
+            key = cache_key(sanitized_data, pap_version(sanitized_data))
+            result = result_cache.get(key) if result_cache is not None else None
+            if result is None:
+                result = await calculation_flight.run(
+                    key, lambda: _calculate_and_cache(key, sanitized_data, engine)
+                )
 
         # Calculate processing time
         processing_time = time.time() - start_time
@@ -417,6 +487,14 @@ async def calculate_payroll_tax(request: LohnsteuerRequest, http_request: Reques
         )
         raise HTTPException(status_code=400, detail=f"Eingabefehler: {str(e)}")
 
+    except (PoolBusyError, PoolTimeoutError) as e:
+        processing_time = time.time() - start_time
+        status_code = _pool_status_code(e)
+        metrics.record_request(
+            "/api/v1/calculate_payroll_tax", processing_time, status_code, type(e).__name__
+        )
+        raise HTTPException(status_code=status_code, detail=_pool_detail(e))
+
     except Exception as e:
         processing_time = time.time() - start_time
         error_type = type(e).__name__
@@ -430,47 +508,415 @@ async def calculate_payroll_tax(request: LohnsteuerRequest, http_request: Reques
         )
 
 
-def _sanitize_input(data: dict) -> dict:
-    """Sanitizes and validates input data"""
-    sanitized = data.copy()
-
-    # Ensure all Decimal fields are properly converted
-    decimal_fields = [
-        "JFREIB",
-        "JHINZU",
-        "JRE4",
-        "JRE4ENT",
-        "JVBEZ",
-        "KVZ",
-        "LZZFREIB",
-        "LZZHINZU",
-        "MBV",
-        "PKPV",
-        "PVA",
-        "RE4",
-        "SONSTB",
-        "SONSTENT",
-        "STERBE",
-        "VBEZ",
-        "VBEZM",
-        "VBEZS",
-        "VBS",
-        "ZKF",
-    ]
+@app.post("/api/v1/net_to_gross", response_model=NetToGrossResponse, tags=["Berechnung"], summary="Berechnet den Bruttolohn zu einem Nettobetrag")
+async def calculate_net_to_gross(request: NetToGrossRequest, http_request: Request):
+    """
+    Sucht den kleinsten Bruttolohn `RE4` in Cent, bei dem `RE4 - LSTLZZ - SOLZLZZ - BK` mindestens `NETTO` erreicht.
 
-    for field in decimal_fields:
-        if field in sanitized and sanitized[field] is not None:
-            try:
-                sanitized[field] = Decimal(str(sanitized[field]))
-            except (ValueError, TypeError):
-                raise ValueError(f"Ungültiger Wert für {field}: {sanitized[field]}")
+    - **Eingabewerte**: Wie bei `/api/v1/calculate_payroll_tax`, jedoch `NETTO` statt `RE4`.
+    - **Ergebnis**: `RE4`, das damit erreichte `NETTO`, die vollständige Berechnung in `result` und die Zahl der intern berechneten Bruttobeträge in `probes`.
+    """
+    start_time = time.time()
+    client_ip = http_request.client.host
+    user_agent = http_request.headers.get("user-agent", "Unknown")
+
+    if security_monitor.is_blocked(client_ip):
+        structured_logger.log_error(
+            "blocked_ip", f"Request from blocked IP: {client_ip}", client_ip=client_ip
+        )
+        raise HTTPException(status_code=403, detail="Zugriff verweigert")
+
+    structured_logger.log_request("POST", "/api/v1/net_to_gross", client_ip, user_agent)
+
+    request_data = request.model_dump(exclude={"NETTO", "RE4"})
+    if security_monitor.check_suspicious_activity(client_ip, request_data):
+        structured_logger.log_error(
+            "suspicious_activity",
+            "Suspicious request pattern detected",
+            request_data,
+            client_ip,
+        )
 
-    # Additional business logic validation
-    if sanitized.get("STKL") == 4 and sanitized.get("f", 1.0) == 1.0:
-        # Bei Steuerklasse IV ohne Faktor, setze af auf 0
-        sanitized["af"] = 0
+    try:
+        sanitized_data = sanitize_input(request_data)
+        result = await calculation_pool.run(net_to_gross, sanitized_data, int(request.NETTO))
+        metrics.record_request("/api/v1/net_to_gross", time.time() - start_time, 200)
+        return result
 
-    return sanitized
+    except ValueError as e:
+        metrics.record_request(
+            "/api/v1/net_to_gross", time.time() - start_time, 400, "validation_error"
+        )
+        raise HTTPException(status_code=400, detail=f"Eingabefehler: {str(e)}")
+
+    except (PoolBusyError, PoolTimeoutError) as e:
+        status_code = _pool_status_code(e)
+        metrics.record_request(
+            "/api/v1/net_to_gross", time.time() - start_time, status_code, type(e).__name__
+        )
+        raise HTTPException(status_code=status_code, detail=_pool_detail(e))
+
+    except Exception as e:
+        error_type = type(e).__name__
+        structured_logger.log_error(error_type, str(e), request_data, client_ip)
+        metrics.record_request("/api/v1/net_to_gross", time.time() - start_time, 500, error_type)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ein interner Fehler ist während der Berechnung aufgetreten: {error_type}",
+        )
+
+
+@app.post("/api/v1/curve", response_model=CurveResponse, tags=["Berechnung"], summary="Steuerkurve über einen Bereich von Bruttolöhnen")
+async def calculate_curve(request: CurveRequest, http_request: Request):
+    """
+    Berechnet LSTLZZ, SOLZLZZ und BK für `RE4 = re4_from, re4_from + re4_step, ...` bis höchstens `re4_to` in einem Aufruf.
+
+    - **Profil**: Die übrigen Eingaben (STKL, ZKF, R, KVZ, PKV, LZZ, ...) gelten für alle Punkte.
+    - **Sätze**: `average_rate` ist `(LSTLZZ + SOLZLZZ + BK) / RE4`, `marginal_rate` die Steigung der Gesamtbelastung zwischen benachbarten Punkten.
+    - **Ausdünnen**: Mit `max_points` werden höchstens so viele Punkte geliefert (LTTB), berechnet wird trotzdem jeder Punkt.
+    """
+    start_time = time.time()
+    client_ip = http_request.client.host
+
+    if security_monitor.is_blocked(client_ip):
+        raise HTTPException(status_code=403, detail="Zugriff verweigert")
+
+    structured_logger.log_request(
+        "POST", "/api/v1/curve", client_ip, http_request.headers.get("user-agent", "Unknown")
+    )
+
+    if request.re4_to < request.re4_from:
+        raise HTTPException(status_code=400, detail="re4_to muss mindestens re4_from sein")
+    points = (request.re4_to - request.re4_from) // request.re4_step + 1
+    if points > CURVE_MAX_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Höchstens {CURVE_MAX_POINTS} Punkte je Kurve, angefragt: {points}",
+        )
+
+    profile = request.model_dump(exclude={"RE4", "re4_from", "re4_to", "re4_step", "max_points"})
+    try:
+        curve = await calculation_pool.run(
+            tax_curve,
+            sanitize_input(profile),
+            request.re4_from,
+            request.re4_to,
+            request.re4_step,
+            request.max_points,
+        )
+    except (PoolBusyError, PoolTimeoutError) as e:
+        status_code = _pool_status_code(e)
+        metrics.record_request(
+            "/api/v1/curve", time.time() - start_time, status_code, type(e).__name__
+        )
+        raise HTTPException(status_code=status_code, detail=_pool_detail(e))
+    except ValueError as e:
+        metrics.record_request("/api/v1/curve", time.time() - start_time, 400, "validation_error")
+        raise HTTPException(status_code=400, detail=f"Eingabefehler: {str(e)}")
+
+    metrics.record_request("/api/v1/curve", time.time() - start_time, 200)
+    # Listen direkt serialisieren, ohne sie Punkt für Punkt erneut zu validieren
+    return JSONResponse(content=curve)
+
+
+@app.post("/api/v1/simulate_year", response_model=YearSimulationResponse, tags=["Berechnung"], summary="Simuliert die zwölf Monatsabrechnungen eines Jahres")
+async def simulate_payroll_year(
+    request: YearSimulationRequest,
+    http_request: Request,
+    engine: Optional[str] = Query(
+        default=None,
+        pattern="^(decimal|int)$",
+        description="Rechenkern: int (Standard, ganzzahlig mit Tariftabellen) oder decimal (identische Ergebnisse)",
+    ),
+):
+    """
+    Rechnet die Monate Januar bis Dezember mit monatlichem Lohnzahlungszeitraum.
+
+    - **Lohnplan**: `wages` enthält einen Monatslohn für alle Monate oder zwölf einzelne.
+    - **Einmalzahlungen**: `one_offs` mit `month`, `SONSTB` und ggf. `SONSTENT`; JRE4, JRE4ENT, JFREIB, JHINZU und JVBEZ (`VBEZ` mal `ZMVB`) werden je Monat fortgeschrieben.
+    - **Ergebnis**: je Monat die Steuerbeträge, `tax`, `net` und die aufgelaufenen Werte `ytd_gross`/`ytd_tax`, dazu die Jahressummen in `totals`.
+    """
+    start_time = time.time()
+    client_ip = http_request.client.host
+
+    if security_monitor.is_blocked(client_ip):
+        raise HTTPException(status_code=403, detail="Zugriff verweigert")
+
+    structured_logger.log_request(
+        "POST", "/api/v1/simulate_year", client_ip, http_request.headers.get("user-agent", "Unknown")
+    )
+
+    profile = request.model_dump(
+        exclude={
+            "RE4",
+            "wages",
+            "one_offs",
+            "SONSTB",
+            "SONSTENT",
+            "JRE4",
+            "JRE4ENT",
+            "JFREIB",
+            "JHINZU",
+            "JVBEZ",
+        }
+    )
+    try:
+        result = await calculation_pool.run(
+            simulate_year,
+            sanitize_input(profile),
+            request.wages,
+            [payment.model_dump() for payment in request.one_offs],
+            engine,
+        )
+    except (PoolBusyError, PoolTimeoutError) as e:
+        status_code = _pool_status_code(e)
+        metrics.record_request(
+            "/api/v1/simulate_year", time.time() - start_time, status_code, type(e).__name__
+        )
+        raise HTTPException(status_code=status_code, detail=_pool_detail(e))
+    except ValueError as e:
+        metrics.record_request(
+            "/api/v1/simulate_year", time.time() - start_time, 400, "validation_error"
+        )
+        raise HTTPException(status_code=400, detail=f"Eingabefehler: {str(e)}")
+
+    metrics.record_request("/api/v1/simulate_year", time.time() - start_time, 200)
+    return result
+
+
+def _validate_batch(items: List[dict], client_ip: str):
+    """Prüft die Eingaben einer Batch-Anfrage wie Einzelanfragen; läuft in einem Thread"""
+    valid, errors = validate_payroll_items(items)
+    for _, request_data in valid:
+        if security_monitor.check_suspicious_activity(client_ip, request_data):
+            structured_logger.log_error(
+                "suspicious_activity",
+                "Suspicious request pattern detected",
+                request_data,
+                client_ip,
+            )
+    return valid, errors
+
+
+@app.post("/api/v1/calculate_payroll_tax/batch", response_model=LohnsteuerBatchResponse, tags=["Berechnung"], summary="Berechnet die Lohnsteuer 2025 für viele Eingaben")
+async def calculate_payroll_tax_batch(
+    request: LohnsteuerBatchRequest,
+    http_request: Request,
+    engine: Optional[str] = Query(
+        default=None,
+        pattern="^(numpy|decimal|int)$",
+        description="Rechenkern: numpy (Standard, alle Eingaben in einem Aufruf), decimal oder int",
+    ),
+):
+    """
+    Berechnet bis zu `MAX_BATCH_SIZE` Eingaben in einer Anfrage.
+
+    - **Reihenfolge**: `results` enthält je Eingabe einen Eintrag mit deren `index`.
+    - **Fehler**: Ungültige Eingaben liefern `error` statt `result`, die übrigen werden trotzdem berechnet.
+    - **Rechenkern**: `numpy` liefert dieselben Beträge wie die Einzelberechnung, jedoch ohne Nachkommastellen (z.B. `0` statt `0.00`).
+    """
+    start_time = time.time()
+    client_ip = http_request.client.host
+    user_agent = http_request.headers.get("user-agent", "Unknown")
+
+    if security_monitor.is_blocked(client_ip):
+        structured_logger.log_error(
+            "blocked_ip", f"Request from blocked IP: {client_ip}", client_ip=client_ip
+        )
+        raise HTTPException(status_code=403, detail="Zugriff verweigert")
+
+    structured_logger.log_request(
+        "POST", "/api/v1/calculate_payroll_tax/batch", client_ip, user_agent
+    )
+
+    # Bis zu MAX_BATCH_SIZE Eingaben prüfen blockiert sonst die Event-Loop
+    valid, errors = await asyncio.to_thread(_validate_batch, request.items, client_ip)
+    results = [None] * len(request.items)
+    for index, message in errors:
+        results[index] = {"index": index, "error": message}
+    indices = [index for index, _ in valid]
+    rows = [data for _, data in valid]
+
+    try:
+        # Alle gültigen Eingaben mit einem Aufruf des Rechenkerns
+        pool = batch_pool if len(rows) >= BATCH_PROCESS_MIN else calculation_pool
+        computed = await pool.run(calculate_pap_batch, rows, engine)
+    except (PoolBusyError, PoolTimeoutError) as e:
+        processing_time = time.time() - start_time
+        status_code = _pool_status_code(e)
+        metrics.record_request(
+            "/api/v1/calculate_payroll_tax/batch", processing_time, status_code, type(e).__name__
+        )
+        raise HTTPException(status_code=status_code, detail=_pool_detail(e))
+    except Exception as e:
+        processing_time = time.time() - start_time
+        error_type = type(e).__name__
+        structured_logger.log_error(error_type, str(e), client_ip=client_ip)
+        metrics.record_request(
+            "/api/v1/calculate_payroll_tax/batch", processing_time, 500, error_type
+        )
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ein interner Fehler ist während der Berechnung aufgetreten: {error_type}",
+        )
+
+    for index, result in zip(indices, computed):
+        results[index] = {"index": index, "result": result}
+
+    processing_time = time.time() - start_time
+    metrics.record_request("/api/v1/calculate_payroll_tax/batch", processing_time, 200)
+
+    return {"results": results, "succeeded": len(rows), "failed": len(results) - len(rows)}
+
+
+@app.post("/api/v1/bulk/csv", tags=["Berechnung"], summary="Berechnet eine CSV-Lohnliste und liefert sie mit Ergebnisspalten zurück")
+async def calculate_bulk_csv(
+    http_request: Request,
+    engine: Optional[str] = Query(
+        default="numpy",
+        pattern="^(numpy|decimal|int)$",
+        description="Rechenkern: numpy (Standard, ein Aufruf je Block), decimal oder int",
+    ),
+    format: str = Query(
+        default="csv",
+        pattern="^(csv|xlsx)$",
+        description="Ausgabe als CSV (Standard) oder als Excel-Datei mit Zahlenzellen",
+    ),
+):
+    """
+    Berechnet eine Lohnliste im CSV-Format (UTF-8) beliebiger Größe.
+
+    - **Eingabe**: Der Body ist die CSV-Datei, eine Zeile je Beschäftigtem; die Spalten heißen wie die Felder der Einzelberechnung (`RE4`, `STKL`, `LZZ`, ...).
+    - **Ausgabe**: Die Zeilen werden in derselben Reihenfolge mit den Ergebnisspalten (`BK`, `LSTLZZ`, ...) und `error` zurückgestreamt.
+    - **Excel**: Mit `format=xlsx` wird eine Excel-Datei ebenso blockweise erzeugt und gesendet.
+    - **Blöcke**: Je `BULK_CHUNK_ROWS` Zeilen werden gemeinsam gerechnet; weder Eingabe noch Ausgabe werden vollständig gehalten.
+    - **Fehler**: Ungültige Zeilen erhalten leere Ergebnisse und die Meldung in `error`.
+    """
+    start_time = time.time()
+    client_ip = http_request.client.host
+    user_agent = http_request.headers.get("user-agent", "Unknown")
+
+    if security_monitor.is_blocked(client_ip):
+        structured_logger.log_error(
+            "blocked_ip", f"Request from blocked IP: {client_ip}", client_ip=client_ip
+        )
+        raise HTTPException(status_code=403, detail="Zugriff verweigert")
+
+    structured_logger.log_request("POST", "/api/v1/bulk/csv", client_ip, user_agent)
+
+    # Kopfzeile vor der Antwort prüfen, damit Formatfehler noch mit 400 gemeldet werden
+    chunks = aiter_chunks(http_request.stream())
+    try:
+        records = await anext(chunks, [])
+        if not records:
+            raise BulkFormatError("Die CSV-Datei ist leer")
+        columns = parse_header(records.pop(0), BULK_FIELDS, BULK_REQUIRED)
+    except (BulkFormatError, UnicodeDecodeError) as e:
+        metrics.record_request("/api/v1/bulk/csv", time.time() - start_time, 400, "format_error")
+        raise HTTPException(status_code=400, detail=f"Ungültige CSV-Datei: {e}")
+
+    xlsx = format == "xlsx"
+    writer = (
+        XLSXStreamWriter(output_columns(columns), xlsx_formats(columns), "Lohnsteuer")
+        if xlsx
+        else None
+    )
+
+    async def body():
+        rows = failed = 0
+        status_code, error_type = 200, None
+        laufend = deque()
+
+        async def ausgabe():
+            nonlocal rows, failed
+            anzahl, auftrag = laufend.popleft()
+            ergebnis, fehler = await auftrag
+            rows += anzahl
+            failed += fehler
+            if xlsx:
+                # Komprimieren dauert je Block einige Millisekunden, nicht in der Ereignisschleife
+                return await asyncio.to_thread(writer.write_rows, ergebnis)
+            return ergebnis
+
+        try:
+            if not xlsx:
+                yield header_line(columns)
+            block = records
+            while block is not None:
+                if block:
+                    laufend.append(
+                        (
+                            len(block),
+                            asyncio.ensure_future(
+                                bulk_pool.run(
+                                    process_chunk,
+                                    columns,
+                                    block,
+                                    validate_payroll_row,
+                                    engine,
+                                    xlsx,
+                                )
+                            ),
+                        )
+                    )
+                # Blöcke parallel rechnen, aber in der Reihenfolge der Eingabe ausgeben
+                while laufend and (len(laufend) >= bulk_pool.max_workers or laufend[0][1].done()):
+                    yield await ausgabe()
+                block = await anext(chunks, None)
+            while laufend:
+                yield await ausgabe()
+            if xlsx:
+                yield writer.close()
+        except Exception as e:
+            # Die Antwort hat bereits begonnen: der Abbruch ist nur noch am Ende erkennbar
+            status_code, error_type = 500, type(e).__name__
+            structured_logger.log_error(error_type, str(e), client_ip=client_ip)
+            raise
+        finally:
+            for _, auftrag in laufend:
+                auftrag.cancel()
+            metrics.record_request(
+                "/api/v1/bulk/csv", time.time() - start_time, status_code, error_type
+            )
+            logging.info(f"CSV-Lohnliste von {client_ip}: {rows} Zeilen, {failed} mit Fehler")
+
+    return StreamingResponse(
+        body(),
+        media_type=XLSX_MEDIA_TYPE if xlsx else "text/csv",
+        headers={"Content-Disposition": f"attachment; filename=lohnsteuer_ergebnis.{format}"},
+    )
+
+
+async def _calculate_and_cache(key: bytes, data: dict, engine: Optional[str]) -> dict:
+    result = await calculation_pool.run(calculate_pap, data, engine)
+    if result_cache is not None:
+        result_cache.put(key, result)
+    return result
+
+
+async def _render_calculation_report(format_type: str, input_data: dict, result: dict):
+    """Liefert (calculation_id, Report); identische gleichzeitige Exporte teilen sich einen"""
+
+    async def render():
+        calculation_id = str(uuid.uuid4())[:8]
+        data = await export_pool.run(
+            render_calculation_report, format_type, input_data, result, calculation_id
+        )
+        return calculation_id, data
+
+    key = request_key("report", format_type, input_data, result)
+    return await export_flight.run(key, render)
+
+
+def _pool_status_code(error: Exception) -> int:
+    """503 bei voller Warteschlange, 504 bei überschrittenem Zeitlimit"""
+    return 504 if isinstance(error, PoolTimeoutError) else 503
+
+
+def _pool_detail(error: Exception) -> str:
+    if isinstance(error, PoolTimeoutError):
+        return "Die Berechnung hat das Zeitlimit überschritten"
+    return "Der Server ist ausgelastet, bitte später erneut versuchen"
 
 
 @app.get("/")
@@ -483,12 +929,11 @@ def health_check():
     """Health check endpoint for monitoring"""
     try:
         # Test basic calculation to ensure everything works
-        test_calc = TaxCalculator2025(
+        default_pap.module.calculate(
             RE4=Decimal(100000),  # 1000€
             STKL=1,
             LZZ=2,
         )
-        test_calc.calculate()
 
         return {
             "status": "healthy",
@@ -513,6 +958,11 @@ def api_info():
         "description": "Offizielle Lohnsteuerberechnung nach PAP 2025",
         "endpoints": {
             "calculate": "/api/v1/calculate_payroll_tax",
+            "net_to_gross": "/api/v1/net_to_gross",
+            "curve": "/api/v1/curve",
+            "simulate_year": "/api/v1/simulate_year",
+            "bulk_csv": "/api/v1/bulk/csv",
+            "payslips": "/api/v1/export/payslips",
             "health": "/health",
             "docs": "/docs",
             "redoc": "/redoc",
@@ -521,7 +971,10 @@ def api_info():
             "requests_per_minute": RATE_LIMIT_REQUESTS,
             "window_seconds": RATE_LIMIT_WINDOW,
         },
-        "supported_years": [2025],
+        "supported_years": pap_registry.years(),
+        "default_year": pap_registry.default_year,
+        "pap_versions": pap_registry.as_list(),
+        "engines": list(ENGINES),
         "last_updated": "2025-01-16",
     }
 
@@ -552,28 +1005,58 @@ def get_tax_constants():
     }
 
 
+@app.get("/api/v1/metrics/prometheus", response_class=PlainTextResponse)
+def get_metrics_prometheus():
+    """Antwortzeiten je Endpunkt und Statusklasse im Textformat von Prometheus"""
+    return PlainTextResponse(
+        metrics.prometheus_text(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/api/v1/metrics/timeseries")
+def get_metrics_timeseries(
+    resolution: str = Query(
+        default="minute",
+        pattern="^(second|minute|hour)$",
+        description="Auflösung: second, minute oder hour",
+    ),
+    periods: Optional[int] = Query(
+        default=None, ge=1, description="Anzahl der letzten Perioden (Standard: ganzer Ring)"
+    ),
+):
+    """Anfragen, Fehler und Antwortzeit-Quantile je Sekunde, Minute oder Stunde, über alle Worker"""
+    return {"resolution": resolution, "series": metrics.timeseries(resolution, periods)}
+
+
 @app.get("/api/v1/metrics")
 def get_metrics():
     """Get API metrics and statistics"""
     return {
         "api_metrics": metrics.get_stats(),
         "security_info": {
-            "blocked_ips_count": len(security_monitor.blocked_ips),
+            "blocked_ips_count": security_monitor.blocked_count(),
             "rate_limit_config": {
                 "requests_per_minute": RATE_LIMIT_REQUESTS,
                 "window_seconds": RATE_LIMIT_WINDOW,
             },
         },
+        "result_cache": result_cache.get_stats() if result_cache else {"enabled": False},
+        "rate_limit": rate_limiter.get_stats(),
+        "logging": structured_logger.get_stats(),
+        "coalescing": {
+            "calculation": calculation_flight.get_stats(),
+            "export": export_flight.get_stats(),
+        },
+        "executor": {
+            "calculation": calculation_pool.get_stats(),
+            "export": export_pool.get_stats(),
+            "batch": batch_pool.get_stats(),
+            "bulk": bulk_pool.get_stats(),
+        },
         "system_info": {"timestamp": time.time(), "uptime_check": "healthy"},
     }
 
 
-# Export Services
-pdf_service = PDFExportService()
-excel_service = ExcelExportService()
-comparison_service = ComparisonExportService()
-
-
 class ExportRequest(BaseModel):
     input_data: dict
     result: dict
@@ -589,9 +1072,8 @@ class ComparisonRequest(BaseModel):
 async def export_pdf(request: ExportRequest, http_request: Request):
     """Export calculation result as PDF"""
     try:
-        calculation_id = str(uuid.uuid4())[:8]
-        pdf_data = pdf_service.generate_calculation_report(
-            request.input_data, request.result, calculation_id
+        calculation_id, pdf_data = await _render_calculation_report(
+            "pdf", request.input_data, request.result
         )
 
         filename = f"lohnsteuer_{calculation_id}.pdf"
@@ -606,6 +1088,8 @@ async def export_pdf(request: ExportRequest, http_request: Request):
             media_type="application/pdf",
             headers={"Content-Disposition": f"attachment; filename={filename}"},
         )
+    except (PoolBusyError, PoolTimeoutError) as e:
+        raise HTTPException(status_code=_pool_status_code(e), detail=_pool_detail(e))
     except Exception as e:
         logging.error(f"PDF export error: {e}")
         raise HTTPException(status_code=500, detail="Fehler beim PDF-Export")
@@ -615,9 +1099,8 @@ async def export_pdf(request: ExportRequest, http_request: Request):
 async def export_excel(request: ExportRequest, http_request: Request):
     """Export calculation result as Excel"""
     try:
-        calculation_id = str(uuid.uuid4())[:8]
-        excel_data = excel_service.generate_calculation_report(
-            request.input_data, request.result, calculation_id
+        calculation_id, excel_data = await _render_calculation_report(
+            "excel", request.input_data, request.result
         )
 
         filename = f"lohnsteuer_{calculation_id}.xlsx"
@@ -632,6 +1115,8 @@ async def export_excel(request: ExportRequest, http_request: Request):
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             headers={"Content-Disposition": f"attachment; filename={filename}"},
         )
+    except (PoolBusyError, PoolTimeoutError) as e:
+        raise HTTPException(status_code=_pool_status_code(e), detail=_pool_detail(e))
     except Exception as e:
         logging.error(f"Excel export error: {e}")
         raise HTTPException(status_code=500, detail="Fehler beim Excel-Export")
@@ -647,34 +1132,142 @@ async def export_comparison(request: ComparisonRequest, http_request: Request):
                 detail="Mindestens 2 Berechnungen für Vergleich erforderlich",
             )
 
+        if request.format_type.lower() == "excel":
+            # Excel wird zeilenweise erzeugt und gesendet, daher ohne Obergrenze; die Beträge
+            # werden vorher geprüft, damit Fehler nicht erst nach dem Status 200 auffallen
+            try:
+                rows = await asyncio.to_thread(
+                    lambda: list(comparison_rows(request.calculations))
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return StreamingResponse(
+                iter_comparison_xlsx(rows),
+                media_type=XLSX_MEDIA_TYPE,
+                headers={
+                    "Content-Disposition": "attachment; filename="
+                    f"lohnsteuer_vergleich_{str(uuid.uuid4())[:8]}.xlsx"
+                },
+            )
+
         if len(request.calculations) > 10:
             raise HTTPException(
                 status_code=400, detail="Maximal 10 Berechnungen für Vergleich erlaubt"
             )
 
-        comparison_data = comparison_service.generate_comparison_report(
-            request.calculations, request.format_type
+        comparison_data = await export_flight.run(
+            request_key("comparison", request.format_type, request.calculations),
+            lambda: export_pool.run(
+                render_comparison_report, request.calculations, request.format_type
+            ),
         )
 
-        if request.format_type.lower() == "pdf":
-            media_type = "application/pdf"
-            extension = "pdf"
-        else:
-            media_type = (
-                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-            extension = "xlsx"
-
-        filename = f"lohnsteuer_vergleich_{str(uuid.uuid4())[:8]}.{extension}"
+        filename = f"lohnsteuer_vergleich_{str(uuid.uuid4())[:8]}.pdf"
 
         return StreamingResponse(
             io.BytesIO(comparison_data),
-            media_type=media_type,
+            media_type="application/pdf",
             headers={"Content-Disposition": f"attachment; filename={filename}"},
         )
+    except HTTPException:
+        raise
+    except (PoolBusyError, PoolTimeoutError) as e:
+        raise HTTPException(status_code=_pool_status_code(e), detail=_pool_detail(e))
     except Exception as e:
         logging.error(f"Comparison export error: {e}")
         raise HTTPException(status_code=500, detail="Fehler beim Vergleichs-Export")
 
+
+# Maximale Anzahl Beschäftigter je Anfrage an /api/v1/export/payslips
+MAX_PAYSLIPS = int(os.environ.get("MAX_PAYSLIPS", "50000"))
+
+
+class PayslipRequest(BaseModel):
+    items: List[dict] = Field(
+        min_length=1,
+        max_length=MAX_PAYSLIPS,
+        description="Eingaben wie bei /api/v1/calculate_payroll_tax, optional mit name je Eintrag",
+    )
+
+
+@app.post("/api/v1/export/payslips")
+async def export_payslips(
+    request: PayslipRequest,
+    http_request: Request,
+    engine: Optional[str] = Query(default=None, pattern="^(numpy|decimal|int)$"),
+):
+    """Rechnet alle Eingaben und liefert je Beschäftigtem einen PDF-Report in einem ZIP-Archiv
+
+    Die Reports werden blockweise im Export-Pool erzeugt und in der Reihenfolge ihrer
+    Fertigstellung in das Archiv geschrieben; ungültige Eingaben stehen in ``fehler.csv``.
+    """
+    start_time = time.time()
+    client_ip = http_request.client.host
+
+    if security_monitor.is_blocked(client_ip):
+        raise HTTPException(status_code=403, detail="Zugriff verweigert")
+
+    structured_logger.log_request(
+        "POST",
+        "/api/v1/export/payslips",
+        client_ip,
+        http_request.headers.get("user-agent", "Unknown"),
+    )
+
+    # Bis zu MAX_PAYSLIPS Eingaben prüfen blockiert sonst die Event-Loop
+    valid, errors = await asyncio.to_thread(validate_payroll_items, request.items)
+    entries = [
+        (payslip_filename(index, request.items[index].get("name")), data)
+        for index, data in valid
+    ]
+
+    async def body():
+        archive = PayslipArchive()
+        status_code, error_type = 200, None
+        laufend = set()
+        bloecke = (
+            entries[start : start + PAYSLIP_CHUNK]
+            for start in range(0, len(entries), PAYSLIP_CHUNK)
+        )
+        try:
+            for block in bloecke:
+                laufend.add(asyncio.ensure_future(export_pool.run(render_payslips, block, engine)))
+                # Höchstens ein Block mehr als Worker unterwegs: begrenzt den Speicher
+                while len(laufend) > export_pool.max_workers:
+                    fertig, laufend = await asyncio.wait(
+                        laufend, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for auftrag in fertig:
+                        yield archive.add(auftrag.result())
+            while laufend:
+                fertig, laufend = await asyncio.wait(laufend, return_when=asyncio.FIRST_COMPLETED)
+                for auftrag in fertig:
+                    yield archive.add(auftrag.result())
+            yield archive.close(errors)
+        except Exception as e:
+            # Die Antwort hat bereits begonnen: der Abbruch ist nur noch am Ende erkennbar
+            status_code, error_type = 500, type(e).__name__
+            structured_logger.log_error(error_type, str(e), client_ip=client_ip)
+            raise
+        finally:
+            for auftrag in laufend:
+                auftrag.cancel()
+            metrics.record_request(
+                "/api/v1/export/payslips", time.time() - start_time, status_code, error_type
+            )
+            logging.info(
+                f"Lohnabrechnungen für {client_ip}: {archive.files} PDFs, {len(errors)} mit Fehler"
+            )
+
+    return StreamingResponse(
+        body(),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": "attachment; filename="
+            f"lohnabrechnungen_{str(uuid.uuid4())[:8]}.zip"
+        },
+    )
+
+
 # Mount frontend
 app.mount("/", StaticFiles(directory="../frontend", html=True), name="static")
@@ -2,27 +2,576 @@
 Monitoring und Logging Utilities für die Lohnsteuer API
 """
 
+import fcntl
 import logging
+import math
+import mmap
+import os
+import struct
 import time
-from typing import Dict, Any
-from collections import defaultdict, deque
-from datetime import datetime
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+from collections import defaultdict
 import threading
 
+import numpy as np
 
-class APIMetrics:
-    """Sammelt und verwaltet API-Metriken"""
-
-    def __init__(self):
-        self.request_count = 0
-        self.error_count = 0
-        self.response_times = deque(maxlen=1000)  # Letzte 1000 Requests
-        self.error_types = defaultdict(int)
-        self.endpoint_stats = defaultdict(
-            lambda: {"count": 0, "errors": 0, "avg_time": 0}
+from log_pipeline import LogPipeline
+from rate_limiter import client_key
+from shared_file import open_shared_file
+
+_DATA_OFFSET = mmap.PAGESIZE
+
+
+# Histogramm-Buckets: je Zweierpotenz HISTOGRAM_SUB_BUCKETS gleich breite Buckets (höchstens
+# 1/16 = 6 % relative Breite) von 2^-20 s (~1 µs) bis 2^7 s; darunter und darüber je einer
+HISTOGRAM_SUB_BUCKETS = 16
+_LOW_EXP = -19
+_OCTAVES = 27
+_HISTOGRAM_SIZE = _OCTAVES * HISTOGRAM_SUB_BUCKETS + 2
+
+QUANTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("p999", 0.999))
+
+# Grenzen ``le`` für Prometheus: Zweierpotenzen, die mit Bucketgrenzen zusammenfallen
+PROMETHEUS_BUCKETS = tuple(2.0**exp for exp in range(-10, 6))
+
+
+_HISTOGRAM_MAX = 2.0 ** (_LOW_EXP + _OCTAVES - 1)
+
+
+def _bucket_index(value: float) -> int:
+    if value <= 0:
+        return 0
+    if value >= _HISTOGRAM_MAX:
+        return _HISTOGRAM_SIZE - 1
+    mantisse, exp = math.frexp(value)
+    octave = exp - _LOW_EXP
+    if octave < 0:
+        return 0
+    return 1 + octave * HISTOGRAM_SUB_BUCKETS + int((mantisse * 2 - 1) * HISTOGRAM_SUB_BUCKETS)
+
+
+def _bucket_upper(index: int) -> float:
+    """Obere Grenze eines Buckets in Sekunden"""
+    if index == 0:
+        return 2.0 ** (_LOW_EXP - 1)
+    if index >= _HISTOGRAM_SIZE - 1:
+        return math.inf
+    octave, sub = divmod(index - 1, HISTOGRAM_SUB_BUCKETS)
+    return 2.0 ** (_LOW_EXP + octave - 1) * (1 + (sub + 1) / HISTOGRAM_SUB_BUCKETS)
+
+
+_BUCKET_UPPER = np.array([_bucket_upper(index) for index in range(_HISTOGRAM_SIZE)])
+
+
+class LatencyHistogram:
+    """Logarithmisch gestuftes Histogramm fester Größe für Antwortzeiten in Sekunden
+
+    Aufzeichnen ist O(1); Quantile werden aus den Buckets bestimmt (obere Bucketgrenze,
+    begrenzt auf min/max) und sind damit auf etwa 6 % genau. ``counts`` und ``werte``
+    (Summe, min, max) sind numpy-Arrays und können Sichten auf eine Metrikdatei sein.
+    """
+
+    __slots__ = ("counts", "werte")
+
+    def __init__(self, counts: Optional[np.ndarray] = None, werte: Optional[np.ndarray] = None):
+        self.counts = np.zeros(_HISTOGRAM_SIZE, np.uint64) if counts is None else counts
+        self.werte = np.array([0.0, math.inf, 0.0]) if werte is None else werte
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def total(self) -> float:
+        return float(self.werte[0])
+
+    @property
+    def min(self) -> float:
+        return float(self.werte[1])
+
+    @property
+    def max(self) -> float:
+        return float(self.werte[2])
+
+    def add(self, index: int, value: float):
+        """Zählt einen Wert, dessen Bucket schon bestimmt ist (``_bucket_index``)"""
+        self.counts[index] += 1
+        werte = self.werte
+        werte[0] += value
+        if value < werte[1]:
+            werte[1] = value
+        if value > werte[2]:
+            werte[2] = value
+
+    def record(self, value: float):
+        self.add(_bucket_index(value), value)
+
+    def merge(self, other: "LatencyHistogram"):
+        self.counts += other.counts
+        self.werte[0] += other.werte[0]
+        self.werte[1] = min(self.werte[1], other.werte[1])
+        self.werte[2] = max(self.werte[2], other.werte[2])
+
+    def copy(self) -> "LatencyHistogram":
+        return LatencyHistogram(self.counts.copy(), self.werte.copy())
+
+    def quantile(self, q: float) -> float:
+        kumuliert = np.cumsum(self.counts)
+        count = int(kumuliert[-1])
+        if not count:
+            return 0.0
+        rang = max(1, math.ceil(q * count))
+        index = int(np.searchsorted(kumuliert, rang))
+        return min(max(float(_BUCKET_UPPER[index]), self.min), self.max)
+
+    def cumulative(self, bounds) -> List[int]:
+        """Anzahl der Werte bis einschließlich jeder Grenze (für Prometheus ``le``)"""
+        kumuliert = np.cumsum(self.counts)
+        enden = np.searchsorted(_BUCKET_UPPER, bounds, side="right")
+        return [int(kumuliert[ende - 1]) if ende else 0 for ende in enden]
+
+    def summary(self) -> Dict[str, float]:
+        """Anzahl, Mittel, min/max und Quantile in Millisekunden"""
+        count = self.count
+        if not count:
+            return {"count": 0}
+        ergebnis = {
+            "count": count,
+            "mean_ms": round(self.total / count * 1000, 3),
+            "min_ms": round(self.min * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+        for name, q in QUANTILES:
+            ergebnis[f"{name}_ms"] = round(self.quantile(q) * 1000, 3)
+        return ergebnis
+
+
+_STATUS_CLASSES = {klasse: f"{klasse}xx" for klasse in range(1, 6)}
+
+
+def status_class(status_code: int) -> str:
+    klasse = status_code // 100
+    return _STATUS_CLASSES.get(klasse) or f"{klasse}xx"
+
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Metriken je Worker in einer eigenen Datei unter METRICS_DIR, summiert wird beim Abruf
+METRICS_SERIES = int(os.environ.get("METRICS_SERIES", "256"))
+METRICS_ERROR_TYPES = int(os.environ.get("METRICS_ERROR_TYPES", "64"))
+
+# Zeitreihen als Ringpuffer je Auflösung: Name, Sekunden je Periode, Anzahl Perioden
+TIMESERIES_RESOLUTIONS = (
+    ("second", 1, int(os.environ.get("METRICS_SECONDS", "300"))),
+    ("minute", 60, int(os.environ.get("METRICS_MINUTES", "1440"))),
+    ("hour", 3600, int(os.environ.get("METRICS_HOURS", "168"))),
+)
+
+# Optionaler Snapshot der Zeitreihen, wird beim Start wieder eingelesen
+METRICS_SNAPSHOT = os.environ.get("METRICS_SNAPSHOT")
+METRICS_SNAPSHOT_INTERVAL = float(os.environ.get("METRICS_SNAPSHOT_INTERVAL", "60"))
+
+# Bei Änderungen am Dateiformat erhöhen, ältere Dateien werden dann nicht mehr gelesen
+METRICS_FORMAT = 2
+
+# Sammelreihe, wenn alle Reihen einer Datei belegt sind
+OVERFLOW_SERIES = ("other", "other")
+
+_METRICS_MAGIC = b"LSTMET\0\0"
+# Magic, Format, Reihen, Fehlerarten, Perioden je Auflösung (3), PID, Start
+_METRICS_HEADER = struct.Struct("<8sIIIIIIId")
+_METRICS_KEY_SIZE = 32  # Magic bis Perioden: bestimmt, ob eine Datei weiter nutzbar ist
+# Kennung des Workers hinter dem Kopf: Startzeit des Prozesses (Ticks seit Systemstart) und
+# PID-Namensraum; in Dateien ohne Kennung (Snapshot, Sammeldatei) beide 0
+_METRICS_WORKER = struct.Struct("<QQ")
+_WORKER_OFFSET = 48
+_ZAEHLER_OFFSET = 64  # int64: Anfragen, Fehler, noch nicht verdichtete Sekunde
+_ANFRAGEN, _FEHLER, _SEKUNDE = range(3)
+_SNAPSHOT_NAME = "metrics_snapshot.bin"
+# Summen beendeter Worker; Sperrdatei für Zusammenlegen, Lesen und Anlegen im Verzeichnis
+_ACCUMULATED_NAME = "metrics_accumulated.bin"
+_LOCK_NAME = "metrics.lock"
+
+_SERIES = np.dtype(
+    [
+        ("endpoint", "S96"),
+        ("klasse", "S8"),
+        ("werte", "<f8", (3,)),
+        ("counts", "<u8", (_HISTOGRAM_SIZE,)),
+    ]
+)
+_ERROR_TYPE = np.dtype([("name", "S56"), ("count", "<u8")])
+
+# Zeitreihen zählen in gröberen Buckets (4 je Zweierpotenz, Quantile auf 25 % genau)
+_TIMESERIES_SUB_BUCKETS = 4
+_GROB = HISTOGRAM_SUB_BUCKETS // _TIMESERIES_SUB_BUCKETS
+_TIMESERIES_SIZE = _OCTAVES * _TIMESERIES_SUB_BUCKETS + 2
+_GROB_INDEX = [0] + [1 + (index - 1) // _GROB for index in range(1, _HISTOGRAM_SIZE)]
+_TIMESERIES_UPPER = np.array(
+    [min(_bucket_upper(_GROB * index), _HISTOGRAM_MAX) for index in range(_TIMESERIES_SIZE)]
+)
+# Periode, Summe der Antwortzeiten, Fehler, Buckets
+_SLOT = np.dtype(
+    [("periode", "<i8"), ("werte", "<f8", (2,)), ("counts", "<u4", (_TIMESERIES_SIZE,))]
+)
+
+
+def _metrics_size(series: int, error_types: int, perioden: Tuple[int, ...]) -> int:
+    return (
+        _DATA_OFFSET
+        + series * _SERIES.itemsize
+        + error_types * _ERROR_TYPE.itemsize
+        + sum(perioden) * _SLOT.itemsize
+    )
+
+
+class _WorkerTables:
+    """Sichten auf den Speicherbereich eines Workers (Datei, mmap oder Kopie)"""
+
+    __slots__ = ("pid", "start", "token", "namespace", "zaehler", "reihen", "fehler", "ringe")
+
+    def __init__(self, buffer):
+        header = _METRICS_HEADER.unpack_from(buffer, 0)
+        _, _, series, error_types, *perioden, self.pid, self.start = header
+        self.token, self.namespace = _METRICS_WORKER.unpack_from(buffer, _WORKER_OFFSET)
+        self.zaehler = np.ndarray(4, "<i8", buffer, _ZAEHLER_OFFSET)
+        offset = _DATA_OFFSET
+        self.reihen = np.ndarray(series, _SERIES, buffer, offset)
+        offset += series * _SERIES.itemsize
+        self.fehler = np.ndarray(error_types, _ERROR_TYPE, buffer, offset)
+        offset += error_types * _ERROR_TYPE.itemsize
+        self.ringe = []
+        for anzahl in perioden:
+            self.ringe.append(np.ndarray(anzahl, _SLOT, buffer, offset))
+            offset += anzahl * _SLOT.itemsize
+
+
+def _metrics_tables(buffer) -> Optional[_WorkerTables]:
+    """Sichten auf ``buffer``; None bei fremdem Format oder unvollständiger Datei"""
+    if len(buffer) < _DATA_OFFSET:
+        return None
+    magic, fmt, series, error_types, *perioden, _, _ = _METRICS_HEADER.unpack_from(buffer, 0)
+    if (
+        magic != _METRICS_MAGIC
+        or fmt != METRICS_FORMAT
+        or len(buffer) != _metrics_size(series, error_types, tuple(perioden))
+    ):
+        return None
+    return _WorkerTables(buffer)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _process_token(pid: int) -> int:
+    """Startzeit des Prozesses in Ticks seit dem Systemstart (/proc); 0, wenn unbekannt"""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as fh:
+            stat = fh.read()
+    except OSError:
+        return 0
+    # Feld 22; der Prozessname in Klammern kann Leerzeichen enthalten
+    return int(stat.rsplit(b")", 1)[1].split()[19])
+
+
+def _pid_namespace() -> int:
+    try:
+        return os.stat("/proc/self/ns/pid").st_ino
+    except OSError:
+        return 0
+
+
+_PID_NAMESPACE = _pid_namespace()
+
+
+def _worker_exited(tabelle: _WorkerTables) -> bool:
+    """True, wenn der Worker einer Datei sicher beendet ist
+
+    Verglichen wird die beim Anlegen eingetragene Startzeit mit der des Prozesses, der jetzt
+    die PID trägt: eine von einem fremden Prozess wiederverwendete PID gilt als beendet.
+    PIDs aus einem anderen Namensraum lassen sich hier nicht prüfen, solche Dateien legt
+    nur ein Worker aus deren Namensraum zusammen. Ohne /proc zählt nur, ob die PID lebt.
+    """
+    if not tabelle.pid or tabelle.namespace != _PID_NAMESPACE:
+        return False
+    if not tabelle.token:
+        return not _alive(tabelle.pid)
+    return _process_token(tabelle.pid) != tabelle.token
+
+
+def _merge_tables(ziel: _WorkerTables, quelle: _WorkerTables):
+    """Addiert Zähler, Histogramme und Fehlerarten von ``quelle``; Reihen nach Schlüssel"""
+    ziel.zaehler[_ANFRAGEN] += quelle.zaehler[_ANFRAGEN]
+    ziel.zaehler[_FEHLER] += quelle.zaehler[_FEHLER]
+    reihen = ziel.reihen
+    letzte = len(reihen) - 1
+    slots = {
+        key: index
+        for index, key in enumerate(zip(reihen["endpoint"], reihen["klasse"]))
+        if key[0]
+    }
+    quelle_reihen = quelle.reihen
+    for endpoint, klasse, werte, counts in zip(
+        quelle_reihen["endpoint"],
+        quelle_reihen["klasse"],
+        quelle_reihen["werte"],
+        quelle_reihen["counts"],
+    ):
+        if not endpoint:
+            continue
+        key = (endpoint, klasse)
+        index = slots.get(key)
+        if index is None:
+            # Wie beim Aufzeichnen: sind alle Reihen belegt, sammelt die letzte den Rest
+            index = min(len(slots), letzte)
+            if not reihen["endpoint"][index]:
+                name = key if index < letzte else tuple(t.encode() for t in OVERFLOW_SERIES)
+                reihen["werte"][index] = (0.0, math.inf, 0.0)
+                reihen["endpoint"][index], reihen["klasse"][index] = name
+            slots[key] = index
+        LatencyHistogram(reihen["counts"][index], reihen["werte"][index]).merge(
+            LatencyHistogram(counts, werte)
         )
-        self.hourly_stats = defaultdict(int)
+    fehler = ziel.fehler
+    letzte = len(fehler) - 1
+    fehler_slots = {name: index for index, name in enumerate(fehler["name"]) if name}
+    for name, anzahl in zip(quelle.fehler["name"], quelle.fehler["count"]):
+        if not name:
+            continue
+        slot = fehler_slots.get(name)
+        if slot is None:
+            slot = min(len(fehler_slots), letzte)
+            if not fehler["name"][slot]:
+                fehler["name"][slot] = name if slot < letzte else b"other"
+            fehler_slots[name] = slot
+        fehler["count"][slot] += anzahl
+
+
+def _add_window(
+    tabellen: _WorkerTables, stufe: int, erste: int, counts: np.ndarray, werte: np.ndarray
+):
+    """Addiert die Perioden ``erste`` bis ``erste + len(counts) - 1`` einer Auflösung"""
+    anzahl = len(counts)
+    ring = tabellen.ringe[stufe]
+    periode = ring["periode"]
+    gueltig = (periode >= erste) & (periode < erste + anzahl)
+    zeilen = periode[gueltig] - erste
+    counts[zeilen] += ring["counts"][gueltig]
+    werte[zeilen] += ring["werte"][gueltig]
+
+    # Die laufende Sekunde (und deren Minute) sind noch nicht in die gröbere Stufe verdichtet
+    offen = int(tabellen.zaehler[_SEKUNDE])
+    zeile = offen // TIMESERIES_RESOLUTIONS[stufe][1] - erste
+    if offen < 0 or not 0 <= zeile < anzahl:
+        return
+    for fein in range(stufe):
+        p = offen // TIMESERIES_RESOLUTIONS[fein][1]
+        fein_ring = tabellen.ringe[fein]
+        slot = p % len(fein_ring)
+        if fein_ring["periode"][slot] == p:
+            counts[zeile] += fein_ring["counts"][slot]
+            werte[zeile] += fein_ring["werte"][slot]
+
+
+class APIMetrics:
+    """Sammelt und verwaltet API-Metriken
+
+    Jeder Prozess zählt in einen eigenen Speicherbereich fester Größe: Zähler, je (Endpunkt,
+    Statusklasse) ein Histogramm, die Fehlerarten und Zeitreihen je Sekunde, Minute und
+    Stunde. Mit ``directory`` ist das eine Datei ``metrics_<pid>.bin`` darin, ``get_stats``,
+    ``prometheus_text`` und ``timeseries`` lesen dann die Dateien aller Worker und summieren
+    sie. Beim Aufzeichnen gibt es keinen Austausch zwischen den Prozessen, nur Schreibzugriffe
+    in den eigenen Bereich. Beim Abruf und beim Start eines Workers werden die Dateien
+    beendeter Worker in ``metrics_accumulated.bin`` addiert und gelöscht, damit die Summen
+    nicht zurückspringen und das Verzeichnis nicht mit jedem neu gestarteten Worker wächst.
+    Beendet ist ein Worker, wenn seine PID nicht mehr zu der beim Anlegen eingetragenen
+    Startzeit des Prozesses passt (``_worker_exited``).
+
+    Eine Anfrage zählt nur in die laufende Sekunde. Beginnt eine neue, wird die vorige in ihre
+    Minute addiert und mit jeder neuen Minute die vorige in ihre Stunde; jeder Ring überschreibt
+    seine ältesten Perioden. Mit ``snapshot`` werden die Zeitreihen aller Worker alle
+    ``snapshot_interval`` Sekunden in diese Datei geschrieben und beim Start wieder eingelesen.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        series: int = METRICS_SERIES,
+        error_types: int = METRICS_ERROR_TYPES,
+        snapshot: Optional[str] = None,
+        snapshot_interval: float = METRICS_SNAPSHOT_INTERVAL,
+    ):
+        self.directory = directory
+        self.series = max(2, series)
+        self.error_type_slots = max(2, error_types)
+        self.perioden = tuple(max(1, anzahl) for _, _, anzahl in TIMESERIES_RESOLUTIONS)
+        self.snapshot = snapshot
+        self.snapshot_interval = snapshot_interval
+        self.path: Optional[str] = None
         self.lock = threading.Lock()
+        # lockf sperrt nur zwischen Prozessen, die Threads eines Prozesses sperrt dieser Lock
+        self._directory_lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._mm: Optional[mmap.mmap] = None
+        self._restored: Optional[_WorkerTables] = None
+
+    @contextmanager
+    def _locked_directory(self):
+        """Sperrt ``directory`` für Zusammenlegen, Lesen und Anlegen von Worker-Dateien"""
+        with self._directory_lock:
+            fd = os.open(os.path.join(self.directory, _LOCK_NAME), os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.lockf(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def _open(self):
+        """Bereich des eigenen Prozesses anlegen; nach fork bekommt das Kind einen neuen"""
+        pid = os.getpid()
+        size = _metrics_size(self.series, self.error_type_slots, self.perioden)
+        header = _METRICS_HEADER.pack(
+            _METRICS_MAGIC,
+            METRICS_FORMAT,
+            self.series,
+            self.error_type_slots,
+            *self.perioden,
+            pid,
+            time.time(),
+        )
+        header += bytes(_WORKER_OFFSET - len(header))
+        header += _METRICS_WORKER.pack(_process_token(pid), _PID_NAMESPACE)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"metrics_{pid}.bin")
+            with self._locked_directory():
+                # Die Datei eines früheren Workers mit derselben PID wird dabei zusammengelegt
+                self.path = None
+                self._directory_tables()
+                self.path = path
+                fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+                try:
+                    # Eine weitere Instanz im selben Prozess zählt in derselben Datei weiter
+                    neu = os.fstat(fd).st_size != size or any(
+                        os.pread(fd, ende - anfang, anfang) != header[anfang:ende]
+                        for anfang, ende in ((0, _METRICS_KEY_SIZE), (_WORKER_OFFSET, len(header)))
+                    )
+                    if neu:
+                        os.ftruncate(fd, 0)
+                        os.ftruncate(fd, size)
+                        os.pwrite(fd, header, 0)
+                    self._mm = mmap.mmap(fd, size)
+                finally:
+                    os.close(fd)
+        else:
+            neu = True
+            self.path = None
+            self._mm = mmap.mmap(-1, size)
+            self._mm[: len(header)] = header
+        tabellen = _metrics_tables(self._mm)
+        if neu:
+            tabellen.zaehler[_SEKUNDE] = -1
+        self._zaehler = tabellen.zaehler
+        self._reihen = tabellen.reihen
+        self._fehler = tabellen.fehler
+        self._ringe = tabellen.ringe
+        self._counts = self._reihen["counts"]
+        self._werte = self._reihen["werte"]
+        self._fehler_counts = self._fehler["count"]
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        namen = zip(self._reihen["endpoint"], self._reihen["klasse"])
+        for index, (endpoint, klasse) in enumerate(namen):
+            if endpoint:
+                self._histograms[(endpoint.decode(), klasse.decode())] = LatencyHistogram(
+                    self._counts[index], self._werte[index]
+                )
+        self._error_slots = {
+            name.decode(): index for index, name in enumerate(self._fehler["name"]) if name
+        }
+        self._sekunde = int(self._zaehler[_SEKUNDE])
+        slot = max(self._sekunde, 0) % len(self._ringe[0])
+        self._offen_counts = self._ringe[0]["counts"][slot]
+        self._offen_werte = self._ringe[0]["werte"][slot]
+        self._pid = pid
+        if self.snapshot:
+            self._restore_snapshot()
+            if self.snapshot_interval > 0:
+                threading.Thread(target=self._snapshot_loop, daemon=True).start()
+
+    def _fold(self, stufe: int, periode: int):
+        """Addiert eine Periode in die der nächstgröberen Auflösung"""
+        quelle = self._ringe[stufe]
+        slot = periode % len(quelle)
+        if quelle["periode"][slot] != periode:
+            return
+        ziel = self._ringe[stufe + 1]
+        ziel_periode = periode * TIMESERIES_RESOLUTIONS[stufe][1]
+        ziel_periode //= TIMESERIES_RESOLUTIONS[stufe + 1][1]
+        ziel_slot = ziel_periode % len(ziel)
+        if ziel["periode"][ziel_slot] != ziel_periode:
+            ziel["counts"][ziel_slot] = 0
+            ziel["werte"][ziel_slot] = 0.0
+            ziel["periode"][ziel_slot] = ziel_periode
+        ziel["counts"][ziel_slot] += quelle["counts"][slot]
+        ziel["werte"][ziel_slot] += quelle["werte"][slot]
+
+    def _rollover(self, sekunde: int):
+        """Wechsel auf eine neue Sekunde; nur unter der Sperre aufrufen"""
+        alt = self._sekunde
+        if alt >= 0:
+            self._fold(0, alt)
+            if alt // 60 != sekunde // 60:
+                self._fold(1, alt // 60)
+        ring = self._ringe[0]
+        slot = sekunde % len(ring)
+        ring["counts"][slot] = 0
+        ring["werte"][slot] = 0.0
+        ring["periode"][slot] = sekunde
+        self._zaehler[_SEKUNDE] = sekunde
+        self._sekunde = sekunde
+        self._offen_counts = ring["counts"][slot]
+        self._offen_werte = ring["werte"][slot]
+
+    def _histogram(self, key: Tuple[str, str]) -> LatencyHistogram:
+        """Histogramm einer Reihe, bei Bedarf neu belegt; nur unter der Sperre aufrufen"""
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            index = len(self._histograms)
+            if index >= self.series - 1:
+                # Alle Reihen belegt: die letzte sammelt alle weiteren Schlüssel
+                index = self.series - 1
+                key_in_datei = OVERFLOW_SERIES
+            else:
+                key_in_datei = key
+            if not self._reihen["endpoint"][index]:
+                self._werte[index] = (0.0, math.inf, 0.0)
+                self._reihen["klasse"][index] = key_in_datei[1].encode()[:8]
+                self._reihen["endpoint"][index] = key_in_datei[0].encode()[:96]
+            histogram = self._histograms[key] = LatencyHistogram(
+                self._counts[index], self._werte[index]
+            )
+        return histogram
+
+    def _error_slot(self, error_type: str) -> int:
+        slot = self._error_slots.get(error_type)
+        if slot is None:
+            # Alle Plätze belegt: der letzte sammelt alle weiteren Fehlerarten
+            slot = min(len(self._error_slots), self.error_type_slots - 1)
+            name = "other" if slot == self.error_type_slots - 1 else error_type
+            if not self._fehler["name"][slot]:
+                self._fehler["name"][slot] = name.encode()[:56]
+            self._error_slots[error_type] = slot
+        return slot
 
     def record_request(
         self,
@@ -32,97 +581,379 @@ class APIMetrics:
         error_type: str = None,
     ):
         """Zeichnet eine API-Anfrage auf"""
+        # Bucket und Sekunde vor der Sperre bestimmen, unter der Sperre nur noch zählen
+        index = _bucket_index(response_time)
+        key = (endpoint, status_class(status_code))
+        sekunde = int(time.time())
         with self.lock:
-            self.request_count += 1
-            self.response_times.append(response_time)
-
-            # Endpoint-spezifische Statistiken
-            self.endpoint_stats[endpoint]["count"] += 1
-            current_avg = self.endpoint_stats[endpoint]["avg_time"]
-            current_count = self.endpoint_stats[endpoint]["count"]
-            self.endpoint_stats[endpoint]["avg_time"] = (
-                current_avg * (current_count - 1) + response_time
-            ) / current_count
+            if self._pid != os.getpid():
+                self._open()
+            if sekunde != self._sekunde:
+                self._rollover(sekunde)
+            self._zaehler[_ANFRAGEN] += 1
+            self._histogram(key).add(index, response_time)
+            self._offen_counts[_GROB_INDEX[index]] += 1
+            offen_werte = self._offen_werte
+            offen_werte[0] += response_time
 
             # Fehlerstatistiken
             if status_code >= 400:
-                self.error_count += 1
-                self.endpoint_stats[endpoint]["errors"] += 1
+                self._zaehler[_FEHLER] += 1
+                offen_werte[1] += 1
                 if error_type:
-                    self.error_types[error_type] += 1
+                    self._fehler_counts[self._error_slot(error_type)] += 1
+
+    def _worker_tables(self) -> List[_WorkerTables]:
+        """Kopien der Bereiche aller Worker, der eigene zuerst"""
+        with self.lock:
+            if self._pid != os.getpid():
+                self._open()
+            tabellen = [_metrics_tables(self._mm[:])]
+        if self._restored is not None:
+            tabellen.append(self._restored)
+        if self.directory:
+            with self._locked_directory():
+                tabellen += self._directory_tables()
+        return tabellen
+
+    def _directory_tables(self) -> List[_WorkerTables]:
+        """Liest die Dateien der anderen Worker und legt die beendeter zusammen
+
+        Nur unter ``_locked_directory`` aufrufen.
+        """
+        tabellen = []
+        beendet = []
+        sammel = None
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if path == self.path or not (name.startswith("metrics_") and name.endswith(".bin")):
+                continue
+            try:
+                with open(path, "rb") as fh:
+                    tabelle = _metrics_tables(fh.read())
+            except OSError:
+                continue
+            if tabelle is None:
+                continue
+            if name == _ACCUMULATED_NAME:
+                sammel = tabelle
+            elif _worker_exited(tabelle):
+                beendet.append((path, tabelle))
+            else:
+                tabellen.append(tabelle)
+        if beendet:
+            quellen = ([sammel] if sammel is not None else []) + [t for _, t in beendet]
+            sammel = self._accumulate(quellen)
+            for path, _ in beendet:
+                os.remove(path)
+        if sammel is not None:
+            tabellen.append(sammel)
+        return tabellen
+
+    def _accumulate(self, quellen: List[_WorkerTables]) -> _WorkerTables:
+        """Schreibt die Summe von ``quellen`` atomar nach ``metrics_accumulated.bin``"""
+        start = min((tabelle.start for tabelle in quellen if tabelle.start), default=0.0)
+        puffer = bytearray(_metrics_size(self.series, self.error_type_slots, self.perioden))
+        _METRICS_HEADER.pack_into(
+            puffer,
+            0,
+            _METRICS_MAGIC,
+            METRICS_FORMAT,
+            self.series,
+            self.error_type_slots,
+            *self.perioden,
+            0,
+            start,
+        )
+        sammel = _WorkerTables(puffer)
+        for quelle in quellen:
+            _merge_tables(sammel, quelle)
+        self._fill_rings(sammel, quellen)
+        path = os.path.join(self.directory, _ACCUMULATED_NAME)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(puffer)
+        os.replace(tmp, path)
+        return sammel
+
+    def _window(
+        self, tabellen: List[_WorkerTables], stufe: int, aktuell: int, anzahl: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Buckets und (Summe, Fehler) der letzten ``anzahl`` Perioden bis ``aktuell``"""
+        counts = np.zeros((anzahl, _TIMESERIES_SIZE), np.uint64)
+        werte = np.zeros((anzahl, 2))
+        for tabelle in tabellen:
+            _add_window(tabelle, stufe, aktuell - anzahl + 1, counts, werte)
+        return counts, werte
+
+    def _aggregate(self) -> Dict[str, Any]:
+        """Summiert Zähler, Histogramme und Fehlerarten über alle Worker"""
+        latency: Dict[Tuple[str, str], LatencyHistogram] = {}
+        error_types: Dict[str, int] = defaultdict(int)
+        ergebnis = {"requests": 0, "errors": 0, "start": time.time(), "workers": 0}
+        tabellen = self._worker_tables()
+        for tabelle in tabellen:
+            if tabelle.start:
+                ergebnis["start"] = min(ergebnis["start"], tabelle.start)
+            if tabelle.pid:
+                ergebnis["workers"] += 1
+            ergebnis["requests"] += int(tabelle.zaehler[_ANFRAGEN])
+            ergebnis["errors"] += int(tabelle.zaehler[_FEHLER])
+            reihen = tabelle.reihen
+            for endpoint, klasse, werte, counts in zip(
+                reihen["endpoint"], reihen["klasse"], reihen["werte"], reihen["counts"]
+            ):
+                if not endpoint:
+                    continue
+                histogram = LatencyHistogram(counts, werte)
+                key = (endpoint.decode(), klasse.decode())
+                if key in latency:
+                    latency[key].merge(histogram)
+                else:
+                    latency[key] = histogram.copy()
+            for name, anzahl in zip(tabelle.fehler["name"], tabelle.fehler["count"]):
+                if name:
+                    error_types[name.decode()] += int(anzahl)
+        minuten = min(60, self.perioden[1])
+        counts, _ = self._window(tabellen, 1, int(time.time()) // 60, minuten)
+        ergebnis["last_hour"] = int(counts.sum())
+        ergebnis["latency"] = latency
+        ergebnis["error_types"] = dict(error_types)
+        return ergebnis
+
+    def timeseries(
+        self, resolution: str = "minute", periods: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Anfragen, Fehler, Mittel und Quantile je Periode, die älteste zuerst"""
+        stufen = [name for name, _, _ in TIMESERIES_RESOLUTIONS]
+        if resolution not in stufen:
+            raise ValueError(f"Unbekannte Auflösung: {resolution} (erlaubt: {', '.join(stufen)})")
+        stufe = stufen.index(resolution)
+        laenge = TIMESERIES_RESOLUTIONS[stufe][1]
+        anzahl = self.perioden[stufe]
+        if periods is not None:
+            anzahl = max(1, min(periods, anzahl))
+        aktuell = int(time.time()) // laenge
+        counts, werte = self._window(self._worker_tables(), stufe, aktuell, anzahl)
+
+        kumuliert = np.cumsum(counts, axis=1)
+        anfragen = kumuliert[:, -1]
+        quantile = {}
+        for name, q in QUANTILES:
+            rang = np.maximum(1, np.ceil(q * anfragen))
+            quantile[name] = _TIMESERIES_UPPER[(kumuliert >= rang[:, None]).argmax(axis=1)]
+        ergebnis = []
+        for zeile in range(anzahl):
+            eintrag = {
+                "start": (aktuell - anzahl + 1 + zeile) * laenge,
+                "requests": int(anfragen[zeile]),
+                "errors": int(werte[zeile, 1]),
+            }
+            if anfragen[zeile]:
+                eintrag["mean_ms"] = round(werte[zeile, 0] / anfragen[zeile] * 1000, 3)
+                for name, _ in QUANTILES:
+                    eintrag[f"{name}_ms"] = round(float(quantile[name][zeile]) * 1000, 3)
+            ergebnis.append(eintrag)
+        return ergebnis
+
+    def _fill_rings(self, ziel: _WorkerTables, tabellen: List[_WorkerTables]):
+        """Zeitreihen aller ``tabellen`` vollständig verdichtet in die Ringe von ``ziel``"""
+        ziel.zaehler[_SEKUNDE] = -1
+        jetzt = int(time.time())
+        for stufe, (_, laenge, _) in enumerate(TIMESERIES_RESOLUTIONS):
+            anzahl = self.perioden[stufe]
+            aktuell = jetzt // laenge
+            counts, werte = self._window(tabellen, stufe, aktuell, anzahl)
+            perioden = np.arange(aktuell - anzahl + 1, aktuell + 1)
+            slots = perioden % anzahl
+            ring = ziel.ringe[stufe]
+            ring["periode"][slots] = perioden
+            ring["counts"][slots] = counts
+            ring["werte"][slots] = werte
+
+    def save_snapshot(self, path: Optional[str] = None):
+        """Schreibt die Zeitreihen aller Worker, vollständig verdichtet, atomar in eine Datei"""
+        path = path or self.snapshot
+        tabellen = self._worker_tables()
+        start = min((tabelle.start for tabelle in tabellen if tabelle.pid), default=time.time())
+        puffer = bytearray(_metrics_size(0, 0, self.perioden))
+        _METRICS_HEADER.pack_into(
+            puffer, 0, _METRICS_MAGIC, METRICS_FORMAT, 0, 0, *self.perioden, 0, start
+        )
+        self._fill_rings(_WorkerTables(puffer), tabellen)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(puffer)
+        os.replace(tmp, path)
 
-            # Stündliche Statistiken
-            current_hour = datetime.now().strftime("%Y-%m-%d %H:00")
-            self.hourly_stats[current_hour] += 1
+    def _restore_snapshot(self):
+        """Liest einen Snapshot ein; mit ``directory`` genau einmal je Verzeichnis"""
+        try:
+            with open(self.snapshot, "rb") as fh:
+                daten = bytearray(fh.read())
+        except OSError:
+            return
+        tabelle = _metrics_tables(daten)
+        if tabelle is None:
+            logging.warning(f"Metrik-Snapshot {self.snapshot} hat ein anderes Format, ignoriert")
+            return
+        # Startzeit des früheren Laufs zählt nicht zur Laufzeit
+        header = _METRICS_HEADER.unpack_from(daten, 0)
+        _METRICS_HEADER.pack_into(daten, 0, *header[:-1], 0.0)
+        tabelle.start = 0.0
+        if not self.directory:
+            self._restored = tabelle
+            return
+        # Als weitere Datei im Verzeichnis ablegen; link schlägt fehl, wenn es sie schon gibt
+        tmp = os.path.join(self.directory, f".snapshot_{os.getpid()}.tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(daten)
+        try:
+            os.link(tmp, os.path.join(self.directory, _SNAPSHOT_NAME))
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp)
+
+    def _snapshot_loop(self):
+        while True:
+            time.sleep(self.snapshot_interval)
+            try:
+                self.save_snapshot()
+            except OSError as e:
+                logging.warning(f"Metrik-Snapshot {self.snapshot} nicht geschrieben: {e}")
 
     def get_stats(self) -> Dict[str, Any]:
-        """Gibt aktuelle Statistiken zurück"""
-        with self.lock:
-            avg_response_time = (
-                sum(self.response_times) / len(self.response_times)
-                if self.response_times
-                else 0
-            )
-            error_rate = (
-                (self.error_count / self.request_count * 100)
-                if self.request_count > 0
-                else 0
-            )
+        """Gibt aktuelle Statistiken zurück, summiert über alle Worker"""
+        daten = self._aggregate()
+        latency = daten["latency"]
+        gesamt = LatencyHistogram()
+        endpoints: Dict[str, LatencyHistogram] = {}
+        endpoint_errors: Dict[str, int] = defaultdict(int)
+        for (endpoint, klasse), histogram in latency.items():
+            gesamt.merge(histogram)
+            endpoints.setdefault(endpoint, LatencyHistogram()).merge(histogram)
+            if klasse in ("4xx", "5xx"):
+                endpoint_errors[endpoint] += histogram.count
 
-            return {
-                "total_requests": self.request_count,
-                "total_errors": self.error_count,
-                "error_rate_percent": round(error_rate, 2),
-                "avg_response_time_ms": round(avg_response_time * 1000, 2),
-                "requests_last_hour": self._get_last_hour_requests(),
-                "endpoint_stats": dict(self.endpoint_stats),
-                "error_types": dict(self.error_types),
-                "uptime_hours": self._get_uptime_hours(),
+        request_count = daten["requests"]
+        error_rate = (daten["errors"] / request_count * 100) if request_count > 0 else 0
+        endpoint_stats = {}
+        for endpoint, histogram in endpoints.items():
+            count = histogram.count
+            endpoint_stats[endpoint] = {
+                "count": count,
+                "errors": endpoint_errors.get(endpoint, 0),
+                "avg_time": histogram.total / count if count else 0.0,
             }
+        latency_stats: Dict[str, Dict[str, Any]] = {}
+        for (endpoint, klasse), histogram in sorted(latency.items()):
+            latency_stats.setdefault(endpoint, {})[klasse] = histogram.summary()
 
-    def _get_last_hour_requests(self) -> int:
-        """Gibt die Anzahl der Requests in der letzten Stunde zurück"""
-        current_hour = datetime.now().strftime("%Y-%m-%d %H:00")
-        return self.hourly_stats.get(current_hour, 0)
+        gesamt_count = gesamt.count
+        return {
+            "total_requests": request_count,
+            "total_errors": daten["errors"],
+            "error_rate_percent": round(error_rate, 2),
+            "avg_response_time_ms": round(
+                gesamt.total / gesamt_count * 1000 if gesamt_count else 0, 2
+            ),
+            "latency": gesamt.summary(),
+            "latency_by_endpoint": latency_stats,
+            "requests_last_hour": daten["last_hour"],
+            "endpoint_stats": endpoint_stats,
+            "error_types": daten["error_types"],
+            "uptime_hours": round((time.time() - daten["start"]) / 3600, 2),
+            "workers": daten["workers"],
+        }
 
-    def _get_uptime_hours(self) -> float:
-        """Berechnet die Uptime in Stunden (vereinfacht)"""
-        # In einer echten Implementierung würde man den Startzeit speichern
-        return len(self.hourly_stats)
+    def prometheus_text(self, prefix: str = "lohnsteuer") -> str:
+        """Antwortzeiten im Textformat von Prometheus (Histogramm, Quantile, min/max)"""
+        latency = sorted(self._aggregate()["latency"].items())
+        name = f"{prefix}_http_request_duration_seconds"
+        zeilen = [
+            f"# HELP {name} Bearbeitungszeit der Anfragen je Endpunkt und Statusklasse",
+            f"# TYPE {name} histogram",
+        ]
+        for (endpoint, klasse), histogram in latency:
+            labels = f'endpoint="{_label(endpoint)}",status="{klasse}"'
+            count = histogram.count
+            for grenze, anzahl in zip(
+                PROMETHEUS_BUCKETS, histogram.cumulative(PROMETHEUS_BUCKETS)
+            ):
+                zeilen.append(f'{name}_bucket{{{labels},le="{grenze!r}"}} {anzahl}')
+            zeilen.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+            zeilen.append(f"{name}_sum{{{labels}}} {histogram.total!r}")
+            zeilen.append(f"{name}_count{{{labels}}} {count}")
+
+        quantile_name = f"{prefix}_http_request_latency_seconds"
+        zeilen += [
+            f"# HELP {quantile_name} Quantile der Bearbeitungszeit seit dem Start des Servers",
+            f"# TYPE {quantile_name} summary",
+        ]
+        for (endpoint, klasse), histogram in latency:
+            labels = f'endpoint="{_label(endpoint)}",status="{klasse}"'
+            for _, q in QUANTILES:
+                zeilen.append(
+                    f'{quantile_name}{{{labels},quantile="{q}"}} {histogram.quantile(q)!r}'
+                )
+            zeilen.append(f"{quantile_name}_sum{{{labels}}} {histogram.total!r}")
+            zeilen.append(f"{quantile_name}_count{{{labels}}} {histogram.count}")
+
+        for grenze, beschreibung in (("min", "Kürzeste"), ("max", "Längste")):
+            gauge = f"{prefix}_http_request_latency_{grenze}_seconds"
+            zeilen += [
+                f"# HELP {gauge} {beschreibung} Bearbeitungszeit seit dem Start des Servers",
+                f"# TYPE {gauge} gauge",
+            ]
+            for (endpoint, klasse), histogram in latency:
+                labels = f'endpoint="{_label(endpoint)}",status="{klasse}"'
+                wert = histogram.min if grenze == "min" else histogram.max
+                zeilen.append(f"{gauge}{{{labels}}} {wert!r}")
+        return "\n".join(zeilen) + "\n"
 
 
 # Globale Metriken-Instanz
-metrics = APIMetrics()
+metrics = APIMetrics(os.environ.get("METRICS_DIR"), snapshot=METRICS_SNAPSHOT)
 
 
 class StructuredLogger:
-    """Strukturiertes Logging für bessere Analyse"""
+    """Strukturiertes Logging für bessere Analyse
 
-    def __init__(self, name: str):
+    Die Ereignisse gehen nicht durch ``logging``, sondern in eine ``LogPipeline``: auf dem
+    Anfragepfad wird nur eingereiht, JSON-Serialisierung und Schreiben übernimmt ein
+    Hintergrund-Thread. Die Protokollstufe (``LOG_LEVEL``) gilt weiterhin über ``name``.
+    """
+
+    def __init__(self, name: str, pipeline: Optional[LogPipeline] = None):
         self.logger = logging.getLogger(name)
+        self.pipeline = pipeline or LogPipeline()
+
+    def _emit(self, level: int, event_type: str, message: str, fields: Dict[str, Any]):
+        if self.logger.isEnabledFor(level):
+            fields["logger"] = self.logger.name
+            self.pipeline.emit(event_type, logging.getLevelName(level), message, fields)
 
     def log_request(
         self, method: str, path: str, client_ip: str, user_agent: str = None
     ):
         """Loggt eingehende Requests"""
-        self.logger.info(
+        self._emit(
+            logging.INFO,
+            "request",
             "Request received",
-            extra={
-                "event_type": "request",
-                "method": method,
-                "path": path,
-                "client_ip": client_ip,
-                "user_agent": user_agent,
-                "timestamp": datetime.utcnow().isoformat(),
-            },
+            {"method": method, "path": path, "client_ip": client_ip, "user_agent": user_agent},
         )
 
     def log_calculation(self, input_data: Dict, result: Dict, processing_time: float):
         """Loggt erfolgreiche Berechnungen"""
-        self.logger.info(
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        self._emit(
+            logging.INFO,
+            "calculation",
             "Calculation completed",
-            extra={
-                "event_type": "calculation",
+            {
                 "processing_time_ms": round(processing_time * 1000, 2),
                 "input_summary": {
                     "RE4": float(input_data.get("RE4", 0)) / 100,  # In Euro
@@ -135,7 +966,6 @@ class StructuredLogger:
                     "SOLZLZZ": float(result.get("SOLZLZZ", 0)) / 100,
                     "BK": float(result.get("BK", 0)) / 100,
                 },
-                "timestamp": datetime.utcnow().isoformat(),
             },
         )
 
@@ -147,15 +977,16 @@ class StructuredLogger:
         client_ip: str = None,
     ):
         """Loggt Fehler mit Kontext"""
-        self.logger.error(
+        self._emit(
+            logging.ERROR,
+            "error",
             f"Error occurred: {error_type}",
-            extra={
-                "event_type": "error",
+            {
                 "error_type": error_type,
                 "error_message": error_message,
                 "client_ip": client_ip,
-                "input_data": input_data,
-                "timestamp": datetime.utcnow().isoformat(),
+                # Kopie, serialisiert wird erst im Schreib-Thread
+                "input_data": dict(input_data) if input_data else input_data,
             },
         )
 
@@ -163,56 +994,148 @@ class StructuredLogger:
         self, field: str, value: Any, error_message: str, client_ip: str = None
     ):
         """Loggt Validierungsfehler"""
-        self.logger.warning(
+        self._emit(
+            logging.WARNING,
+            "validation_error",
             f"Validation error for field {field}",
-            extra={
-                "event_type": "validation_error",
+            {
                 "field": field,
                 "invalid_value": str(value),
                 "error_message": error_message,
                 "client_ip": client_ip,
-                "timestamp": datetime.utcnow().isoformat(),
             },
         )
 
+    def get_stats(self) -> Dict[str, Any]:
+        return self.pipeline.get_stats()
+
+    def close(self):
+        """Schreibt die noch wartenden Ereignisse"""
+        self.pipeline.flush()
+
+
+# Zustand des SecurityMonitor: Schlüssel, tat der Verdachtsfälle (ns), gesperrt bis (ns),
+# Prüfwort; Lesen ohne Sperre, ein halb geschriebener Slot hat ein falsches Prüfwort
+_SECURITY_FORMAT = 1
+_SECURITY_MAGIC = b"LSTSM\0\0\0"
+_SECURITY_HEADER = struct.Struct("<8sIIIQQ")  # Magic, Format, Slots, Ways, Fenster, Sperre (ns)
+_SECURITY_SLOT = struct.Struct("<QQQQ")
+_PRUEFWORT = 0x5A17C0DEDECAF5A1
+
 
 class SecurityMonitor:
-    """Überwacht verdächtige Aktivitäten"""
+    """Überwacht verdächtige Aktivitäten; Zustand fester Größe, zwischen Workern geteilt
 
-    def __init__(self):
-        self.suspicious_ips = defaultdict(list)
-        self.blocked_ips = set()
-        self.lock = threading.Lock()
+    Je IP zählt ein Leaky Bucket die verdächtigen Anfragen (wie der GCRA-Rate-Limiter:
+    ein Zeitstempel statt einer Liste). Mehr als ``limit`` in ``window`` Sekunden sperren
+    die IP für ``block_seconds``. Der Zustand liegt in einer mmap-Datei mit festen Buckets
+    (``path``, sonst je Prozess); Einträge ohne Verdacht und Sperre gelten als frei, bei
+    vollem Bucket wird der Eintrag mit dem frühesten Ablauf ersetzt.
 
-    def check_suspicious_activity(self, client_ip: str, request_data: Dict) -> bool:
-        """Prüft auf verdächtige Aktivitäten"""
-        with self.lock:
-            current_time = time.time()
+    ``is_blocked`` und Anfragen ohne verdächtiges Muster lesen ohne Sperre; nur das Buchen
+    eines Verdachtsfalls sperrt den Bucket der IP (lockf).
+    """
 
-            # Entferne alte Einträge (älter als 1 Stunde)
-            self.suspicious_ips[client_ip] = [
-                timestamp
-                for timestamp in self.suspicious_ips[client_ip]
-                if current_time - timestamp < 3600
-            ]
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        slots: int = 16384,
+        ways: int = 8,
+        limit: int = 10,
+        window: float = 3600,
+        block_seconds: float = 3600,
+    ):
+        self.path = path
+        self.ways = ways
+        self.buckets = max(1, slots // ways)
+        self.slots = self.buckets * ways
+        self.limit = limit
+        self.window = window
+        self.block_seconds = block_seconds
+        self.suspicious_count = 0
+        self.blocks = 0
+        self.evictions = 0
+        self._window_ns = int(window * 1e9)
+        self._interval_ns = self._window_ns // max(limit, 1)
+        self._block_ns = int(block_seconds * 1e9)
+        self._bucket_size = ways * _SECURITY_SLOT.size
+        self._bucket = struct.Struct(f"<{4 * ways}Q")
+        self._fd = self._open(path)
+        self._mm = mmap.mmap(self._fd, _DATA_OFFSET + self.slots * _SECURITY_SLOT.size)
 
-            # Prüfe auf verdächtige Muster
-            suspicious = False
+    def _open(self, path: Optional[str]) -> int:
+        size = _DATA_OFFSET + self.slots * _SECURITY_SLOT.size
+        header = _SECURITY_HEADER.pack(
+            _SECURITY_MAGIC, _SECURITY_FORMAT, self.slots, self.ways, self._window_ns, self._block_ns
+        )
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                return open_shared_file(path, header, size)
+            except OSError as e:
+                logging.warning(f"Sperrliste {path} nicht verfügbar ({e}), Sperren je Worker")
+                self.path = None
+        return open_shared_file(None, header, size)
+
+    def _start(self, key: int) -> int:
+        return _DATA_OFFSET + (key % self.buckets) * self._bucket_size
 
-            # 1. Zu viele Requests mit ungültigen Daten
-            if self._has_invalid_patterns(request_data):
-                self.suspicious_ips[client_ip].append(current_time)
-                suspicious = True
+    def _find(self, werte, key: int) -> Optional[int]:
+        for way in range(self.ways):
+            slot_key, tat, gesperrt, pruefwort = werte[4 * way : 4 * way + 4]
+            if slot_key == key and pruefwort == key ^ tat ^ gesperrt ^ _PRUEFWORT:
+                return way
+        return None
+
+    def check_suspicious_activity(self, client_ip: str, request_data: Dict) -> bool:
+        """Prüft auf verdächtige Aktivitäten; True bei verdächtiger Anfrage"""
+        # Anfragen ohne verdächtiges Muster ändern keinen Zustand
+        if not self._has_invalid_patterns(request_data):
+            return False
 
-            # 2. Zu viele verdächtige Requests in kurzer Zeit
-            if (
-                len(self.suspicious_ips[client_ip]) > 10
-            ):  # Mehr als 10 verdächtige Requests pro Stunde
-                self.blocked_ips.add(client_ip)
+        self.suspicious_count += 1
+        key = client_key(client_ip)
+        start = self._start(key)
+        now = time.time_ns()
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, self._bucket_size, start)
+        try:
+            werte = self._bucket.unpack_from(self._mm, start)
+            slot = self._find(werte, key)
+            tat = gesperrt = 0
+            if slot is None:
+                slot = self._victim(werte, now)
+            else:
+                tat, gesperrt = werte[4 * slot + 1 : 4 * slot + 3]
+            tat = max(tat, now) + self._interval_ns
+            # Mehr als ``limit`` verdächtige Anfragen im Fenster
+            if tat - now > self._window_ns and gesperrt <= now:
+                gesperrt = now + self._block_ns
+                self.blocks += 1
                 logging.warning(f"IP {client_ip} blocked due to suspicious activity")
-                return True
+            _SECURITY_SLOT.pack_into(
+                self._mm,
+                start + slot * _SECURITY_SLOT.size,
+                key,
+                tat,
+                gesperrt,
+                key ^ tat ^ gesperrt ^ _PRUEFWORT,
+            )
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, self._bucket_size, start)
+        return True
 
-            return suspicious
+    def _victim(self, werte, now: int) -> int:
+        """Freier oder am frühesten ablaufender Slot eines Buckets"""
+        victim, ablauf = 0, None
+        for way in range(self.ways):
+            _, tat, gesperrt, _ = werte[4 * way : 4 * way + 4]
+            ende = max(tat, gesperrt)
+            if ende <= now:
+                return way
+            if ablauf is None or ende < ablauf:
+                victim, ablauf = way, ende
+        self.evictions += 1
+        return victim
 
     def _has_invalid_patterns(self, request_data: Dict) -> bool:
         """Prüft auf verdächtige Eingabemuster"""
@@ -233,10 +1156,43 @@ class SecurityMonitor:
         return False
 
     def is_blocked(self, client_ip: str) -> bool:
-        """Prüft ob eine IP blockiert ist"""
-        return client_ip in self.blocked_ips
+        """Prüft ob eine IP blockiert ist (ohne Sperre)"""
+        key = client_key(client_ip)
+        werte = self._bucket.unpack_from(self._mm, self._start(key))
+        slot = self._find(werte, key)
+        return slot is not None and werte[4 * slot + 2] > time.time_ns()
+
+    def blocked_count(self) -> int:
+        """Anzahl aktuell gesperrter IPs (liest alle Slots)"""
+        now = time.time_ns()
+        return sum(
+            1
+            for key, tat, gesperrt, pruefwort in _SECURITY_SLOT.iter_unpack(
+                self._mm[_DATA_OFFSET:]
+            )
+            if gesperrt > now and pruefwort == key ^ tat ^ gesperrt ^ _PRUEFWORT
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "capacity": self.slots,
+            "blocked_ips_count": self.blocked_count(),
+            "suspicious_requests": self.suspicious_count,
+            "blocks": self.blocks,
+            "evictions": self.evictions,
+            "pid": os.getpid(),
+        }
+
+    def close(self):
+        self._mm.close()
+        os.close(self._fd)
 
 
-# Globale Instanzen
-security_monitor = SecurityMonitor()
+# Globale Instanzen; unter gunicorn setzt gunicorn_conf.py SECURITY_STATE_PATH für alle Worker
+security_monitor = SecurityMonitor(
+    os.environ.get("SECURITY_STATE_PATH"),
+    slots=int(os.environ.get("SECURITY_STATE_SLOTS", "16384")),
+    block_seconds=float(os.environ.get("SECURITY_BLOCK_SECONDS", "3600")),
+)
 structured_logger = StructuredLogger("lohnsteuer_api")
@@ -0,0 +1,123 @@
+"""
+Umkehrung der Lohnsteuerberechnung: kleinster Bruttolohn RE4 zu einem Nettobetrag
+
+Netto ist hier ``RE4 - LSTLZZ - SOLZLZZ - BK`` (BK ist die Kirchensteuer), alle Beträge in
+Cent des Lohnzahlungszeitraums. Die übrigen Eingaben bleiben fest.
+
+Netto steigt mit RE4 fast monoton: der Grenzsteuersatz liegt höchstens bei 45 % zuzüglich
+Solidaritätszuschlag und Kirchensteuer, nur an den Rundungsstufen (ganze Euro in UPTAB25,
+Vorsorgepauschale, Cent-Rundung je Zeitraum) kann Netto um wenige Cent fallen.
+``solve_gross`` nutzt das in drei Schritten, jeweils mit dem NumPy-Rechenkern für viele
+RE4-Werte in einem Aufruf (andere Jahre als 2025 zeilenweise mit dem übersetzten PAP):
+
+1. Klammer: Netto ist nie größer als RE4, und mit dem höchsten Grenzsteuersatz ergibt sich
+   eine obere Schranke, die bei Bedarf verdoppelt wird.
+2. Eingrenzung: je Runde ``RASTER`` Stützstellen in der Klammer, bis eine Stelle ``b`` mit
+   ``netto(b - 1) < ziel <= netto(b)`` gefunden ist.
+3. Fenster: alle Cent-Beträge der letzten ``FENSTER[LZZ]`` Cent vor ``b`` werden geprüft.
+   Ein Treffer weiter unten müsste über mehr als das Fenster unter das Ziel zurückfallen,
+   was die Rundungsstufen nicht hergeben; so ist das Ergebnis der kleinste Betrag.
+"""
+
+from decimal import Decimal
+from typing import Dict, Tuple
+
+import numpy as np
+
+import tax_calculator_batch
+from engines import calculate_pap, fixed_point
+from tax_calculator_int import NotRepresentableError
+
+# Obergrenze für RE4 wie in der API-Validierung
+MAX_RE4 = 10**8
+
+# Stützstellen je Eingrenzungsrunde
+RASTER = 64
+
+# Geprüfte Cent-Beträge unterhalb der gefundenen Stelle je Lohnzahlungszeitraum; mindestens
+# das Achtfache des größten gemessenen Rückfalls (LZZ 1: 431, 2: 40, 3: 9, 4: 4 Cent)
+FENSTER = {1: 4096, 2: 512, 3: 128, 4: 32}
+
+# Höchster Anteil von Lohnsteuer, Solidaritätszuschlag und Kirchensteuer (9 %) an einem
+# zusätzlichen Euro, aufgerundet
+_GRENZSATZ = Decimal("0.52")
+
+
+class TargetNotReachableError(ValueError):
+    """Der Nettobetrag ist mit RE4 bis MAX_RE4 nicht erreichbar"""
+
+
+class _Netto:
+    """Netto zu vielen RE4-Werten; feste Eingaben werden nur einmal aufbereitet"""
+
+    def __init__(self, data: Dict):
+        self.data = data
+        self.columns = {}
+        for name in tax_calculator_batch.INPUTS:
+            if name == "RE4" or name not in data:
+                continue
+            wert = data[name]
+            # Decimal-Skalare einmal wandeln statt je Aufruf als object-Spalte
+            self.columns[name] = float(wert) if isinstance(wert, Decimal) else wert
+        self.probes = 0
+        # Der NumPy-Rechenkern rechnet nur den PAP 2025, andere Jahre zeilenweise
+        self._vektoriell = fixed_point(data)
+
+    def __call__(self, re4: np.ndarray) -> np.ndarray:
+        self.probes += len(re4)
+        if self._vektoriell:
+            try:
+                out = tax_calculator_batch.calculate_batch(dict(self.columns, RE4=re4))
+                return re4 - out["LSTLZZ"] - out["SOLZLZZ"] - out["BK"]
+            except NotRepresentableError:
+                # z.B. Beträge mit Cent-Bruchteilen: zeilenweise mit Decimal-Fallback
+                self._vektoriell = False
+        netto = []
+        for wert in re4.tolist():
+            result = calculate_pap(dict(self.data, RE4=Decimal(wert)), "int")
+            netto.append(wert - int(result["LSTLZZ"] + result["SOLZLZZ"] + result["BK"]))
+        return np.array(netto, dtype=np.int64)
+
+
+def solve_gross(data: Dict, target: int) -> Tuple[int, int]:
+    """Kleinstes RE4 in Cent mit Netto >= ``target``; liefert (RE4, Anzahl berechneter RE4)"""
+    netto = _Netto(data)
+    if target <= 0:
+        return 0, 0
+
+    # 1. Klammer: netto(lo) < target <= netto(hi)
+    lo = target - 1
+    hi = min(MAX_RE4, int(target / (1 - _GRENZSATZ)) + 100)
+    while netto(np.array([hi], dtype=np.int64))[0] < target:
+        if hi >= MAX_RE4:
+            raise TargetNotReachableError(f"Netto {target} ist bis RE4 {MAX_RE4} nicht erreichbar")
+        lo, hi = hi, min(MAX_RE4, hi * 2)
+
+    # 2. Eingrenzung auf b mit netto(b - 1) < target <= netto(b)
+    while hi - lo > 1:
+        step = -(-(hi - lo) // RASTER)
+        punkte = np.arange(lo + step, hi, step, dtype=np.int64)
+        treffer = np.flatnonzero(netto(punkte) >= target)
+        if len(treffer):
+            hi = int(punkte[treffer[0]])
+            if treffer[0] > 0:
+                lo = int(punkte[treffer[0] - 1])
+        else:
+            lo = int(punkte[-1])
+
+    # 3. Fenster unterhalb von b
+    fenster = FENSTER.get(int(data.get("LZZ", 2)), max(FENSTER.values()))
+    punkte = np.arange(max(target, hi - fenster), hi, dtype=np.int64)
+    if len(punkte):
+        treffer = np.flatnonzero(netto(punkte) >= target)
+        if len(treffer):
+            hi = int(punkte[treffer[0]])
+    return hi, netto.probes
+
+
+def net_to_gross(data: Dict, target: int) -> Dict:
+    """Löst nach RE4 auf und berechnet dazu das vollständige Ergebnis"""
+    re4, probes = solve_gross(data, target)
+    result = calculate_pap(dict(data, RE4=Decimal(re4)))
+    netto = Decimal(re4) - result["LSTLZZ"] - result["SOLZLZZ"] - result["BK"]
+    return {"RE4": Decimal(re4), "NETTO": netto, "probes": probes, "result": result}
@@ -0,0 +1,635 @@
+"""
+PAP-Compiler: übersetzt den XML-Programmablaufplan (PAP) des BMF in ein flaches Python-Modul
+
+Der PAP wird einmal pro Version geparst (METHODS/MAIN/EXECUTE/EVAL/IF), alle
+Methodenaufrufe werden aufgelöst und der gesamte Ablauf als eine einzige Funktion
+``calculate(**eingaben)`` mit lokalen Variablen erzeugt. Das erzeugte Modul wird
+auf der Festplatte zwischengespeichert; der Dateiname enthält den Hash der XML-Datei,
+so dass ein neuer PAP (oder ein geänderter Generator) automatisch neu übersetzt wird.
+
+Aufruf als Skript (z.B. beim Docker-Build) erzeugt alle Module im Cache vorab:
+
+    python pap_compiler.py [pfad/zum/pap.xml ...]
+"""
+
+import hashlib
+import importlib.util
+import logging
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Tuple
+
+PAP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pap")
+PAP_CACHE_DIR = os.environ.get("PAP_CACHE_DIR", os.path.join(PAP_DIR, "generated"))
+DEFAULT_PAP_XML = os.path.join(PAP_DIR, "Lohnsteuer2025.xml")
+
+# Bei Änderungen am erzeugten Code erhöhen, damit alte Cache-Dateien nicht mehr passen
+GENERATOR_VERSION = "1"
+
+# Die Anwendung weist in BK/BKS die Kirchensteuer selbst aus (9 % bzw. 8 %),
+# der amtliche PAP liefert dort nur die Bemessungsgrundlage. Die betroffenen
+# Anweisungen werden beim Übersetzen ersetzt (Schlüssel: Methode, Anweisung).
+_KISTSATZ = "(R == 1 ? BigDecimal.valueOf (0.09) : BigDecimal.valueOf (0.08))"
+KIRCHENSTEUER_PATCHES = {
+    ("MSOLZ", "JW= JBMG.multiply (ZAHL100)"): (
+        f"JW= JBMG.multiply {_KISTSATZ}.multiply (ZAHL100)"
+        ".setScale (0, BigDecimal.ROUND_DOWN)"
+    ),
+    ("STSMIN", "BKS = STS"): (
+        f"BKS = STS.multiply {_KISTSATZ}.setScale (0, BigDecimal.ROUND_DOWN)"
+    ),
+}
+
+
+class PAPCompileError(ValueError):
+    """Fehler beim Übersetzen eines PAP"""
+
+
+# ---------------------------------------------------------------------------
+# Ausdrücke (Java/BigDecimal-Syntax des PAP)
+# ---------------------------------------------------------------------------
+
+_TOKEN_RE = re.compile(
+    r"\s*(?:(\d+\.\d+|\d+)|([A-Za-z_]\w*)|(==|!=|<=|>=|&&|\|\||[-+*/<>()\[\],.?:!]))"
+)
+
+_COMPARE_OPS = {
+    frozenset([-1]): "<",
+    frozenset([0]): "==",
+    frozenset([1]): ">",
+    frozenset([-1, 0]): "<=",
+    frozenset([0, 1]): ">=",
+    frozenset([-1, 1]): "!=",
+}
+
+_PY_CMP = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+def _tokenize(text: str) -> List[str]:
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if not match:
+            raise PAPCompileError(f"Unbekanntes Zeichen in Ausdruck: {text[pos:]!r}")
+        tokens.append(next(group for group in match.groups() if group is not None))
+        pos = match.end()
+    return tokens
+
+
+class _ExprParser:
+    """Rekursiver Abstieg über die im PAP verwendete Teilmenge von Java"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def parse(self):
+        node = self._conditional()
+        if self.pos != len(self.tokens):
+            raise PAPCompileError(f"Unerwartetes Ende in Ausdruck: {self.text!r}")
+        return node
+
+    def _peek(self, offset: int = 0) -> Optional[str]:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def _take(self, expected: str = None) -> str:
+        token = self._peek()
+        if token is None or (expected is not None and token != expected):
+            raise PAPCompileError(
+                f"Erwartet {expected!r}, gefunden {token!r} in {self.text!r}"
+            )
+        self.pos += 1
+        return token
+
+    def _conditional(self):
+        node = self._or()
+        if self._peek() == "?":
+            self._take("?")
+            then = self._conditional()
+            self._take(":")
+            return ("cond", node, then, self._conditional())
+        return node
+
+    def _or(self):
+        node = self._and()
+        while self._peek() == "||":
+            self._take()
+            node = ("bool", "or", node, self._and())
+        return node
+
+    def _and(self):
+        node = self._compare()
+        while self._peek() == "&&":
+            self._take()
+            node = ("bool", "and", node, self._compare())
+        return node
+
+    def _compare(self):
+        node = self._additive()
+        if self._peek() in _PY_CMP:
+            op = self._take()
+            node = ("cmp", op, node, self._additive())
+        return node
+
+    def _additive(self):
+        node = self._unary()
+        while self._peek() in ("+", "-"):
+            op = self._take()
+            node = ("arith", op, node, self._unary())
+        return node
+
+    def _unary(self):
+        if self._peek() == "-":
+            self._take()
+            operand = self._unary()
+            if operand[0] == "num":
+                return ("num", "-" + operand[1])
+            return ("neg", operand)
+        if self._peek() == "!":
+            self._take()
+            return ("not", self._unary())
+        return self._postfix()
+
+    def _args(self) -> list:
+        self._take("(")
+        args = []
+        while self._peek() != ")":
+            args.append(self._conditional())
+            if self._peek() == ",":
+                self._take(",")
+        self._take(")")
+        return args
+
+    def _postfix(self):
+        node = self._primary()
+        while self._peek() in (".", "["):
+            if self._take() == ".":
+                method = self._take()
+                node = ("call", node, method, self._args())
+            else:
+                index = self._conditional()
+                self._take("]")
+                node = ("index", node, index)
+        return node
+
+    def _primary(self):
+        token = self._take()
+        if token == "(":
+            node = self._conditional()
+            self._take(")")
+            return node
+        if token[0].isdigit():
+            return ("num", token)
+        if token == "new":
+            self._take("BigDecimal")
+            return ("decimal", self._args()[0])
+        if token == "BigDecimal":
+            self._take(".")
+            member = self._take()
+            if member == "valueOf":
+                return ("decimal", self._args()[0])
+            if member in ("ZERO", "ONE", "TEN"):
+                return ("decimal", ("num", {"ZERO": "0", "ONE": "1", "TEN": "10"}[member]))
+            if member.startswith("ROUND_"):
+                return ("rounding", member)
+            raise PAPCompileError(f"Unbekanntes BigDecimal-Element: {member}")
+        if re.match(r"[A-Za-z_]\w*$", token):
+            return ("var", token)
+        raise PAPCompileError(f"Unerwartetes Token {token!r} in {self.text!r}")
+
+
+def parse_expression(text: str):
+    """Parst einen PAP-Ausdruck in einen einfachen Syntaxbaum (Tupel)"""
+    return _ExprParser(text).parse()
+
+
+# ---------------------------------------------------------------------------
+# Codeerzeugung
+# ---------------------------------------------------------------------------
+
+
+class _PAPModel:
+    """Eingelesene Struktur eines PAP"""
+
+    def __init__(self, root: ET.Element):
+        self.name = root.get("name", "PAP")
+        self.version = root.get("versionNummer", root.get("version", "1.0"))
+        self.inputs: List[Tuple[str, str, Optional[str]]] = []
+        self.outputs: List[Tuple[str, str, Optional[str]]] = []
+        self.internals: List[Tuple[str, str, Optional[str]]] = []
+        self.constants: List[Tuple[str, str, str]] = []
+        variables = root.find("VARIABLES")
+        if variables is None:
+            raise PAPCompileError("PAP enthält keinen VARIABLES-Block")
+        for section, target in (
+            ("INPUTS", self.inputs),
+            ("OUTPUTS", self.outputs),
+            ("INTERNALS", self.internals),
+        ):
+            for block in variables.iter(section):
+                for var in block:
+                    target.append((var.get("name"), var.get("type"), var.get("default")))
+        for block in root.iter("CONSTANTS"):
+            for const in block:
+                self.constants.append((const.get("name"), const.get("type"), const.get("value")))
+        methods = root.find("METHODS")
+        if methods is None or methods.find("MAIN") is None:
+            raise PAPCompileError("PAP enthält keinen METHODS/MAIN-Block")
+        self.main = methods.find("MAIN")
+        self.methods = {m.get("name"): m for m in methods.iter("METHOD")}
+        self.types: Dict[str, str] = {}
+        for name, vtype, _ in self.inputs + self.outputs + self.internals:
+            self.types[name] = vtype
+        for name, vtype, _ in self.constants:
+            self.types[name] = vtype
+
+
+class _CodeGenerator:
+    """Erzeugt den Python-Quelltext für ein eingelesenes PAP-Modell"""
+
+    def __init__(self, model: _PAPModel, patches: Dict[Tuple[str, str], str]):
+        self.model = model
+        self.patches = {
+            (method, re.sub(r"\s+", "", stmt)): replacement
+            for (method, stmt), replacement in (patches or {}).items()
+        }
+        self.used_patches = set()
+        self.decimal_consts: Dict[str, str] = {}
+        self.quantizers: Dict[int, str] = {}
+        self.lines: List[str] = []
+
+    # -- Konstanten ---------------------------------------------------------
+
+    def _decimal_const(self, literal: str) -> str:
+        if literal not in self.decimal_consts:
+            suffix = literal.replace("-", "M").replace(".", "_")
+            self.decimal_consts[literal] = f"_D{suffix}"
+        return self.decimal_consts[literal]
+
+    def _quantizer(self, scale: int) -> str:
+        if scale not in self.quantizers:
+            self.quantizers[scale] = f"_Q{scale}"
+        return self.quantizers[scale]
+
+    # -- Typen ---------------------------------------------------------------
+
+    def _type(self, node) -> str:
+        kind = node[0]
+        if kind == "num":
+            return "double" if "." in node[1] else "int"
+        if kind == "var":
+            return self.model.types.get(node[1], "BigDecimal")
+        if kind == "index":
+            return self._type(node[1]).rstrip("[]")
+        if kind == "call":
+            if node[2] in ("longValue", "intValue"):
+                return "int"
+            if node[2] == "compareTo":
+                return "int"
+            return "BigDecimal"
+        if kind == "arith":
+            left, right = self._type(node[2]), self._type(node[3])
+            if "BigDecimal" in (left, right):
+                return "BigDecimal"
+            return "double" if "double" in (left, right) else "int"
+        if kind in ("neg",):
+            return self._type(node[1])
+        if kind == "cond":
+            return self._type(node[2])
+        if kind in ("cmp", "bool", "not"):
+            return "boolean"
+        return "BigDecimal"
+
+    # -- Ausdrücke ----------------------------------------------------------
+
+    def _operand(self, node) -> str:
+        """Operand einer Decimal-Rechnung; ganzzahlige valueOf-Werte bleiben int"""
+        if node[0] == "decimal" and self._type(node[1]) == "int" and node[1][0] != "num":
+            return self.expr(node[1])
+        return self.expr(node)
+
+    def _rounding(self, node) -> str:
+        if node[0] != "rounding" or node[1] not in ("ROUND_DOWN", "ROUND_UP"):
+            raise PAPCompileError(f"Nicht unterstützter Rundungsmodus: {node}")
+        return node[1]
+
+    def _scale(self, node) -> int:
+        if node[0] != "num":
+            raise PAPCompileError(f"Skala muss ein Literal sein: {node}")
+        return int(node[1])
+
+    def expr(self, node) -> str:
+        kind = node[0]
+        if kind == "num":
+            return node[1]
+        if kind == "var":
+            return node[1]
+        if kind == "decimal":
+            inner = node[1]
+            if inner[0] == "num":
+                return self._decimal_const(inner[1])
+            inner_type = self._type(inner)
+            if inner_type == "double":
+                return f"Decimal(repr({self.expr(inner)}))"
+            if inner_type == "int":
+                return f"Decimal({self.expr(inner)})"
+            return self.expr(inner)
+        if kind == "index":
+            return f"{self.expr(node[1])}[{self.expr(node[2])}]"
+        if kind == "neg":
+            return f"(-{self.expr(node[1])})"
+        if kind == "not":
+            return f"(not {self.expr(node[1])})"
+        if kind == "arith":
+            return f"({self.expr(node[2])} {node[1]} {self.expr(node[3])})"
+        if kind == "bool":
+            return f"({self.expr(node[2])} {node[1]} {self.expr(node[3])})"
+        if kind == "cond":
+            return f"({self.expr(node[2])} if {self.expr(node[1])} else {self.expr(node[3])})"
+        if kind == "cmp":
+            return self._compare(node)
+        if kind == "call":
+            return self._call(node)
+        raise PAPCompileError(f"Nicht unterstützter Ausdruck: {node}")
+
+    def _compare(self, node) -> str:
+        _, op, left, right = node
+        if left[0] == "call" and left[2] == "compareTo":
+            if right[0] != "num" or int(right[1]) not in (-1, 0, 1):
+                raise PAPCompileError(f"compareTo nur mit -1/0/1 unterstützt: {node}")
+            value = int(right[1])
+            outcomes = frozenset(s for s in (-1, 0, 1) if _PY_CMP[op](s, value))
+            if not outcomes or outcomes == frozenset([-1, 0, 1]):
+                raise PAPCompileError(f"Triviale compareTo-Bedingung: {node}")
+            py_op = _COMPARE_OPS[outcomes]
+            target = self.expr(left[1])
+            return f"({target} {py_op} {self._operand(left[3][0])})"
+        return f"({self.expr(left)} {op} {self.expr(right)})"
+
+    def _call(self, node) -> str:
+        _, target, method, args = node
+        obj = self.expr(target)
+        if method in ("add", "subtract", "multiply"):
+            op = {"add": "+", "subtract": "-", "multiply": "*"}[method]
+            return f"({obj} {op} {self._operand(args[0])})"
+        if method == "divide":
+            quotient = f"({obj} / {self._operand(args[0])})"
+            if len(args) == 1:
+                return quotient
+            if len(args) == 3:
+                scale = self._quantizer(self._scale(args[1]))
+                return f"{quotient}.quantize({scale}, {self._rounding(args[2])})"
+            raise PAPCompileError(f"divide mit {len(args)} Argumenten: {node}")
+        if method == "setScale":
+            if len(args) != 2:
+                raise PAPCompileError(f"setScale ohne Rundungsmodus: {node}")
+            scale = self._quantizer(self._scale(args[0]))
+            return f"{obj}.quantize({scale}, {self._rounding(args[1])})"
+        if method in ("longValue", "intValue"):
+            return f"int({obj})"
+        if method == "negate":
+            return f"(-{obj})"
+        if method == "abs":
+            return f"abs({obj})"
+        raise PAPCompileError(f"Nicht unterstützte Methode {method} in {node}")
+
+    # -- Anweisungen ----------------------------------------------------------
+
+    def _emit(self, indent: int, text: str):
+        self.lines.append("    " * indent + text)
+
+    def _eval(self, method: str, statement: str, indent: int):
+        key = (method, re.sub(r"\s+", "", statement))
+        if key in self.patches:
+            self.used_patches.add(key)
+            statement = self.patches[key]
+        match = re.match(r"\s*([A-Za-z_]\w*)\s*=(?!=)\s*(.+)$", statement, re.S)
+        if not match:
+            raise PAPCompileError(f"Ungültige EVAL-Anweisung: {statement!r}")
+        target, source = match.groups()
+        if target not in self.model.types:
+            raise PAPCompileError(f"Unbekannte Variable {target} in {statement!r}")
+        node = parse_expression(source)
+        value = self.expr(node)
+        if self.model.types[target] == "BigDecimal" and self._type(node) == "int":
+            value = f"Decimal({value})"
+        elif self.model.types[target] == "double" and node[0] == "num":
+            value = repr(float(node[1]))
+        self._emit(indent, f"{target} = {value}")
+
+    def block(self, element: ET.Element, method: str, indent: int, stack: Tuple[str, ...]):
+        start = len(self.lines)
+        for child in element:
+            if child.tag == "EVAL":
+                self._eval(method, child.get("exec"), indent)
+            elif child.tag == "EXECUTE":
+                self._execute(child.get("method"), indent, stack)
+            elif child.tag == "IF":
+                self._if(child, method, indent, stack, "if")
+            else:
+                raise PAPCompileError(f"Unbekanntes Element <{child.tag}> in {method}")
+        if len(self.lines) == start:
+            self._emit(indent, "pass")
+
+    def _if(self, element: ET.Element, method: str, indent: int, stack, keyword: str):
+        condition = self.expr(parse_expression(element.get("expr")))
+        self._emit(indent, f"{keyword} {condition}:")
+        then = element.find("THEN")
+        if then is not None:
+            self.block(then, method, indent + 1, stack)
+        else:
+            self._emit(indent + 1, "pass")
+        otherwise = element.find("ELSE")
+        if otherwise is None or len(otherwise) == 0:
+            return
+        if len(otherwise) == 1 and otherwise[0].tag == "IF":
+            self._if(otherwise[0], method, indent, stack, "elif")
+            return
+        self._emit(indent, "else:")
+        self.block(otherwise, method, indent + 1, stack)
+
+    def _execute(self, name: str, indent: int, stack: Tuple[str, ...]):
+        if name not in self.model.methods:
+            raise PAPCompileError(f"Methode {name} ist im PAP nicht definiert")
+        if name in stack:
+            raise PAPCompileError(f"Rekursiver Methodenaufruf: {' -> '.join(stack + (name,))}")
+        self._emit(indent, f"# {name}")
+        self.block(self.model.methods[name], name, indent, stack + (name,))
+
+    # -- Modul ----------------------------------------------------------------
+
+    def _default(self, vtype: str, default: Optional[str]) -> str:
+        if default is not None:
+            node = parse_expression(default)
+            if vtype == "BigDecimal" and node[0] == "num":
+                node = ("decimal", node)
+            return self.expr(node)
+        if vtype == "BigDecimal":
+            return self._decimal_const("0")
+        if vtype == "double":
+            return "0.0"
+        return "0"
+
+    def generate(self, xml_hash: str) -> str:
+        model = self.model
+
+        # Funktionsrumpf zuerst erzeugen, damit alle Konstanten bekannt sind
+        body: List[str] = []
+        self.lines = body
+        for name, vtype, _ in model.inputs:
+            if vtype == "BigDecimal":
+                self._emit(1, f"{name} = Decimal({name})")
+            elif vtype == "double":
+                self._emit(1, f"{name} = float({name})")
+            else:
+                self._emit(1, f"{name} = int({name})")
+        for name, vtype, default in model.outputs + model.internals:
+            self._emit(1, f"{name} = {self._default(vtype, default)}")
+        self.block(model.main, "MAIN", 1, ())
+        outputs = ", ".join(f'"{name}": {name}' for name, _, _ in model.outputs)
+        self._emit(1, f"return {{{outputs}}}")
+
+        unused = set(self.patches) - self.used_patches
+        if unused:
+            raise PAPCompileError(f"Patches passen nicht zum PAP: {sorted(unused)}")
+
+        signature = [
+            f"{name}={self._default(vtype, default)}" for name, vtype, default in model.inputs
+        ]
+
+        constants: List[str] = []
+        self.lines = constants
+        for name, vtype, value in model.constants:
+            if vtype.endswith("[]"):
+                items = [parse_expression(item) for item in value.strip().strip("{}").split(",")]
+                values = ", ".join(
+                    f'Decimal("{item[1][1]}")'
+                    if item[0] == "decimal" and item[1][0] == "num"
+                    else self.expr(item)
+                    for item in items
+                )
+                self._emit(0, f"{name} = ({values},)")
+            else:
+                self._emit(0, f"{name} = {self.expr(parse_expression(value))}")
+
+        header = [
+            "# Automatisch erzeugt von pap_compiler.py - nicht von Hand bearbeiten.",
+            f"# PAP {model.name}, Version {model.version}, XML-SHA256 {xml_hash}",
+            "from decimal import Decimal, ROUND_DOWN, ROUND_UP",
+            "",
+            f'PAP_NAME = "{model.name}"',
+            f'PAP_VERSION = "{model.version}"',
+            f'PAP_HASH = "{xml_hash}"',
+            "INPUTS = (" + "".join(f'"{n}", ' for n, _, _ in model.inputs) + ")",
+            "OUTPUTS = (" + "".join(f'"{n}", ' for n, _, _ in model.outputs) + ")",
+            "",
+        ]
+        for scale, name in sorted(self.quantizers.items()):
+            header.append(f'{name} = Decimal("1E-{scale}")' if scale else f'{name} = Decimal("1")')
+        for literal, name in self.decimal_consts.items():
+            header.append(f'{name} = Decimal("{literal}")')
+        header.append("")
+
+        function = [
+            "",
+            "",
+            "def calculate(*, " + ", ".join(signature) + ", **_unbenutzt):",
+            f'    """Berechnet den PAP {model.name} und liefert die Ausgabewerte"""',
+        ]
+        return "\n".join(header + constants + function + body) + "\n"
+
+
+_ATTRIBUTE_RE = re.compile(rb'(\s(?:expr|exec|value|default)=")([^"]*)(")')
+
+
+def _escape_attributes(xml_source: bytes) -> bytes:
+    """Die BMF-Dateien enthalten unmaskierte '<' und '&&' in Attributen; diese werden maskiert"""
+
+    def escape(match):
+        value = re.sub(rb"&(?!(?:amp|lt|gt|quot|apos);)", b"&amp;", match.group(2))
+        return match.group(1) + value.replace(b"<", b"&lt;") + match.group(3)
+
+    return _ATTRIBUTE_RE.sub(escape, xml_source)
+
+
+def compile_pap(xml_source: bytes, patches: Dict[Tuple[str, str], str] = None) -> str:
+    """Übersetzt den Inhalt einer PAP-XML-Datei in Python-Quelltext"""
+    root = ET.fromstring(_escape_attributes(xml_source))
+    generator = _CodeGenerator(_PAPModel(root), patches)
+    return generator.generate(pap_hash(xml_source, patches))
+
+
+def pap_hash(xml_source: bytes, patches: Dict[Tuple[str, str], str] = None) -> str:
+    """Cache-Schlüssel aus XML-Inhalt, Generator-Version und Patches"""
+    digest = hashlib.sha256(xml_source)
+    digest.update(f"\0{GENERATOR_VERSION}\0{sorted((patches or {}).items())!r}".encode())
+    return digest.hexdigest()
+
+
+_loaded_modules: Dict[str, object] = {}
+
+
+def load_pap_module(
+    xml_path: str = DEFAULT_PAP_XML,
+    patches: Dict[Tuple[str, str], str] = KIRCHENSTEUER_PATCHES,
+    cache_dir: str = None,
+):
+    """Lädt das übersetzte Modul zu einer PAP-XML-Datei (aus dem Cache oder neu erzeugt)"""
+    with open(xml_path, "rb") as fh:
+        xml_source = fh.read()
+    key = pap_hash(xml_source, patches)
+    if key in _loaded_modules:
+        return _loaded_modules[key]
+
+    cache_dir = cache_dir or PAP_CACHE_DIR
+    stem = re.sub(r"\W", "_", os.path.splitext(os.path.basename(xml_path))[0]).lower()
+    module_name = f"pap_{stem}_{key[:16]}"
+    module_path = os.path.join(cache_dir, module_name + ".py")
+
+    if not os.path.exists(module_path):
+        source = compile_pap(xml_source, patches)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Atomar schreiben, da mehrere Worker gleichzeitig übersetzen können
+            tmp_path = f"{module_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                fh.write(source)
+            os.replace(tmp_path, module_path)
+            logging.info(f"PAP {xml_path} nach {module_path} übersetzt")
+        except OSError as e:
+            logging.warning(f"PAP-Cache nicht beschreibbar ({e}), nutze Modul im Speicher")
+            module = type(sys)(module_name)
+            module.__file__ = f"<{module_name}>"
+            exec(compile(source, module.__file__, "exec"), module.__dict__)
+            _loaded_modules[key] = module
+            return module
+
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _loaded_modules[key] = module
+    return module
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or [
+        os.path.join(PAP_DIR, name)
+        for name in sorted(os.listdir(PAP_DIR))
+        if name.endswith(".xml")
+    ]
+    for path in paths:
+        module = load_pap_module(path)
+        print(f"{path}: {module.PAP_NAME} {module.PAP_VERSION} -> {module.__file__}")
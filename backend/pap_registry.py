@@ -0,0 +1,169 @@
+"""
+Registry der PAP-Versionen nach Jahr und Versionsnummer
+
+Jede Datei ``pap/Lohnsteuer<Jahr>*.xml`` ist ein Eintrag (z.B. ``Lohnsteuer2024.xml``,
+``Lohnsteuer2024Dezember.xml``, ``Lohnsteuer2026.xml``). Beim Start wird von jeder Datei nur
+der Kopf gelesen (``<PAP name=... versionNummer=...>``); übersetzt bzw. aus dem PAP-Cache
+geladen wird ein Jahr erst bei der ersten Berechnung, danach bleibt das Modul im Speicher.
+Gibt es für ein Jahr mehrere Versionen, gilt ohne Angabe die höchste Versionsnummer.
+
+Die ganzzahligen Rechenkerne (``int``, ``numpy``) und ihre Tariftabellen bilden genau
+``pap/Lohnsteuer2025.xml`` nach; für alle anderen Einträge rechnet der übersetzte PAP.
+"""
+
+import filecmp
+import logging
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from pap_compiler import DEFAULT_PAP_XML, KIRCHENSTEUER_PATCHES, PAP_DIR, load_pap_module
+
+# Jahr für Anfragen ohne ``year``
+DEFAULT_YEAR = int(os.environ.get("PAP_YEAR", "2025"))
+
+_DATEI_RE = re.compile(r"Lohnsteuer(\d{4})\w*\.xml$")
+_KOPF_RE = re.compile(rb"<PAP\s[^>]*>")
+_ATTRIBUT_RE = re.compile(rb'(\w+)="([^"]*)"')
+
+
+class UnsupportedYearError(ValueError):
+    """Für das Jahr (oder die Version) ist kein PAP vorhanden"""
+
+
+def _versionsschluessel(version: str) -> Tuple:
+    return tuple(int(teil) if teil.isdigit() else teil for teil in re.split(r"[.\-_]", version))
+
+
+class PAPEntry:
+    """Eine PAP-Version; das übersetzte Modul wird beim ersten Zugriff geladen"""
+
+    __slots__ = (
+        "year", "version", "name", "xml_path", "patches", "fixed_point", "cache_dir", "_module",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        year: int,
+        version: str,
+        xml_path: str,
+        name: str = None,
+        patches: Dict[Tuple[str, str], str] = KIRCHENSTEUER_PATCHES,
+        cache_dir: str = None,
+    ):
+        self.year = year
+        self.version = version
+        self.name = name or f"Lohnsteuer{year}"
+        self.xml_path = xml_path
+        self.patches = patches
+        self.fixed_point = year == 2025 and filecmp.cmp(xml_path, DEFAULT_PAP_XML, shallow=False)
+        self.cache_dir = cache_dir
+        self._module = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    @property
+    def module(self):
+        """Übersetztes PAP-Modul (``calculate(**eingaben)``)"""
+        if self._module is None:
+            # Mehrere Threads des Rechenpools können dasselbe Jahr zugleich anfordern
+            with self._lock:
+                if self._module is None:
+                    self._module = load_pap_module(self.xml_path, self.patches, self.cache_dir)
+                    logging.info(f"PAP {self.name} Version {self.version} geladen")
+        return self._module
+
+    def as_dict(self) -> Dict:
+        return {
+            "year": self.year,
+            "version": self.version,
+            "name": self.name,
+            "file": os.path.basename(self.xml_path),
+            "engines": ["decimal", "int", "numpy"] if self.fixed_point else ["decimal"],
+            "loaded": self.loaded,
+        }
+
+
+def read_header(xml_path: str) -> Dict[str, str]:
+    """Attribute des ``<PAP>``-Elements, ohne die Datei zu parsen"""
+    with open(xml_path, "rb") as fh:
+        kopf = _KOPF_RE.search(fh.read(4096))
+    if kopf is None:
+        raise ValueError(f"{xml_path} enthält keinen PAP-Kopf")
+    return {name.decode(): wert.decode() for name, wert in _ATTRIBUT_RE.findall(kopf.group())}
+
+
+class PAPRegistry:
+    """PAP-Versionen nach (Jahr, Versionsnummer)"""
+
+    def __init__(self, default_year: int = DEFAULT_YEAR, cache_dir: str = None):
+        self.default_year = default_year
+        self.cache_dir = cache_dir
+        self._entries: Dict[int, Dict[str, PAPEntry]] = {}
+
+    def register(self, entry: PAPEntry) -> PAPEntry:
+        self._entries.setdefault(entry.year, {})[entry.version] = entry
+        return entry
+
+    def discover(self, directory: str = PAP_DIR) -> List[PAPEntry]:
+        """Registriert alle ``Lohnsteuer<Jahr>*.xml`` eines Verzeichnisses (nur Kopf lesen)"""
+        entries = []
+        for datei in sorted(os.listdir(directory)):
+            treffer = _DATEI_RE.match(datei)
+            if not treffer:
+                continue
+            pfad = os.path.join(directory, datei)
+            try:
+                kopf = read_header(pfad)
+            except (OSError, ValueError) as e:
+                logging.warning(f"PAP-Datei {pfad} übersprungen: {e}")
+                continue
+            version = kopf.get("versionNummer") or kopf.get("version") or "1.0"
+            entries.append(
+                self.register(
+                    PAPEntry(
+                        int(treffer.group(1)),
+                        version,
+                        pfad,
+                        kopf.get("name"),
+                        cache_dir=self.cache_dir,
+                    )
+                )
+            )
+        return entries
+
+    def years(self) -> List[int]:
+        return sorted(self._entries)
+
+    def versions(self, year: int) -> List[str]:
+        return sorted(self._entries.get(year, {}), key=_versionsschluessel)
+
+    def get(self, year: Optional[int] = None, version: Optional[str] = None) -> PAPEntry:
+        """Eintrag zu Jahr und Version; ohne Version die höchste des Jahres"""
+        year = self.default_year if year is None else int(year)
+        versionen = self._entries.get(year)
+        if not versionen:
+            raise UnsupportedYearError(
+                f"Kein PAP für {year} vorhanden (verfügbar: {', '.join(map(str, self.years()))})"
+            )
+        if version is None:
+            return versionen[self.versions(year)[-1]]
+        if version not in versionen:
+            raise UnsupportedYearError(f"PAP {year} Version {version} ist nicht vorhanden")
+        return versionen[version]
+
+    def as_list(self) -> List[Dict]:
+        return [
+            self._entries[year][version].as_dict()
+            for year in self.years()
+            for version in self.versions(year)
+        ]
+
+
+registry = PAPRegistry()
+registry.discover()
@@ -0,0 +1,317 @@
+"""
+Eingaben einer Lohnsteuer-Berechnung: Anfragemodell, Prüfung und Aufbereitung
+
+Ohne Abhängigkeit von ``main``, damit auch die Worker des Bulk-Pools und die Kommandozeile
+(``bulk_csv``) Zeilen genauso prüfen wie die API, ohne die App zu laden.
+"""
+
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from pap_registry import registry as pap_registry
+
+
+class LohnsteuerRequest(BaseModel):
+    af: int = Field(
+        default=1,
+        ge=0,
+        le=1,
+        description="1, wenn die Anwendung des Faktorverfahrens gewählt wurden (nur in Steuerklasse IV)",
+    )
+    AJAHR: Optional[int] = Field(
+        default=0,
+        ge=1900,
+        le=2100,
+        description="Auf die Vollendung des 64. Lebensjahres folgende Kalenderjahr",
+    )
+    ALTER1: Optional[int] = Field(
+        default=0,
+        ge=0,
+        le=1,
+        description="1, wenn das 64. Lebensjahr zu Beginn des Kalenderjahres vollendet wurde",
+    )
+    f: float = Field(
+        default=1.0,
+        ge=0.001,
+        le=10.0,
+        description="Eingetragener Faktor mit drei Nachkommastellen",
+    )
+    JFREIB: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(10000000),
+        description="Jahresfreibetrag in Cent",
+    )
+    JHINZU: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(10000000),
+        description="Jahreshinzurechnungsbetrag in Cent",
+    )
+    JRE4: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(100000000),
+        description="Voraussichtlicher Jahresarbeitslohn in Cent",
+    )
+    JRE4ENT: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(100000000),
+        description="In JRE4 enthaltene Entschädigungen",
+    )
+    JVBEZ: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(100000000),
+        description="In JRE4 enthaltene Versorgungsbezuege in Cents",
+    )
+    KRV: Optional[int] = Field(
+        default=0, ge=0, le=1, description="Merker für die Vorsorgepauschale (0 oder 1)"
+    )
+    KVZ: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(10),
+        description="Kassenindividueller Zusatzbeitragssatz in Prozent",
+    )
+    LZZ: int = Field(
+        ge=1, le=4, description="Lohnzahlungszeitraum: 1=Jahr, 2=Monat, 3=Woche, 4=Tag"
+    )
+    LZZFREIB: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(10000000),
+        description="Freibetrag für den Lohnzahlungszeitraum in Cent",
+    )
+    LZZHINZU: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(10000000),
+        description="Hinzurechnungsbetrag für den Lohnzahlungszeitraum in Cent",
+    )
+    MBV: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(10000000),
+        description="Nicht zu besteuernde Vorteile bei Vermögensbeteiligungen in Cent",
+    )
+    PKPV: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(200000),
+        description="Private Kranken- bzw. Pflegeversicherung Monatsbetrag in Cent",
+    )
+    PKV: int = Field(
+        default=0,
+        ge=0,
+        le=2,
+        description="0=gesetzlich, 1=privat ohne AG-Zuschuss, 2=privat mit AG-Zuschuss",
+    )
+    PVA: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(10),
+        description="Beitragsabschläge in der sozialen Pflegeversicherung",
+    )
+    PVS: Optional[int] = Field(
+        default=0,
+        ge=0,
+        le=1,
+        description="1, wenn Besonderheiten in Sachsen zu berücksichtigen sind",
+    )
+    PVZ: Optional[int] = Field(
+        default=0,
+        ge=0,
+        le=1,
+        description="1, wenn Zuschlag zur sozialen Pflegeversicherung zu zahlen ist",
+    )
+    R: Optional[int] = Field(
+        default=0, ge=0, le=2, description="Religionsgemeinschaft des Arbeitnehmers"
+    )
+    RE4: Decimal = Field(
+        ge=0,
+        le=Decimal(100000000),
+        description="Steuerpflichtiger Arbeitslohn für den Lohnzahlungszeitraum in Cent",
+    )
+    SONSTB: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(100000000),
+        description="Sonstige Bezüge in Cent",
+    )
+    SONSTENT: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(100000000),
+        description="In SONSTB enthaltene Entschädigungen",
+    )
+    STERBE: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(1000000),
+        description="Sterbegeld bei Versorgungsbezuegen",
+    )
+    STKL: int = Field(ge=1, le=6, description="Steuerklasse: 1-6")
+    VBEZ: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(100000000),
+        description="In RE4 enthaltene Versorgungsbezuege in Cents",
+    )
+    VBEZM: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(10000000),
+        description="Vorsorgungsbezug im Januar 2005 oder ersten vollen Monat in Cents",
+    )
+    VBEZS: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(10000000),
+        description="Voraussichtliche Sonderzahlungen im Kalenderjahr des Versorgungsbeginns",
+    )
+    VBS: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(100000000),
+        description="In SONSTB enthaltene Versorgungsbezuege",
+    )
+    VJAHR: Optional[int] = Field(
+        default=0,
+        ge=0,
+        le=2100,
+        description="Jahr, in dem der Versorgungsbezug erstmalig gewährt wurde",
+    )
+    ZKF: Optional[Decimal] = Field(
+        default=Decimal(0),
+        ge=0,
+        le=Decimal(20),
+        description="Zahl der Freibetraege fuer Kinder",
+    )
+    ZMVB: Optional[int] = Field(
+        default=0,
+        ge=0,
+        le=12,
+        description="Zahl der Monate, fuer die Versorgungsbezuege gezahlt werden",
+    )
+    year: Optional[int] = Field(
+        default=None,
+        description="Jahr des PAP, ohne Angabe PAP_YEAR (Standard 2025)",
+    )
+
+    @field_validator("year")
+    @classmethod
+    def validate_year_supported(cls, v):
+        if v is not None and v not in pap_registry.years():
+            raise ValueError(
+                f"Für {v} ist kein PAP vorhanden (verfügbar: {', '.join(map(str, pap_registry.years()))})"
+            )
+        return v
+
+    @field_validator("RE4")
+    @classmethod
+    def validate_re4_not_zero(cls, v):
+        if v <= 0:
+            raise ValueError("RE4 (Arbeitslohn) muss größer als 0 sein")
+        return v
+
+    @field_validator("ZKF")
+    @classmethod
+    def validate_zkf_increment(cls, v):
+        # ZKF muss in 0.5er Schritten sein
+        if v % Decimal("0.5") != 0:
+            raise ValueError(
+                "Kinderfreibeträge müssen in 0.5er Schritten angegeben werden"
+            )
+        return v
+
+
+# Spalten einer CSV-Lohnliste: die Felder der Einzelberechnung
+BULK_FIELDS = tuple(LohnsteuerRequest.model_fields)
+BULK_REQUIRED = tuple(
+    name for name, field in LohnsteuerRequest.model_fields.items() if field.is_required()
+)
+
+
+def validation_message(error: ValidationError) -> str:
+    errors = "; ".join(
+        f"{'.'.join(str(loc) for loc in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
+    return f"Eingabefehler: {errors}"
+
+
+def validate_payroll_row(values: dict) -> dict:
+    """Prüft eine Zeile einer Lohnliste wie eine Einzelanfrage und bereitet sie auf"""
+    try:
+        data = LohnsteuerRequest.model_validate(values).model_dump()
+    except ValidationError as e:
+        raise ValueError(validation_message(e)) from None
+    try:
+        return sanitize_input(data)
+    except ValueError as e:
+        raise ValueError(f"Eingabefehler: {e}") from None
+
+
+def validate_payroll_items(
+    items: List[dict],
+) -> Tuple[List[Tuple[int, dict]], List[Tuple[int, str]]]:
+    """Prüft viele Eingaben wie Einzelanfragen
+
+    Liefert ``(Index, aufbereitete Eingabe)`` der gültigen und ``(Index, Fehlertext)`` der
+    übrigen Einträge. Bei großen Listen nicht auf der Event-Loop aufrufen.
+    """
+    valid = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, validate_payroll_row(item)))
+        except ValueError as e:
+            errors.append((index, str(e)))
+    return valid, errors
+
+
+def sanitize_input(data: dict) -> dict:
+    """Sanitizes and validates input data"""
+    sanitized = data.copy()
+
+    # Ensure all Decimal fields are properly converted
+    decimal_fields = [
+        "JFREIB",
+        "JHINZU",
+        "JRE4",
+        "JRE4ENT",
+        "JVBEZ",
+        "KVZ",
+        "LZZFREIB",
+        "LZZHINZU",
+        "MBV",
+        "PKPV",
+        "PVA",
+        "RE4",
+        "SONSTB",
+        "SONSTENT",
+        "STERBE",
+        "VBEZ",
+        "VBEZM",
+        "VBEZS",
+        "VBS",
+        "ZKF",
+    ]
+
+    for field in decimal_fields:
+        if field in sanitized and sanitized[field] is not None:
+            try:
+                sanitized[field] = Decimal(str(sanitized[field]))
+            except (ValueError, TypeError):
+                raise ValueError(f"Ungültiger Wert für {field}: {sanitized[field]}")
+
+    # Additional business logic validation
+    if sanitized.get("STKL") == 4 and sanitized.get("f", 1.0) == 1.0:
+        # Bei Steuerklasse IV ohne Faktor, setze af auf 0
+        sanitized["af"] = 0
+
+    return sanitized
@@ -0,0 +1,68 @@
+"""
+Lohnabrechnungen als ZIP: ein PDF-Report je Beschäftigtem
+
+Die Eingaben werden in Blöcken von ``PAYSLIP_CHUNK`` Beschäftigten im Export-Pool gerechnet
+und gerendert (``render_payslips``, ein Aufruf des Rechenkerns je Block). ``PayslipArchive``
+schreibt die fertigen PDFs in ein ZIP64-Archiv, dessen Bytes sofort gesendet werden; offen
+sind dabei nur die Blöcke, die gerade gerechnet werden.
+"""
+
+import csv
+import io
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from engines import calculate_pap_batch
+from export_service import render_calculation_report
+from xlsx_stream import ZipStream
+
+# Beschäftigte je Auftrag an den Export-Pool
+PAYSLIP_CHUNK = int(os.environ.get("PAYSLIP_CHUNK", "50"))
+
+_UNERLAUBT_RE = re.compile(r"[^\w\- ]+")
+
+
+def payslip_filename(index: int, name: Optional[str] = None) -> str:
+    """Dateiname im Archiv; die laufende Nummer hält die Reihenfolge der Eingabe"""
+    stem = f"{index + 1:06d}"
+    if name:
+        safe_name = _UNERLAUBT_RE.sub("", str(name)).strip()[:80]
+        if safe_name:
+            stem = f"{stem}_{safe_name.replace(' ', '_')}"
+    return f"{stem}.pdf"
+
+
+def render_payslips(
+    entries: List[Tuple[str, Dict]], engine: Optional[str] = None
+) -> List[Tuple[str, bytes]]:
+    """Rechnet einen Block und rendert je Eingabe einen PDF-Report; für den Prozess-Pool"""
+    results = calculate_pap_batch([data for _, data in entries], engine)
+    return [
+        (filename, render_calculation_report("pdf", data, result, filename[:-4]))
+        for (filename, data), result in zip(entries, results)
+    ]
+
+
+class PayslipArchive:
+    """ZIP64-Archiv mit den Reports; jede Methode liefert die neu erzeugten Bytes"""
+
+    def __init__(self):
+        self._zip = ZipStream()
+        self.files = 0
+
+    def add(self, payslips: List[Tuple[str, bytes]]) -> bytes:
+        for filename, pdf in payslips:
+            self._zip.writestr(filename, pdf)
+            self.files += 1
+        return self._zip.read()
+
+    def close(self, errors: List[Tuple[int, str]] = ()) -> bytes:
+        """Schließt das Archiv; ungültige Eingaben stehen in ``fehler.csv``"""
+        if errors:
+            out = io.StringIO()
+            writer = csv.writer(out, lineterminator="\n")
+            writer.writerow(["index", "error"])
+            writer.writerows(errors)
+            self._zip.writestr("fehler.csv", out.getvalue())
+        return self._zip.close()
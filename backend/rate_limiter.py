@@ -0,0 +1,140 @@
+"""
+Rate-Limit je Client nach GCRA, über eine mmap-Datei von allen Workern geteilt
+
+GCRA (Generic Cell Rate Algorithm) ist ein Token-Bucket, der je Client nur einen Zeitpunkt
+speichert, die theoretische Ankunftszeit ``tat``: jede Anfrage schiebt sie um
+``window / limit`` weiter, liegt sie danach mehr als ``window`` in der Zukunft, wird die
+Anfrage abgelehnt. Ein Client darf also ``limit`` Anfragen auf einmal stellen und erhält je
+``window / limit`` eine zurück. Prüfen und Buchen ist O(1), unabhängig von der Zahl der
+Anfragen im Fenster.
+
+Die Datei ist wie der Ergebnis-Cache in Buckets zu ``ways`` Slots geteilt (Hash des Clients,
+``tat``). Ein Slot mit ``tat`` in der Vergangenheit gehört einem Client mit vollem Kontingent
+und wird frei verwendet; ohne Anfragen verfällt ein Eintrag also nach spätestens ``window``.
+Ist ein Bucket voll aktiver Clients, wird der ersetzt, dessen ``tat`` am nächsten liegt. Der
+Speicherbedarf ist damit fest. Eine Anfrage sperrt nur ihren Bucket (lockf).
+
+Ohne ``path`` liegt der Zustand in einer unbenannten temporären Datei und gilt nur für den
+eigenen Prozess; unter gunicorn setzt ``gunicorn_conf.py`` ``RATE_LIMIT_PATH`` für alle Worker.
+"""
+
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import time
+from typing import Any, Dict, Optional
+
+from shared_file import open_shared_file
+
+# Bei Änderungen am Dateiformat erhöhen, ältere Dateien werden dann ersetzt
+LIMITER_FORMAT = 1
+
+_MAGIC = b"LSTRL\0\0\0"
+_HEADER = struct.Struct("<8sIIIIQ")  # Magic, Format, Slots, Ways, Limit, Fenster (ns)
+_DATA_OFFSET = mmap.PAGESIZE
+_SLOT_SIZE = 16  # Schlüssel, tat (ns)
+
+
+def client_key(client: str) -> int:
+    """64-Bit-Hash des Clients; 0 kennzeichnet freie Slots"""
+    key = int.from_bytes(hashlib.blake2b(client.encode(), digest_size=8).digest(), "little")
+    return key or 1
+
+
+class RateLimiter:
+    """Höchstens ``limit`` Anfragen je ``window`` Sekunden und Client, zwischen Prozessen geteilt"""
+
+    def __init__(
+        self,
+        limit: int,
+        window: float,
+        path: Optional[str] = None,
+        slots: int = 65536,
+        ways: int = 8,
+    ):
+        self.limit = limit
+        self.window = window
+        self.path = path
+        self.ways = ways
+        self.buckets = max(1, slots // ways)
+        self.slots = self.buckets * ways
+        self.allowed = 0
+        self.limited = 0
+        self.evictions = 0
+        self._window_ns = int(window * 1e9)
+        self._interval_ns = self._window_ns // max(limit, 1)
+        self._bucket_size = ways * _SLOT_SIZE
+        self._bucket = struct.Struct(f"<{2 * ways}Q")
+        size = _DATA_OFFSET + self.slots * _SLOT_SIZE
+        header = _HEADER.pack(_MAGIC, LIMITER_FORMAT, self.slots, ways, limit, self._window_ns)
+        self._fd = open_shared_file(path, header, size)
+        self._mm = mmap.mmap(self._fd, size)
+
+    def hit(self, client: str) -> float:
+        """Bucht eine Anfrage; 0 wenn erlaubt, sonst die Sekunden bis zur nächsten erlaubten"""
+        key = client_key(client)
+        start = _DATA_OFFSET + (key % self.buckets) * self._bucket_size
+        now = time.time_ns()
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, self._bucket_size, start)
+        try:
+            werte = self._bucket.unpack_from(self._mm, start)
+            slot = frei = ersatz = None
+            for way in range(self.ways):
+                slot_key, tat = werte[2 * way], werte[2 * way + 1]
+                if slot_key == key:
+                    slot = way
+                    break
+                if tat <= now:
+                    if frei is None:
+                        frei = way
+                elif ersatz is None or tat < werte[2 * ersatz + 1]:
+                    ersatz = way
+            if slot is None:
+                tat = now
+                if frei is None:
+                    slot = ersatz
+                    self.evictions += 1
+                else:
+                    slot = frei
+            neu = max(tat, now) + self._interval_ns
+            if neu - now > self._window_ns:
+                self.limited += 1
+                return (neu - now - self._window_ns) / 1e9
+            struct.pack_into("<QQ", self._mm, start + slot * _SLOT_SIZE, key, neu)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, self._bucket_size, start)
+        self.allowed += 1
+        return 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": True,
+            "path": self.path,
+            "limit": self.limit,
+            "window_seconds": self.window,
+            "capacity": self.slots,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "evictions": self.evictions,
+            "pid": os.getpid(),
+        }
+
+    def close(self):
+        self._mm.close()
+        os.close(self._fd)
+
+
+def open_rate_limiter(
+    limit: int, window: float, path: Optional[str], slots: int
+) -> RateLimiter:
+    """Geteilter Limiter unter ``path``; ist die Datei nicht anlegbar, einer je Prozess"""
+    if path:
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            return RateLimiter(limit, window, path, slots)
+        except OSError as e:
+            logging.warning(f"Rate-Limit-Datei {path} nicht verfügbar ({e}), Limit je Worker")
+    return RateLimiter(limit, window, None, slots)
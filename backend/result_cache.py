@@ -0,0 +1,193 @@
+"""
+Ergebnis-Cache für Einzelberechnungen, über eine mmap-Datei von allen Workern geteilt
+
+Der Schlüssel ist ein Hash über die bereinigten Eingaben und die Version des Rechenkerns
+(``cache_key``). Die Datei ist in Buckets zu ``ways`` Slots fester Größe geteilt; ein Eintrag
+liegt immer im Bucket seines Schlüssels, bei vollem Bucket wird der am längsten nicht
+gelesene Slot ersetzt (LRU je Bucket). Die Dateigröße ist damit fest.
+
+Lesen geschieht ohne Sperre: jeder Slot trägt eine CRC32 über Schlüssel und Inhalt, ein
+halb geschriebener Slot gilt als Fehltreffer. Schreiber sperren nur ihren Bucket (lockf).
+
+Treffer, Fehltreffer, Speicherungen und Ersetzungen zählt jeder Prozess zunächst für sich und
+addiert sie spätestens nach ``COUNTER_FLUSH_INTERVAL`` Sekunden (und vor ``get_stats``) unter
+Sperre in gemeinsame Zähler im Kopf der Datei. Die Zähler gelten damit für alle Worker, seit
+die Datei angelegt wurde.
+"""
+
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+from decimal import Decimal
+from typing import Any, Dict, Optional, Sequence
+
+from shared_file import open_shared_file
+
+# Bei Änderungen am Dateiformat erhöhen, ältere Dateien werden dann ersetzt
+CACHE_FORMAT = 1
+
+_MAGIC = b"LSTRC\0\0\0"
+_HEADER = struct.Struct("<8sIIII")  # Magic, Format, Slots, Ways, Slotgröße
+_DATA_OFFSET = mmap.PAGESIZE
+_SLOT = struct.Struct("<16sQIH")  # Schlüssel, letzter Zugriff (ns), CRC32, Länge
+_STAMP_OFFSET = 16
+# Gemeinsame Zähler im Kopf: Treffer, Fehltreffer, Speicherungen, Ersetzungen
+_COUNTERS = struct.Struct("<QQQQ")
+_COUNTERS_OFFSET = 64
+_HITS, _MISSES, _STORES, _EVICTIONS = range(4)
+
+# Höchstens so viele Sekunden zählt ein Prozess, bevor er in die gemeinsamen Zähler addiert
+COUNTER_FLUSH_INTERVAL = float(os.environ.get("RESULT_CACHE_COUNTER_INTERVAL", "1"))
+
+
+def cache_key(data: Dict[str, Any], version: str) -> bytes:
+    """Kanonischer Schlüssel: Felder sortiert, Werte in ihrer exakten Textform"""
+    canonical = "\0".join(f"{name}={data[name]!s}" for name in sorted(data))
+    return hashlib.blake2b(f"{version}\0{canonical}".encode(), digest_size=16).digest()
+
+
+class ResultCache:
+    """Fester, zwischen Prozessen geteilter LRU-Cache für Ergebnisse mit Decimal-Werten"""
+
+    def __init__(
+        self,
+        path: str,
+        fields: Sequence[str],
+        slots: int = 65536,
+        ways: int = 8,
+        slot_size: int = 256,
+    ):
+        self.path = path
+        self.fields = tuple(fields)
+        self.ways = ways
+        self.buckets = max(1, slots // ways)
+        self.slots = self.buckets * ways
+        self.slot_size = slot_size
+        self._pending = [0, 0, 0, 0]
+        self._pid = os.getpid()
+        self._flushed = time.monotonic()
+        self._max_payload = slot_size - _SLOT.size
+        size = _DATA_OFFSET + self.slots * slot_size
+        header = _HEADER.pack(_MAGIC, CACHE_FORMAT, self.slots, ways, slot_size)
+        self._fd = open_shared_file(path, header, size)
+        self._mm = mmap.mmap(self._fd, size)
+
+    def _bucket(self, key: bytes) -> int:
+        return int.from_bytes(key[:8], "little") % self.buckets
+
+    def _slot_offset(self, bucket: int, way: int) -> int:
+        return _DATA_OFFSET + (bucket * self.ways + way) * self.slot_size
+
+    def _read(self, offset: int, key: bytes) -> Optional[bytes]:
+        raw = self._mm[offset : offset + self.slot_size]
+        slot_key, _, crc, length = _SLOT.unpack_from(raw)
+        if slot_key != key or length > self._max_payload:
+            return None
+        payload = raw[_SLOT.size : _SLOT.size + length]
+        if zlib.crc32(payload, zlib.crc32(key)) != crc:
+            return None
+        return payload
+
+    def get(self, key: bytes) -> Optional[Dict[str, Decimal]]:
+        bucket = self._bucket(key)
+        for way in range(self.ways):
+            offset = self._slot_offset(bucket, way)
+            payload = self._read(offset, key)
+            if payload is not None:
+                struct.pack_into("<Q", self._mm, offset + _STAMP_OFFSET, time.time_ns())
+                self._count(_HITS)
+                return dict(zip(self.fields, map(Decimal, payload.decode().split(","))))
+        self._count(_MISSES)
+        return None
+
+    def _count(self, counter: int):
+        if self._pid != os.getpid():
+            # Nach fork: die noch nicht addierten Zähler gehören den Eltern
+            self._pid = os.getpid()
+            self._pending = [0, 0, 0, 0]
+        self._pending[counter] += 1
+        if time.monotonic() - self._flushed >= COUNTER_FLUSH_INTERVAL:
+            self._flush()
+
+    def _flush(self) -> tuple:
+        """Addiert die eigenen Zähler in die gemeinsamen; liefert deren neuen Stand"""
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, _COUNTERS.size, _COUNTERS_OFFSET)
+        try:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._pending = [0, 0, 0, 0]
+            werte = _COUNTERS.unpack_from(self._mm, _COUNTERS_OFFSET)
+            werte = tuple(map(sum, zip(werte, self._pending)))
+            _COUNTERS.pack_into(self._mm, _COUNTERS_OFFSET, *werte)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, _COUNTERS.size, _COUNTERS_OFFSET)
+        self._pending = [0, 0, 0, 0]
+        self._flushed = time.monotonic()
+        return werte
+
+    def put(self, key: bytes, result: Dict[str, Any]):
+        """Speichert ein Ergebnis; nur Decimal-Werte, zu große Einträge werden übergangen"""
+        values = [result.get(name) for name in self.fields]
+        if not all(type(value) is Decimal for value in values):
+            return
+        payload = ",".join(map(str, values)).encode()
+        if len(payload) > self._max_payload:
+            return
+        bucket = self._bucket(key)
+        start = self._slot_offset(bucket, 0)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, self.ways * self.slot_size, start)
+        try:
+            victim, oldest, occupied = 0, None, False
+            for way in range(self.ways):
+                offset = self._slot_offset(bucket, way)
+                slot_key, stamp, _, _ = _SLOT.unpack_from(self._mm, offset)
+                if slot_key == key or stamp == 0:
+                    victim, occupied = way, False
+                    break
+                if oldest is None or stamp < oldest:
+                    victim, oldest, occupied = way, stamp, True
+            slot = _SLOT.pack(key, time.time_ns(), zlib.crc32(payload, zlib.crc32(key)), len(payload))
+            offset = self._slot_offset(bucket, victim)
+            self._mm[offset : offset + _SLOT.size + len(payload)] = slot + payload
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, self.ways * self.slot_size, start)
+        self._count(_STORES)
+        if occupied:
+            self._count(_EVICTIONS)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Zähler aller Prozesse, die eigenen vorher addiert"""
+        hits, misses, stores, evictions = self._flush()
+        lookups = hits + misses
+        return {
+            "enabled": True,
+            "path": self.path,
+            "capacity": self.slots,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate_percent": round(hits / lookups * 100, 2) if lookups else 0,
+            "stores": stores,
+            "evictions": evictions,
+        }
+
+    def close(self):
+        self._flush()
+        self._mm.close()
+        os.close(self._fd)
+
+
+def open_result_cache(path: str, fields: Sequence[str], slots: int) -> Optional[ResultCache]:
+    """Öffnet den Cache, oder None wenn er abgeschaltet (slots=0) oder nicht anlegbar ist"""
+    if slots <= 0:
+        return None
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        return ResultCache(path, fields, slots)
+    except OSError as e:
+        logging.warning(f"Ergebnis-Cache {path} nicht verfügbar ({e}), rechne ohne Cache")
+        return None
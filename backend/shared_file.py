@@ -0,0 +1,58 @@
+"""
+Anlegen der mmap-Dateien, die sich die Worker teilen (Ergebnis-Cache, Rate-Limit, Sperrliste)
+
+Passt eine vorhandene Datei nicht (anderes Format oder andere Größe), wird sie nicht an Ort
+und Stelle gekürzt: andere Prozesse können sie schon abgebildet haben und bekämen dann SIGBUS
+oder schrieben mit dem alten Aufbau weiter. Die neue Datei entsteht unter einem temporären
+Namen und ersetzt die alte per ``os.replace``; bestehende Abbildungen behalten die alte Datei.
+"""
+
+import fcntl
+import os
+import tempfile
+from typing import Optional
+
+
+def _create(path: str, header: bytes, size: int) -> int:
+    """Neue Datei mit ``header`` unter ``path``; liefert ihren Deskriptor"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        os.ftruncate(fd, size)
+        os.pwrite(fd, header, 0)
+        os.replace(tmp, path)
+    except BaseException:
+        os.close(fd)
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return fd
+
+
+def open_shared_file(path: Optional[str], header: bytes, size: int) -> int:
+    """Deskriptor einer Datei mit ``header`` am Anfang und ``size`` Bytes
+
+    Ohne ``path`` eine unbenannte temporäre Datei nur für den eigenen Prozess.
+    """
+    if not path:
+        with tempfile.TemporaryFile() as fh:
+            fd = os.dup(fh.fileno())
+        os.ftruncate(fd, size)
+        os.pwrite(fd, header, 0)
+        return fd
+    while True:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        # Prüfen und Ersetzen unter Sperre, damit gleichzeitig startende Worker dieselbe
+        # Datei nutzen; wer nach dem Ersetzen die Sperre bekommt, hält die alte und öffnet neu
+        fcntl.lockf(fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(fd).st_ino != os.stat(path).st_ino:
+                continue
+            if os.fstat(fd).st_size == size and os.pread(fd, len(header), 0) == header:
+                return os.dup(fd)
+            return _create(path, header, size)
+        except FileNotFoundError:
+            continue
+        finally:
+            fcntl.lockf(fd, fcntl.LOCK_UN)
+            os.close(fd)
@@ -0,0 +1,54 @@
+"""
+Zusammenfassen gleichzeitiger, identischer Aufträge (Single-Flight)
+
+Kommt ein Auftrag, während derselbe Schlüssel noch berechnet wird, wartet er auf diese
+Berechnung statt eine eigene zu starten. Ergebnis und Fehler gehen an alle Wartenden.
+Die Berechnung läuft als eigene Task: bricht der erste Aufrufer ab (z.B. weil der Client
+die Verbindung schließt), rechnet sie für die übrigen weiter.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+def request_key(*parts: Any) -> bytes:
+    """Kanonischer Schlüssel für JSON-artige Daten (Schlüssel sortiert, Decimal als Text)"""
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).digest()
+
+
+class SingleFlight:
+    """Führt je Schlüssel höchstens eine Berechnung gleichzeitig aus"""
+
+    def __init__(self):
+        self.executed = 0
+        self.coalesced = 0
+        self.failed = 0
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    def _done(self, key: Hashable, task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            self.failed += 1
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Wartet auf die laufende Berechnung zu ``key`` oder startet ``fn()``"""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+            "in_flight": len(self._in_flight),
+        }
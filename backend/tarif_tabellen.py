@@ -0,0 +1,149 @@
+"""
+Vorberechnete Tariftabellen für UPTAB25 und MST5_6 (PAP Lohnsteuer 2025)
+
+UPMLST wendet den Tarif immer auf einen ganzen Euro-Betrag X an. Im Bereich der
+Progressionsformeln werden die Ergebnisse deshalb einmal vorab berechnet und als
+kompakte ``array("i")`` gehalten:
+
+- ``UPTAB25[X]``: Einkommensteuer in Euro für X < UPTAB25_GRENZE und KZTAB 1. Bei KZTAB 2
+  ist das Ergebnis ``UPTAB25[X] * 2``, da der PAP X bereits halbiert und ST mit KZTAB
+  multipliziert. Ab UPTAB25_GRENZE ist der Tarif linear und wird gerechnet.
+- ``MST5_6[ZZX]``: Lohnsteuer der Steuerklassen V/VI für ZZX <= W2STKL5 (dort sind bis zu
+  sechs UPTAB25-Auswertungen nötig); darüber ist MST5_6 ebenfalls linear.
+
+Die Tabellen werden aus den Formeln des Rechenkerns erzeugt, dabei Wert für Wert gegen
+die Decimal-Referenz ``TaxCalculator2025`` geprüft und im PAP-Cache abgelegt. Weitere
+Prozesse laden die Datei und prüfen nur Stichproben gegen die Formeln.
+"""
+
+import array
+import hashlib
+import inspect
+import logging
+import os
+import sys
+from decimal import Decimal
+from typing import Callable, Tuple
+
+from pap_compiler import PAP_CACHE_DIR
+
+# Bei Änderungen am Tabellenformat erhöhen, damit alte Cache-Dateien nicht mehr passen
+TABELLEN_VERSION = "1"
+
+UPTAB25_GRENZE = 68481  # ab hier linear (vierte Tarifzone)
+MST5_6_GRENZE = 34241  # W2STKL5 + 1
+
+_STICHPROBE = 997
+
+
+def _referenz_uptab25() -> Callable[[int], int]:
+    from tax_calculator import TaxCalculator2025
+
+    rechner = TaxCalculator2025()
+    rechner.MPARA()
+    rechner.KZTAB = 1
+
+    def uptab25(x: int) -> int:
+        rechner.X = Decimal(x)
+        rechner.UPTAB25()
+        return int(rechner.ST)
+
+    return uptab25
+
+
+def _referenz_mst5_6() -> Callable[[int], int]:
+    from tax_calculator import TaxCalculator2025
+
+    rechner = TaxCalculator2025()
+    rechner.MPARA()
+    rechner.KZTAB = 1
+
+    def mst5_6(zzx: int) -> int:
+        rechner.X = Decimal(zzx)
+        rechner.MST5_6()
+        return int(rechner.ST)
+
+    return mst5_6
+
+
+def _erzeugen(name: str, laenge: int, formel: Callable[[int], int], referenz) -> array.array:
+    tabelle = array.array("i", map(formel, range(laenge)))
+    pruefen = referenz()
+    for x, wert in enumerate(tabelle):
+        erwartet = pruefen(x)
+        if wert != erwartet:
+            raise RuntimeError(
+                f"Tariftabelle {name} weicht für X={x} von der Referenz ab: {wert} != {erwartet}"
+            )
+    return tabelle
+
+
+def _laden(pfad: str, laenge: int, formel: Callable[[int], int]):
+    """Tabelle aus dem Cache, oder None wenn sie fehlt bzw. nicht zu den Formeln passt"""
+    tabelle = array.array("i")
+    try:
+        with open(pfad, "rb") as fh:
+            tabelle.frombytes(fh.read())
+    except (OSError, ValueError):
+        return None
+    if len(tabelle) != laenge:
+        return None
+    for x in list(range(0, laenge, _STICHPROBE)) + [laenge - 1]:
+        if tabelle[x] != formel(x):
+            logging.warning(f"Tariftabelle {pfad} passt nicht zur Formel, wird neu erzeugt")
+            return None
+    return tabelle
+
+
+def _speichern(pfad: str, tabelle: array.array):
+    try:
+        os.makedirs(os.path.dirname(pfad), exist_ok=True)
+        # Atomar schreiben, da mehrere Worker gleichzeitig erzeugen können
+        tmp_pfad = f"{pfad}.{os.getpid()}.tmp"
+        with open(tmp_pfad, "wb") as fh:
+            fh.write(tabelle.tobytes())
+        os.replace(tmp_pfad, pfad)
+    except OSError as e:
+        logging.warning(f"Tariftabelle nicht speicherbar ({e}), nutze Tabelle im Speicher")
+
+
+def tabellen_schluessel(formel: Callable) -> str:
+    """Cache-Schlüssel aus Tabellenversion, Byte-Reihenfolge und Quelltext des Rechenkerns"""
+    digest = hashlib.sha256(inspect.getsource(sys.modules[formel.__module__]).encode())
+    digest.update(f"\0{TABELLEN_VERSION}\0{sys.byteorder}\0{array.array('i').itemsize}".encode())
+    return digest.hexdigest()
+
+
+def lade_tabellen(
+    uptab25: Callable[[int], int], mst5_6: Callable[[int], int], cache_dir: str = None
+) -> Tuple[array.array, array.array]:
+    """Lädt (oder erzeugt und prüft) die Tabellen UPTAB25 und MST5_6 zu den Formeln
+
+    ``uptab25(X)`` liefert die Steuer in Euro für KZTAB 1, ``mst5_6(ZZX)`` die Steuer der
+    Steuerklassen V/VI, beide für ganze Euro-Beträge.
+    """
+    cache_dir = cache_dir or PAP_CACHE_DIR
+    schluessel = tabellen_schluessel(mst5_6)[:16]
+    tabellen = []
+    for name, laenge, formel, referenz in (
+        ("uptab25", UPTAB25_GRENZE, uptab25, _referenz_uptab25),
+        ("mst5_6", MST5_6_GRENZE, mst5_6, _referenz_mst5_6),
+    ):
+        pfad = os.path.join(cache_dir, f"tarif_{name}_{schluessel}.bin")
+        tabelle = _laden(pfad, laenge, formel)
+        if tabelle is None:
+            tabelle = _erzeugen(name, laenge, formel, referenz)
+            _speichern(pfad, tabelle)
+            logging.info(f"Tariftabelle {name} erzeugt und geprüft: {pfad}")
+        tabellen.append(tabelle)
+    return tabellen[0], tabellen[1]
+
+
+if __name__ == "__main__":
+    # Erzeugt und prüft die Tabellen des int-Rechenkerns vorab (z.B. beim Docker-Build)
+    import tax_calculator_int
+
+    print(
+        f"UPTAB25: {len(tax_calculator_int.UPTAB25_TABELLE)} Werte, "
+        f"MST5_6: {len(tax_calculator_int.MST5_6_TABELLE)} Werte -> {PAP_CACHE_DIR}"
+    )
@@ -1,18 +1,177 @@
-import logging
+from dataclasses import dataclass
 from decimal import Decimal, getcontext
-
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 # Set precision for Decimal calculations
 getcontext().prec = 50
 
+# Decimal ist unveränderlich: alle mit 0 vorbelegten Felder teilen sich ein Objekt
+_D0 = Decimal(0)
+
+
+def _dezimal_tabelle(*werte: str) -> Tuple[Decimal, ...]:
+    return tuple(Decimal(wert) for wert in werte)
+
+
+@dataclass(frozen=True, eq=False)
+class PAPParameter:
+    """Unveränderliche Konstanten eines PAP-Jahres, von allen Rechnern geteilt"""
+
+    # Prozentsatz und Höchstbeträge Versorgungsfreibetrag / Altersentlastungsbetrag
+    TAB1: Tuple[Decimal, ...]
+    TAB2: Tuple[Decimal, ...]
+    TAB3: Tuple[Decimal, ...]
+    TAB4: Tuple[Decimal, ...]
+    TAB5: Tuple[Decimal, ...]
+    # MPARA
+    BBGRV: Decimal
+    RVSATZAN: Decimal
+    BBGKVPV: Decimal
+    KVSATZAG: Decimal
+    PVSATZAN: Decimal
+    PVSATZAG: Decimal
+    PVSATZAN_SACHSEN: Decimal
+    PVSATZAG_SACHSEN: Decimal
+    PVZUSCHLAG: Decimal
+    PVABSCHLAG: Decimal
+    W1STKL5: Decimal
+    W2STKL5: Decimal
+    W3STKL5: Decimal
+    GFB: Decimal
+    SOLZFREI: Decimal
+    # Zahlenkonstanten des PAP
+    ZAHL1: Decimal = Decimal(1)
+    ZAHL2: Decimal = Decimal(2)
+    ZAHL5: Decimal = Decimal(5)
+    ZAHL7: Decimal = Decimal(7)
+    ZAHL12: Decimal = Decimal(12)
+    ZAHL100: Decimal = Decimal(100)
+    ZAHL360: Decimal = Decimal(360)
+    ZAHL500: Decimal = Decimal(500)
+    ZAHL700: Decimal = Decimal(700)
+    ZAHL1000: Decimal = Decimal(1000)
+    ZAHL10000: Decimal = Decimal(10000)
+
+
+_TAB1_2025 = _dezimal_tabelle(
+    "0", "0.4", "0.384", "0.368", "0.352", "0.336", "0.32", "0.304", "0.288", "0.272",
+    "0.256", "0.24", "0.224", "0.208", "0.192", "0.176", "0.16", "0.152", "0.144", "0.14",
+    "0.136", "0.132", "0.128", "0.124", "0.12", "0.116", "0.112", "0.108", "0.104", "0.1",
+    "0.096", "0.092", "0.088", "0.084", "0.08", "0.076", "0.072", "0.068", "0.064", "0.06",
+    "0.056", "0.052", "0.048", "0.044", "0.04", "0.036", "0.032", "0.028", "0.024", "0.02",
+    "0.016", "0.012", "0.008", "0.004", "0",
+)
+
+PAP2025 = PAPParameter(
+    TAB1=_TAB1_2025,
+    TAB2=_dezimal_tabelle(
+        "0", "3000", "2880", "2760", "2640", "2520", "2400", "2280", "2160", "2040", "1920",
+        "1800", "1680", "1560", "1440", "1320", "1200", "1140", "1080", "1050", "1020", "990",
+        "960", "930", "900", "870", "840", "810", "780", "750", "720", "690", "660", "630",
+        "600", "570", "540", "510", "480", "450", "420", "390", "360", "330", "300", "270",
+        "240", "210", "180", "150", "120", "90", "60", "30", "0",
+    ),
+    TAB3=_dezimal_tabelle(
+        "0", "900", "864", "828", "792", "756", "720", "684", "648", "612", "576", "540",
+        "504", "468", "432", "396", "360", "342", "324", "315", "306", "297", "288", "279",
+        "270", "261", "252", "243", "234", "225", "216", "207", "198", "189", "180", "171",
+        "162", "153", "144", "135", "126", "117", "108", "99", "90", "81", "72", "63", "54",
+        "45", "36", "27", "18", "9", "0",
+    ),
+    TAB4=_TAB1_2025,
+    TAB5=_dezimal_tabelle(
+        "0", "1900", "1824", "1748", "1672", "1596", "1520", "1444", "1368", "1292", "1216",
+        "1140", "1064", "988", "912", "836", "760", "722", "684", "665", "646", "627", "608",
+        "589", "570", "551", "532", "513", "494", "475", "456", "437", "418", "399", "380",
+        "361", "342", "323", "304", "285", "266", "247", "228", "209", "190", "171", "152",
+        "133", "114", "95", "76", "57", "38", "19", "0",
+    ),
+    BBGRV=Decimal(96600),
+    RVSATZAN=Decimal("0.093"),
+    BBGKVPV=Decimal(66150),
+    KVSATZAG=Decimal("0.0125") + Decimal("0.07"),
+    PVSATZAN=Decimal("0.018"),
+    PVSATZAG=Decimal("0.018"),
+    PVSATZAN_SACHSEN=Decimal("0.023"),
+    PVSATZAG_SACHSEN=Decimal("0.013"),
+    PVZUSCHLAG=Decimal("0.006"),
+    PVABSCHLAG=Decimal("0.0025"),
+    W1STKL5=Decimal(13785),
+    W2STKL5=Decimal(34240),
+    W3STKL5=Decimal(222260),
+    GFB=Decimal(12096),
+    SOLZFREI=Decimal(19950),
+)
+
+
+@lru_cache(maxsize=256)
+def _mpara_saetze(
+    parameter: PAPParameter, KRV: int, KVZ: str, PVS: int, PVZ: int, PVA: str
+) -> Tuple[Optional[Decimal], Optional[Decimal], Decimal, Decimal, Decimal, Decimal]:
+    """MPARA-Sätze zu den Eingaben; KVZ/PVA als Text, damit Stellen zum Schlüssel gehören
+
+    Liefert BBGRV, RVSATZAN (None bei KRV >= 1), KVSATZAN, KVSATZAG, PVSATZAN, PVSATZAG.
+    """
+    p = parameter
+    if KRV < 1:
+        bbgrv, rvsatzan = p.BBGRV, p.RVSATZAN
+    else:
+        bbgrv = rvsatzan = None
+    kvsatzan = (Decimal(KVZ) / p.ZAHL2 / p.ZAHL100) + Decimal("0.07")
+    if PVS == 1:
+        pvsatzan, pvsatzag = p.PVSATZAN_SACHSEN, p.PVSATZAG_SACHSEN
+    else:
+        pvsatzan, pvsatzag = p.PVSATZAN, p.PVSATZAG
+    if PVZ == 1:
+        pvsatzan = pvsatzan + p.PVZUSCHLAG
+    else:
+        pvsatzan = pvsatzan - (Decimal(PVA) * p.PVABSCHLAG)
+    return bbgrv, rvsatzan, kvsatzan, p.KVSATZAG, pvsatzan, pvsatzag
+
 
 class TaxCalculator2025:
+    # Konstanten des PAP 2025 als Klassenattribute: keine Kopie je Instanz
+    PARAMETER = PAP2025
+    TAB1 = PAP2025.TAB1
+    TAB2 = PAP2025.TAB2
+    TAB3 = PAP2025.TAB3
+    TAB4 = PAP2025.TAB4
+    TAB5 = PAP2025.TAB5
+    ZAHL1 = PAP2025.ZAHL1
+    ZAHL2 = PAP2025.ZAHL2
+    ZAHL5 = PAP2025.ZAHL5
+    ZAHL7 = PAP2025.ZAHL7
+    ZAHL12 = PAP2025.ZAHL12
+    ZAHL100 = PAP2025.ZAHL100
+    ZAHL360 = PAP2025.ZAHL360
+    ZAHL500 = PAP2025.ZAHL500
+    ZAHL700 = PAP2025.ZAHL700
+    ZAHL1000 = PAP2025.ZAHL1000
+    ZAHL10000 = PAP2025.ZAHL10000
+
+    # Zustand in Slots statt in einem __dict__ je Instanz: weniger Speicher, schnellerer Zugriff
+    __slots__ = (
+        # INPUTS
+        "af", "AJAHR", "ALTER1", "f", "JFREIB", "JHINZU", "JRE4", "JRE4ENT", "JVBEZ", "KRV",
+        "KVZ", "LZZ", "LZZFREIB", "LZZHINZU", "MBV", "PKPV", "PKV", "PVA", "PVS", "PVZ",
+        "R", "RE4", "SONSTB", "SONSTENT", "STERBE", "STKL", "VBEZ", "VBEZM", "VBEZS", "VBS",
+        "VJAHR", "ZKF", "ZMVB",
+        # OUTPUTS
+        "BK", "BKS", "LSTLZZ", "SOLZLZZ", "SOLZS", "STS", "VKVLZZ", "VKVSONST", "VFRB",
+        "VFRBS1", "VFRBS2", "WVFRB", "WVFRBO", "WVFRBM",
+        # INTERNALS
+        "ALTE", "ANP", "ANTEIL1", "BBGKVPV", "BBGRV", "BMG", "DIFF", "EFA", "FVB", "FVBSO",
+        "FVBZ", "FVBZSO", "GFB", "HBALTE", "HFVB", "HFVBZ", "HFVBZSO", "HOCH", "J", "JBMG",
+        "JLFREIB", "JLHINZU", "JW", "K", "KFB", "KVSATZAG", "KVSATZAN", "KZTAB", "LSTJAHR",
+        "LSTOSO", "LSTSO", "MIST", "PVSATZAG", "PVSATZAN", "RVSATZAN", "RW", "SAP",
+        "SOLZFREI", "SOLZJ", "SOLZMIN", "SOLZSBMG", "SOLZSZVE", "SOLZVBMG", "ST", "ST1",
+        "ST2", "VBEZB", "VBEZBSO", "VERGL", "VHB", "VKV", "VSP", "VSP1", "VSP2", "VSP3",
+        "VSPN", "W1STKL5", "W2STKL5", "W3STKL5", "X", "Y", "ZRE4", "ZRE4J", "ZRE4VP",
+        "ZTABFB", "ZVBEZ", "ZVBEZJ", "ZVE", "ZX", "ZZX",
+    )
+
     def __init__(self, **kwargs):
-        logging.info("Initializing TaxCalculator2025 with input parameters.")
         # INPUTS
         self.af = int(kwargs.get("af", 1))
         self.AJAHR = int(kwargs.get("AJAHR", 0))
@@ -48,414 +207,95 @@ class TaxCalculator2025:
         self.ZKF = Decimal(kwargs.get("ZKF", "0"))
         self.ZMVB = int(kwargs.get("ZMVB", 0))
 
-        # Log major input values for debugging
-        logging.info(
-            f"RE4: {self.RE4}, STKL: {self.STKL}, LZZ: {self.LZZ}, VBEZ: {self.VBEZ}"
-        )
-
         # OUTPUTS
-        self.BK = Decimal(0)
-        self.BKS = Decimal(0)
-        self.LSTLZZ = Decimal(0)
-        self.SOLZLZZ = Decimal(0)
-        self.SOLZS = Decimal(0)
-        self.STS = Decimal(0)
-        self.VKVLZZ = Decimal(0)
-        self.VKVSONST = Decimal(0)
-        self.VFRB = Decimal(0)
-        self.VFRBS1 = Decimal(0)
-        self.VFRBS2 = Decimal(0)
-        self.WVFRB = Decimal(0)
-        self.WVFRBO = Decimal(0)
-        self.WVFRBM = Decimal(0)
+        self.BK = _D0
+        self.BKS = _D0
+        self.LSTLZZ = _D0
+        self.SOLZLZZ = _D0
+        self.SOLZS = _D0
+        self.STS = _D0
+        self.VKVLZZ = _D0
+        self.VKVSONST = _D0
+        self.VFRB = _D0
+        self.VFRBS1 = _D0
+        self.VFRBS2 = _D0
+        self.WVFRB = _D0
+        self.WVFRBO = _D0
+        self.WVFRBM = _D0
 
         # INTERNALS
-        self.ALTE = Decimal(0)
-        self.ANP = Decimal(0)
-        self.ANTEIL1 = Decimal(0)
-        self.BMG = Decimal(0)
-        self.BBGKVPV = Decimal(0)
-        self.BBGRV = Decimal(0)
-        self.DIFF = Decimal(0)
-        self.EFA = Decimal(0)
-        self.FVB = Decimal(0)
-        self.FVBSO = Decimal(0)
-        self.FVBZ = Decimal(0)
-        self.FVBZSO = Decimal(0)
-        self.GFB = Decimal(0)
-        self.HBALTE = Decimal(0)
-        self.HFVB = Decimal(0)
-        self.HFVBZ = Decimal(0)
-        self.HFVBZSO = Decimal(0)
-        self.HOCH = Decimal(0)
+        self.ALTE = _D0
+        self.ANP = _D0
+        self.ANTEIL1 = _D0
+        self.BMG = _D0
+        self.BBGKVPV = _D0
+        self.BBGRV = _D0
+        self.DIFF = _D0
+        self.EFA = _D0
+        self.FVB = _D0
+        self.FVBSO = _D0
+        self.FVBZ = _D0
+        self.FVBZSO = _D0
+        self.GFB = _D0
+        self.HBALTE = _D0
+        self.HFVB = _D0
+        self.HFVBZ = _D0
+        self.HFVBZSO = _D0
+        self.HOCH = _D0
         self.J = 0
-        self.JBMG = Decimal(0)
-        self.JLFREIB = Decimal(0)
-        self.JLHINZU = Decimal(0)
-        self.JW = Decimal(0)
+        self.JBMG = _D0
+        self.JLFREIB = _D0
+        self.JLHINZU = _D0
+        self.JW = _D0
         self.K = 0
-        self.KFB = Decimal(0)
-        self.KVSATZAG = Decimal(0)
-        self.KVSATZAN = Decimal(0)
+        self.KFB = _D0
+        self.KVSATZAG = _D0
+        self.KVSATZAN = _D0
         self.KZTAB = 0
-        self.LSTJAHR = Decimal(0)
-        self.LSTOSO = Decimal(0)
-        self.LSTSO = Decimal(0)
-        self.MIST = Decimal(0)
-        self.PVSATZAG = Decimal(0)
-        self.PVSATZAN = Decimal(0)
-        self.RVSATZAN = Decimal(0)
-        self.RW = Decimal(0)
-        self.SAP = Decimal(0)
-        self.SOLZFREI = Decimal(0)
-        self.SOLZJ = Decimal(0)
-        self.SOLZMIN = Decimal(0)
-        self.SOLZSBMG = Decimal(0)
-        self.SOLZSZVE = Decimal(0)
-        self.SOLZVBMG = Decimal(0)
-        self.ST = Decimal(0)
-        self.ST1 = Decimal(0)
-        self.ST2 = Decimal(0)
-        self.VBEZB = Decimal(0)
-        self.VBEZBSO = Decimal(0)
-        self.VERGL = Decimal(0)
-        self.VHB = Decimal(0)
-        self.VKV = Decimal(0)
-        self.VSP = Decimal(0)
-        self.VSPN = Decimal(0)
-        self.VSP1 = Decimal(0)
-        self.VSP2 = Decimal(0)
-        self.VSP3 = Decimal(0)
-        self.W1STKL5 = Decimal(0)
-        self.W2STKL5 = Decimal(0)
-        self.W3STKL5 = Decimal(0)
-        self.X = Decimal(0)
-        self.Y = Decimal(0)
-        self.ZRE4 = Decimal(0)
-        self.ZRE4J = Decimal(0)
-        self.ZRE4VP = Decimal(0)
-        self.ZTABFB = Decimal(0)
-        self.ZVBEZ = Decimal(0)
-        self.ZVBEZJ = Decimal(0)
-        self.ZVE = Decimal(0)
-        self.ZX = Decimal(0)
-        self.ZZX = Decimal(0)
-
-        # CONSTANTS
-        self.TAB1 = [
-            Decimal(v)
-            for v in [
-                0,
-                0.4,
-                0.384,
-                0.368,
-                0.352,
-                0.336,
-                0.32,
-                0.304,
-                0.288,
-                0.272,
-                0.256,
-                0.24,
-                0.224,
-                0.208,
-                0.192,
-                0.176,
-                0.16,
-                0.152,
-                0.144,
-                0.14,
-                0.136,
-                0.132,
-                0.128,
-                0.124,
-                0.12,
-                0.116,
-                0.112,
-                0.108,
-                0.104,
-                0.1,
-                0.096,
-                0.092,
-                0.088,
-                0.084,
-                0.08,
-                0.076,
-                0.072,
-                0.068,
-                0.064,
-                0.06,
-                0.056,
-                0.052,
-                0.048,
-                0.044,
-                0.04,
-                0.036,
-                0.032,
-                0.028,
-                0.024,
-                0.02,
-                0.016,
-                0.012,
-                0.008,
-                0.004,
-                0,
-            ]
-        ]
-        self.TAB2 = [
-            Decimal(v)
-            for v in [
-                0,
-                3000,
-                2880,
-                2760,
-                2640,
-                2520,
-                2400,
-                2280,
-                2160,
-                2040,
-                1920,
-                1800,
-                1680,
-                1560,
-                1440,
-                1320,
-                1200,
-                1140,
-                1080,
-                1050,
-                1020,
-                990,
-                960,
-                930,
-                900,
-                870,
-                840,
-                810,
-                780,
-                750,
-                720,
-                690,
-                660,
-                630,
-                600,
-                570,
-                540,
-                510,
-                480,
-                450,
-                420,
-                390,
-                360,
-                330,
-                300,
-                270,
-                240,
-                210,
-                180,
-                150,
-                120,
-                90,
-                60,
-                30,
-                0,
-            ]
-        ]
-        self.TAB3 = [
-            Decimal(v)
-            for v in [
-                0,
-                900,
-                864,
-                828,
-                792,
-                756,
-                720,
-                684,
-                648,
-                612,
-                576,
-                540,
-                504,
-                468,
-                432,
-                396,
-                360,
-                342,
-                324,
-                315,
-                306,
-                297,
-                288,
-                279,
-                270,
-                261,
-                252,
-                243,
-                234,
-                225,
-                216,
-                207,
-                198,
-                189,
-                180,
-                171,
-                162,
-                153,
-                144,
-                135,
-                126,
-                117,
-                108,
-                99,
-                90,
-                81,
-                72,
-                63,
-                54,
-                45,
-                36,
-                27,
-                18,
-                9,
-                0,
-            ]
-        ]
-        self.TAB4 = [
-            Decimal(v)
-            for v in [
-                0,
-                0.4,
-                0.384,
-                0.368,
-                0.352,
-                0.336,
-                0.32,
-                0.304,
-                0.288,
-                0.272,
-                0.256,
-                0.24,
-                0.224,
-                0.208,
-                0.192,
-                0.176,
-                0.16,
-                0.152,
-                0.144,
-                0.14,
-                0.136,
-                0.132,
-                0.128,
-                0.124,
-                0.12,
-                0.116,
-                0.112,
-                0.108,
-                0.104,
-                0.1,
-                0.096,
-                0.092,
-                0.088,
-                0.084,
-                0.08,
-                0.076,
-                0.072,
-                0.068,
-                0.064,
-                0.06,
-                0.056,
-                0.052,
-                0.048,
-                0.044,
-                0.04,
-                0.036,
-                0.032,
-                0.028,
-                0.024,
-                0.02,
-                0.016,
-                0.012,
-                0.008,
-                0.004,
-                0,
-            ]
-        ]
-        self.TAB5 = [
-            Decimal(v)
-            for v in [
-                0,
-                1900,
-                1824,
-                1748,
-                1672,
-                1596,
-                1520,
-                1444,
-                1368,
-                1292,
-                1216,
-                1140,
-                1064,
-                988,
-                912,
-                836,
-                760,
-                722,
-                684,
-                665,
-                646,
-                627,
-                608,
-                589,
-                570,
-                551,
-                532,
-                513,
-                494,
-                475,
-                456,
-                437,
-                418,
-                399,
-                380,
-                361,
-                342,
-                323,
-                304,
-                285,
-                266,
-                247,
-                228,
-                209,
-                190,
-                171,
-                152,
-                133,
-                114,
-                95,
-                76,
-                57,
-                38,
-                19,
-                0,
-            ]
-        ]
-        self.ZAHL1 = Decimal(1)
-        self.ZAHL2 = Decimal(2)
-        self.ZAHL5 = Decimal(5)
-        self.ZAHL7 = Decimal(7)
-        self.ZAHL12 = Decimal(12)
-        self.ZAHL100 = Decimal(100)
-        self.ZAHL360 = Decimal(360)
-        self.ZAHL500 = Decimal(500)
-        self.ZAHL700 = Decimal(700)
-        self.ZAHL1000 = Decimal(1000)
-        self.ZAHL10000 = Decimal(10000)
+        self.LSTJAHR = _D0
+        self.LSTOSO = _D0
+        self.LSTSO = _D0
+        self.MIST = _D0
+        self.PVSATZAG = _D0
+        self.PVSATZAN = _D0
+        self.RVSATZAN = _D0
+        self.RW = _D0
+        self.SAP = _D0
+        self.SOLZFREI = _D0
+        self.SOLZJ = _D0
+        self.SOLZMIN = _D0
+        self.SOLZSBMG = _D0
+        self.SOLZSZVE = _D0
+        self.SOLZVBMG = _D0
+        self.ST = _D0
+        self.ST1 = _D0
+        self.ST2 = _D0
+        self.VBEZB = _D0
+        self.VBEZBSO = _D0
+        self.VERGL = _D0
+        self.VHB = _D0
+        self.VKV = _D0
+        self.VSP = _D0
+        self.VSPN = _D0
+        self.VSP1 = _D0
+        self.VSP2 = _D0
+        self.VSP3 = _D0
+        self.W1STKL5 = _D0
+        self.W2STKL5 = _D0
+        self.W3STKL5 = _D0
+        self.X = _D0
+        self.Y = _D0
+        self.ZRE4 = _D0
+        self.ZRE4J = _D0
+        self.ZRE4VP = _D0
+        self.ZTABFB = _D0
+        self.ZVBEZ = _D0
+        self.ZVBEZJ = _D0
+        self.ZVE = _D0
+        self.ZX = _D0
+        self.ZZX = _D0
 
     def calculate(self):
-        logging.info("Starting tax calculation.")
         self.MPARA()
         self.MRE4JL()
         self.VBEZBSO = Decimal(0)
@@ -480,38 +320,24 @@ class TaxCalculator2025:
             "WVFRBO": self.WVFRBO,
             "WVFRBM": self.WVFRBM,
         }
-        logging.info(f"Tax calculation finished. Results: {results}")
         return results
 
     def MPARA(self):
-        logging.info("Running MPARA to set calculation parameters.")
-        if self.KRV < 1:
-            self.BBGRV = Decimal(96600)
-            self.RVSATZAN = Decimal("0.093")
-        self.BBGKVPV = Decimal(66150)
-        self.KVSATZAN = (self.KVZ / self.ZAHL2 / self.ZAHL100) + Decimal("0.07")
-        self.KVSATZAG = Decimal("0.0125") + Decimal("0.07")
-        if self.PVS == 1:
-            self.PVSATZAN = Decimal("0.023")
-            self.PVSATZAG = Decimal("0.013")
-        else:
-            self.PVSATZAN = Decimal("0.018")
-            self.PVSATZAG = Decimal("0.018")
-        if self.PVZ == 1:
-            self.PVSATZAN = self.PVSATZAN + Decimal("0.006")
-        else:
-            self.PVSATZAN = self.PVSATZAN - (self.PVA * Decimal("0.0025"))
-        self.W1STKL5 = Decimal(13785)
-        self.W2STKL5 = Decimal(34240)
-        self.W3STKL5 = Decimal(222260)
-        self.GFB = Decimal(12096)
-        self.SOLZFREI = Decimal(19950)
-        logging.info(
-            f"MPARA results: BBGRV={self.BBGRV}, KVSATZAN={self.KVSATZAN}, PVSATZAN={self.PVSATZAN}"
+        p = self.PARAMETER
+        bbgrv, rvsatzan, self.KVSATZAN, self.KVSATZAG, self.PVSATZAN, self.PVSATZAG = (
+            _mpara_saetze(p, self.KRV, str(self.KVZ), self.PVS, self.PVZ, str(self.PVA))
         )
+        if self.KRV < 1:
+            self.BBGRV = bbgrv
+            self.RVSATZAN = rvsatzan
+        self.BBGKVPV = p.BBGKVPV
+        self.W1STKL5 = p.W1STKL5
+        self.W2STKL5 = p.W2STKL5
+        self.W3STKL5 = p.W3STKL5
+        self.GFB = p.GFB
+        self.SOLZFREI = p.SOLZFREI
 
     def MRE4JL(self):
-        logging.info("Running MRE4JL to calculate yearly income.")
         if self.LZZ == 1:
             self.ZRE4J = (self.RE4 / self.ZAHL100).quantize(
                 Decimal("0.01"), rounding="ROUND_DOWN"
@@ -566,10 +392,8 @@ class TaxCalculator2025:
             )
         if self.af == 0:
             self.f = 1.0
-        logging.info(f"MRE4JL results: ZRE4J={self.ZRE4J}, ZVBEZJ={self.ZVBEZJ}")
 
     def MRE4(self):
-        logging.info("Running MRE4 to calculate tax-free allowances.")
         if self.ZVBEZJ == 0:
             self.FVBZ = Decimal(0)
             self.FVB = Decimal(0)
@@ -624,9 +448,6 @@ class TaxCalculator2025:
             if self.FVBZ > self.HFVBZ:
                 self.FVBZ = self.HFVBZ.quantize(Decimal("1"), rounding="ROUND_UP")
         self.MRE4ALTE()
-        logging.info(
-            f"MRE4 results: FVB={self.FVB}, FVBZ={self.FVBZ}, ALTE={self.ALTE}"
-        )
 
     def MRE4ALTE(self):
         if self.ALTER1 == 0:
@@ -647,7 +468,6 @@ class TaxCalculator2025:
                 self.ALTE = self.HBALTE
 
     def MRE4ABZ(self):
-        logging.info("Running MRE4ABZ to adjust taxable income.")
         self.ZRE4 = (
             self.ZRE4J - self.FVB - self.ALTE - self.JLFREIB + self.JLHINZU
         ).quantize(Decimal("0.01"), rounding="ROUND_DOWN")
@@ -659,10 +479,8 @@ class TaxCalculator2025:
         )
         if self.ZVBEZ < 0:
             self.ZVBEZ = Decimal(0)
-        logging.info(f"MRE4ABZ results: ZRE4={self.ZRE4}, ZVBEZ={self.ZVBEZ}")
 
     def MBERECH(self):
-        logging.info("Running MBERECH to perform main tax calculation.")
         self.MZTABFB()
         self.VFRB = ((self.ANP + self.FVB + self.FVBZ) * self.ZAHL100).quantize(
             Decimal("1"), rounding="ROUND_DOWN"
@@ -673,7 +491,7 @@ class TaxCalculator2025:
         )
         if self.WVFRB < 0:
             self.WVFRB = Decimal(0)
-        self.LSTJAHR = (self.ST * Decimal(self.f)).quantize(
+        self.LSTJAHR = (self.ST * Decimal(str(self.f))).quantize(
             Decimal("1"), rounding="ROUND_DOWN"
         )
         self.UPLSTLZZ()
@@ -682,13 +500,12 @@ class TaxCalculator2025:
             self.ZTABFB = self.ZTABFB + self.KFB
             self.MRE4ABZ()
             self.MLSTJAHR()
-            self.JBMG = (self.ST * Decimal(self.f)).quantize(
+            self.JBMG = (self.ST * Decimal(str(self.f))).quantize(
                 Decimal("1"), rounding="ROUND_DOWN"
             )
         else:
             self.JBMG = self.LSTJAHR
         self.MSOLZ()
-        logging.info(f"MBERECH results: LSTJAHR={self.LSTJAHR}, JBMG={self.JBMG}")
 
     def MZTABFB(self):
         self.ANP = Decimal(0)
@@ -746,11 +563,9 @@ class TaxCalculator2025:
         )
 
     def MLSTJAHR(self):
-        logging.info("Running MLSTJAHR to calculate annual tax.")
         self.UPEVP()
         self.ZVE = self.ZRE4 - self.ZTABFB - self.VSP
         self.UPMLST()
-        logging.info(f"MLSTJAHR results: ZVE={self.ZVE}, VSP={self.VSP}, ST={self.ST}")
 
     def UPVKVLZZ(self):
         self.UPVKV()
@@ -878,7 +693,6 @@ class TaxCalculator2025:
             self.ST = self.DIFF
 
     def MSOLZ(self):
-        logging.info("Running MSOLZ to calculate solidarity surcharge.")
         self.SOLZFREI = self.SOLZFREI * Decimal(self.KZTAB)
         if self.JBMG > self.SOLZFREI:
             self.SOLZJ = (self.JBMG * Decimal("5.5") / self.ZAHL100).quantize(
@@ -909,7 +723,6 @@ class TaxCalculator2025:
             self.BK = self.ANTEIL1
         else:
             self.BK = Decimal(0)
-        logging.info(f"MSOLZ results: SOLZLZZ={self.SOLZLZZ}, BK={self.BK}")
 
     def UPANTEIL(self):
         if self.LZZ == 1:
@@ -959,7 +772,7 @@ class TaxCalculator2025:
             self.VKVSONST = self.VKV - self.VKVSONST
             self.LSTSO = self.ST * self.ZAHL100
             self.STS = (
-                (self.LSTSO - self.LSTOSO) * Decimal(self.f) / self.ZAHL100
+                (self.LSTSO - self.LSTOSO) * Decimal(str(self.f)) / self.ZAHL100
             ).quantize(Decimal("1"), rounding="ROUND_DOWN") * self.ZAHL100
             self.STSMIN()
 
@@ -969,9 +782,9 @@ class TaxCalculator2025:
                 self.LSTLZZ += self.STS
                 if self.LSTLZZ < 0:
                     self.LSTLZZ = Decimal(0)
-                self.SOLZLZZ += (self.STS * Decimal("5.5") / self.ZAHL100).quantize(
-                    Decimal("1"), rounding="ROUND_DOWN"
-                )
+                self.SOLZLZZ = (
+                    self.SOLZLZZ + self.STS * Decimal("5.5") / self.ZAHL100
+                ).quantize(Decimal("1"), rounding="ROUND_DOWN")
                 if self.SOLZLZZ < 0:
                     self.SOLZLZZ = Decimal(0)
                 self.BK += self.STS
@@ -1010,7 +823,7 @@ class TaxCalculator2025:
             self.UPTAB25()
         else:
             self.MST5_6()
-        self.SOLZSBMG = (self.ST * Decimal(self.f)).quantize(
+        self.SOLZSBMG = (self.ST * Decimal(str(self.f))).quantize(
             Decimal("1"), rounding="ROUND_DOWN"
         )
         if self.SOLZSBMG > self.SOLZFREI:
@@ -1087,3 +900,83 @@ class TaxCalculator2025:
                 Decimal("1"), rounding="ROUND_DOWN"
             )
         self.ST = self.ST * Decimal(self.KZTAB)
+
+
+# Obergrenze der Einträge einer Ablaufverfolgung
+TRACE_LIMIT = 1000
+
+
+class PAPTrace:
+    """Begrenzter Puffer für die Ablaufverfolgung einer Berechnung
+
+    Enthält je PAP-Methode einen Eintrag ``enter`` und je Abschnitt einen Eintrag ``set``
+    mit den dort geänderten Variablen. Einträge über ``limit`` werden nur gezählt.
+    """
+
+    __slots__ = ("limit", "events", "dropped")
+
+    def __init__(self, limit: int = TRACE_LIMIT):
+        self.limit = limit
+        self.events: List[Dict] = []
+        self.dropped = 0
+
+    def record(self, event: Dict):
+        if len(self.events) < self.limit:
+            self.events.append(event)
+        else:
+            self.dropped += 1
+
+    def as_dict(self) -> Dict:
+        return {"limit": self.limit, "dropped": self.dropped, "events": self.events}
+
+
+class _TracedTaxCalculator2025(TaxCalculator2025):
+    """TaxCalculator2025 mit Ablaufverfolgung; die Methoden werden unten umhüllt
+
+    Nur diese Unterklasse zeichnet auf, der normale Rechenweg prüft nichts.
+    """
+
+    __slots__ = ("_trace", "_stand", "_stapel")
+
+    def __init__(self, trace: PAPTrace, **kwargs):
+        super().__init__(**kwargs)
+        self._trace = trace
+        self._stand = {name: getattr(self, name) for name in TaxCalculator2025.__slots__}
+        self._stapel = []
+
+    def _abschnitt(self):
+        """Zeichnet die seit dem letzten Eintrag geänderten Variablen auf"""
+        stand = self._stand
+        werte = {}
+        for name in TaxCalculator2025.__slots__:
+            wert = getattr(self, name)
+            if wert != stand[name] or type(wert) is not type(stand[name]):
+                werte[name] = str(wert)
+                stand[name] = wert
+        if werte:
+            self._trace.record({"event": "set", "method": self._stapel[-1], "values": werte})
+
+
+def _verfolgt(name: str, methode):
+    def verfolgt(self):
+        if self._stapel:
+            self._abschnitt()
+        self._stapel.append(name)
+        self._trace.record({"event": "enter", "method": name, "depth": len(self._stapel)})
+        ergebnis = methode(self)
+        self._abschnitt()
+        self._stapel.pop()
+        return ergebnis
+
+    return verfolgt
+
+
+for _name, _methode in list(vars(TaxCalculator2025).items()):
+    if _name == "calculate" or (callable(_methode) and _name.isupper()):
+        setattr(_TracedTaxCalculator2025, _name, _verfolgt(_name, _methode))
+
+
+def calculate_traced(data: Dict, limit: int = TRACE_LIMIT) -> Tuple[Dict, PAPTrace]:
+    """Berechnet wie ``TaxCalculator2025(**data).calculate()`` und liefert die Ablaufverfolgung"""
+    trace = PAPTrace(limit)
+    return _TracedTaxCalculator2025(trace, **data).calculate(), trace
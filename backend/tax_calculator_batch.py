@@ -0,0 +1,449 @@
+"""
+Vektorisierter Rechenkern für den PAP Lohnsteuer 2025 (NumPy)
+
+``calculate_batch`` rechnet den PAP für viele Arbeitnehmer in einem Aufruf: jede Eingabe
+ist eine Spalte (eine Zeile je Arbeitnehmer), jeder Verzweigung des PAP entspricht eine
+Maske. Gerechnet wird wie in ``tax_calculator_int`` auf ``int64``-Werten in Cent bzw.
+Millionstel, mit exakter Nachbildung von ROUND_DOWN/ROUND_UP; die Ergebnisse stimmen
+numerisch mit dem Decimal-Rechenkern überein.
+
+Die Ausgabespalten sind ``int64``-Arrays (Cent). Damit ``int64`` nicht überläuft, sind
+Cent-Beträge auf ``MAX_BETRAG`` begrenzt. Eingabespalten dürfen ``int``, ``float`` oder
+``Decimal`` enthalten; Werte, die sich nicht skalieren lassen (z.B. Cent-Bruchteile), lösen
+wie im int-Rechenkern ``NotRepresentableError`` aus.
+"""
+
+from decimal import Decimal
+from typing import Dict, Mapping
+
+import numpy as np
+
+from tax_calculator_int import (
+    BBGKVPV,
+    MST5_6_TABELLE,
+    UPTAB25_TABELLE,
+    BBGRV,
+    GFB,
+    INPUTS,
+    OUTPUTS,
+    SOLZFREI,
+    TAB1,
+    TAB2,
+    TAB3,
+    TAB4,
+    TAB5,
+    W1STKL5,
+    W2STKL5,
+    W3STKL5,
+    NotRepresentableError,
+)
+
+# 1 Mrd. Euro; größere Beträge würden die Zwischenergebnisse über int64 hinaus treiben
+MAX_BETRAG = 10**11
+
+_CENT_SPALTEN = (
+    "JFREIB", "JHINZU", "JRE4", "JRE4ENT", "JVBEZ", "LZZFREIB", "LZZHINZU", "MBV",
+    "PKPV", "RE4", "SONSTB", "SONSTENT", "STERBE", "VBEZ", "VBEZM", "VBEZS", "VBS",
+)
+_GANZZAHL_SPALTEN = (
+    "af", "AJAHR", "ALTER1", "KRV", "LZZ", "PKV", "PVS", "PVZ", "R", "STKL", "VJAHR", "ZMVB",
+)
+STANDARDWERTE = {"af": 1, "f": 1.0}
+# Sätze werden mit diesen Faktoren ganzzahlig gerechnet, Cent-Beträge mit 1
+_FAKTOREN = {"ZKF": 10, "f": 1000, "PVA": 2500, "KVZ": 5000}
+
+_TAB1 = np.array(TAB1, dtype=np.int64)
+_TAB2 = np.array(TAB2, dtype=np.int64)
+_TAB3 = np.array(TAB3, dtype=np.int64)
+_TAB4 = np.array(TAB4, dtype=np.int64)
+_TAB5 = np.array(TAB5, dtype=np.int64)
+_UPTAB25 = np.frombuffer(UPTAB25_TABELLE, dtype=np.intc).astype(np.int64)
+_MST5_6 = np.frombuffer(MST5_6_TABELLE, dtype=np.intc).astype(np.int64)
+_SKALA_SATZ = 1000000
+
+
+def _down(zaehler, nenner):
+    """Ganzzahlige Division mit ROUND_DOWN (zur Null hin)"""
+    return np.where(zaehler >= 0, zaehler // nenner, -(-zaehler // nenner))
+
+
+def _up(zaehler, nenner):
+    """Ganzzahlige Division mit ROUND_UP (von der Null weg)"""
+    return np.where(zaehler >= 0, -(-zaehler // nenner), zaehler // nenner)
+
+
+def _euro_up(cent):
+    return _up(cent, 100) * 100
+
+
+def _dezimal_exakt(werte, faktor: int, name: str):
+    """Prüft Decimal-Werte vor der Umwandlung in float64: mit ``faktor`` ganzzahlig
+
+    Ein Cent-Betrag wie ``Decimal("100.0000000001")`` wird als float64 zu 100.0 und fiele
+    danach nicht mehr auf.
+    """
+    for wert in werte:
+        if type(wert) is Decimal:
+            try:
+                rest = (wert * faktor) % 1
+            except ArithmeticError:
+                raise ValueError(f"{name} enthält keine Zahlen")
+            if rest:
+                raise NotRepresentableError(f"{name} hat zu viele Nachkommastellen")
+
+
+def _skaliert(werte, faktor: int, name: str) -> np.ndarray:
+    """Spalte mit ``faktor`` skaliert als int64; Nachkommastellen darüber hinaus sind ein Fehler"""
+    werte = np.asarray(werte)
+    if werte.dtype.kind in "biu":
+        return werte.astype(np.int64) * faktor
+    if werte.dtype.kind != "f":
+        # Decimal-Spalten: ganze Cent-Beträge bis MAX_BETRAG sind als float64 exakt
+        _dezimal_exakt(werte, faktor, name)
+        try:
+            werte = werte.astype(np.float64)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} enthält keine Zahlen")
+    skaliert = werte * faktor
+    gerundet = np.rint(skaliert)
+    # Skalierte Sätze (KVZ, f, ...) dürfen den Rundungsfehler von float64 tragen
+    if not np.all(np.abs(skaliert - gerundet) <= (0 if faktor == 1 else 1e-9)):
+        raise NotRepresentableError(f"{name} hat zu viele Nachkommastellen")
+    return gerundet.astype(np.int64)
+
+
+def _spalten(columns: Mapping, anzahl: int) -> Dict[str, np.ndarray]:
+    """Liest die Eingabespalten; Skalare gelten für alle Zeilen, fehlende Spalten sind 0"""
+    spalten = {}
+    for name in INPUTS:
+        wert = columns.get(name, STANDARDWERTE.get(name, 0))
+        if isinstance(wert, (list, tuple)):
+            # Listen (z.B. mit Decimal aus der API) direkt als float64 lesen, ohne object-Array
+            if name not in _GANZZAHL_SPALTEN:
+                _dezimal_exakt(wert, _FAKTOREN.get(name, 1), name)
+            try:
+                wert = np.fromiter(map(float, wert), np.float64, len(wert))
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} enthält keine Zahlen")
+        wert = np.asarray(wert)
+        if wert.ndim == 0:
+            wert = np.full(anzahl, wert.item(), dtype=wert.dtype if wert.dtype.kind != "O" else object)
+        elif wert.shape != (anzahl,):
+            raise ValueError(f"Spalte {name} hat {len(wert)} statt {anzahl} Zeilen")
+        spalten[name] = wert
+    for name in _CENT_SPALTEN:
+        spalten[name] = _skaliert(spalten[name], 1, name)
+        if np.any(np.abs(spalten[name]) > MAX_BETRAG):
+            raise ValueError(f"{name} überschreitet {MAX_BETRAG} Cent")
+    for name in _GANZZAHL_SPALTEN:
+        spalten[name] = np.asarray(spalten[name]).astype(np.int64)
+    return spalten
+
+
+def _anteil(jw, lzz):
+    """UPANTEIL: Jahreswert auf den Lohnzahlungszeitraum umrechnen"""
+    return np.select(
+        [lzz == 1, lzz == 2, lzz == 3],
+        [jw, _down(jw, 12), _down(jw * 7, 360)],
+        _down(jw, 360),
+    )
+
+
+def _uptab25(x, kztab):
+    """UPTAB25: Einkommensteuertarif, x in Cent, Ergebnis in Euro"""
+    # Die Zonen werden auf ihren Wertebereich begrenzt, damit ausgeblendete Zeilen nicht überlaufen
+    y1 = np.clip(x - GFB * 100, 0, 534800)
+    y2 = np.clip(x - 1744300, 0, 5103800)
+    st = np.select(
+        [x < 1209700, x < 1744400, x < 6848100, x < 27782600],
+        [
+            0,
+            (y1 * 93230 + 140000000000) * y1 // 100000000000000,
+            ((y2 * 17664 + 239700000000) * y2 + 101513000000000000) // 100000000000000,
+            (x * 42 - 109119200) // 10000,
+        ],
+        (x * 45 - 192466700) // 10000,
+    )
+    return st * kztab
+
+
+def _up5_6(zx):
+    """UP5_6: Lohnsteuer der Steuerklassen V und VI für zx Euro"""
+    diff = (_uptab25(zx * 125, 1) - _uptab25(zx * 75, 1)) * 2
+    return np.maximum(zx * 14 // 100, diff)
+
+
+_ST_W1STKL5 = int(_up5_6(np.array([W1STKL5], dtype=np.int64))[0])
+_ST_W2STKL5 = int(_up5_6(np.array([W2STKL5], dtype=np.int64))[0])
+
+
+def _mst5_6(zzx):
+    """MST5_6: Lohnsteuer der Steuerklassen V und VI"""
+    st_w3 = (_ST_W2STKL5 * 100 + (W3STKL5 - W2STKL5) * 42) // 100
+    ueber_w2 = np.where(
+        zzx > W3STKL5,
+        (st_w3 * 100 + (zzx - W3STKL5) * 45) // 100,
+        (_ST_W2STKL5 * 100 + (zzx - W2STKL5) * 42) // 100,
+    )
+    st = _up5_6(np.minimum(zzx, W2STKL5))
+    hoch = (_ST_W1STKL5 * 100 + (zzx - W1STKL5) * 42) // 100
+    bis_w2 = np.where(zzx > W1STKL5, np.minimum(hoch, st), st)
+    return np.where(zzx > W2STKL5, ueber_w2, bis_w2)
+
+
+def _tarif(zve, kztab, stkl):
+    """UPMLST: Jahreslohnsteuer in Euro für das zu versteuernde Einkommen zve (Cent)"""
+    x = np.where(zve < 100, 0, zve // (100 * kztab))
+    grund = stkl < 5
+    st = np.empty_like(x)
+    # Im Progressionsbereich aus den vorberechneten Tabellen, darüber linear gerechnet
+    xg = x[grund]
+    kz = kztab[grund]
+    st_g = _UPTAB25[np.minimum(xg, len(_UPTAB25) - 1)] * kz
+    ueber = xg >= len(_UPTAB25)
+    if ueber.any():
+        st_g[ueber] = _uptab25(xg[ueber] * 100, kz[ueber])
+    st[grund] = st_g
+    x56 = x[~grund]
+    st_56 = _MST5_6[np.minimum(x56, len(_MST5_6) - 1)]
+    ueber = x56 >= len(_MST5_6)
+    if ueber.any():
+        st_56[ueber] = _mst5_6(x56[ueber])
+    st[~grund] = st_56
+    return st
+
+
+def _mre4(zvbezj, vbezbso, jahr, VBEZM, VBEZS, ZMVB, VJAHR):
+    """MRE4: Versorgungsfreibeträge, liefert FVB, FVBSO, FVBZ, FVBZSO in Cent"""
+    j = np.where(VJAHR < 2006, 1, np.where(VJAHR < 2058, VJAHR - 2004, 54))
+    tab1 = _TAB1[j]
+    tab2 = _TAB2[j]
+    tab3 = _TAB3[j]
+    vbezb = np.where(jahr, VBEZM * ZMVB + VBEZS, VBEZM * 12 + VBEZS)
+    hfvb = np.where(jahr, _up(tab2 * ZMVB, 1200) * 100, tab2)
+    fvbz = np.where(jahr, _up(tab3 * ZMVB, 1200) * 100, tab3)
+    fvb = np.minimum(np.minimum(_up(vbezb * tab1, 1000), hfvb), zvbezj)
+    fvbso = np.minimum(_up(fvb * 1000 + vbezbso * tab1, 1000), tab2)
+    hfvbzso = vbezb + vbezbso - fvbso
+    fvbzso = _euro_up(fvbz + vbezbso)
+    fvbzso = np.minimum(np.where(fvbzso > hfvbzso, _euro_up(hfvbzso), fvbzso), tab3)
+    hfvbz = vbezb - fvb
+    fvbz = np.where(fvbz > hfvbz, _euro_up(hfvbz), fvbz)
+    keine = zvbezj == 0
+    return (
+        np.where(keine, 0, fvb),
+        np.where(keine, 0, fvbso),
+        np.where(keine, 0, fvbz),
+        np.where(keine, 0, fvbzso),
+    )
+
+
+def _mre4alte(zre4j, zvbezj, ALTER1, AJAHR):
+    """MRE4ALTE: Altersentlastungsbetrag in Cent"""
+    k = np.where(AJAHR < 2006, 1, np.where(AJAHR < 2058, AJAHR - 2004, 54))
+    alte = np.minimum(_up((zre4j - zvbezj) * _TAB4[k], 100000) * 100, _TAB5[k])
+    return np.where(ALTER1 == 0, 0, alte)
+
+
+def _mztabfb(zvbez, zre4, fvbz, stkl, zkf10):
+    """MZTABFB: feste Tabellenfreibeträge, liefert ANP, FVBZ, KZTAB, KFB, ZTABFB"""
+    fvbz = np.where((zvbez >= 0) & (zvbez < fvbz), zvbez // 100 * 100, fvbz)
+    unter6 = stkl < 6
+    rest = zvbez - fvbz
+    anp = np.where(unter6 & (zvbez > 0), np.where(rest < 10200, _euro_up(rest), 10200), 0)
+    rest = zre4 - zvbez
+    anp = np.where(
+        unter6 & (zre4 > zvbez),
+        np.where(rest < 123000, _euro_up(anp + rest), anp + 123000),
+        anp,
+    )
+    fvbz = np.where(unter6, fvbz, 0)
+    kztab = np.where(stkl == 3, 2, 1)
+    efa = np.where(stkl == 2, 426000, 0)
+    sap = np.where((stkl >= 1) & (stkl <= 5), 3600, 0)
+    kfb = np.select([(stkl >= 1) & (stkl <= 3), stkl == 4], [zkf10 * 96000, zkf10 * 48000], 0)
+    return anp, fvbz, kztab, kfb, efa + anp + sap + fvbz
+
+
+def _vsp(zre4vp, stkl, KRV, PKV, PKPV, satz_an, satz_ag):
+    """UPEVP/MVSP: Vorsorgepauschale in Cent und VKV (UPVKV) in Cent"""
+    ohne_rv = KRV == 1
+    zre4vp = np.where(ohne_rv, zre4vp, np.minimum(zre4vp, np.where(KRV < 1, BBGRV, 0)))
+    vsp1 = np.where(ohne_rv, 0, _down(zre4vp * np.where(KRV < 1, 93000, 0), _SKALA_SATZ))
+    vsp2 = np.minimum(_down(zre4vp * 12, 100), np.where(stkl == 3, 300000, 190000))
+    vspn = _euro_up(vsp1 + vsp2)
+    zre4vp = np.minimum(zre4vp, BBGKVPV)
+    vsp3_privat = np.where(
+        PKV == 2, _down(PKPV * 12 * _SKALA_SATZ - zre4vp * satz_ag, _SKALA_SATZ), PKPV * 12
+    )
+    vsp3 = np.where(
+        PKV > 0,
+        np.where(stkl == 6, 0, vsp3_privat),
+        _down(zre4vp * satz_an, _SKALA_SATZ),
+    )
+    vsp = np.maximum(_euro_up(vsp3 + vsp1), vspn)
+    vkv = np.where(PKV > 0, np.maximum(vsp2, vsp3), 0)
+    return vsp, vkv
+
+
+def _msonst(t: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """MSONST mit MOSONST, MRE4SONST, STSMIN und MSOLZSTS für die Zeilen in ``t``"""
+    STKL = t["STKL"]
+    KRV = t["KRV"]
+    PKV = t["PKV"]
+    PKPV = t["PKPV"]
+    R = t["R"]
+    MBV = t["MBV"]
+    zkf10 = t["zkf10"]
+    f = t["f"]
+    satz_an = t["satz_an"]
+    satz_ag = t["satz_ag"]
+    zmvb = np.where(t["ZMVB"] == 0, 12, t["ZMVB"])
+
+    # MOSONST
+    zre4j = t["JRE4"]
+    zvbezj = t["JVBEZ"]
+    fvb, _, fvbz, _ = _mre4(zvbezj, 0, True, t["VBEZM"], t["VBEZS"], zmvb, t["VJAHR"])
+    alte = _mre4alte(zre4j, zvbezj, t["ALTER1"], t["AJAHR"])
+    zre4 = np.maximum(zre4j - fvb - alte - t["JFREIB"] + t["JHINZU"], 0)
+    zvbez = np.maximum(zvbezj - fvb, 0)
+    anp, fvbz, kztab, kfb, ztabfb = _mztabfb(zvbez, zre4, fvbz, STKL, zkf10)
+    vfrbs1 = anp + fvb + fvbz
+    vsp, vkv_oso = _vsp(zre4j - t["JRE4ENT"], STKL, KRV, PKV, PKPV, satz_an, satz_ag)
+    zve = zre4 - ztabfb - vsp
+    zve = np.where(zve < 100, 0, zve)
+    st_oso = _tarif(zve, kztab, STKL)
+    wvfrbo = np.maximum(zve - GFB * 100, 0)
+
+    # MRE4SONST
+    zre4j = t["JRE4"] + t["SONSTB"]
+    zvbezj = t["JVBEZ"] + t["VBS"]
+    _, fvb, _, fvbz = _mre4(zvbezj, t["STERBE"], True, t["VBEZM"], t["VBEZS"], zmvb, t["VJAHR"])
+    alte = _mre4alte(zre4j, zvbezj, t["ALTER1"], t["AJAHR"])
+    zre4 = np.maximum(zre4j - fvb - alte - t["JFREIB"] + t["JHINZU"], 0)
+    zvbez = np.maximum(zvbezj - fvb, 0)
+    anp, fvbz, kztab, kfb, ztabfb = _mztabfb(zvbez, zre4, fvbz, STKL, zkf10)
+    vfrbs2 = anp + fvb + fvbz - vfrbs1
+    vsp, vkv_so = _vsp(
+        zre4j + MBV - t["JRE4ENT"] - t["SONSTENT"], STKL, KRV, PKV, PKPV, satz_an, satz_ag
+    )
+    zve = zre4 - ztabfb - vsp
+    zve = np.where(zve < 100, 0, zve)
+    st_so = _tarif(zve, kztab, STKL)
+    wvfrbm = np.maximum(zve - GFB * 100, 0)
+
+    sts = _down((st_so - st_oso) * f, 1000) * 100
+
+    # STSMIN
+    negativ = sts < 0
+    mit_mbv = negativ & (MBV != 0)
+    lstlzz = np.where(mit_mbv, np.maximum(t["LSTLZZ"] + sts, 0), t["LSTLZZ"])
+    solzlzz = t["SOLZLZZ"]
+    solzlzz = np.where(mit_mbv, np.maximum(_down(solzlzz * 1000 + sts * 55, 1000), 0), solzlzz)
+    bk = np.where(mit_mbv, np.maximum(t["BK"] + sts, 0), t["BK"])
+    sts = np.where(negativ, 0, sts)
+
+    # MSOLZSTS
+    solzszve = np.where(zkf10 > 0, zve - kfb, zve)
+    solzsbmg = _tarif(solzszve, kztab, STKL) * f // 1000
+    solzs = np.where(solzsbmg > t["solzfrei"], sts * 55 // 1000, 0)
+    bks = np.where(R > 0, sts * np.where(R == 1, 9, 8) // 100, 0)
+
+    return {
+        "BK": bk,
+        "BKS": bks,
+        "LSTLZZ": lstlzz,
+        "SOLZLZZ": solzlzz,
+        "SOLZS": solzs,
+        "STS": sts,
+        "VKVSONST": vkv_so - vkv_oso,
+        "VFRBS1": vfrbs1,
+        "VFRBS2": vfrbs2,
+        "WVFRBO": wvfrbo,
+        "WVFRBM": wvfrbm,
+    }
+
+
+def calculate_batch(columns: Mapping) -> Dict[str, np.ndarray]:
+    """Berechnet den PAP Lohnsteuer 2025 spaltenweise für viele Arbeitnehmer
+
+    ``columns`` bildet die Eingabenamen (RE4, STKL, LZZ, ...) auf gleich lange Spalten
+    (Listen oder Arrays) ab; Skalare gelten für alle Zeilen, fehlende Eingaben sind 0
+    (``af`` 1, ``f`` 1.0). Geliefert werden die Ausgaben (LSTLZZ, SOLZLZZ, BK, STS, ...)
+    als ``int64``-Spalten in Cent.
+    """
+    laengen = {
+        len(wert)
+        for wert in columns.values()
+        if isinstance(wert, (list, tuple)) or np.ndim(wert) == 1
+    }
+    if len(laengen) > 1:
+        raise ValueError(f"Spalten unterschiedlicher Länge: {sorted(laengen)}")
+    anzahl = laengen.pop() if laengen else 1
+    s = _spalten(columns, anzahl)
+
+    STKL = s["STKL"]
+    LZZ = s["LZZ"]
+    KRV = s["KRV"]
+    PKV = s["PKV"]
+    PKPV = s["PKPV"]
+    R = s["R"]
+    MBV = s["MBV"]
+    zkf10 = _skaliert(s["ZKF"], _FAKTOREN["ZKF"], "ZKF")
+    f = np.where(s["af"] == 0, 1000, _skaliert(s["f"], _FAKTOREN["f"], "f"))
+
+    # MPARA: Sätze in Millionstel
+    pvsatzan = np.where(s["PVS"] == 1, 23000, 18000)
+    pvsatzan = np.where(s["PVZ"] == 1, pvsatzan + 6000, pvsatzan - _skaliert(s["PVA"], _FAKTOREN["PVA"], "PVA"))
+    satz_an = _skaliert(s["KVZ"], _FAKTOREN["KVZ"], "KVZ") + 70000 + pvsatzan
+    satz_ag = 82500 + np.where(s["PVS"] == 1, 13000, 18000)
+
+    # MRE4JL
+    def auf_jahr(wert):
+        return np.select(
+            [LZZ == 1, LZZ == 2, LZZ == 3], [wert, wert * 12, _down(wert * 360, 7)], wert * 360
+        )
+
+    zre4j = auf_jahr(s["RE4"])
+    zvbezj = auf_jahr(s["VBEZ"])
+
+    # MRE4, MRE4ALTE, MRE4ABZ
+    fvb, _, fvbz, _ = _mre4(zvbezj, 0, LZZ == 1, s["VBEZM"], s["VBEZS"], s["ZMVB"], s["VJAHR"])
+    alte = _mre4alte(zre4j, zvbezj, s["ALTER1"], s["AJAHR"])
+    zre4 = np.maximum(zre4j - fvb - alte - auf_jahr(s["LZZFREIB"]) + auf_jahr(s["LZZHINZU"]), 0)
+    zvbez = np.maximum(zvbezj - fvb, 0)
+
+    # MBERECH
+    anp, fvbz, kztab, kfb, ztabfb = _mztabfb(zvbez, zre4, fvbz, STKL, zkf10)
+    vfrb = anp + fvb + fvbz
+    vsp, vkv = _vsp(zre4j, STKL, KRV, PKV, PKPV, satz_an, satz_ag)
+    zve = zre4 - ztabfb - vsp
+    zve = np.where(zve < 100, 0, zve)
+    lstjahr = _tarif(zve, kztab, STKL) * f // 1000
+    wvfrb = np.maximum(zve - GFB * 100, 0)
+    lstlzz = _anteil(lstjahr * 100, LZZ)
+    vkvlzz = _anteil(vkv, LZZ)
+    jbmg = np.where(
+        zkf10 > 0, _tarif(zre4 - ztabfb - kfb - vsp, kztab, STKL) * f // 1000, lstjahr
+    )
+
+    # MSOLZ
+    solzfrei = SOLZFREI * kztab
+    solzj = np.minimum(jbmg * 55 // 10, (jbmg - solzfrei) * 119 // 10)
+    solzlzz = np.where(jbmg > solzfrei, _anteil(solzj, LZZ), 0)
+    bk = np.where(R > 0, _anteil(jbmg * np.where(R == 1, 9, 8), LZZ), 0)
+
+    ergebnis = {name: np.zeros(anzahl, dtype=np.int64) for name in OUTPUTS}
+    ergebnis.update(BK=bk, LSTLZZ=lstlzz, SOLZLZZ=solzlzz, VKVLZZ=vkvlzz, VFRB=vfrb, WVFRB=wvfrb)
+
+    # MSONST nur für die Zeilen mit sonstigen Bezügen
+    zeilen = np.flatnonzero((s["SONSTB"] != 0) | (MBV != 0))
+    if zeilen.size:
+        t = {name: spalte[zeilen] for name, spalte in s.items()}
+        t.update(
+            zkf10=zkf10[zeilen], f=f[zeilen], satz_an=satz_an[zeilen], satz_ag=satz_ag[zeilen],
+            solzfrei=solzfrei[zeilen], LSTLZZ=lstlzz[zeilen], SOLZLZZ=solzlzz[zeilen], BK=bk[zeilen],
+        )
+        for name, werte in _msonst(t).items():
+            ergebnis[name][zeilen] = werte
+    return ergebnis
@@ -0,0 +1,549 @@
+"""
+Ganzzahliger Rechenkern für den PAP Lohnsteuer 2025
+
+Rechnet dieselben Schritte wie ``TaxCalculator2025`` bzw. der übersetzte PAP, aber auf
+skalierten ``int``-Werten statt auf ``Decimal``:
+
+- Euro-Beträge werden in Cent gehalten (``12345`` entspricht 123,45 €),
+- Beitragssätze in Millionstel (``93000`` entspricht 0,093),
+- die Tabellenwerte TAB1/TAB4 in Tausendstel, der Faktor ``f`` ebenfalls.
+
+Jede ``setScale``-Stelle des PAP wird durch eine ganzzahlige Division mit derselben
+Rundungsrichtung ersetzt (ROUND_DOWN = zur Null hin, ROUND_UP = von der Null weg).
+Die Ausgabewerte werden erst am Ende wieder in ``Decimal`` gewandelt und tragen dabei
+dieselbe Anzahl Nachkommastellen (und dasselbe Vorzeichen einer Null) wie beim
+Decimal-Rechenkern, die Ergebnisse sind also auch als Zeichenkette identisch.
+
+Eingaben, die sich nicht exakt skalieren lassen (z.B. Cent-Beträge mit Nachkommastellen),
+lösen ``NotRepresentableError`` aus; ``engines.calculate`` rechnet diese mit dem
+Decimal-Rechenkern.
+"""
+
+from decimal import Decimal
+from typing import Dict
+
+import tarif_tabellen
+
+INPUTS = (
+    "af", "AJAHR", "ALTER1", "f", "JFREIB", "JHINZU", "JRE4", "JRE4ENT", "JVBEZ",
+    "KRV", "KVZ", "LZZ", "LZZFREIB", "LZZHINZU", "MBV", "PKPV", "PKV", "PVA", "PVS",
+    "PVZ", "R", "RE4", "SONSTB", "SONSTENT", "STERBE", "STKL", "VBEZ", "VBEZM",
+    "VBEZS", "VBS", "VJAHR", "ZKF", "ZMVB",
+)
+OUTPUTS = (
+    "BK", "BKS", "LSTLZZ", "SOLZLZZ", "SOLZS", "STS", "VKVLZZ", "VKVSONST",
+    "VFRB", "VFRBS1", "VFRBS2", "WVFRB", "WVFRBO", "WVFRBM",
+)
+
+# Prozentsatz Versorgungsfreibetrag / Altersentlastungsbetrag in Tausendstel
+TAB1 = (
+    0, 400, 384, 368, 352, 336, 320, 304, 288, 272, 256, 240, 224, 208, 192, 176, 160,
+    152, 144, 140, 136, 132, 128, 124, 120, 116, 112, 108, 104, 100, 96, 92, 88, 84,
+    80, 76, 72, 68, 64, 60, 56, 52, 48, 44, 40, 36, 32, 28, 24, 20, 16, 12, 8, 4, 0,
+)
+TAB4 = TAB1
+# Höchstbetrag Versorgungsfreibetrag in Cent
+TAB2 = tuple(euro * 100 for euro in (
+    0, 3000, 2880, 2760, 2640, 2520, 2400, 2280, 2160, 2040, 1920, 1800, 1680, 1560,
+    1440, 1320, 1200, 1140, 1080, 1050, 1020, 990, 960, 930, 900, 870, 840, 810, 780,
+    750, 720, 690, 660, 630, 600, 570, 540, 510, 480, 450, 420, 390, 360, 330, 300,
+    270, 240, 210, 180, 150, 120, 90, 60, 30, 0,
+))
+# Zuschlag zum Versorgungsfreibetrag in Cent
+TAB3 = tuple(euro * 100 for euro in (
+    0, 900, 864, 828, 792, 756, 720, 684, 648, 612, 576, 540, 504, 468, 432, 396, 360,
+    342, 324, 315, 306, 297, 288, 279, 270, 261, 252, 243, 234, 225, 216, 207, 198,
+    189, 180, 171, 162, 153, 144, 135, 126, 117, 108, 99, 90, 81, 72, 63, 54, 45, 36,
+    27, 18, 9, 0,
+))
+# Höchstbetrag Altersentlastungsbetrag in Cent
+TAB5 = tuple(euro * 100 for euro in (
+    0, 1900, 1824, 1748, 1672, 1596, 1520, 1444, 1368, 1292, 1216, 1140, 1064, 988,
+    912, 836, 760, 722, 684, 665, 646, 627, 608, 589, 570, 551, 532, 513, 494, 475,
+    456, 437, 418, 399, 380, 361, 342, 323, 304, 285, 266, 247, 228, 209, 190, 171,
+    152, 133, 114, 95, 76, 57, 38, 19, 0,
+))
+
+# MPARA (Beträge in Cent bzw. Euro, wie vom Tarif verwendet)
+BBGRV = 9660000
+BBGKVPV = 6615000
+GFB = 12096  # Euro
+SOLZFREI = 19950  # Euro
+W1STKL5 = 13785  # Euro
+W2STKL5 = 34240  # Euro
+W3STKL5 = 222260  # Euro
+
+_SKALA_SATZ = 1000000
+_NACHKOMMA = {0: "", -1: ".0", -2: ".00"}
+_D0 = Decimal(0)
+_D_MINUS_0 = Decimal("-0")
+
+_faktoren: Dict[float, int] = {}
+
+
+class NotRepresentableError(ValueError):
+    """Eingabe lässt sich nicht exakt als skalierte Ganzzahl darstellen"""
+
+
+def _down(zaehler: int, nenner: int) -> int:
+    """Ganzzahlige Division mit ROUND_DOWN (zur Null hin)"""
+    if zaehler >= 0:
+        return zaehler // nenner
+    return -(-zaehler // nenner)
+
+
+def _up(zaehler: int, nenner: int) -> int:
+    """Ganzzahlige Division mit ROUND_UP (von der Null weg)"""
+    if zaehler >= 0:
+        return -(-zaehler // nenner)
+    return zaehler // nenner
+
+
+def _euro_up(cent: int) -> int:
+    """Cent-Betrag auf volle Euro mit ROUND_UP (Ergebnis wieder in Cent)"""
+    return _up(cent, 100) * 100
+
+
+def _skaliert(wert, faktor: int, name: str) -> int:
+    if not wert:
+        return 0
+    zahl = wert * faktor
+    ganz = int(zahl)
+    if ganz != zahl:
+        raise NotRepresentableError(f"{name} hat zu viele Nachkommastellen: {wert}")
+    return ganz
+
+
+def _faktor(f: float) -> int:
+    """Faktor f in Tausendstel, wie ``Decimal(repr(f))`` ihn sieht"""
+    skaliert = _faktoren.get(f)
+    if skaliert is None:
+        skaliert = _skaliert(Decimal(repr(f)), 1000, "f")
+        _faktoren[f] = skaliert
+    return skaliert
+
+
+def _anteil(jw: int, lzz: int) -> int:
+    """UPANTEIL: Jahreswert auf den Lohnzahlungszeitraum umrechnen"""
+    if lzz == 1:
+        return jw
+    if lzz == 2:
+        return _down(jw, 12)
+    if lzz == 3:
+        return _down(jw * 7, 360)
+    return _down(jw, 360)
+
+
+def _uptab25(x: int, kztab: int) -> int:
+    """UPTAB25: Einkommensteuertarif, x in Cent, Ergebnis in Euro"""
+    if x < 1209700:
+        st = 0
+    elif x < 1744400:
+        y = x - GFB * 100  # Millionstel
+        st = (y * 93230 + 140000000000) * y // 100000000000000
+    elif x < 6848100:
+        y = x - 1744300
+        st = ((y * 17664 + 239700000000) * y + 101513000000000000) // 100000000000000
+    elif x < 27782600:
+        st = (x * 42 - 109119200) // 10000
+    else:
+        st = (x * 45 - 192466700) // 10000
+    return st * kztab
+
+
+def _up5_6(zx: int) -> int:
+    """UP5_6: Lohnsteuer der Steuerklassen V und VI für zx Euro"""
+    st1 = _uptab25(zx * 125, 1)
+    st2 = _uptab25(zx * 75, 1)
+    diff = (st1 - st2) * 2
+    mist = zx * 14 // 100
+    return mist if mist > diff else diff
+
+
+def _mst5_6(zzx: int) -> int:
+    """MST5_6: Lohnsteuer der Steuerklassen V und VI"""
+    if zzx > W2STKL5:
+        st = _up5_6(W2STKL5)
+        if zzx > W3STKL5:
+            st = (st * 100 + (W3STKL5 - W2STKL5) * 42) // 100
+            return (st * 100 + (zzx - W3STKL5) * 45) // 100
+        return (st * 100 + (zzx - W2STKL5) * 42) // 100
+    st = _up5_6(zzx)
+    if zzx > W1STKL5:
+        vergl = st
+        hoch = (_up5_6(W1STKL5) * 100 + (zzx - W1STKL5) * 42) // 100
+        return hoch if hoch < vergl else vergl
+    return st
+
+
+# Vorberechnete Ergebnisse für ganze Euro-Beträge im Progressionsbereich (tarif_tabellen.py)
+UPTAB25_TABELLE, MST5_6_TABELLE = tarif_tabellen.lade_tabellen(
+    lambda x: _uptab25(x * 100, 1), _mst5_6
+)
+_UPTAB25_GRENZE = len(UPTAB25_TABELLE)
+_MST5_6_GRENZE = len(MST5_6_TABELLE)
+
+
+def _tarif(zve: int, kztab: int, stkl: int) -> int:
+    """UPMLST: Jahreslohnsteuer in Euro für das zu versteuernde Einkommen zve (Cent)"""
+    x = 0 if zve < 100 else zve // (100 * kztab)
+    if stkl < 5:
+        if x < _UPTAB25_GRENZE:
+            return UPTAB25_TABELLE[x] * kztab
+        return _uptab25(x * 100, kztab)
+    if x < _MST5_6_GRENZE:
+        return MST5_6_TABELLE[x]
+    return _mst5_6(x)
+
+
+def _mre4(zvbezj, vbezbso, lzz, VBEZM, VBEZS, ZMVB, VJAHR):
+    """MRE4: Versorgungsfreibeträge, liefert FVB, FVBSO, FVBZ, FVBZSO in Cent"""
+    if zvbezj == 0:
+        return 0, 0, 0, 0
+    j = 1 if VJAHR < 2006 else (VJAHR - 2004 if VJAHR < 2058 else 54)
+    tab1 = TAB1[j]
+    if lzz == 1:
+        vbezb = VBEZM * ZMVB + VBEZS
+        hfvb = _up(TAB2[j] * ZMVB, 1200) * 100
+        fvbz = _up(TAB3[j] * ZMVB, 1200) * 100
+    else:
+        vbezb = VBEZM * 12 + VBEZS
+        hfvb = TAB2[j]
+        fvbz = TAB3[j]
+    fvb = _up(vbezb * tab1, 1000)
+    if fvb > hfvb:
+        fvb = hfvb
+    if fvb > zvbezj:
+        fvb = zvbezj
+    fvbso = _up(fvb * 1000 + vbezbso * tab1, 1000)
+    if fvbso > TAB2[j]:
+        fvbso = TAB2[j]
+    hfvbzso = vbezb + vbezbso - fvbso
+    fvbzso = _euro_up(fvbz + vbezbso)
+    if fvbzso > hfvbzso:
+        fvbzso = _euro_up(hfvbzso)
+    if fvbzso > TAB3[j]:
+        fvbzso = TAB3[j]
+    hfvbz = vbezb - fvb
+    if fvbz > hfvbz:
+        fvbz = _euro_up(hfvbz)
+    return fvb, fvbso, fvbz, fvbzso
+
+
+def _mre4alte(zre4j: int, zvbezj: int, ALTER1: int, AJAHR: int) -> int:
+    """MRE4ALTE: Altersentlastungsbetrag in Cent"""
+    if ALTER1 == 0:
+        return 0
+    k = 1 if AJAHR < 2006 else (AJAHR - 2004 if AJAHR < 2058 else 54)
+    alte = _up((zre4j - zvbezj) * TAB4[k], 100000) * 100
+    return TAB5[k] if alte > TAB5[k] else alte
+
+
+def _mztabfb(zvbez, zre4, fvbz, stkl, zkf10):
+    """MZTABFB: feste Tabellenfreibeträge, liefert ANP, FVBZ, KZTAB, KFB, ZTABFB"""
+    anp = 0
+    if 0 <= zvbez < fvbz:
+        fvbz = zvbez // 100 * 100
+    if stkl < 6:
+        if zvbez > 0:
+            anp = _euro_up(zvbez - fvbz) if zvbez - fvbz < 10200 else 10200
+        if zre4 > zvbez:
+            anp = _euro_up(anp + zre4 - zvbez) if zre4 - zvbez < 123000 else anp + 123000
+    else:
+        fvbz = 0
+    kztab = 1
+    efa = 0
+    sap = 3600
+    if stkl == 1:
+        kfb = zkf10 * 96000
+    elif stkl == 2:
+        efa = 426000
+        kfb = zkf10 * 96000
+    elif stkl == 3:
+        kztab = 2
+        kfb = zkf10 * 96000
+    elif stkl == 4:
+        kfb = zkf10 * 48000
+    else:
+        kfb = 0
+        if stkl != 5:
+            sap = 0
+    return anp, fvbz, kztab, kfb, efa + anp + sap + fvbz
+
+
+def _vsp(zre4vp, stkl, KRV, PKV, PKPV, satz_an, satz_ag):
+    """UPEVP/MVSP: Vorsorgepauschale in Cent, dazu VSP2/VSP3 als Wert mit Stellen und Vorzeichen"""
+    if KRV == 1:
+        vsp1 = 0
+    else:
+        bbgrv = BBGRV if KRV < 1 else 0
+        if zre4vp > bbgrv:
+            zre4vp = bbgrv
+        vsp1 = _down(zre4vp * (93000 if KRV < 1 else 0), _SKALA_SATZ)
+    vsp2 = _down(zre4vp * 12, 100)
+    vsp2_stellen = -2
+    vhb = 300000 if stkl == 3 else 190000
+    if vsp2 > vhb:
+        vsp2 = vhb
+        vsp2_stellen = 0
+    vsp2_negativ = zre4vp < 0 and vsp2 == 0
+    vspn = _euro_up(vsp1 + vsp2)
+    if zre4vp > BBGKVPV:
+        zre4vp = BBGKVPV
+    vsp3_negativ = False
+    if PKV > 0:
+        if stkl == 6:
+            vsp3 = 0
+            vsp3_stellen = 0
+        else:
+            vsp3 = PKPV * 12
+            # Exakte Division PKPV * 12 / 100: Decimal kürzt Nullen bis zum Exponenten 0
+            vsp3_stellen = 0 if vsp3 % 100 == 0 else (-1 if vsp3 % 10 == 0 else -2)
+            if PKV == 2:
+                zaehler = vsp3 * _SKALA_SATZ - zre4vp * satz_ag
+                vsp3 = _down(zaehler, _SKALA_SATZ)
+                vsp3_stellen = -2
+                vsp3_negativ = zaehler < 0 and vsp3 == 0
+    else:
+        vsp3 = _down(zre4vp * satz_an, _SKALA_SATZ)
+        vsp3_stellen = -2
+    vsp = _euro_up(vsp3 + vsp1)
+    if vspn > vsp:
+        vsp = vspn
+    if PKV > 0:
+        # UPVKV
+        if vsp2 > vsp3:
+            vkv = (vsp2, vsp2_stellen, vsp2_negativ)
+        else:
+            vkv = (vsp3, vsp3_stellen, vsp3_negativ)
+    else:
+        vkv = (0, 0, False)
+    return vsp, vkv
+
+
+def _dezimal(wert: int, stellen: int, negativ: bool) -> Decimal:
+    """Ganzzahl mit der Anzahl Nachkommastellen und Vorzeichen des Decimal-Ergebnisses"""
+    if negativ:
+        return Decimal("-0" + _NACHKOMMA[stellen])
+    if stellen == 0:
+        return Decimal(wert)
+    return Decimal(f"{wert}{_NACHKOMMA[stellen]}")
+
+
+def calculate(
+    *, af=1, AJAHR=0, ALTER1=0, f=1.0, JFREIB=0, JHINZU=0, JRE4=0, JRE4ENT=0,
+    JVBEZ=0, KRV=0, KVZ=0, LZZ=0, LZZFREIB=0, LZZHINZU=0, MBV=0, PKPV=0, PKV=0,
+    PVA=0, PVS=0, PVZ=0, R=0, RE4=0, SONSTB=0, SONSTENT=0, STERBE=0, STKL=0, VBEZ=0,
+    VBEZM=0, VBEZS=0, VBS=0, VJAHR=0, ZKF=0, ZMVB=0, **_unbenutzt
+) -> Dict[str, Decimal]:
+    """Berechnet den PAP Lohnsteuer 2025 ganzzahlig und liefert die Ausgabewerte"""
+    af = int(af)
+    AJAHR = int(AJAHR)
+    ALTER1 = int(ALTER1)
+    KRV = int(KRV)
+    LZZ = int(LZZ)
+    PKV = int(PKV)
+    PVS = int(PVS)
+    PVZ = int(PVZ)
+    R = int(R)
+    STKL = int(STKL)
+    VJAHR = int(VJAHR)
+    ZMVB = int(ZMVB)
+    if isinstance(PKPV, Decimal) and PKPV.as_tuple().exponent != 0:
+        # Die Stellen von PKPV bestimmen die Stellen von VKVLZZ/VKVSONST
+        raise NotRepresentableError(f"PKPV muss ohne Exponent angegeben werden: {PKPV}")
+    betraege = (
+        JFREIB, JHINZU, JRE4, JRE4ENT, JVBEZ, LZZFREIB, LZZHINZU, MBV, PKPV, RE4,
+        SONSTB, SONSTENT, STERBE, VBEZ, VBEZM, VBEZS, VBS,
+    )
+    ganzzahlig = tuple(map(int, betraege))
+    if ganzzahlig != betraege:
+        raise NotRepresentableError(f"Cent-Beträge müssen ganzzahlig sein: {betraege}")
+    (
+        JFREIB, JHINZU, JRE4, JRE4ENT, JVBEZ, LZZFREIB, LZZHINZU, MBV, PKPV, RE4,
+        SONSTB, SONSTENT, STERBE, VBEZ, VBEZM, VBEZS, VBS,
+    ) = ganzzahlig
+    zkf10 = _skaliert(ZKF, 10, "ZKF")
+    f = _faktor(1.0 if af == 0 else float(f))
+
+    # MPARA: Sätze in Millionstel
+    kvsatzan = _skaliert(KVZ, 5000, "KVZ") + 70000
+    if PVS == 1:
+        pvsatzan = 23000
+        pvsatzag = 13000
+    else:
+        pvsatzan = 18000
+        pvsatzag = 18000
+    if PVZ == 1:
+        pvsatzan += 6000
+    else:
+        pvsatzan -= _skaliert(PVA, 2500, "PVA")
+    satz_an = kvsatzan + pvsatzan
+    satz_ag = 82500 + pvsatzag
+
+    # MRE4JL
+    if LZZ == 1:
+        zre4j, zvbezj, jlfreib, jlhinzu = RE4, VBEZ, LZZFREIB, LZZHINZU
+    elif LZZ == 2:
+        zre4j, zvbezj, jlfreib, jlhinzu = RE4 * 12, VBEZ * 12, LZZFREIB * 12, LZZHINZU * 12
+    elif LZZ == 3:
+        zre4j = _down(RE4 * 360, 7)
+        zvbezj = _down(VBEZ * 360, 7)
+        jlfreib = _down(LZZFREIB * 360, 7)
+        jlhinzu = _down(LZZHINZU * 360, 7)
+    else:
+        zre4j, zvbezj, jlfreib, jlhinzu = RE4 * 360, VBEZ * 360, LZZFREIB * 360, LZZHINZU * 360
+
+    # MRE4, MRE4ALTE, MRE4ABZ
+    fvb, _, fvbz, _ = _mre4(zvbezj, 0, LZZ, VBEZM, VBEZS, ZMVB, VJAHR)
+    alte = _mre4alte(zre4j, zvbezj, ALTER1, AJAHR)
+    zre4 = zre4j - fvb - alte - jlfreib + jlhinzu
+    if zre4 < 0:
+        zre4 = 0
+    zvbez = zvbezj - fvb
+    if zvbez < 0:
+        zvbez = 0
+
+    # MBERECH
+    anp, fvbz, kztab, kfb, ztabfb = _mztabfb(zvbez, zre4, fvbz, STKL, zkf10)
+    vfrb = anp + fvb + fvbz
+    vsp, vkv = _vsp(zre4j, STKL, KRV, PKV, PKPV, satz_an, satz_ag)
+    zve = zre4 - ztabfb - vsp
+    if zve < 100:
+        zve = 0
+    st = _tarif(zve, kztab, STKL)
+    wvfrb = zve - GFB * 100
+    if wvfrb < 0:
+        wvfrb = 0
+    lstjahr = st * f // 1000
+    lstlzz = _anteil(lstjahr * 100, LZZ)
+    vkv_wert, vkv_stellen, vkv_negativ = vkv
+    if LZZ == 1:
+        vkvlzz = _dezimal(vkv_wert, vkv_stellen, vkv_negativ)
+    else:
+        anteil = _anteil(vkv_wert, LZZ)
+        vkvlzz = _dezimal(anteil, 0, anteil == 0 and (vkv_wert < 0 or vkv_negativ))
+    if zkf10 > 0:
+        st = _tarif(zre4 - ztabfb - kfb - vsp, kztab, STKL)
+        jbmg = st * f // 1000
+    else:
+        jbmg = lstjahr
+
+    # MSOLZ
+    solzfrei = SOLZFREI * kztab
+    if jbmg > solzfrei:
+        solzj = jbmg * 55 // 10
+        solzmin = (jbmg - solzfrei) * 119 // 10
+        if solzmin < solzj:
+            solzj = solzmin
+        solzlzz = _anteil(solzj, LZZ)
+    else:
+        solzlzz = 0
+    bk = _anteil(jbmg * (9 if R == 1 else 8), LZZ) if R > 0 else 0
+
+    # MSONST
+    if ZMVB == 0:
+        ZMVB = 12
+    if SONSTB == 0 and MBV == 0:
+        return {
+            "BK": Decimal(bk), "BKS": _D0, "LSTLZZ": Decimal(lstlzz),
+            "SOLZLZZ": Decimal(solzlzz), "SOLZS": _D0, "STS": _D0, "VKVLZZ": vkvlzz,
+            "VKVSONST": _D0, "VFRB": Decimal(vfrb), "VFRBS1": _D0, "VFRBS2": _D0,
+            "WVFRB": Decimal(wvfrb), "WVFRBO": _D0, "WVFRBM": _D0,
+        }
+
+    # MOSONST
+    zre4j = JRE4
+    zvbezj = JVBEZ
+    fvb, _, fvbz, _ = _mre4(zvbezj, 0, 1, VBEZM, VBEZS, ZMVB, VJAHR)
+    alte = _mre4alte(zre4j, zvbezj, ALTER1, AJAHR)
+    zre4 = zre4j - fvb - alte - JFREIB + JHINZU
+    if zre4 < 0:
+        zre4 = 0
+    zvbez = zvbezj - fvb
+    if zvbez < 0:
+        zvbez = 0
+    anp, fvbz, kztab, kfb, ztabfb = _mztabfb(zvbez, zre4, fvbz, STKL, zkf10)
+    vfrbs1 = anp + fvb + fvbz
+    vsp, vkv_oso = _vsp(zre4j - JRE4ENT, STKL, KRV, PKV, PKPV, satz_an, satz_ag)
+    zve = zre4 - ztabfb - vsp
+    if zve < 100:
+        zve = 0
+    st_oso = _tarif(zve, kztab, STKL)
+    wvfrbo = zve - GFB * 100
+
+    # MRE4SONST
+    zre4j = JRE4 + SONSTB
+    zvbezj = JVBEZ + VBS
+    _, fvb, _, fvbz = _mre4(zvbezj, STERBE, 1, VBEZM, VBEZS, ZMVB, VJAHR)
+    alte = _mre4alte(zre4j, zvbezj, ALTER1, AJAHR)
+    zre4 = zre4j - fvb - alte - JFREIB + JHINZU
+    if zre4 < 0:
+        zre4 = 0
+    zvbez = zvbezj - fvb
+    if zvbez < 0:
+        zvbez = 0
+    anp, fvbz, kztab, kfb, ztabfb = _mztabfb(zvbez, zre4, fvbz, STKL, zkf10)
+    vfrbs2 = anp + fvb + fvbz - vfrbs1
+    vsp, vkv_so = _vsp(zre4j + MBV - JRE4ENT - SONSTENT, STKL, KRV, PKV, PKPV, satz_an, satz_ag)
+    zve = zre4 - ztabfb - vsp
+    if zve < 100:
+        zve = 0
+    st_so = _tarif(zve, kztab, STKL)
+    wvfrbm = zve - GFB * 100
+
+    vkv_oso_wert, vkv_oso_stellen, vkv_oso_negativ = vkv_oso
+    vkv_so_wert, vkv_so_stellen, vkv_so_negativ = vkv_so
+    vkvsonst = _dezimal(
+        vkv_so_wert - vkv_oso_wert,
+        min(vkv_so_stellen, vkv_oso_stellen),
+        vkv_so_negativ and not vkv_oso_negativ and vkv_oso_wert == 0,
+    )
+    # STS = (LSTSO - LSTOSO) * f / 100 mit ROUND_DOWN, in Euro; -0 bleibt bei Decimal erhalten
+    sts_zaehler = (st_so - st_oso) * f
+    sts = _down(sts_zaehler, 1000) * 100
+    sts_negativ = sts_zaehler < 0 and sts == 0
+    solzlzz_negativ = False
+    solzs_negativ = False
+    if sts < 0:
+        # STSMIN
+        if MBV != 0:
+            lstlzz += sts
+            if lstlzz < 0:
+                lstlzz = 0
+            solz_zaehler = solzlzz * 1000 + sts * 55
+            solzlzz = _down(solz_zaehler, 1000)
+            solzlzz_negativ = solz_zaehler < 0 and solzlzz == 0
+            if solzlzz < 0:
+                solzlzz = 0
+            bk += sts
+            if bk < 0:
+                bk = 0
+        sts = 0
+        solzs = 0
+    else:
+        # MSOLZSTS
+        solzszve = zve - kfb if zkf10 > 0 else zve
+        if _tarif(solzszve, kztab, STKL) * f // 1000 > solzfrei:
+            solzs = sts * 55 // 1000
+            solzs_negativ = sts_negativ
+        else:
+            solzs = 0
+    bks = sts * (9 if R == 1 else 8) // 100 if R > 0 else 0
+
+    return {
+        "BK": Decimal(bk),
+        "BKS": _D_MINUS_0 if sts_negativ and R > 0 else Decimal(bks),
+        "LSTLZZ": Decimal(lstlzz),
+        "SOLZLZZ": _D_MINUS_0 if solzlzz_negativ else Decimal(solzlzz),
+        "SOLZS": _D_MINUS_0 if solzs_negativ else Decimal(solzs),
+        "STS": _D_MINUS_0 if sts_negativ else Decimal(sts),
+        "VKVLZZ": vkvlzz,
+        "VKVSONST": vkvsonst,
+        "VFRB": Decimal(vfrb),
+        "VFRBS1": _dezimal(vfrbs1, -2, False),
+        "VFRBS2": _dezimal(vfrbs2, -2, False),
+        "WVFRB": Decimal(wvfrb),
+        "WVFRBO": _D0 if wvfrbo < 0 else _dezimal(wvfrbo, -2, False),
+        "WVFRBM": _D0 if wvfrbm < 0 else _dezimal(wvfrbm, -2, False),
+    }
@@ -0,0 +1,94 @@
+"""
+Steuerkurven: LSTLZZ, SOLZLZZ und BK über einen Bereich von RE4 in einem Aufruf
+
+Alle Punkte der Kurve werden mit dem NumPy-Rechenkern zusammen berechnet. Für Diagramme
+kann die Kurve mit Largest-Triangle-Three-Buckets (LTTB) auf ein Punktebudget reduziert
+werden; dabei bleiben Knicke der Gesamtbelastung erhalten.
+"""
+
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import tax_calculator_batch
+from engines import calculate_pap_batch, fixed_point
+from tax_calculator_int import NotRepresentableError
+
+CURVE_OUTPUTS = ("LSTLZZ", "SOLZLZZ", "BK")
+
+
+def downsample_lttb(x: np.ndarray, y: np.ndarray, budget: int) -> np.ndarray:
+    """Indizes von höchstens ``budget`` Punkten nach LTTB, erster und letzter Punkt bleiben"""
+    n = len(x)
+    if budget >= n:
+        return np.arange(n)
+    if budget < 3:
+        raise ValueError("Das Punktebudget muss mindestens 3 sein")
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    # Innere Punkte auf budget - 2 gleich große Eimer verteilt
+    grenzen = np.linspace(1, n - 1, budget - 1).astype(np.int64)
+    indizes = np.empty(budget, dtype=np.int64)
+    indizes[0], indizes[-1] = 0, n - 1
+    a = 0
+    for i in range(budget - 2):
+        von, bis = grenzen[i], grenzen[i + 1]
+        # Schwerpunkt des nächsten Eimers (beim letzten: der letzte Punkt)
+        n_von, n_bis = bis, grenzen[i + 2] if i + 2 < len(grenzen) else n
+        cx, cy = x[n_von:n_bis].mean(), y[n_von:n_bis].mean()
+        flaeche = np.abs(
+            (x[a] - cx) * (y[von:bis] - y[a]) - (x[a] - x[von:bis]) * (cy - y[a])
+        )
+        a = von + int(np.argmax(flaeche))
+        indizes[i + 1] = a
+    return indizes
+
+
+def _ausgaben(profile: Dict, re4: np.ndarray) -> Dict[str, np.ndarray]:
+    columns = {
+        name: float(wert) if isinstance(wert, Decimal) else wert
+        for name, wert in profile.items()
+        if name in tax_calculator_batch.INPUTS and name != "RE4"
+    }
+    if fixed_point(profile):
+        try:
+            out = tax_calculator_batch.calculate_batch(dict(columns, RE4=re4))
+            return {name: out[name] for name in CURVE_OUTPUTS}
+        except NotRepresentableError:
+            pass
+    # Beträge mit Cent-Bruchteilen oder andere Jahre als 2025: zeilenweise, exakt mit Decimal
+    rows = [dict(profile, RE4=Decimal(wert)) for wert in re4.tolist()]
+    results = calculate_pap_batch(rows, "int")
+    return {
+        name: np.array([int(r[name]) for r in results], dtype=np.int64)
+        for name in CURVE_OUTPUTS
+    }
+
+
+def tax_curve(
+    profile: Dict, re4_from: int, re4_to: int, re4_step: int, max_points: Optional[int] = None
+) -> Dict[str, List]:
+    """Kurve für RE4 = re4_from, re4_from + re4_step, ... bis höchstens re4_to (Cent)
+
+    Liefert je Punkt RE4, LSTLZZ, SOLZLZZ, BK (Cent), den Durchschnittssatz
+    ``(LSTLZZ + SOLZLZZ + BK) / RE4`` und den Grenzsatz als Steigung der Gesamtbelastung
+    zwischen den Nachbarpunkten, beide vor dem Ausdünnen auf ``max_points`` berechnet.
+    """
+    re4 = np.arange(re4_from, re4_to + 1, re4_step, dtype=np.int64)
+    out = _ausgaben(profile, re4)
+    gesamt = out["LSTLZZ"] + out["SOLZLZZ"] + out["BK"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        average = np.where(re4 > 0, gesamt / np.maximum(re4, 1), 0.0)
+    marginal = np.gradient(gesamt.astype(np.float64), re4) if len(re4) > 1 else np.zeros(len(re4))
+
+    auswahl = slice(None)
+    if max_points and max_points < len(re4):
+        auswahl = downsample_lttb(re4, gesamt, max_points)
+    return {
+        "RE4": re4[auswahl].tolist(),
+        **{name: out[name][auswahl].tolist() for name in CURVE_OUTPUTS},
+        "average_rate": np.round(average[auswahl], 6).tolist(),
+        "marginal_rate": np.round(marginal[auswahl], 6).tolist(),
+        "computed_points": len(re4),
+    }
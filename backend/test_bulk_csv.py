@@ -0,0 +1,129 @@
+import csv
+import io
+from decimal import Decimal
+
+import pytest
+
+from bulk_csv import (
+    RESULT_COLUMNS,
+    BulkFormatError,
+    RecordSplitter,
+    iter_chunks,
+    parse_header,
+    process_chunk,
+    process_file,
+)
+from engines import calculate_pap
+from payroll_input import validate_payroll_items, validate_payroll_row
+
+FIELDS = ("RE4", "STKL", "LZZ", "R", "KVZ", "name")
+REQUIRED = ("RE4", "STKL", "LZZ")
+
+
+def _validate(values):
+    if "RE4" not in values:
+        raise ValueError("RE4 fehlt")
+    data = {name: Decimal(v) for name, v in values.items() if name in ("RE4", "KVZ")}
+    data.update({name: int(v) for name, v in values.items() if name in ("STKL", "LZZ", "R")})
+    return data
+
+
+def test_splitter_keeps_quoted_newlines_across_pieces():
+    text = 'RE4,name\r\n100,"Meier,\nAnna"\n200,"x""y"\n\n300,z'
+    for size in (1, 2, 3, 7, len(text)):
+        splitter = RecordSplitter()
+        records = []
+        for start in range(0, len(text), size):
+            records += splitter.feed(text[start : start + size])
+        records += splitter.close()
+        assert records == ["RE4,name", '100,"Meier,\nAnna"', '200,"x""y"', "300,z"]
+
+    splitter = RecordSplitter()
+    splitter.feed('1,"offen\n')
+    with pytest.raises(BulkFormatError):
+        splitter.close()
+
+
+def test_header_validation():
+    assert parse_header(" RE4,STKL,LZZ", FIELDS, REQUIRED) == ["RE4", "STKL", "LZZ"]
+    for header in ("RE4,STKL", "RE4,STKL,LZZ,XYZ", "RE4,STKL,LZZ,RE4"):
+        with pytest.raises(BulkFormatError):
+            parse_header(header, FIELDS, REQUIRED)
+
+
+def test_chunk_results_and_errors():
+    columns = ["name", "RE4", "STKL", "LZZ", "R", "KVZ"]
+    records = [
+        '"Meier, Anna",400000,1,2,1,1.7',
+        "Kurz,300000,3,2,,",
+        "Fehler,,1,2,0,0",
+        "zu,wenig",
+    ]
+    text, failed = process_chunk(columns, records, _validate)
+    assert failed == 2
+    rows = list(csv.reader(io.StringIO(text)))
+    assert len(rows) == 4
+    expected = calculate_pap(
+        {"RE4": Decimal(400000), "STKL": 1, "LZZ": 2, "R": 1, "KVZ": Decimal("1.7")}
+    )
+    result = dict(zip(RESULT_COLUMNS, rows[0][len(columns) :]))
+    assert rows[0][:2] == ["Meier, Anna", "400000"]
+    assert {k: Decimal(v) for k, v in result.items() if v} == {
+        k: v for k, v in expected.items() if v is not None
+    }
+    assert rows[0][-1] == "" and rows[1][-1] == ""
+    assert rows[2][-1] == "RE4 fehlt" and rows[2][len(columns)] == ""
+    assert rows[3][-1] == "2 statt 6 Spalten"
+
+
+def test_process_file_in_small_chunks():
+    lines = ["RE4,STKL,LZZ"] + [f"{100000 + i * 997},{1 + i % 6},2" for i in range(250)]
+    source = io.StringIO("\n".join(lines) + "\n")
+    target = io.StringIO()
+    stats = process_file(source, target, _validate, FIELDS, REQUIRED, chunk_rows=64)
+    assert stats == {"rows": 250, "failed": 0}
+
+    output = target.getvalue().splitlines()
+    assert output[0].split(",") == ["RE4", "STKL", "LZZ", *RESULT_COLUMNS, "error"]
+    assert [line.split(",")[0] for line in output[1:]] == [line.split(",")[0] for line in lines[1:]]
+    last = dict(zip(output[0].split(","), output[-1].split(",")))
+    expected = calculate_pap({"RE4": Decimal(lines[-1].split(",")[0]), "STKL": 4, "LZZ": 2})
+    assert Decimal(last["LSTLZZ"]) == expected["LSTLZZ"]
+
+    assert [len(c) for c in iter_chunks(io.StringIO("\n".join(lines)), 100)] == [100, 100, 51]
+    with pytest.raises(BulkFormatError):
+        process_file(io.StringIO(""), io.StringIO(), _validate, FIELDS, REQUIRED)
+
+
+def _process_chunk_without_main(columns, records):
+    import sys
+
+    text, failed = process_chunk(columns, records, validate_payroll_row)
+    return text, failed, "main" in sys.modules
+
+
+def test_validator_does_not_load_main_in_worker():
+    """Der Validator der API wird im Prozess-Pool ohne ``main`` (App, Pools, mmap-Dateien) geladen"""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(1, mp_context=context) as pool:
+        text, failed, main_loaded = pool.submit(
+            _process_chunk_without_main, ["RE4", "STKL", "LZZ"], ["400000,1,2", "-1,1,2"]
+        ).result()
+    assert failed == 1 and not main_loaded
+    assert "Eingabefehler: RE4" in text
+
+
+def test_validate_payroll_items_keeps_indices():
+    valid, errors = validate_payroll_items(
+        [
+            {"RE4": 300000, "STKL": 1, "LZZ": 2},
+            {"RE4": -1, "STKL": 1, "LZZ": 2},
+            {"RE4": 250000, "STKL": 3, "LZZ": 2},
+        ]
+    )
+    assert [index for index, _ in valid] == [0, 2]
+    assert valid[1][1]["RE4"] == Decimal("250000")
+    assert errors[0][0] == 1 and errors[0][1].startswith("Eingabefehler: RE4")
@@ -1,6 +1,9 @@
+import csv
+import io
 import pytest
 from decimal import Decimal
-from tax_calculator import TaxCalculator2025
+from tax_calculator import PAP2025, PAPTrace, TaxCalculator2025, calculate_traced
+import main
 from main import app
 from fastapi.testclient import TestClient
 
@@ -139,6 +142,71 @@ class TestTaxCalculator2025:
         )
 
 
+class TestParameter:
+    """Tests für die geteilten PAP-Parameter und den MPARA-Cache"""
+
+    def test_instances_share_constants(self):
+        """Tabellen und Zahlen werden nicht je Instanz neu angelegt"""
+        first = TaxCalculator2025(RE4=Decimal(300000), STKL=1)
+        second = TaxCalculator2025(RE4=Decimal(500000), STKL=3)
+        assert first.TAB1 is second.TAB1 is PAP2025.TAB1
+        assert first.ZAHL100 is second.ZAHL100
+        assert not hasattr(first, "__dict__")
+        with pytest.raises(AttributeError):
+            PAP2025.GFB = Decimal(0)
+
+    def test_mpara_cache_keeps_decimal_places(self):
+        """KVZ mit unterschiedlichen Stellen liefert die Sätze wie ohne Cache"""
+        for kvz in ("2", "2.00", "2.5", "1.7", "2"):
+            calculator = TaxCalculator2025(KVZ=Decimal(kvz), PVA=Decimal("1"), KRV=0)
+            calculator.MPARA()
+            expected = (Decimal(kvz) / Decimal(2) / Decimal(100)) + Decimal("0.07")
+            assert str(calculator.KVSATZAN) == str(expected)
+            assert calculator.PVSATZAN == Decimal("0.018") - Decimal("0.0025")
+            assert calculator.BBGRV == Decimal(96600)
+
+        calculator = TaxCalculator2025(KRV=1, PVS=1, PVZ=1)
+        calculator.MPARA()
+        assert calculator.BBGRV == 0
+        assert calculator.PVSATZAN == Decimal("0.029")
+        assert calculator.PVSATZAG == Decimal("0.013")
+
+
+class TestTrace:
+    """Tests für die Ablaufverfolgung des PAP"""
+
+    def test_trace_records_methods_and_values(self):
+        """Methodeneintritte und Zwischenwerte, Ergebnis wie ohne Verfolgung"""
+        data = {"RE4": Decimal(500000), "STKL": 1, "LZZ": 2, "SONSTB": Decimal(100000)}
+        result, trace = calculate_traced(data)
+        assert result == TaxCalculator2025(**data).calculate()
+
+        entered = [e["method"] for e in trace.events if e["event"] == "enter"]
+        assert entered[:3] == ["calculate", "MPARA", "MRE4JL"]
+        assert {"MBERECH", "MLSTJAHR", "UPTAB25", "MSONST"} <= set(entered)
+
+        values = {}
+        for event in trace.events:
+            if event["event"] == "set":
+                values.update(event["values"])
+        mre4jl = next(e for e in trace.events if e["event"] == "set" and e["method"] == "MRE4JL")
+        assert mre4jl["values"]["ZRE4J"] == "60000.00"
+        assert values["LSTLZZ"] == str(result["LSTLZZ"])
+        assert {"ZVE", "X", "ST", "JBMG"} <= set(values)
+        assert trace.dropped == 0
+
+    def test_trace_is_bounded(self):
+        """Einträge über dem Limit werden verworfen und gezählt"""
+        _, trace = calculate_traced({"RE4": Decimal(500000), "STKL": 6}, limit=5)
+        assert len(trace.events) == 5
+        assert trace.dropped > 0
+        assert trace.as_dict()["dropped"] == trace.dropped
+
+        trace = PAPTrace(limit=0)
+        trace.record({"event": "enter"})
+        assert trace.events == [] and trace.dropped == 1
+
+
 class TestAPIEndpoints:
     """Tests für die FastAPI Endpunkte"""
 
@@ -179,6 +247,291 @@ class TestAPIEndpoints:
         # Sollte entweder 422 (Validation Error) oder 500 (Server Error) sein
         assert response.status_code in [422, 500]
 
+    def test_calculate_endpoint_trace(self):
+        """Ablaufverfolgung per Parameter oder Header, sonst kein Feld trace"""
+        data = {"RE4": 350000, "STKL": 1, "LZZ": 2, "KVZ": 1.7}
+        plain = client.post("/api/v1/calculate_payroll_tax", json=data).json()
+        assert "trace" not in plain
+
+        for url, headers in (
+            ("/api/v1/calculate_payroll_tax?trace=true", {}),
+            ("/api/v1/calculate_payroll_tax", {"X-PAP-Trace": "1"}),
+        ):
+            response = client.post(url, json=data, headers=headers)
+            assert response.status_code == 200
+            body = response.json()
+            trace = body.pop("trace")
+            assert body == plain
+            assert trace["dropped"] == 0
+            assert trace["events"][0] == {"event": "enter", "method": "calculate", "depth": 1}
+
+    def test_net_to_gross_endpoint(self):
+        """Bruttolohn zum Nettobetrag, Ergebnis wie bei der Einzelberechnung"""
+        data = {"NETTO": 300000, "STKL": 1, "LZZ": 2, "R": 1, "KVZ": 1.7}
+        response = client.post("/api/v1/net_to_gross", json=data)
+        assert response.status_code == 200
+        body = response.json()
+        re4 = int(body["RE4"])
+        assert int(body["NETTO"]) >= 300000
+
+        single = dict(data, RE4=re4)
+        del single["NETTO"]
+        result = client.post("/api/v1/calculate_payroll_tax", json=single).json()
+        assert body["result"] == result
+        lower = client.post("/api/v1/calculate_payroll_tax", json=dict(single, RE4=re4 - 1)).json()
+        assert re4 - 1 - sum(int(lower[k]) for k in ("LSTLZZ", "SOLZLZZ", "BK")) < 300000
+
+        response = client.post("/api/v1/net_to_gross", json=dict(data, NETTO=100000000))
+        assert response.status_code == 400
+        response = client.post("/api/v1/net_to_gross", json=dict(data, NETTO=1.5))
+        assert response.status_code == 422
+
+    def test_curve_endpoint(self):
+        """Steuerkurve in einem Aufruf, wahlweise ausgedünnt, mit Punktegrenze"""
+        data = {"STKL": 3, "LZZ": 2, "R": 1, "re4_from": 100000, "re4_to": 1099900, "re4_step": 100}
+        response = client.post("/api/v1/curve", json=data)
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body["RE4"]) == body["computed_points"] == 10000
+        assert set(body) == {
+            "RE4", "LSTLZZ", "SOLZLZZ", "BK", "average_rate", "marginal_rate", "computed_points"
+        }
+
+        response = client.post("/api/v1/curve", json=dict(data, max_points=300))
+        assert len(response.json()["RE4"]) == 300
+
+        response = client.post("/api/v1/curve", json=dict(data, re4_step=1))
+        assert response.status_code == 400
+        response = client.post("/api/v1/curve", json=dict(data, re4_to=0))
+        assert response.status_code == 400
+
+    def test_simulate_year_endpoint(self):
+        """Jahressimulation mit Einmalzahlung, Summen über alle Monate"""
+        data = {
+            "STKL": 1,
+            "R": 1,
+            "wages": [400000],
+            "one_offs": [{"month": 6, "SONSTB": 300000}],
+        }
+        response = client.post("/api/v1/simulate_year", json=data)
+        assert response.status_code == 200
+        body = response.json()
+        assert [month["month"] for month in body["months"]] == list(range(1, 13))
+        assert Decimal(body["totals"]["SONSTB"]) == 300000
+        assert sum(Decimal(m["tax"]) for m in body["months"]) == Decimal(body["totals"]["tax"])
+
+        # JVBEZ wird aus VBEZ fortgeschrieben, ein angegebener Wert zählt nicht
+        response = client.post("/api/v1/simulate_year", json=dict(data, JVBEZ=5000000))
+        assert response.json() == body
+
+        response = client.post("/api/v1/simulate_year", json=dict(data, LZZ=1))
+        assert response.status_code == 422
+        response = client.post("/api/v1/simulate_year", json=dict(data, wages=[1, 2]))
+        assert response.status_code == 400
+        response = client.post("/api/v1/simulate_year", json=dict(data, wages=[]))
+        assert response.status_code == 422
+
+    def test_bulk_csv_endpoint(self):
+        """CSV-Lohnliste wird mit Ergebnisspalten zurückgestreamt, auch über mehrere Blöcke"""
+        lines = ["RE4,STKL,LZZ,R"] + [f"{200000 + i * 1000},{1 + i % 6},2,1" for i in range(30)]
+        lines.append("abc,1,2,1")
+        response = client.post(
+            "/api/v1/bulk/csv",
+            content="\n".join(lines).encode(),
+            headers={"Content-Type": "text/csv"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 31
+        single = client.post(
+            "/api/v1/calculate_payroll_tax", json={"RE4": 200000, "STKL": 1, "LZZ": 2, "R": 1}
+        ).json()
+        assert Decimal(rows[0]["LSTLZZ"]) == Decimal(single["LSTLZZ"])
+        assert rows[-1]["error"].startswith("Eingabefehler") and rows[-1]["LSTLZZ"] == ""
+
+        response = client.post("/api/v1/bulk/csv", content=b"RE4,STKL,FOO\n1,1,1\n")
+        assert response.status_code == 400
+        response = client.post("/api/v1/bulk/csv", content=b"")
+        assert response.status_code == 400
+
+    def test_bulk_csv_as_xlsx(self):
+        """format=xlsx liefert dieselben Zeilen als Excel mit Zahlenzellen"""
+        import openpyxl
+
+        lines = ["RE4,STKL,LZZ"] + [f"{300000 + i},1,2" for i in range(12)] + ["x,1,2"]
+        response = client.post("/api/v1/bulk/csv?format=xlsx", content="\n".join(lines).encode())
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/vnd.openxmlformats")
+        ws = openpyxl.load_workbook(io.BytesIO(response.content)).active
+        header = [c.value for c in ws[1]]
+        assert header[:3] == ["RE4", "STKL", "LZZ"] and header[-1] == "error"
+        assert ws.max_row == 14
+        single = client.post(
+            "/api/v1/calculate_payroll_tax", json={"RE4": 300000, "STKL": 1, "LZZ": 2}
+        ).json()
+        row = dict(zip(header, [c.value for c in ws[2]]))
+        assert row["RE4"] == 300000 and row["LSTLZZ"] == int(Decimal(single["LSTLZZ"]))
+        assert ws.cell(14, 1).value == "x" and ws.cell(14, len(header)).value
+
+    def test_excel_comparison_is_streamed_without_limit(self):
+        calculations = [
+            {"input": {"RE4": 300000}, "result": {"LSTLZZ": 40000, "SOLZLZZ": 0, "BK": 0}}
+        ] * 25
+        response = client.post(
+            "/api/v1/export/comparison",
+            json={"calculations": calculations, "format_type": "excel"},
+        )
+        assert response.status_code == 200
+        assert response.content.startswith(b"PK")
+        response = client.post(
+            "/api/v1/export/comparison",
+            json={"calculations": calculations, "format_type": "pdf"},
+        )
+        assert response.status_code == 400
+        for re4 in ("abc", "NaN", "Infinity"):
+            kaputt = calculations[:2] + [{"input": {"RE4": re4}, "result": {}}]
+            response = client.post(
+                "/api/v1/export/comparison",
+                json={"calculations": kaputt, "format_type": "excel"},
+            )
+            assert response.status_code == 400
+
+    def test_payslip_export(self):
+        """Je gültiger Eingabe ein PDF im ZIP, ungültige in fehler.csv"""
+        import zipfile
+
+        items = [
+            {"RE4": 250000 + i * 5000, "STKL": 1, "LZZ": 2, "name": f"MA {i}"} for i in range(7)
+        ]
+        items.insert(3, {"RE4": -1, "STKL": 1, "LZZ": 2})
+        response = client.post("/api/v1/export/payslips", json={"items": items})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+            names = zf.namelist()
+            assert sorted(names) == [
+                "000001_MA_0.pdf", "000002_MA_1.pdf", "000003_MA_2.pdf", "000005_MA_3.pdf",
+                "000006_MA_4.pdf", "000007_MA_5.pdf", "000008_MA_6.pdf", "fehler.csv",
+            ]
+            assert zf.read("000001_MA_0.pdf").startswith(b"%PDF")
+            assert zf.read("fehler.csv").decode().splitlines()[1].startswith("3,")
+
+    def test_prometheus_metrics(self):
+        client.post("/api/v1/calculate_payroll_tax", json={"RE4": 300000, "STKL": 1, "LZZ": 2})
+        response = client.get("/api/v1/metrics/prometheus")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'endpoint="/api/v1/calculate_payroll_tax",status="2xx",le="+Inf"' in response.text
+        latency = client.get("/api/v1/metrics").json()["api_metrics"]["latency"]
+        assert latency["count"] >= 1 and latency["p50_ms"] <= latency["max_ms"]
+
+    def test_metrics_timeseries(self):
+        client.post("/api/v1/calculate_payroll_tax", json={"RE4": 300000, "STKL": 1, "LZZ": 2})
+        response = client.get("/api/v1/metrics/timeseries?resolution=minute&periods=5")
+        assert response.status_code == 200
+        series = response.json()["series"]
+        assert len(series) == 5 and series[-1]["requests"] >= 1
+        assert series[-1]["p50_ms"] <= series[-1]["p999_ms"]
+        assert client.get("/api/v1/metrics/timeseries?resolution=day").status_code == 422
+
+    def test_year_field(self):
+        """year wählt den PAP; nicht vorhandene Jahre werden abgelehnt"""
+        data = {"RE4": 300000, "STKL": 1, "LZZ": 2, "R": 1}
+        default = client.post("/api/v1/calculate_payroll_tax", json=data).json()
+        response = client.post("/api/v1/calculate_payroll_tax", json=dict(data, year=2025))
+        assert response.status_code == 200
+        assert response.json() == default
+
+        response = client.post("/api/v1/calculate_payroll_tax", json=dict(data, year=1999))
+        assert response.status_code == 422
+
+        info = client.get("/api/v1/info").json()
+        assert 2025 in info["supported_years"]
+        assert any(v["year"] == 2025 and "int" in v["engines"] for v in info["pap_versions"])
+
+    def test_result_cache(self):
+        """Wiederholte Eingaben kommen aus dem Cache, mit identischem Ergebnis"""
+        data = {"RE4": 412345, "STKL": 3, "LZZ": 2, "KVZ": 1.7, "R": 1}
+        before = client.get("/api/v1/metrics").json()["result_cache"]
+        first = client.post("/api/v1/calculate_payroll_tax", json=data).json()
+        second = client.post("/api/v1/calculate_payroll_tax?engine=int", json=data).json()
+        after = client.get("/api/v1/metrics").json()["result_cache"]
+        assert first == second
+        assert after["hits"] >= before["hits"] + 1
+        assert after["hits"] + after["misses"] == before["hits"] + before["misses"] + 2
+
+    def test_export_endpoints(self):
+        """Exporte werden im Prozess-Pool erzeugt"""
+        data = {"RE4": 350000, "STKL": 1, "LZZ": 2}
+        result = client.post("/api/v1/calculate_payroll_tax", json=data).json()
+        export = {"input_data": data, "result": result, "name": "Test"}
+
+        response = client.post("/api/v1/export/pdf", json=export)
+        assert response.status_code == 200
+        assert response.content.startswith(b"%PDF")
+
+        response = client.post("/api/v1/export/excel", json=export)
+        assert response.status_code == 200
+        assert response.content.startswith(b"PK")
+
+        coalescing = client.get("/api/v1/metrics").json()["coalescing"]
+        assert coalescing["export"]["executed"] >= 2
+
+        executor = client.get("/api/v1/metrics").json()["executor"]
+        assert executor["export"]["completed"] >= 2
+        assert executor["calculation"]["completed"] >= 1
+
+    def test_batch_endpoint(self):
+        """Batch-Berechnung: Reihenfolge, Einzelfehler, gleiche Beträge wie einzeln"""
+        items = [
+            {"RE4": 350000, "STKL": 1, "LZZ": 2, "KVZ": 1.7, "R": 1},
+            {"RE4": -1000, "STKL": 1, "LZZ": 2},
+            {"RE4": 500000, "STKL": 5, "LZZ": 2, "SONSTB": 200000, "JRE4": 6000000},
+            {"RE4": 4200000, "STKL": 3, "LZZ": 1, "ZKF": 1.5, "PKV": 1, "PKPV": 40000},
+        ]
+
+        response = client.post("/api/v1/calculate_payroll_tax/batch", json={"items": items})
+        assert response.status_code == 200
+
+        body = response.json()
+        assert body["succeeded"] == 3
+        assert body["failed"] == 1
+        assert [entry["index"] for entry in body["results"]] == [0, 1, 2, 3]
+        assert body["results"][1]["result"] is None
+        assert "RE4" in body["results"][1]["error"]
+
+        for index in (0, 2, 3):
+            single = client.post("/api/v1/calculate_payroll_tax", json=items[index]).json()
+            batch = body["results"][index]["result"]
+            assert {k: Decimal(v) for k, v in batch.items()} == {
+                k: Decimal(v) for k, v in single.items()
+            }
+
+    def test_large_batch_uses_own_pool(self, monkeypatch):
+        """Große Batches rechnen im Pool batch, nicht in der Warteschlange der Exporte"""
+        monkeypatch.setattr(main, "BATCH_PROCESS_MIN", 2)
+        before = client.get("/api/v1/metrics").json()["executor"]
+        items = [{"RE4": 300000 + 1000 * i, "STKL": 1, "LZZ": 2} for i in range(3)]
+        response = client.post("/api/v1/calculate_payroll_tax/batch", json={"items": items})
+        assert response.status_code == 200
+        assert response.json()["succeeded"] == 3
+
+        after = client.get("/api/v1/metrics").json()["executor"]
+        assert after["batch"]["completed"] == before["batch"]["completed"] + 1
+        assert after["export"]["completed"] == before["export"]["completed"]
+
+    def test_batch_endpoint_limits(self):
+        """Leere Batches und unbekannte Rechenkerne werden abgelehnt"""
+        response = client.post("/api/v1/calculate_payroll_tax/batch", json={"items": []})
+        assert response.status_code == 422
+
+        response = client.post(
+            "/api/v1/calculate_payroll_tax/batch?engine=float",
+            json={"items": [{"RE4": 350000, "STKL": 1, "LZZ": 2}]},
+        )
+        assert response.status_code == 422
+
 
 class TestReferenceValues:
     """Tests mit bekannten Referenzwerten"""
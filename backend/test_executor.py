@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+from decimal import Decimal, getcontext
+
+import pytest
+
+from executor import DECIMAL_PRECISION, PoolBusyError, PoolTimeoutError, WorkerPool
+
+
+def _precision() -> int:
+    return getcontext().prec
+
+
+def _wait(event: threading.Event) -> str:
+    event.wait(5)
+    return "fertig"
+
+
+def test_thread_pool_runs_jobs_with_decimal_context():
+    """Ergebnisse kommen zurück, der Decimal-Kontext ist wie im API-Prozess"""
+    pool = WorkerPool("test", "thread", max_workers=2, max_queue=4, timeout=5)
+    try:
+        assert asyncio.run(pool.run(sum, [1, 2, 3])) == 6
+        assert asyncio.run(pool.run(_precision)) == DECIMAL_PRECISION
+        with pytest.raises(ZeroDivisionError):
+            asyncio.run(pool.run(Decimal(1).__truediv__, Decimal(0)))
+        stats = pool.get_stats()
+        assert stats["completed"] == 2
+        assert stats["failed"] == 1
+        assert stats["pending"] == 0
+        assert stats["max_queue_wait_ms"] >= stats["avg_queue_wait_ms"] >= 0
+    finally:
+        pool.shutdown()
+
+
+def test_pool_rejects_when_queue_is_full():
+    """Mehr als max_workers + max_queue offene Aufträge werden abgelehnt"""
+    pool = WorkerPool("test", "thread", max_workers=1, max_queue=1, timeout=5)
+    event = threading.Event()
+
+    async def main():
+        running = [asyncio.ensure_future(pool.run(_wait, event)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(PoolBusyError):
+            await pool.run(_wait, event)
+        event.set()
+        return await asyncio.gather(*running)
+
+    try:
+        assert asyncio.run(main()) == ["fertig", "fertig"]
+        assert pool.get_stats()["rejected"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_pool_timeout_keeps_slot_until_job_ends():
+    """Zeitüberschreitung wird gemeldet, der laufende Auftrag belegt seinen Platz weiter"""
+    pool = WorkerPool("test", "thread", max_workers=1, max_queue=0, timeout=0.05)
+    event = threading.Event()
+    try:
+        with pytest.raises(PoolTimeoutError):
+            asyncio.run(pool.run(_wait, event))
+        assert pool.get_stats()["timeouts"] == 1
+        assert pool.get_stats()["pending"] == 1
+        event.set()
+        deadline = time.time() + 5
+        while pool.get_stats()["pending"] and time.time() < deadline:
+            time.sleep(0.01)
+        assert pool.get_stats()["pending"] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_process_pool_and_inline_mode():
+    """Prozess-Pool mit picklebaren Funktionen; max_workers=0 rechnet direkt"""
+    pool = WorkerPool("test", "process", max_workers=1, max_queue=1, timeout=60)
+    try:
+        assert asyncio.run(pool.run(_precision)) == DECIMAL_PRECISION
+        assert pool.get_stats()["completed"] == 1
+    finally:
+        pool.shutdown()
+
+    inline = WorkerPool("test", "thread", max_workers=0, max_queue=0, timeout=1)
+    assert asyncio.run(inline.run(threading.current_thread)) is threading.current_thread()
+
+    with pytest.raises(ValueError):
+        WorkerPool("test", "fiber", max_workers=1, max_queue=1, timeout=1)
+
+
+def _export_services():
+    import export_service
+
+    return sorted(export_service._services)
+
+
+def test_process_pool_initializer_warms_export_services():
+    """Der Initializer läuft im Worker vor dem ersten Auftrag"""
+    from export_service import init_export_worker
+
+    pool = WorkerPool(
+        "test", "process", max_workers=1, max_queue=1, timeout=60, initializer=init_export_worker
+    )
+    try:
+        assert asyncio.run(pool.run(_export_services)) == ["comparison", "excel", "pdf"]
+        assert asyncio.run(pool.run(_precision)) == DECIMAL_PRECISION
+    finally:
+        pool.shutdown()
@@ -0,0 +1,79 @@
+import io
+import json
+import threading
+import time
+
+from log_pipeline import LogPipeline, parse_sample_rates
+from monitoring import StructuredLogger
+
+
+def test_events_are_written_as_json_lines_in_batches():
+    stream = io.StringIO()
+    writes = []
+    schreiben = stream.write
+    stream.write = lambda text: writes.append(text) or schreiben(text)
+    pipeline = LogPipeline(stream, batch_size=2, flush_interval=0)
+    logger = StructuredLogger("test_pipeline", pipeline)
+    logger.logger.setLevel("INFO")
+    logger.log_request("POST", "/api/v1/calculate", "10.0.0.1", "pytest")
+    logger.log_error("ValueError", "kaputt", {"RE4": 100, "objekt": object()}, "10.0.0.1")
+    logger.log_validation_error("STKL", 9, "ungültig")
+    assert stream.getvalue() == ""
+
+    pipeline.flush()
+    zeilen = [json.loads(zeile) for zeile in stream.getvalue().splitlines()]
+    assert len(writes) == 2
+    assert [zeile["event_type"] for zeile in zeilen] == ["request", "error", "validation_error"]
+    assert zeilen[0]["path"] == "/api/v1/calculate" and zeilen[0]["level"] == "INFO"
+    assert zeilen[0]["timestamp"].endswith("+00:00")
+    assert zeilen[1]["input_data"]["RE4"] == 100 and zeilen[1]["level"] == "ERROR"
+    assert pipeline.get_stats()["written"] == 3
+
+
+def test_full_queue_drops_instead_of_blocking():
+    pipeline = LogPipeline(io.StringIO(), queue_size=3, flush_interval=0)
+    angenommen = [pipeline.emit("request", "INFO", "x", {}) for _ in range(5)]
+    assert angenommen == [True, True, True, False, False]
+    stats = pipeline.get_stats()
+    assert stats["dropped"] == 2 and stats["max_queue_length"] == 3
+    pipeline.flush()
+    assert pipeline.emit("request", "INFO", "x", {})
+
+
+def test_sampling():
+    assert parse_sample_rates("request=0.25, calculation=2,kaputt") == {
+        "request": 0.25,
+        "calculation": 1.0,
+    }
+    pipeline = LogPipeline(io.StringIO(), flush_interval=0, sample_rates={"request": 0.0})
+    for _ in range(10):
+        pipeline.emit("request", "INFO", "x", {})
+        pipeline.emit("error", "ERROR", "x", {})
+    stats = pipeline.get_stats()
+    assert stats["sampled_out"] == 10 and stats["enqueued"] == 10
+
+
+class _SlowStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.schreibt = threading.Event()
+
+    def write(self, text):
+        self.schreibt.set()
+        time.sleep(0.3)
+        return super().write(text)
+
+
+def test_slow_stream_does_not_block_emit():
+    stream = _SlowStream()
+    pipeline = LogPipeline(stream, flush_interval=0.01)
+    pipeline.emit("request", "INFO", "erstes", {})
+    assert stream.schreibt.wait(2)
+    start = time.perf_counter()
+    for _ in range(1000):
+        pipeline.emit("request", "INFO", "x", {})
+    assert time.perf_counter() - start < 0.1
+    deadline = time.time() + 5
+    while pipeline.get_stats()["written"] < 1001 and time.time() < deadline:
+        time.sleep(0.05)
+    assert pipeline.get_stats()["written"] == 1001
@@ -392,10 +392,10 @@ def test_tax_calculator_with_versorgungsbezuege():
     assert result["STS"] == Decimal("0")
     assert result["VKVLZZ"] == Decimal("0")
     assert result["VKVSONST"] == Decimal("0")
-    assert result["VFRB"] == Decimal("188401")
+    assert result["VFRB"] == Decimal("188400")
     assert result["VFRBS1"] == Decimal("0")
     assert result["VFRBS2"] == Decimal("0")
-    assert result["WVFRB"] == Decimal("1516199")
+    assert result["WVFRB"] == Decimal("1516200")
     assert result["WVFRBO"] == Decimal("0")
     assert result["WVFRBM"] == Decimal("0")
 
@@ -0,0 +1,283 @@
+import multiprocessing
+import os
+import random
+import struct
+import time
+
+import monitoring
+from monitoring import _DATA_OFFSET, APIMetrics, LatencyHistogram, SecurityMonitor
+from rate_limiter import client_key
+
+SUSPICIOUS = {"RE4": -1}
+
+
+def test_block_after_limit_and_expiry():
+    monitor = SecurityMonitor(limit=3, window=60, block_seconds=0.2)
+    assert monitor.check_suspicious_activity("10.0.0.1", {"RE4": 350000}) is False
+    for _ in range(3):
+        assert monitor.check_suspicious_activity("10.0.0.1", SUSPICIOUS)
+    assert not monitor.is_blocked("10.0.0.1")
+    monitor.check_suspicious_activity("10.0.0.1", SUSPICIOUS)
+    assert monitor.is_blocked("10.0.0.1")
+    assert not monitor.is_blocked("10.0.0.2")
+    stats = monitor.get_stats()
+    assert stats["blocked_ips_count"] == 1 and stats["blocks"] == 1
+    time.sleep(0.25)
+    assert not monitor.is_blocked("10.0.0.1")
+    assert monitor.blocked_count() == 0
+
+
+def test_state_is_bounded():
+    monitor = SecurityMonitor(slots=16, ways=4, limit=1, window=60)
+    for i in range(100):
+        monitor.check_suspicious_activity(f"10.1.0.{i}", SUSPICIOUS)
+    assert monitor.get_stats()["capacity"] == 16
+    assert monitor.evictions == 84
+    # Die Sperrliste bleibt auf die Zahl der Slots begrenzt
+    for i in range(100):
+        monitor.check_suspicious_activity(f"10.1.0.{i}", SUSPICIOUS)
+    assert monitor.blocked_count() <= 16
+
+
+def test_torn_slot_is_ignored():
+    monitor = SecurityMonitor(limit=1, window=60)
+    monitor.check_suspicious_activity("10.2.0.1", SUSPICIOUS)
+    monitor.check_suspicious_activity("10.2.0.1", SUSPICIOUS)
+    assert monitor.is_blocked("10.2.0.1")
+    key = client_key("10.2.0.1")
+    start = _DATA_OFFSET + (key % monitor.buckets) * monitor.ways * 32
+    for way in range(monitor.ways):
+        if struct.unpack_from("<Q", monitor._mm, start + way * 32)[0] == key:
+            # Halb geschriebener Slot: Sperrzeit neu, Prüfwort noch alt
+            struct.pack_into("<Q", monitor._mm, start + way * 32 + 16, time.time_ns() + 10**12)
+    assert not monitor.is_blocked("10.2.0.1")
+
+
+def _report(path: str):
+    monitor = SecurityMonitor(path, limit=5, window=60)
+    for _ in range(3):
+        monitor.check_suspicious_activity("10.3.0.1", SUSPICIOUS)
+
+
+def test_block_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "security.bin")
+    monitor = SecurityMonitor(path, limit=5, window=60)
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_report, args=(path,)) for _ in range(2)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    # Sechs Verdachtsfälle aus zwei Prozessen: in diesem Prozess gesperrt
+    assert monitor.is_blocked("10.3.0.1")
+
+
+def test_changed_settings_replace_file_without_breaking_open_monitor(tmp_path):
+    path = str(tmp_path / "security.bin")
+    alt = SecurityMonitor(path, limit=1, window=60)
+    alt.check_suspicious_activity("10.4.0.1", SUSPICIOUS)
+    alt.check_suspicious_activity("10.4.0.1", SUSPICIOUS)
+    neu = SecurityMonitor(path, slots=64, limit=5, window=60)
+    assert alt.is_blocked("10.4.0.1") and not neu.is_blocked("10.4.0.1")
+    alt.close()
+    neu.close()
+
+
+def test_histogram_quantiles_are_within_bucket_width():
+    rnd = random.Random(22)
+    werte = [rnd.lognormvariate(-5, 1.2) for _ in range(20000)]
+    histogram = LatencyHistogram()
+    for wert in werte:
+        histogram.record(wert)
+    werte.sort()
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exakt = werte[int(q * len(werte)) - 1]
+        assert exakt <= histogram.quantile(q) <= exakt * 1.07
+    assert histogram.min == werte[0] and histogram.max == werte[-1]
+    assert histogram.quantile(1.0) == werte[-1]
+    assert LatencyHistogram().quantile(0.5) == 0.0
+
+
+def test_metrics_by_endpoint_and_status_class():
+    metrics = APIMetrics()
+    for ms in (1, 2, 3, 4):
+        metrics.record_request("/api/v1/calculate", ms / 1000, 200)
+    metrics.record_request("/api/v1/calculate", 0.5, 503, "PoolBusyError")
+    stats = metrics.get_stats()
+    latency = stats["latency_by_endpoint"]["/api/v1/calculate"]
+    assert latency["2xx"]["count"] == 4 and latency["2xx"]["max_ms"] == 4.0
+    assert latency["5xx"]["p99_ms"] == 500.0
+    assert stats["endpoint_stats"]["/api/v1/calculate"]["errors"] == 1
+    assert stats["latency"]["count"] == 5
+    assert stats["avg_response_time_ms"] == 102.0
+
+    text = metrics.prometheus_text()
+    assert "# TYPE lohnsteuer_http_request_duration_seconds histogram" in text
+    assert (
+        'lohnsteuer_http_request_duration_seconds_bucket{endpoint="/api/v1/calculate",'
+        'status="2xx",le="0.00390625"} 3'
+    ) in text
+    assert (
+        'lohnsteuer_http_request_duration_seconds_count{endpoint="/api/v1/calculate",'
+        'status="5xx"} 1'
+    ) in text
+    assert 'quantile="0.999"' in text
+
+
+def _record(directory: str, seed: int):
+    metrics = APIMetrics(directory)
+    rnd = random.Random(seed)
+    for _ in range(1000):
+        metrics.record_request("/api/v1/calculate", rnd.lognormvariate(-5, 1), 200)
+    metrics.record_request("/api/v1/calculate", 0.25, 503, "PoolBusyError")
+
+
+def test_metrics_are_aggregated_over_worker_files(tmp_path):
+    directory = str(tmp_path)
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_record, args=(directory, seed)) for seed in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    metrics = APIMetrics(directory)
+    metrics.record_request("/api/v1/curve", 0.002, 200)
+    stats = metrics.get_stats()
+    # Die beendeten Worker sind in eine Datei zusammengelegt
+    assert stats["workers"] == 1
+    assert sorted(os.listdir(directory)) == sorted(
+        ["metrics.lock", "metrics_accumulated.bin", f"metrics_{os.getpid()}.bin"]
+    )
+    assert stats["total_requests"] == 3004 and stats["total_errors"] == 3
+    assert stats["error_types"] == {"PoolBusyError": 3}
+    assert stats["endpoint_stats"]["/api/v1/calculate"]["errors"] == 3
+
+    # Summiertes Histogramm entspricht einem über alle Werte
+    erwartet = LatencyHistogram()
+    for seed in range(3):
+        rnd = random.Random(seed)
+        for _ in range(1000):
+            erwartet.record(rnd.lognormvariate(-5, 1))
+    latency = stats["latency_by_endpoint"]["/api/v1/calculate"]
+    assert latency["2xx"] == erwartet.summary()
+    assert latency["5xx"]["count"] == 3
+    assert (
+        'lohnsteuer_http_request_duration_seconds_count{endpoint="/api/v1/calculate",'
+        'status="2xx"} 3000'
+    ) in metrics.prometheus_text()
+
+
+def test_dead_worker_files_are_accumulated_once(tmp_path):
+    directory = str(tmp_path)
+    context = multiprocessing.get_context("spawn")
+    metrics = APIMetrics(directory, series=2, error_types=2)
+    for runde in range(2):
+        process = context.Process(target=_record, args=(directory, runde))
+        process.start()
+        process.join()
+        # Mehrfaches Abrufen zählt die Datei nur einmal
+        metrics.get_stats()
+        stats = metrics.get_stats()
+        assert stats["total_requests"] == 1001 * (runde + 1)
+        assert stats["workers"] == 1
+        assert stats["error_types"] == {"PoolBusyError": runde + 1}
+    assert sum(eintrag["requests"] for eintrag in metrics.timeseries("minute", 2)) == 2002
+
+    # Mehr Reihen als Platz: der Rest zählt unter other
+    with open(os.path.join(directory, "metrics_accumulated.bin"), "rb") as fh:
+        assert b"other" in fh.read()
+    assert stats["latency_by_endpoint"]["/api/v1/calculate"]["2xx"]["count"] == 2000
+    assert stats["latency_by_endpoint"]["other"]["other"]["count"] == 2
+
+
+def _worker_file(directory, name: str, pid: int, token: int, namespace: int):
+    """Metrikdatei mit einer Anfrage und vorgegebener Kennung des Workers"""
+    quelle = APIMetrics()
+    quelle.record_request("/api/v1/calculate", 0.01, 200)
+    daten = bytearray(quelle._mm[:])
+    struct.pack_into("<I", daten, 32, pid)
+    monitoring._METRICS_WORKER.pack_into(daten, monitoring._WORKER_OFFSET, token, namespace)
+    with open(os.path.join(directory, name), "wb") as fh:
+        fh.write(daten)
+
+
+def test_exited_workers_are_detected_by_start_token(tmp_path):
+    directory = str(tmp_path)
+    ppid = os.getppid()
+    eigener = monitoring._PID_NAMESPACE
+    # PID lebt, gehört aber einem anderen Prozess als dem, der die Datei angelegt hat
+    _worker_file(directory, "metrics_1.bin", ppid, 1, eigener)
+    # Laufender Worker
+    _worker_file(directory, "metrics_2.bin", ppid, monitoring._process_token(ppid), eigener)
+    # Anderer PID-Namensraum: von hier aus nicht prüfbar
+    _worker_file(directory, "metrics_3.bin", 2**22 + 1, 1, eigener + 1)
+
+    stats = APIMetrics(directory).get_stats()
+    assert stats["total_requests"] == 3
+    assert stats["workers"] == 3
+    assert sorted(os.listdir(directory)) == sorted(
+        [
+            "metrics.lock",
+            "metrics_2.bin",
+            "metrics_3.bin",
+            "metrics_accumulated.bin",
+            f"metrics_{os.getpid()}.bin",
+        ]
+    )
+
+
+def test_metric_series_are_bounded():
+    metrics = APIMetrics(series=4, error_types=2)
+    for i in range(10):
+        metrics.record_request(f"/api/v1/e{i}", 0.001, 500, f"Fehler{i}")
+    stats = metrics.get_stats()
+    assert stats["total_requests"] == 10
+    assert stats["latency_by_endpoint"]["other"]["other"]["count"] == 7
+    assert stats["error_types"] == {"Fehler0": 1, "other": 9}
+
+
+def test_timeseries_downsampling(monkeypatch):
+    metrics = APIMetrics()
+    jetzt = [7200.0 * 1000]
+    monkeypatch.setattr(time, "time", lambda: jetzt[0])
+    # Über 3 Minuten je Sekunde eine Anfrage, jede zehnte ein Fehler
+    for sekunde in range(180):
+        jetzt[0] = 7200.0 * 1000 + sekunde
+        metrics.record_request("/api/v1/calculate", 0.004, 500 if sekunde % 10 == 0 else 200)
+
+    sekunden = metrics.timeseries("second", 60)
+    assert [eintrag["requests"] for eintrag in sekunden] == [1] * 60
+    assert 0.004 <= sekunden[-1]["p99_ms"] / 1000 <= 0.004 * 1.25
+
+    minuten = metrics.timeseries("minute", 4)
+    assert [eintrag["requests"] for eintrag in minuten] == [0, 60, 60, 60]
+    assert [eintrag["errors"] for eintrag in minuten] == [0, 6, 6, 6]
+    assert minuten[-1]["mean_ms"] == 4.0
+
+    stunden = metrics.timeseries("hour", 2)
+    assert [eintrag["requests"] for eintrag in stunden] == [0, 180]
+    assert metrics.get_stats()["requests_last_hour"] == 180
+
+    # Nach einer Pause sind die alten Sekunden aus dem Ring, Minuten und Stunden bleiben
+    jetzt[0] += 3600
+    metrics.record_request("/api/v1/calculate", 0.004, 200)
+    assert sum(eintrag["requests"] for eintrag in metrics.timeseries("second")) == 1
+    assert [eintrag["requests"] for eintrag in metrics.timeseries("hour", 2)] == [180, 1]
+
+
+def test_timeseries_snapshot_is_restored(tmp_path):
+    snapshot = str(tmp_path / "snapshot.bin")
+    metrics = APIMetrics(str(tmp_path / "lauf1"), snapshot=snapshot, snapshot_interval=0)
+    for _ in range(5):
+        metrics.record_request("/api/v1/calculate", 0.01, 200)
+    metrics.save_snapshot()
+
+    # Neuer Lauf: der Snapshot zählt einmal, auch wenn mehrere Prozesse ihn einlesen
+    directory = str(tmp_path / "lauf2")
+    neu = APIMetrics(directory, snapshot=snapshot, snapshot_interval=0)
+    neu.record_request("/api/v1/calculate", 0.01, 200)
+    APIMetrics(directory, snapshot=snapshot, snapshot_interval=0).get_stats()
+    assert sum(eintrag["requests"] for eintrag in neu.timeseries("minute", 2)) == 6
+    stats = neu.get_stats()
+    assert stats["total_requests"] == 1 and stats["workers"] == 1
@@ -0,0 +1,65 @@
+import random
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+import tax_calculator_batch
+from engines import calculate_pap
+from net_to_gross import MAX_RE4, TargetNotReachableError, net_to_gross, solve_gross
+
+
+def _netto(data, von, bis):
+    """Netto für alle RE4 von ``von`` bis ausschließlich ``bis``"""
+    re4 = np.arange(von, bis, dtype=np.int64)
+    out = tax_calculator_batch.calculate_batch(dict(data, RE4=re4))
+    return re4 - out["LSTLZZ"] - out["SOLZLZZ"] - out["BK"]
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_solver_returns_minimal_cent(seed):
+    """Vergleich mit allen Cent-Beträgen unterhalb des Ergebnisses"""
+    rnd = random.Random(seed)
+    lzz = rnd.choice([1, 2, 3, 4])
+    data = {
+        "LZZ": lzz,
+        "STKL": rnd.randint(1, 6),
+        "R": rnd.randint(0, 2),
+        "ZKF": Decimal(rnd.randint(0, 4)) / 2,
+        "KVZ": Decimal(rnd.randint(0, 350)) / 100,
+        "PKV": rnd.choice([0, 0, 1]),
+        "PKPV": Decimal(rnd.randint(0, 60000)),
+        "PVZ": rnd.randint(0, 1),
+    }
+    top = {1: 6_000_000, 2: 900_000, 3: 200_000, 4: 30_000}[lzz]
+    for target in (rnd.randint(1, top // 10), rnd.randint(top // 10, top)):
+        re4, probes = solve_gross(data, target)
+        assert _netto(data, re4, re4 + 1)[0] >= target
+        # Unterhalb von target ist Netto ohnehin kleiner (Netto <= RE4)
+        for von in range(target, re4, 500_000):
+            assert not np.any(_netto(data, von, min(von + 500_000, re4)) >= target)
+        assert probes < 5000
+
+
+def test_net_to_gross_result_matches_calculation():
+    data = {"STKL": 1, "LZZ": 2, "R": 1, "KVZ": Decimal("1.7")}
+    result = net_to_gross(data, 300000)
+    assert result["result"] == calculate_pap(dict(data, RE4=result["RE4"]))
+    assert result["NETTO"] >= 300000
+    assert result["NETTO"] - 300000 < 100
+
+    assert solve_gross(data, 0) == (0, 0)
+
+
+def test_fractional_cents_fall_back_to_decimal():
+    data = {"STKL": 1, "LZZ": 2, "LZZFREIB": Decimal("1000.5")}
+    re4, _ = solve_gross(data, 250000)
+    netto = lambda r: r - sum(
+        int(calculate_pap(dict(data, RE4=Decimal(r)), "int")[k]) for k in ("LSTLZZ", "SOLZLZZ", "BK")
+    )
+    assert netto(re4) >= 250000 > netto(re4 - 1)
+
+
+def test_unreachable_target():
+    with pytest.raises(TargetNotReachableError):
+        solve_gross({"STKL": 1, "LZZ": 2}, MAX_RE4)
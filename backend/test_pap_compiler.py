@@ -0,0 +1,104 @@
+import random
+from decimal import Decimal
+
+import pytest
+
+import pap_compiler
+from tax_calculator import TaxCalculator2025
+
+
+def _random_inputs(rnd):
+    return {
+        "af": rnd.randint(0, 1),
+        "f": rnd.choice([1.0, 0.7, 0.9]),
+        "STKL": rnd.randint(1, 6),
+        "LZZ": rnd.randint(1, 4),
+        "R": rnd.randint(0, 2),
+        "ZKF": Decimal(rnd.randint(0, 6)) / 2,
+        "KVZ": Decimal(rnd.randint(0, 300)) / 100,
+        "PKV": rnd.randint(0, 2),
+        "PKPV": Decimal(rnd.randint(0, 90000)),
+        "PVS": rnd.randint(0, 1),
+        "PVZ": rnd.randint(0, 1),
+        "PVA": Decimal(rnd.randint(0, 4)),
+        "KRV": rnd.randint(0, 1),
+        "ALTER1": rnd.randint(0, 1),
+        "AJAHR": rnd.randint(2000, 2060),
+        "RE4": Decimal(rnd.randint(1, 5000000)),
+        "VBEZ": Decimal(rnd.choice([0, rnd.randint(0, 300000)])),
+        "VBEZM": Decimal(rnd.choice([0, rnd.randint(0, 300000)])),
+        "VBEZS": Decimal(rnd.choice([0, rnd.randint(0, 300000)])),
+        "VJAHR": rnd.randint(2000, 2060),
+        "ZMVB": rnd.randint(0, 12),
+        "JRE4": Decimal(rnd.randint(0, 20000000)),
+        "SONSTB": Decimal(rnd.choice([0, rnd.randint(0, 5000000)])),
+        "MBV": Decimal(rnd.choice([0, 0, rnd.randint(0, 500000)])),
+        "STERBE": Decimal(rnd.choice([0, rnd.randint(0, 300000)])),
+        "JFREIB": Decimal(rnd.choice([0, rnd.randint(0, 1000000)])),
+    }
+
+
+@pytest.fixture(scope="module")
+def pap(tmp_path_factory):
+    return pap_compiler.load_pap_module(cache_dir=str(tmp_path_factory.mktemp("pap")))
+
+
+def test_compiled_pap_matches_tax_calculator(pap):
+    rnd = random.Random(42)
+    for _ in range(2000):
+        data = _random_inputs(rnd)
+        expected = TaxCalculator2025(**data).calculate()
+        result = pap.calculate(**data)
+        assert result == expected, data
+        assert {k: str(v) for k, v in result.items()} == {
+            k: str(v) for k, v in expected.items()
+        }, data
+
+
+def test_compiled_pap_is_cached_by_hash(tmp_path, monkeypatch):
+    monkeypatch.setattr(pap_compiler, "_loaded_modules", {})
+    first = pap_compiler.load_pap_module(cache_dir=str(tmp_path))
+    assert first.PAP_NAME == "Lohnsteuer2025"
+    assert first.PAP_HASH[:16] in first.__file__
+    assert pap_compiler.load_pap_module(cache_dir=str(tmp_path)) is first
+    cached = list(tmp_path.glob("*.py"))
+    assert len(cached) == 1
+
+    # Ein neuer Prozess verwendet die Datei aus dem Cache, statt neu zu übersetzen
+    monkeypatch.setattr(pap_compiler, "_loaded_modules", {})
+    monkeypatch.setattr(pap_compiler, "compile_pap", None)
+    second = pap_compiler.load_pap_module(cache_dir=str(tmp_path))
+    assert second.__file__ == first.__file__
+
+
+def test_changed_xml_is_recompiled(tmp_path):
+    with open(pap_compiler.DEFAULT_PAP_XML, "rb") as fh:
+        source = fh.read()
+    changed = tmp_path / "Lohnsteuer2025_neu.xml"
+    changed.write_bytes(
+        source.replace(b"GFB = new BigDecimal(12096)", b"GFB = new BigDecimal(20000)")
+    )
+    original = pap_compiler.load_pap_module(cache_dir=str(tmp_path / "cache"))
+    modified = pap_compiler.load_pap_module(str(changed), cache_dir=str(tmp_path / "cache"))
+    assert modified is not original
+    data = {"RE4": Decimal(150000), "STKL": 1, "LZZ": 2}
+    assert original.calculate(**data)["LSTLZZ"] > 0
+    assert modified.calculate(**data)["LSTLZZ"] == 0
+
+
+def test_unknown_patch_is_rejected():
+    with open(pap_compiler.DEFAULT_PAP_XML, "rb") as fh:
+        source = fh.read()
+    with pytest.raises(pap_compiler.PAPCompileError):
+        pap_compiler.compile_pap(source, {("MSOLZ", "GIBTS = NICHT"): "X = ZAHL1"})
+
+
+def test_expression_translation():
+    generator = pap_compiler._CodeGenerator.__new__(pap_compiler._CodeGenerator)
+    generator.model = type("Model", (), {"types": {"X": "BigDecimal", "GFB": "BigDecimal"}})()
+    generator.decimal_consts = {}
+    generator.quantizers = {}
+    node = pap_compiler.parse_expression("X.compareTo(GFB.add(BigDecimal.ONE)) == -1")
+    assert generator.expr(node) == "(X < (GFB + _D1))"
+    node = pap_compiler.parse_expression("X.divide (ZAHL100, 2, BigDecimal.ROUND_DOWN)")
+    assert generator.expr(node) == "(X / ZAHL100).quantize(_Q2, ROUND_DOWN)"
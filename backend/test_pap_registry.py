@@ -0,0 +1,81 @@
+import shutil
+from decimal import Decimal
+
+import pytest
+
+import engines
+from pap_compiler import DEFAULT_PAP_XML
+from pap_registry import PAPRegistry, UnsupportedYearError, read_header
+
+DATA = {"STKL": 1, "LZZ": 2, "R": 1, "RE4": Decimal(150000), "KVZ": Decimal("1.7")}
+
+
+def _variante(pfad, name, version, gfb):
+    """Kopie des PAP 2025 mit anderem Namen, anderer Version und Grundfreibetrag"""
+    with open(DEFAULT_PAP_XML, encoding="utf-8") as fh:
+        xml = fh.read()
+    xml = xml.replace('name="Lohnsteuer2025" version="1.0" versionNummer="1.0"',
+                      f'name="{name}" version="1.0" versionNummer="{version}"', 1)
+    xml = xml.replace("GFB = new BigDecimal(12096)", f"GFB = new BigDecimal({gfb})")
+    pfad.write_text(xml, encoding="utf-8")
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    pap_dir = tmp_path / "pap"
+    pap_dir.mkdir()
+    shutil.copy(DEFAULT_PAP_XML, pap_dir / "Lohnsteuer2025.xml")
+    _variante(pap_dir / "Lohnsteuer2024.xml", "Lohnsteuer2024", "1.0", 11604)
+    _variante(pap_dir / "Lohnsteuer2024Dezember.xml", "Lohnsteuer2024", "1.1", 11784)
+    _variante(pap_dir / "Lohnsteuer2026.xml", "Lohnsteuer2026", "1.0", 12348)
+    (pap_dir / "README.txt").write_text("keine PAP-Datei")
+    registry = PAPRegistry(default_year=2025, cache_dir=str(tmp_path / "cache"))
+    registry.discover(str(pap_dir))
+    monkeypatch.setattr(engines, "registry", registry)
+    return registry
+
+
+def test_discovery_reads_headers_only(registry):
+    assert registry.years() == [2024, 2025, 2026]
+    assert registry.versions(2024) == ["1.0", "1.1"]
+    assert registry.get(2024).version == "1.1"
+    assert registry.get(2024, "1.0").version == "1.0"
+    assert not any(entry["loaded"] for entry in registry.as_list())
+    assert read_header(DEFAULT_PAP_XML)["name"] == "Lohnsteuer2025"
+
+    with pytest.raises(UnsupportedYearError):
+        registry.get(2023)
+    with pytest.raises(UnsupportedYearError):
+        registry.get(2024, "2.0")
+
+
+def test_years_are_loaded_on_first_use(registry):
+    result = engines.calculate_pap(dict(DATA, year=2026))
+    loaded = {(e["year"], e["version"]): e["loaded"] for e in registry.as_list()}
+    assert loaded == {
+        (2024, "1.0"): False,
+        (2024, "1.1"): False,
+        (2025, "1.0"): False,
+        (2026, "1.0"): True,
+    }
+    assert registry.get(2026).module is registry.get(2026).module
+
+    # Höherer Grundfreibetrag: weniger Lohnsteuer als 2025
+    assert result["LSTLZZ"] < engines.calculate_pap(DATA)["LSTLZZ"]
+    assert engines.calculate_pap(dict(DATA, year=2024))["LSTLZZ"] > result["LSTLZZ"]
+
+
+def test_fixed_point_engines_only_for_2025(registry):
+    assert engines.fixed_point(dict(DATA, year=2025))
+    assert not engines.fixed_point(dict(DATA, year=2026))
+    # int fällt für andere Jahre auf den übersetzten PAP zurück
+    assert engines.calculate_pap(dict(DATA, year=2026), "int") == engines.calculate_pap(
+        dict(DATA, year=2026), "decimal"
+    )
+    assert engines.pap_version(dict(DATA, year=2026)) != engines.pap_version(DATA)
+
+
+def test_batch_with_mixed_years_keeps_order(registry):
+    rows = [dict(DATA, RE4=Decimal(140000 + i * 1000), year=2024 + i % 3) for i in range(9)]
+    results = engines.calculate_pap_batch(rows)
+    assert results == [engines.calculate_pap(row, "decimal") for row in rows]
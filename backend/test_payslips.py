@@ -0,0 +1,31 @@
+import csv
+import io
+import zipfile
+from decimal import Decimal
+
+from payslips import PayslipArchive, payslip_filename, render_payslips
+
+
+def test_filenames_keep_order_and_strip_paths():
+    assert payslip_filename(0) == "000001.pdf"
+    assert payslip_filename(41, "Erika Mustermann") == "000042_Erika_Mustermann.pdf"
+    assert payslip_filename(2, "../../etc/passwd") == "000003_etcpasswd.pdf"
+    assert payslip_filename(3, "///") == "000004.pdf"
+
+
+def test_archive_with_reports_and_errors():
+    entries = [
+        (payslip_filename(i), {"RE4": Decimal(300000 + 1000 * i), "STKL": 1, "LZZ": 2})
+        for i in range(3)
+    ]
+    archive = PayslipArchive()
+    data = archive.add(render_payslips(entries))
+    data += archive.close([(3, "Eingabefehler: RE4")])
+    assert archive.files == 3
+
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ["000001.pdf", "000002.pdf", "000003.pdf", "fehler.csv"]
+        assert all(zf.read(name).startswith(b"%PDF") for name in zf.namelist()[:3])
+        errors = list(csv.reader(io.StringIO(zf.read("fehler.csv").decode())))
+        assert errors == [["index", "error"], ["3", "Eingabefehler: RE4"]]
@@ -0,0 +1,72 @@
+import multiprocessing
+import os
+import time
+
+from rate_limiter import RateLimiter, open_rate_limiter
+
+
+def test_burst_then_refill():
+    limiter = RateLimiter(limit=5, window=0.5)
+    assert [limiter.hit("a") for _ in range(5)] == [0.0] * 5
+    retry_after = limiter.hit("a")
+    assert 0 < retry_after <= 0.1
+    # Andere Clients sind unabhängig
+    assert limiter.hit("b") == 0.0
+    time.sleep(retry_after + 0.01)
+    assert limiter.hit("a") == 0.0
+    assert limiter.hit("a") > 0
+    stats = limiter.get_stats()
+    assert stats["allowed"] == 7 and stats["limited"] == 2
+
+
+def test_memory_is_bounded_and_idle_keys_are_reused():
+    limiter = RateLimiter(limit=2, window=0.2, slots=16, ways=4)
+    for i in range(200):
+        assert limiter.hit(f"client-{i}") == 0.0
+    assert limiter.get_stats()["capacity"] == 16
+    assert limiter.evictions > 0
+
+    limiter = RateLimiter(limit=2, window=0.05, slots=4, ways=4)
+    for i in range(4):
+        limiter.hit(f"client-{i}")
+    time.sleep(0.06)
+    # Abgelaufene Einträge werden ohne Verdrängung wiederverwendet
+    for i in range(4, 8):
+        limiter.hit(f"client-{i}")
+    assert limiter.evictions == 0
+
+
+def _hits(path: str, count: int, queue):
+    limiter = RateLimiter(limit=50, window=60, path=path)
+    queue.put(sum(1 for _ in range(count) if limiter.hit("10.0.0.1") == 0.0))
+
+
+def test_limit_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "rate_limit.bin")
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    processes = [context.Process(target=_hits, args=(path, 40, queue)) for _ in range(3)]
+    for process in processes:
+        process.start()
+    allowed = sum(queue.get(timeout=60) for _ in processes)
+    for process in processes:
+        process.join()
+    assert allowed == 50
+
+    # Andere Einstellungen legen die Datei neu an
+    limiter = open_rate_limiter(10, 60, path, 1024)
+    assert limiter.hit("10.0.0.1") == 0.0
+    assert limiter.get_stats()["path"] == path
+
+
+def test_changed_settings_replace_file_without_breaking_open_limiter(tmp_path):
+    path = str(tmp_path / "rate_limit.bin")
+    alt = RateLimiter(2, 60, path)
+    assert alt.hit("10.9.0.1") == 0.0
+    neu = RateLimiter(5, 60, path)
+    # Der alte Limiter arbeitet auf seiner Datei weiter, der neue beginnt leer
+    assert alt.hit("10.9.0.1") == 0.0 and alt.hit("10.9.0.1") > 0
+    assert all(neu.hit("10.9.0.1") == 0.0 for _ in range(5))
+    alt.close()
+    neu.close()
+    assert os.listdir(tmp_path) == ["rate_limit.bin"]
@@ -0,0 +1,109 @@
+import multiprocessing
+import os
+from decimal import Decimal
+
+from result_cache import ResultCache, cache_key, open_result_cache
+
+FIELDS = ("BK", "LSTLZZ", "SOLZLZZ")
+
+
+def _result(lstlzz: str) -> dict:
+    return {"BK": Decimal(0), "LSTLZZ": Decimal(lstlzz), "SOLZLZZ": Decimal("0.00")}
+
+
+def _store_in_child(path: str, key: bytes):
+    cache = ResultCache(path, FIELDS, slots=64)
+    cache.put(key, _result("999.00"))
+    cache.close()
+
+
+def test_cache_key_is_canonical():
+    """Reihenfolge egal, Textform der Werte und Version zählen"""
+    a = {"RE4": Decimal("350000"), "STKL": 1, "KVZ": Decimal("1.7")}
+    b = {"KVZ": Decimal("1.7"), "STKL": 1, "RE4": Decimal("350000")}
+    assert cache_key(a, "v1") == cache_key(b, "v1")
+    assert cache_key(a, "v1") != cache_key(a, "v2")
+    assert cache_key(a, "v1") != cache_key(dict(a, KVZ=Decimal("1.70")), "v1")
+
+
+def test_get_put_keeps_decimal_places(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.bin"), FIELDS, slots=64)
+    key = cache_key({"RE4": 1}, "v1")
+    assert cache.get(key) is None
+    cache.put(key, _result("43416"))
+    hit = cache.get(key)
+    assert hit == _result("43416")
+    assert str(hit["SOLZLZZ"]) == "0.00"
+
+    # Nicht-Decimal-Werte werden nicht gespeichert
+    other = cache_key({"RE4": 2}, "v1")
+    cache.put(other, {"BK": 0, "LSTLZZ": Decimal(1), "SOLZLZZ": Decimal(0)})
+    assert cache.get(other) is None
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 2, 1)
+    cache.close()
+
+
+def test_lru_eviction_within_bucket(tmp_path):
+    """Ein voller Bucket ersetzt den am längsten nicht gelesenen Eintrag"""
+    cache = ResultCache(str(tmp_path / "cache.bin"), FIELDS, slots=4, ways=4)
+    keys = [cache_key({"RE4": i}, "v1") for i in range(5)]
+    for i, key in enumerate(keys[:4]):
+        cache.put(key, _result(str(i)))
+    assert cache.get(keys[0]) is not None  # 0 wieder frisch, 1 ist nun der älteste
+    cache.put(keys[4], _result("4"))
+    assert cache.get(keys[1]) is None
+    assert all(cache.get(key) is not None for key in (keys[0], keys[2], keys[3], keys[4]))
+    assert cache.get_stats()["evictions"] == 1
+    cache.close()
+
+
+def test_cache_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    cache = ResultCache(path, FIELDS, slots=64)
+    key = cache_key({"RE4": 7}, "v1")
+    child = multiprocessing.get_context("spawn").Process(target=_store_in_child, args=(path, key))
+    child.start()
+    child.join(60)
+    assert child.exitcode == 0
+    assert cache.get(key) == _result("999.00")
+    # Zähler gelten für alle Prozesse: die Speicherung des Kinds, der eigene Treffer
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 0, 1)
+    cache.close()
+
+
+def test_corrupt_slot_is_a_miss(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    cache = ResultCache(path, FIELDS, slots=8, ways=8)
+    key = cache_key({"RE4": 3}, "v1")
+    cache.put(key, _result("12.34"))
+    offset = cache._slot_offset(cache._bucket(key), 0)
+    cache._mm[offset + 40] ^= 0xFF
+    assert cache.get(key) is None
+    cache.close()
+
+
+def test_changed_layout_recreates_file(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    cache = ResultCache(path, FIELDS, slots=64)
+    key = cache_key({"RE4": 5}, "v1")
+    cache.put(key, _result("1"))
+
+    # Die neue Datei ersetzt die alte; der noch offene Cache behält seine Abbildung
+    neu = ResultCache(path, FIELDS, slots=128)
+    assert neu.get(key) is None
+    assert cache.get(key) == _result("1")
+    cache.put(cache_key({"RE4": 6}, "v1"), _result("2"))
+    assert neu.get(cache_key({"RE4": 6}, "v1")) is None
+    cache.close()
+    neu.close()
+    assert os.listdir(tmp_path) == ["cache.bin"]
+
+    assert open_result_cache(path, FIELDS, slots=0) is None
+    nested = open_result_cache(str(tmp_path / "a" / "b" / "cache.bin"), FIELDS, slots=8)
+    assert nested is not None
+    nested.close()
+    # Pfad unterhalb einer Datei: Cache abgeschaltet statt Fehler
+    assert open_result_cache(path + "/cache.bin", FIELDS, slots=8) is None
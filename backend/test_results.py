@@ -91,10 +91,10 @@ TEST_RESULTS = {
         "STS": Decimal("0"),
         "VKVLZZ": Decimal("0"),
         "VKVSONST": Decimal("0"),
-        "VFRB": Decimal("188401"),
+        "VFRB": Decimal("188400"),
         "VFRBS1": Decimal("0"),
         "VFRBS2": Decimal("0"),
-        "WVFRB": Decimal("1516199"),
+        "WVFRB": Decimal("1516200"),
         "WVFRBO": Decimal("0"),
         "WVFRBM": Decimal("0"),
     },
@@ -0,0 +1,73 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from singleflight import SingleFlight, request_key
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"LSTLZZ": Decimal("43416")}
+
+    async def main():
+        return await asyncio.gather(*(flight.run("a", compute) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.get_stats() == {"executed": 1, "coalesced": 4, "failed": 0, "in_flight": 0}
+
+    # Nach Abschluss wird wieder gerechnet
+    asyncio.run(flight.run("a", compute))
+    assert len(calls) == 2
+
+
+def test_errors_reach_all_waiters():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("Eingabefehler")
+
+    async def main():
+        return await asyncio.gather(
+            *(flight.run("b", fail) for _ in range(3)), return_exceptions=True
+        )
+
+    errors = asyncio.run(main())
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert flight.get_stats()["failed"] == 1
+
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return "fertig"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.run("c", compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.run("c", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(main()) == "fertig"
+
+
+def test_request_key_is_canonical():
+    assert request_key("pdf", {"a": 1, "b": Decimal("1.0")}) == request_key(
+        "pdf", {"b": Decimal("1.0"), "a": 1}
+    )
+    assert request_key("pdf", {"a": 1}) != request_key("excel", {"a": 1})
+    assert request_key({"b": Decimal("1.0")}) != request_key({"b": Decimal("1.00")})
@@ -0,0 +1,67 @@
+import array
+import os
+from decimal import Decimal
+
+import pytest
+
+import engines
+import tarif_tabellen
+import tax_calculator_int
+
+
+def _uptab25(x):
+    return tax_calculator_int._uptab25(x * 100, 1)
+
+
+def test_tables_are_built_verified_and_cached(tmp_path):
+    uptab25, mst5_6 = tarif_tabellen.lade_tabellen(
+        _uptab25, tax_calculator_int._mst5_6, cache_dir=str(tmp_path)
+    )
+    assert uptab25 == tax_calculator_int.UPTAB25_TABELLE
+    assert mst5_6 == tax_calculator_int.MST5_6_TABELLE
+    assert len(uptab25) == tarif_tabellen.UPTAB25_GRENZE
+    assert len(mst5_6) == tarif_tabellen.MST5_6_GRENZE
+    names = sorted(os.listdir(tmp_path))
+    assert [name.split("_")[1] for name in names] == ["mst5", "uptab25"]
+
+
+def test_corrupt_cache_file_is_rebuilt(tmp_path):
+    tarif_tabellen.lade_tabellen(_uptab25, tax_calculator_int._mst5_6, cache_dir=str(tmp_path))
+    for name in os.listdir(tmp_path):
+        with open(tmp_path / name, "r+b") as fh:
+            fh.write(b"\xff" * 16)
+    uptab25, mst5_6 = tarif_tabellen.lade_tabellen(
+        _uptab25, tax_calculator_int._mst5_6, cache_dir=str(tmp_path)
+    )
+    assert uptab25 == tax_calculator_int.UPTAB25_TABELLE
+    assert mst5_6 == tax_calculator_int.MST5_6_TABELLE
+
+
+def test_formula_deviating_from_reference_is_rejected(tmp_path):
+    with pytest.raises(RuntimeError):
+        tarif_tabellen.lade_tabellen(
+            lambda x: _uptab25(x) + (x == 20000), tax_calculator_int._mst5_6, cache_dir=str(tmp_path)
+        )
+
+
+@pytest.mark.parametrize("stkl", [1, 3, 5, 6])
+def test_tarif_matches_formula_around_table_limits(stkl):
+    kztab = 2 if stkl == 3 else 1
+    for euro in (0, 12096, 12097, 17443, 17444, 34240, 34241, 68480, 68481, 277826, 300000):
+        zve = euro * 100 * kztab + 99
+        if stkl < 5:
+            expected = tax_calculator_int._uptab25(euro * 100, kztab)
+        else:
+            expected = tax_calculator_int._mst5_6(euro * kztab)
+        assert tax_calculator_int._tarif(zve, kztab, stkl) == expected
+
+
+def test_default_engine_reads_mst5_6_table(monkeypatch):
+    """Einzelberechnungen der Steuerklasse VI nutzen ohne Angabe des Rechenkerns die Tabelle"""
+    data = {"STKL": 6, "LZZ": 2, "RE4": Decimal(250000)}
+    assert engines.calculate_pap(data) == engines.calculate_pap(data, "decimal")
+
+    verfaelscht = array.array("i", (wert + 1000 for wert in tax_calculator_int.MST5_6_TABELLE))
+    monkeypatch.setattr(tax_calculator_int, "MST5_6_TABELLE", verfaelscht)
+    assert engines.DEFAULT_ENGINE == "int"
+    assert engines.calculate_pap(data)["LSTLZZ"] > engines.calculate_pap(data, "decimal")["LSTLZZ"]
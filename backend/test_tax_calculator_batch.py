@@ -0,0 +1,88 @@
+import random
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+import engines
+import tax_calculator_batch
+from tax_calculator_int import INPUTS, NotRepresentableError
+from test_tax_calculator_int import _random_inputs
+
+
+def _columns(rows):
+    return {name: [row.get(name, 0) for row in rows] for name in INPUTS if name in rows[0]}
+
+
+def test_batch_matches_decimal_engine():
+    rnd = random.Random(2025)
+    rows = [_random_inputs(rnd) for _ in range(5000)]
+    result = tax_calculator_batch.calculate_batch(_columns(rows))
+    for index, data in enumerate(rows):
+        expected = engines.pap2025.calculate(**data)
+        actual = {name: Decimal(int(column[index])) for name, column in result.items()}
+        assert actual == expected, data
+
+
+def test_numeric_columns_and_scalars():
+    columns = {
+        "RE4": np.array([350000, 500000, 8000000], dtype=np.int64),
+        "STKL": np.array([1, 3, 6]),
+        "LZZ": 2,
+        "KVZ": 2.5,
+        "ZKF": np.array([0.0, 1.5, 0.0]),
+        "R": 1,
+    }
+    result = tax_calculator_batch.calculate_batch(columns)
+    for index in range(3):
+        data = {
+            "RE4": Decimal(int(columns["RE4"][index])), "STKL": int(columns["STKL"][index]),
+            "LZZ": 2, "KVZ": Decimal("2.5"), "ZKF": Decimal(str(columns["ZKF"][index])), "R": 1,
+        }
+        expected = engines.pap2025.calculate(**data)
+        assert {name: int(column[index]) for name, column in result.items()} == {
+            name: int(value) for name, value in expected.items()
+        }
+    assert result["LSTLZZ"].dtype == np.int64
+
+
+def test_invalid_columns_are_rejected():
+    with pytest.raises(NotRepresentableError):
+        tax_calculator_batch.calculate_batch({"RE4": [350000.5], "STKL": [1], "LZZ": [2]})
+    with pytest.raises(ValueError):
+        tax_calculator_batch.calculate_batch({"RE4": [350000, 400000], "STKL": [1], "LZZ": 2})
+    with pytest.raises(ValueError):
+        tax_calculator_batch.calculate_batch(
+            {"RE4": [tax_calculator_batch.MAX_BETRAG + 1], "STKL": [1], "LZZ": [1]}
+        )
+
+
+@pytest.mark.parametrize(
+    "columns",
+    [
+        # Als float64 genau 350000.0 bzw. innerhalb der Toleranz für Sätze
+        {"RE4": [Decimal("350000.000000000001")]},
+        {"RE4": np.array([Decimal("350000.000000000001")], dtype=object)},
+        {"RE4": [Decimal(350000)], "KVZ": [Decimal("1.7000000000001")]},
+    ],
+)
+def test_decimal_digits_are_checked_before_float_conversion(columns):
+    with pytest.raises(NotRepresentableError):
+        tax_calculator_batch.calculate_batch(dict(columns, STKL=[1], LZZ=[2]))
+
+    row = {name: werte[0] for name, werte in columns.items()}
+    row.update(STKL=1, LZZ=2)
+    assert engines.calculate_pap_batch([row]) == [engines.pap2025.calculate(**row)]
+
+
+@pytest.mark.parametrize("engine", engines.BATCH_ENGINES)
+def test_calculate_pap_batch_keeps_order(engine):
+    rnd = random.Random(7)
+    rows = [_random_inputs(rnd) for _ in range(200)]
+    results = engines.calculate_pap_batch(rows, engine)
+    assert results == [engines.pap2025.calculate(**row) for row in rows]
+
+
+def test_calculate_pap_batch_falls_back_for_fractional_cents():
+    rows = [{"RE4": Decimal(350000), "STKL": 1, "LZZ": 2}, {"RE4": Decimal("350000.5"), "STKL": 1, "LZZ": 2}]
+    assert engines.calculate_pap_batch(rows) == [engines.pap2025.calculate(**row) for row in rows]
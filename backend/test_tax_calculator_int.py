@@ -0,0 +1,119 @@
+import random
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+
+import engines
+import tax_calculator_int
+import test_comprehensive
+import test_main
+from main import app
+
+
+def _random_inputs(rnd):
+    # Kleine Beträge erzeugen Rundungen auf -0 bzw. 0.00, die exakt nachgebildet werden müssen
+    small = rnd.random() < 0.2
+
+    def amount(high):
+        return Decimal(rnd.choice([0, rnd.randint(0, 20) if small else rnd.randint(0, high)]))
+
+    return {
+        "af": rnd.randint(0, 1),
+        "f": rnd.choice([1.0, 0.7, 0.9, 0.5, 0.333, 0.001]),
+        "STKL": rnd.randint(1, 6),
+        "LZZ": rnd.randint(1, 4),
+        "R": rnd.randint(0, 2),
+        "ZKF": Decimal(rnd.randint(0, 6)) / 2,
+        "KVZ": Decimal(rnd.randint(0, 1000)) / 100,
+        "PKV": rnd.randint(0, 2),
+        "PKPV": amount(200000),
+        "PVS": rnd.randint(0, 1),
+        "PVZ": rnd.randint(0, 1),
+        "PVA": Decimal(rnd.randint(0, 10)),
+        "KRV": rnd.randint(0, 1),
+        "ALTER1": rnd.randint(0, 1),
+        "AJAHR": rnd.randint(1990, 2070),
+        "RE4": Decimal(rnd.randint(1, 20) if small else rnd.randint(1, 50000000)),
+        "VBEZ": amount(3000000),
+        "VBEZM": amount(300000),
+        "VBEZS": amount(300000),
+        "VJAHR": rnd.randint(1990, 2070),
+        "ZMVB": rnd.randint(0, 12),
+        "JRE4": amount(50000000),
+        "JRE4ENT": amount(5000000),
+        "JVBEZ": amount(5000000),
+        "SONSTB": amount(50000000),
+        "SONSTENT": amount(5000000),
+        "VBS": amount(3000000),
+        "MBV": amount(500000),
+        "STERBE": amount(300000),
+        "JFREIB": amount(1000000),
+        "JHINZU": amount(1000000),
+        "LZZFREIB": amount(100000),
+        "LZZHINZU": amount(100000),
+    }
+
+
+def _as_text(result):
+    return {key: str(value) for key, value in result.items()}
+
+
+def test_int_engine_is_bit_identical_to_decimal_engine():
+    rnd = random.Random(2025)
+    for _ in range(5000):
+        data = _random_inputs(rnd)
+        expected = engines.pap2025.calculate(**data)
+        assert _as_text(tax_calculator_int.calculate(**data)) == _as_text(expected), data
+
+
+class _IntEngineCalculator:
+    """Ersetzt TaxCalculator2025 in den bestehenden Tests durch den int-Rechenkern"""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def calculate(self):
+        result = tax_calculator_int.calculate(**self.kwargs)
+        assert _as_text(result) == _as_text(engines.pap2025.calculate(**self.kwargs))
+        return result
+
+
+@pytest.mark.parametrize(
+    "name", [name for name in dir(test_main) if name.startswith("test_tax_calculator")]
+)
+def test_existing_suite_with_int_engine(name, monkeypatch):
+    monkeypatch.setattr(test_main, "TaxCalculator2025", _IntEngineCalculator)
+    getattr(test_main, name)()
+
+
+@pytest.mark.parametrize(
+    "name",
+    [name for name in dir(test_comprehensive.TestTaxCalculator2025) if name.startswith("test_")],
+)
+def test_comprehensive_suite_with_int_engine(name, monkeypatch):
+    monkeypatch.setattr(test_comprehensive, "TaxCalculator2025", _IntEngineCalculator)
+    getattr(test_comprehensive.TestTaxCalculator2025(), name)()
+
+
+def test_fractional_cents_fall_back_to_decimal_engine():
+    data = {"RE4": Decimal("350000.5"), "STKL": 1, "LZZ": 2}
+    with pytest.raises(tax_calculator_int.NotRepresentableError):
+        tax_calculator_int.calculate(**data)
+    assert engines.calculate_pap(data, "int") == engines.pap2025.calculate(**data)
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        engines.calculate_pap({"RE4": Decimal(350000), "STKL": 1, "LZZ": 2}, "float")
+
+
+def test_api_engine_parameter():
+    client = TestClient(app)
+    payload = {"RE4": 350000, "STKL": 1, "LZZ": 2, "SONSTB": 100000, "JRE4": 4200000, "PKV": 1, "PKPV": 31949}
+    decimal_response = client.post("/api/v1/calculate_payroll_tax", json=payload)
+    int_response = client.post("/api/v1/calculate_payroll_tax?engine=int", json=payload)
+    assert int_response.status_code == 200
+    assert int_response.json() == decimal_response.json()
+    invalid = client.post("/api/v1/calculate_payroll_tax?engine=float", json=payload)
+    assert invalid.status_code == 422
@@ -0,0 +1,51 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from engines import calculate_pap
+from tax_curve import downsample_lttb, tax_curve
+
+PROFILE = {"STKL": 1, "LZZ": 2, "ZKF": Decimal(1), "R": 1, "KVZ": Decimal("1.7"), "PKV": 0}
+
+
+def test_curve_matches_single_calculations():
+    curve = tax_curve(PROFILE, 100000, 900000, 20000)
+    assert curve["RE4"] == list(range(100000, 900001, 20000))
+    assert curve["computed_points"] == len(curve["RE4"])
+    for i, re4 in enumerate(curve["RE4"]):
+        single = calculate_pap(dict(PROFILE, RE4=Decimal(re4)))
+        assert [curve[name][i] for name in ("LSTLZZ", "SOLZLZZ", "BK")] == [
+            int(single[name]) for name in ("LSTLZZ", "SOLZLZZ", "BK")
+        ]
+        total = int(single["LSTLZZ"] + single["SOLZLZZ"] + single["BK"])
+        assert curve["average_rate"][i] == pytest.approx(total / re4, abs=1e-6)
+    # Grenzsatz steigt im Progressionsbereich und bleibt unter 100 %
+    assert 0 < curve["marginal_rate"][5] < curve["marginal_rate"][-1] < 1
+
+
+def test_curve_downsampling_keeps_ends():
+    curve = tax_curve(PROFILE, 0, 999900, 100, max_points=200)
+    assert len(curve["RE4"]) == 200
+    assert curve["computed_points"] == 10000
+    assert curve["RE4"][0] == 0 and curve["RE4"][-1] == 999900
+    assert curve["RE4"] == sorted(curve["RE4"])
+    assert curve["average_rate"][0] == 0
+
+
+def test_lttb_keeps_kink():
+    x = np.arange(1000)
+    y = np.where(x < 400, 0, x - 400)
+    indizes = downsample_lttb(x, y, 10)
+    assert len(indizes) == 10
+    assert np.min(np.abs(x[indizes] - 400)) <= 2
+    assert list(downsample_lttb(x[:5], y[:5], 10)) == [0, 1, 2, 3, 4]
+    with pytest.raises(ValueError):
+        downsample_lttb(x, y, 2)
+
+
+def test_curve_with_fractional_cents():
+    profile = dict(PROFILE, LZZFREIB=Decimal("1000.5"))
+    curve = tax_curve(profile, 300000, 300300, 100)
+    single = calculate_pap(dict(profile, RE4=Decimal(300300)))
+    assert curve["LSTLZZ"][-1] == int(single["LSTLZZ"])
@@ -0,0 +1,73 @@
+import io
+import zipfile
+from decimal import Decimal
+
+import openpyxl
+
+from export_service import comparison_rows, iter_comparison_xlsx
+from xlsx_stream import XLSXStreamWriter, column_letter, euro, iter_xlsx
+
+
+def _load(data: bytes):
+    return openpyxl.load_workbook(io.BytesIO(data))
+
+
+def test_numbers_formats_and_escaping():
+    rows = [["A & <B>", euro(400012), 3, ""], ["Steuer\x01", Decimal("1.5"), 0, None]]
+    headers = ["Name", "Betrag", "Anzahl", "Fehler"]
+    data = b"".join(iter_xlsx(rows, headers, [None, "euro", "integer", None]))
+    ws = _load(data).active
+    assert [[c.value for c in row] for row in ws.iter_rows()] == [
+        headers,
+        ["A & <B>", 4000.12, 3, None],
+        ["Steuer", 1.5, 0, None],
+    ]
+    assert ws["B2"].number_format == '#,##0.00 "€"'
+    assert ws["C2"].number_format == "#,##0"
+    assert ws["A1"].font.b
+    assert column_letter(1) == "A" and column_letter(28) == "AB"
+
+
+def test_rows_are_streamed_in_chunks():
+    """Die Bytes kommen blockweise, bevor alle Zeilen gelesen sind"""
+    gelesen = []
+
+    def rows():
+        for i in range(5000):
+            gelesen.append(i)
+            yield [f"Zeile {i}", euro(100000 + i)]
+
+    stream = iter_xlsx(rows(), ["Name", "Betrag"], [None, "euro"], rows_per_chunk=500)
+    erstes = next(stream)
+    assert erstes.startswith(b"PK") and len(gelesen) < 5000
+    data = erstes + b"".join(stream)
+    assert zipfile.ZipFile(io.BytesIO(data)).testzip() is None
+    ws = _load(data).active
+    assert ws.max_row == 5001 and ws["B5001"].value == 1049.99
+
+
+def test_new_sheet_after_max_rows():
+    writer = XLSXStreamWriter(["n"], ["integer"], "Liste", max_rows=3)
+    data = writer.write_rows([[i] for i in range(5)]) + writer.close()
+    wb = _load(data)
+    assert wb.sheetnames == ["Liste", "Liste (2)", "Liste (3)"]
+    assert [[c.value for c in row] for ws in wb for row in ws.iter_rows()] == [
+        ["n"], [0], [1], ["n"], [2], [3], ["n"], [4]
+    ]
+
+
+def test_comparison_without_limit():
+    calculations = [
+        {"input": {"RE4": 300000 + i}, "result": {"LSTLZZ": 40000, "SOLZLZZ": 0, "BK": 3600}}
+        for i in range(50)
+    ]
+    ws = _load(b"".join(iter_comparison_xlsx(comparison_rows(calculations)))).active
+    assert ws.max_row == 51
+    assert [c.value for c in ws[2]] == ["Szenario 1", 3000, 400, 0, 36, 2564]
+
+
+def test_non_finite_numbers_are_written_as_text():
+    writer = XLSXStreamWriter(["n"], ["euro"], "Liste")
+    werte = [Decimal("NaN"), float("inf"), Decimal("1.5")]
+    ws = _load(writer.write_rows([[wert] for wert in werte]) + writer.close()).active
+    assert [c.value for c in ws["A"]][1:] == ["NaN", "inf", 1.5]
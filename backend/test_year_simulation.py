@@ -0,0 +1,93 @@
+from decimal import Decimal
+
+import pytest
+
+from engines import calculate_pap
+from year_simulation import simulate_year
+
+PROFILE = {"STKL": 1, "R": 1, "KVZ": Decimal("1.7")}
+
+
+def test_constant_salary_with_bonuses_matches_annual_tax():
+    """Monatslohnsteuer plus Steuer auf sonstige Bezüge ergibt die Jahreslohnsteuer"""
+    one_offs = [{"month": 6, "SONSTB": 300000}, {"month": 11, "SONSTB": 200000}]
+    result = simulate_year(PROFILE, [Decimal(400000)], one_offs)
+
+    annual = calculate_pap(dict(PROFILE, LZZ=1, RE4=Decimal(5300000)))
+    totals = result["totals"]
+    assert totals["LSTLZZ"] + totals["STS"] == annual["LSTLZZ"]
+    assert totals["RE4"] == 4800000 and totals["SONSTB"] == 500000
+    assert totals["net"] == totals["RE4"] + totals["SONSTB"] - totals["tax"]
+    # Gleiche Monate werden nur einmal gerechnet
+    assert result["calculations"] == 3
+
+    june = result["months"][5]
+    assert june["SONSTB"] == 300000 and june["STS"] > 0
+    assert result["months"][4]["STS"] == 0
+    assert result["months"][-1]["ytd_gross"] == 5300000
+    assert result["months"][-1]["ytd_tax"] == totals["tax"]
+
+
+def test_year_to_date_values_are_carried_forward():
+    """JRE4 enthält den Lohnplan und die sonstigen Bezüge der Vormonate"""
+    wages = [Decimal(300000 + 10000 * i) for i in range(12)]
+    one_offs = [
+        {"month": 3, "SONSTB": 100000, "SONSTENT": 40000},
+        {"month": 9, "SONSTB": 250000},
+    ]
+    profile = dict(PROFILE, LZZFREIB=Decimal(5000))
+    result = simulate_year(profile, wages, one_offs)
+
+    expected = calculate_pap(
+        dict(
+            profile,
+            LZZ=2,
+            RE4=wages[8],
+            SONSTB=Decimal(250000),
+            SONSTENT=Decimal(0),
+            JRE4=sum(wages) + 100000,
+            JRE4ENT=Decimal(40000),
+            JFREIB=Decimal(60000),
+            JHINZU=Decimal(0),
+        )
+    )
+    september = result["months"][8]
+    assert september["STS"] == expected["STS"]
+    assert september["LSTLZZ"] == expected["LSTLZZ"]
+    assert result["calculations"] == 12
+
+
+@pytest.mark.parametrize("zmvb", [12, 5])
+def test_pension_is_carried_forward_as_jvbez(zmvb):
+    """Bei Versorgungsbezügen enthält JRE4 auch JVBEZ, VBEZ für jeden Monat mit Versorgungsbezug"""
+    profile = dict(
+        PROFILE, VBEZ=Decimal(150000), VBEZM=Decimal(150000), VJAHR=2020, ZMVB=zmvb
+    )
+    result = simulate_year(profile, [Decimal(400000)], [{"month": 12, "SONSTB": 200000}])
+
+    expected = calculate_pap(
+        dict(
+            profile,
+            LZZ=2,
+            RE4=Decimal(400000),
+            SONSTB=Decimal(200000),
+            SONSTENT=Decimal(0),
+            JRE4=Decimal(4800000),
+            JRE4ENT=Decimal(0),
+            JFREIB=Decimal(0),
+            JHINZU=Decimal(0),
+            JVBEZ=Decimal(150000) * zmvb,
+        )
+    )
+    december = result["months"][11]
+    assert december["STS"] == expected["STS"]
+    assert december["LSTLZZ"] == expected["LSTLZZ"]
+
+
+def test_invalid_schedules():
+    with pytest.raises(ValueError):
+        simulate_year(PROFILE, [Decimal(1)] * 11, [])
+    with pytest.raises(ValueError):
+        simulate_year(PROFILE, [Decimal(1)], [{"month": 13, "SONSTB": 1}])
+    with pytest.raises(ValueError):
+        simulate_year(PROFILE, [Decimal(1)], [{"month": 1, "SONSTB": 1, "SONSTENT": 2}])
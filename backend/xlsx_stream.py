@@ -0,0 +1,303 @@
+"""
+XLSX-Dateien zeilenweise schreiben, ohne Arbeitsmappe im Speicher
+
+``openpyxl`` hält eine Arbeitsmappe bis zum Speichern vollständig (bzw. im write-only-Modus
+in einer temporären Datei) und liefert sie erst danach. ``XLSXStreamWriter`` schreibt das
+Tabellenblatt als XML direkt in ein ZIP-Archiv, dessen Bytes nach jedem Block abgeholt und
+an den Client gesendet werden; der Speicherbedarf hängt nicht von der Zeilenzahl ab.
+
+- Zahlen (int, Decimal, float) werden als Zahlenzellen geschrieben, Texte als Inline-Strings
+- je Spalte ein Zahlenformat aus ``NUMBER_FORMATS`` (z.B. ``euro``), in ``styles.xml``
+  einmal definiert und von allen Zellen der Spalte geteilt
+- über ``MAX_ROWS`` Zeilen hinaus beginnt ein neues Tabellenblatt mit derselben Kopfzeile
+- das ZIP-Archiv wird ohne Zurückspringen geschrieben (Datendeskriptoren, ZIP64), da es
+  beim Schreiben schon unterwegs ist
+"""
+
+import math
+import re
+import time
+import zipfile
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Optional, Sequence
+from xml.sax.saxutils import escape, quoteattr
+
+# Zeilen je Tabellenblatt einschließlich Kopfzeile (Grenze von Excel: 1.048.576)
+MAX_ROWS = 1048576
+
+# Zeilen, nach denen ``iter_xlsx`` die bisher erzeugten Bytes abgibt
+ROWS_PER_CHUNK = 1000
+
+# Zahlenformate je Spalte; der Index ist die Stil-Nummer in ``styles.xml``
+NUMBER_FORMATS = {"euro": (2, '#,##0.00 "€"'), "integer": (3, "#,##0")}
+HEADER_STYLE = 1
+
+MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+_ZAHLTYPEN = frozenset((int, float, Decimal))
+
+
+
+def _endlich(value) -> bool:
+    """NaN und Unendlich haben in ``<v>`` keine Darstellung, sie werden als Text geschrieben"""
+    if type(value) is Decimal:
+        return value.is_finite()
+    return type(value) is int or math.isfinite(value)
+
+
+# In XML 1.0 nicht erlaubte Steuerzeichen
+_STEUERZEICHEN_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG = "http://schemas.openxmlformats.org/package/2006"
+
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<styleSheet xmlns="{_NS}">'
+    '<numFmts count="2">'
+    f'<numFmt numFmtId="164" formatCode={quoteattr(NUMBER_FORMATS["euro"][1])}/>'
+    f'<numFmt numFmtId="165" formatCode={quoteattr(NUMBER_FORMATS["integer"][1])}/>'
+    "</numFmts>"
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><color rgb="FFFFFFFF"/><name val="Calibri"/></font></fonts>'
+    '<fills count="3"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FF4472C4"/></patternFill></fill>'
+    "</fills>"
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" applyFill="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    "</cellXfs>"
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    "</styleSheet>"
+)
+
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<Relationships xmlns="{_NS_PKG}/relationships">'
+    '<Relationship Id="rId1" Target="xl/workbook.xml" '
+    f'Type="{_NS_R}/officeDocument"/></Relationships>'
+)
+
+
+def column_letter(index: int) -> str:
+    """Spaltenbuchstaben zu einer Spaltennummer ab 1 (1 -> A, 27 -> AA)"""
+    letters = ""
+    while index:
+        index, rest = divmod(index - 1, 26)
+        letters = chr(65 + rest) + letters
+    return letters
+
+
+class ZipStream:
+    """ZIP-Archiv, dessen Bytes während des Schreibens abgeholt werden"""
+
+    def __init__(self, compression: int = zipfile.ZIP_DEFLATED):
+        self._chunks: List[bytes] = []
+        # Ohne tell()/seek() schreibt zipfile Datendeskriptoren statt nachträglicher Köpfe
+        self._zip = zipfile.ZipFile(self, "w", compression, allowZip64=True)
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def open(self, name: str):
+        """Eintrag zum Schreiben öffnen; Größe unbekannt, daher immer ZIP64"""
+        info = zipfile.ZipInfo(name, time.localtime()[:6])
+        info.compress_type = self._zip.compression
+        return self._zip.open(info, "w", force_zip64=True)
+
+    def writestr(self, name: str, data):
+        info = zipfile.ZipInfo(name, time.localtime()[:6])
+        info.compress_type = self._zip.compression
+        self._zip.writestr(info, data)
+
+    def read(self) -> bytes:
+        """Seit dem letzten Aufruf erzeugte Bytes"""
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+    def close(self) -> bytes:
+        """Zentralverzeichnis schreiben; liefert die restlichen Bytes"""
+        self._zip.close()
+        return self.read()
+
+
+class XLSXStreamWriter:
+    """Schreibt Zeilen in eine XLSX-Datei; jede Methode liefert die neu erzeugten Bytes
+
+    ``formats`` enthält je Spalte ``None`` oder einen Schlüssel aus ``NUMBER_FORMATS``,
+    ``widths`` die Spaltenbreiten in Zeichen.
+    """
+
+    def __init__(
+        self,
+        headers: Sequence[str],
+        formats: Optional[Sequence[Optional[str]]] = None,
+        sheet_name: str = "Tabelle1",
+        widths: Optional[Sequence[float]] = None,
+        max_rows: int = MAX_ROWS,
+    ):
+        self.headers = list(headers)
+        formats = formats or [None] * len(self.headers)
+        self._styles = [NUMBER_FORMATS[name][0] if name else 0 for name in formats]
+        self._letters = [column_letter(index) for index in range(1, len(self.headers) + 1)]
+        self.sheet_name = sheet_name
+        self.widths = widths
+        self.max_rows = max_rows
+        self.rows = 0
+        self._zip = ZipStream()
+        self._sheets: List[str] = []
+        self._sheet = None
+        self._sheet_rows = 0
+
+    def _open_sheet(self):
+        nummer = len(self._sheets) + 1
+        name = self.sheet_name if nummer == 1 else f"{self.sheet_name} ({nummer})"
+        self._sheets.append(_STEUERZEICHEN_RE.sub("", name)[:31])
+        self._sheet = self._zip.open(f"xl/worksheets/sheet{nummer}.xml")
+        teile = [
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n',
+            f'<worksheet xmlns="{_NS}" xmlns:r="{_NS_R}">',
+            '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" '
+            'activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>',
+        ]
+        if self.widths:
+            teile.append("<cols>")
+            for index, width in enumerate(self.widths, 1):
+                teile.append(f'<col min="{index}" max="{index}" width="{width}" customWidth="1"/>')
+            teile.append("</cols>")
+        teile.append("<sheetData>")
+        self._sheet.write("".join(teile).encode())
+        self._sheet_rows = 0
+        self._write([self.headers], HEADER_STYLE)
+
+    def _close_sheet(self):
+        self._sheet.write(b"</sheetData></worksheet>")
+        self._sheet.close()
+        self._sheet = None
+
+    def _write(self, rows: Iterable[Sequence], style: int = None):
+        teile = []
+        styles, letters = self._styles, self._letters
+        for row in rows:
+            self._sheet_rows += 1
+            nummer = self._sheet_rows
+            teile.append(f'<row r="{nummer}">')
+            for index, value in enumerate(row):
+                if value is None or value == "":
+                    continue
+                ref = f"{letters[index]}{nummer}"
+                s = styles[index] if style is None else style
+                attribut = f' s="{s}"' if s else ""
+                if type(value) in _ZAHLTYPEN and _endlich(value):
+                    teile.append(f'<c r="{ref}"{attribut}><v>{value}</v></c>')
+                else:
+                    text = escape(_STEUERZEICHEN_RE.sub("", str(value)))
+                    teile.append(
+                        f'<c r="{ref}"{attribut} t="inlineStr"><is><t xml:space="preserve">'
+                        f"{text}</t></is></c>"
+                    )
+            teile.append("</row>")
+        self._sheet.write("".join(teile).encode())
+
+    def write_rows(self, rows: Iterable[Sequence]) -> bytes:
+        """Schreibt Datenzeilen; liefert die bis dahin komprimierten Bytes"""
+        block = []
+        for row in rows:
+            if self._sheet is None or self._sheet_rows + len(block) >= self.max_rows:
+                if self._sheet is not None:
+                    self._write(block)
+                    self._close_sheet()
+                    block = []
+                self._open_sheet()
+            block.append(row)
+            self.rows += 1
+        if block:
+            self._write(block)
+        return self._zip.read()
+
+    def close(self) -> bytes:
+        """Schließt das letzte Tabellenblatt und schreibt Arbeitsmappe und Verzeichnis"""
+        if self._sheet is None and not self._sheets:
+            self._open_sheet()
+        if self._sheet is not None:
+            self._close_sheet()
+        anzahl = len(self._sheets)
+        sheets = "".join(
+            f"<sheet name={quoteattr(name)} sheetId=\"{nummer}\" r:id=\"rId{nummer}\"/>"
+            for nummer, name in enumerate(self._sheets, 1)
+        )
+        self._zip.writestr(
+            "xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<workbook xmlns="{_NS}" xmlns:r="{_NS_R}"><sheets>{sheets}</sheets></workbook>',
+        )
+        beziehungen = "".join(
+            f'<Relationship Id="rId{nummer}" Target="worksheets/sheet{nummer}.xml" '
+            f'Type="{_NS_R}/worksheet"/>'
+            for nummer in range(1, anzahl + 1)
+        )
+        self._zip.writestr(
+            "xl/_rels/workbook.xml.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Relationships xmlns="{_NS_PKG}/relationships">{beziehungen}'
+            f'<Relationship Id="rId{anzahl + 1}" Target="styles.xml" Type="{_NS_R}/styles"/>'
+            "</Relationships>",
+        )
+        self._zip.writestr("xl/styles.xml", _STYLES)
+        self._zip.writestr("_rels/.rels", _RELS)
+        overrides = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{nummer}.xml" ContentType="application/'
+            'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for nummer in range(1, anzahl + 1)
+        )
+        self._zip.writestr(
+            "[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Types xmlns="{_NS_PKG}/content-types">'
+            '<Default Extension="rels" '
+            'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/'
+            'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" ContentType="application/'
+            'vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            f"{overrides}</Types>",
+        )
+        return self._zip.close()
+
+
+def iter_xlsx(
+    rows: Iterable[Sequence],
+    headers: Sequence[str],
+    formats: Optional[Sequence[Optional[str]]] = None,
+    sheet_name: str = "Tabelle1",
+    widths: Optional[Sequence[float]] = None,
+    rows_per_chunk: int = ROWS_PER_CHUNK,
+) -> Iterator[bytes]:
+    """XLSX-Datei zu einem (beliebig langen) Iterator von Zeilen, in Stücken von Bytes"""
+    writer = XLSXStreamWriter(headers, formats, sheet_name, widths)
+    block: List[Sequence] = []
+    for row in rows:
+        block.append(row)
+        if len(block) >= rows_per_chunk:
+            data = writer.write_rows(block)
+            block = []
+            if data:
+                yield data
+    yield writer.write_rows(block) + writer.close()
+
+
+def euro(cents) -> Decimal:
+    """Centbetrag als Eurobetrag für Zellen im Format ``euro``"""
+    return Decimal(str(cents)).scaleb(-2)
+
@@ -0,0 +1,95 @@
+"""
+Jahressimulation: zwölf Monatsabrechnungen mit sonstigen Bezügen in einem Aufruf
+
+Eingaben sind ein festes Profil (STKL, ZKF, R, KVZ, PKV, ...), die zwölf Monatslöhne RE4 und
+einmalige Zahlungen (sonstige Bezüge) mit ihrem Monat. Für jeden Monat mit sonstigem Bezug
+werden die Jahreswerte fortgeschrieben, wie der PAP sie erwartet:
+
+- ``JRE4``: voraussichtlicher Jahresarbeitslohn, d.h. die Summe des Lohnplans, zuzüglich der
+  in Vormonaten gezahlten sonstigen Bezüge; ``JRE4ENT`` die darin enthaltenen Entschädigungen
+- ``JFREIB``/``JHINZU``: das Zwölffache von ``LZZFREIB``/``LZZHINZU``
+- ``JVBEZ``: die in ``JRE4`` enthaltenen Versorgungsbezüge, ``VBEZ`` mal ``ZMVB`` (Monate mit
+  Versorgungsbezug, ohne Angabe zwölf)
+
+Monate mit gleichen Eingaben (z.B. gleichbleibendes Gehalt ohne Einmalzahlung) werden nur
+einmal gerechnet.
+"""
+
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from engines import calculate_pap
+
+MONTHS = 12
+
+# Beträge je Monat in der Simulation, Summen in den Jahreswerten
+MONTH_AMOUNTS = ("LSTLZZ", "SOLZLZZ", "BK", "STS", "SOLZS", "BKS")
+
+
+def simulate_year(
+    profile: Dict, wages: List[Decimal], one_offs: List[Dict], engine: Optional[str] = None
+) -> Dict:
+    """Rechnet die zwölf Monate; ``one_offs`` enthält Einträge mit month, SONSTB, SONSTENT"""
+    if len(wages) == 1:
+        wages = list(wages) * MONTHS
+    if len(wages) != MONTHS:
+        raise ValueError(f"Es werden 1 oder {MONTHS} Monatslöhne benötigt, nicht {len(wages)}")
+
+    sonstb = [Decimal(0)] * MONTHS
+    sonstent = [Decimal(0)] * MONTHS
+    for payment in one_offs:
+        month = int(payment["month"])
+        if not 1 <= month <= MONTHS:
+            raise ValueError(f"Monat {month} liegt nicht zwischen 1 und {MONTHS}")
+        sonstb[month - 1] += Decimal(payment["SONSTB"])
+        sonstent[month - 1] += Decimal(payment.get("SONSTENT", 0))
+        if sonstent[month - 1] > sonstb[month - 1]:
+            raise ValueError(f"SONSTENT übersteigt SONSTB in Monat {month}")
+
+    base = dict(profile, LZZ=2)
+    base.pop("RE4", None)
+    jahreslohn = sum(wages, Decimal(0))
+    jfreib = Decimal(base.get("LZZFREIB", 0)) * MONTHS
+    jhinzu = Decimal(base.get("LZZHINZU", 0)) * MONTHS
+    jvbez = Decimal(base.get("VBEZ", 0)) * (base.get("ZMVB") or MONTHS)
+
+    computed: Dict[tuple, Dict] = {}
+    months = []
+    totals = dict.fromkeys(("RE4", "SONSTB", *MONTH_AMOUNTS, "tax", "net"), Decimal(0))
+    paid_sonstb = paid_sonstent = Decimal(0)
+    for index in range(MONTHS):
+        row = dict(base, RE4=Decimal(wages[index]))
+        if sonstb[index]:
+            row.update(
+                SONSTB=sonstb[index],
+                SONSTENT=sonstent[index],
+                JRE4=jahreslohn + paid_sonstb,
+                JRE4ENT=paid_sonstent,
+                JFREIB=jfreib,
+                JHINZU=jhinzu,
+                JVBEZ=jvbez,
+            )
+        key = tuple(sorted((name, str(value)) for name, value in row.items()))
+        if key not in computed:
+            computed[key] = calculate_pap(row, engine)
+        result = computed[key]
+
+        amounts = {name: result[name] for name in MONTH_AMOUNTS}
+        tax = sum(amounts.values(), Decimal(0))
+        month = {
+            "month": index + 1,
+            "RE4": row["RE4"],
+            "SONSTB": sonstb[index],
+            **amounts,
+            "tax": tax,
+            "net": row["RE4"] + sonstb[index] - tax,
+        }
+        for name in totals:
+            totals[name] += month[name]
+        month["ytd_gross"] = totals["RE4"] + totals["SONSTB"]
+        month["ytd_tax"] = totals["tax"]
+        months.append(month)
+        paid_sonstb += sonstb[index]
+        paid_sonstent += sonstent[index]
+
+    return {"months": months, "totals": totals, "calculations": len(computed)}
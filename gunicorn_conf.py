@@ -1,4 +1,7 @@
 import multiprocessing
+import os
+import shutil
+import tempfile
 
 # Server socket
 bind = "0.0.0.0:8000"
@@ -13,3 +16,38 @@ worker_class = "uvicorn.workers.UvicornWorker"
 # Logging
 accesslog = "-"
 errorlog = "-"
+
+
+# Zustand, den alle Worker über eine Datei teilen; bei jedem Start des Masters neu angelegt
+SHARED_STATE = {
+    "RATE_LIMIT_PATH": "lohnsteuer_rate_limit",
+    "SECURITY_STATE_PATH": "lohnsteuer_security",
+}
+
+
+def _state_path(prefix):
+    shm = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(shm, f"{prefix}_{os.getpid()}.bin")
+
+
+# Verzeichnis mit einer Metrikdatei je Worker, beim Abruf summiert
+METRICS_PREFIX = "lohnsteuer_metrics"
+
+
+def _metrics_dir():
+    return _state_path(METRICS_PREFIX)[: -len(".bin")]
+
+
+def on_starting(server):
+    for variable, prefix in SHARED_STATE.items():
+        os.environ.setdefault(variable, _state_path(prefix))
+    os.environ.setdefault("METRICS_DIR", _metrics_dir())
+
+
+def on_exit(server):
+    for variable, prefix in SHARED_STATE.items():
+        path = os.environ.get(variable)
+        if path == _state_path(prefix) and os.path.exists(path):
+            os.remove(path)
+    if os.environ.get("METRICS_DIR") == _metrics_dir():
+        shutil.rmtree(_metrics_dir(), ignore_errors=True)